@@ -11,6 +11,8 @@ from enum import Enum
 from typing import List, Optional, Any, Dict, Tuple
 from dataclasses import dataclass, field
 
+from core.utils.metrics import STATE_WRITES
+
 # --- File paths for state management ---
 STATE_FILE = os.path.join(os.path.dirname(__file__), "..", "gui_state.json")
 GOAL_REQUEST_FILE = os.path.join(os.path.dirname(__file__), "..", "goal_request.json")
@@ -156,6 +158,7 @@ def write_state(state_dict):
         os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
         with open(STATE_FILE, 'w') as f:
             json.dump(state_dict, f, indent=2)
+        STATE_WRITES.inc()
     except Exception as e:
         print(f"Error writing state file: {e}")
 
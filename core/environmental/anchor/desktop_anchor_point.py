@@ -4,6 +4,8 @@ import subprocess
 import time
 import logging
 
+from core.utils.screen_settle import wait_for_screen_settle
+
 logger = logging.getLogger(__name__)
 
 def show_desktop():
@@ -14,11 +16,11 @@ def show_desktop():
             
             # Method 1: Use Windows API to minimize all windows
             minimize_all_windows_api()
-            time.sleep(0.5)
+            wait_for_screen_settle(timeout=0.5, expect_change=True)
             
             # Method 2: Fallback to PowerShell if API method fails
             minimize_all_windows()
-            time.sleep(0.5)
+            wait_for_screen_settle(timeout=0.5)
             
             # Method 3: Ensure desktop is focused
             focus_desktop()
@@ -88,3 +88,19 @@ class WebViewError(AutomoyError):
     def __init__(self, message: str):
         self.message = f"WebView Error: {message}"
         super().__init__(self.message)
+
+class PluginDisabledError(AutomoyError):
+    """Exception raised when a disabled optional integration is requested."""
+    def __init__(self, plugin_name: str, config_key: str = None):
+        self.plugin_name = plugin_name
+        self.config_key = config_key
+        hint = f" (set {config_key}: True in config.txt)" if config_key else ""
+        self.message = f"Plugin '{plugin_name}' is disabled{hint}"
+        super().__init__(self.message)
+
+class StartupError(AutomoyError):
+    """Exception raised when a startup component fails to come up."""
+    def __init__(self, component: str, message: str):
+        self.component = component
+        self.message = f"Startup Error ({component}): {message}"
+        super().__init__(self.message)
@@ -5,10 +5,20 @@ import requests
 import json
 import asyncio
 import re  # Add re import for regex search
+import logging
 
 sys.path.append(str(pathlib.Path(__file__).parent.parent.parent.parent / "config"))
 from config import Config
 
+sys.path.append(str(pathlib.Path(__file__).parent.parent.parent.parent))
+from core.utils.structured_logging import LazyJSON, LazyPreview, Sampler, log_event
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# Streamed tokens are only logged every LOG_SAMPLE_EVERY tokens
+_token_sampler = Sampler()
+
 # Helper function to format OCR & YOLO data into a readable string
 def format_preprocessed_data(data):
     """
@@ -28,18 +38,18 @@ def format_messages(messages):
     for msg in messages:
         if "role" in msg and "content" in msg:
             if msg["content"] is None or not isinstance(msg["content"], str):
-                print(f"[WARNING] Fixing malformed message: {msg}")  # Debugging
+                logger.warning("Fixing malformed message: %s", LazyPreview(msg, 300))
                 msg["content"] = ""  # Convert None to empty string
             formatted.append({"role": msg["role"], "content": msg["content"]})
         else:
-            print(f"[ERROR] Malformed message detected: {msg}")
+            logger.error("Malformed message detected: %s", LazyPreview(msg, 300))
     return formatted
 
 async def call_lmstudio_model(messages, objective, model, thinking_callback=None):
     """
     Calls the LMStudio API with streaming enabled.
-    The function prints tokens as they arrive (so text appears as it's generated)
-    and only returns the full response after the model finishes generating.
+    Tokens are forwarded to ``thinking_callback`` as they arrive (and logged,
+    sampled, at DEBUG); the full response is returned once the model finishes.
     
     Args:
         thinking_callback: Optional async function to call with each streamed token
@@ -53,32 +63,32 @@ async def call_lmstudio_model(messages, objective, model, thinking_callback=None
         # Add enhanced error checking for API source and URL
         if api_source != "lmstudio":
             error_msg = f"[ERROR] Expected LMStudio API but got {api_source} instead"
-            print(error_msg)
+            logger.error(error_msg)
             return error_msg
             
         if not api_value or not api_value.strip():
             error_msg = "[ERROR] No LMStudio API URL specified in configuration"
-            print(error_msg)
+            logger.error(error_msg)
             return error_msg
             
         api_url = api_value.rstrip("/") + "/v1/chat/completions"
         
         # Test the API connection quickly before proceeding
         try:
-            print(f"[DEBUG] Testing LMStudio API connection at {api_url}")
-            test_response = requests.get(api_value.rstrip("/") + "/v1/models", timeout=3)
+            logger.debug("Testing LMStudio API connection at %s", api_url)
+            test_response = await asyncio.to_thread(requests.get, api_value.rstrip("/") + "/v1/models", timeout=3)
             if test_response.status_code != 200:
                 error_msg = f"[ERROR] LMStudio API not available (status: {test_response.status_code})"
-                print(error_msg)
+                logger.error(error_msg)
                 return error_msg
-            print("[DEBUG] LMStudio API connection successful")
+            logger.debug("LMStudio API connection successful")
         except requests.RequestException as e:
             error_msg = f"[ERROR] Could not connect to LMStudio API: {e}"
-            print(error_msg)
+            logger.error(error_msg)
             return error_msg
     except Exception as e:
         error_msg = f"[ERROR] Failed to get LMStudio API configuration: {e}"
-        print(error_msg)
+        logger.error(error_msg)
         return error_msg
 
     headers = {"Content-Type": "application/json"}
@@ -96,17 +106,10 @@ async def call_lmstudio_model(messages, objective, model, thinking_callback=None
             original_content = msg["content"]
             max_length = 5000  # Allow a larger amount of data
             if len(original_content) > max_length:
-                print(f"[DEBUG] Preprocessed data message length: {len(original_content)} exceeds {max_length}. Truncating.")
+                logger.debug("Preprocessed data message length %d exceeds %d. Truncating.", len(original_content), max_length)
                 truncated_content = original_content[:max_length] + "\n... [truncated]"
                 msg["content"] = truncated_content
-            else:
-                print(f"[DEBUG] Preprocessed data message length: {len(original_content)} is within limits.")
-
-    # Log the sanitized preprocessed data for inspection.
-    for msg in formatted_messages:
-        if msg["role"] == "system" and "Preprocessed data summary:" in msg["content"]:
-            print("[DEBUG] Sanitized preprocessed data message:")
-            print(msg["content"])
+            logger.debug("Sanitized preprocessed data message:\n%s", msg["content"])
 
     # Prepare payload with streaming enabled.
     payload = {
@@ -118,24 +121,34 @@ async def call_lmstudio_model(messages, objective, model, thinking_callback=None
         "stream": True  # Enable streaming so tokens appear as they're generated.
     }
 
-    print(f"[DEBUG] Sending request to LMStudio API ({api_url}) with model: {model}")
-    print(f"[DEBUG] Final Payload Before Sending:\n{json.dumps(payload, indent=2)}")
-    payload_str = json.dumps(payload)
-    print(f"[DEBUG] Payload size: {len(payload_str)} bytes")
-    if len(payload_str) > 10000:
-        print("[WARNING] Payload is very large and may cause timeouts or errors.")
+    # Message text dominates the payload; avoids serializing it a second time just to measure it
+    payload_chars = sum(len(msg["content"]) for msg in formatted_messages)
+    log_event(logger, logging.INFO, "LMStudio request", url=api_url, model=model,
+              messages=len(formatted_messages), chars=payload_chars)
+    logger.debug("LMStudio payload:\n%s", LazyJSON(payload, indent=2))
+    if payload_chars > 10000:
+        logger.warning("LMStudio payload is very large (%d chars) and may cause timeouts or errors.", payload_chars)
 
     try:
-        # Add timeout to prevent hanging requests
-        with requests.post(api_url, json=payload, headers=headers, stream=True, timeout=45) as response:
+        # Add timeout to prevent hanging requests. The connect and every chunk read
+        # block, so they run in a worker thread and the event loop stays free.
+        response = await asyncio.to_thread(requests.post, api_url, json=payload, headers=headers,
+                                           stream=True, timeout=45)
+        with response:
             response.raise_for_status()
 
             full_response = ""
             printed_any_token = False
-            print("[Waiting for streamed output...]")  # Always print before streaming starts
+            token_count = 0
+            _token_sampler.reset("lmstudio_token")
+            logger.debug("Waiting for streamed output...")
             
             # Using iter_content for more robust chunk handling
-            for chunk in response.iter_content(chunk_size=None):
+            chunks = response.iter_content(chunk_size=None)
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
                 if not chunk:
                     continue
                 
@@ -155,36 +168,38 @@ async def call_lmstudio_model(messages, objective, model, thinking_callback=None
                         try:
                             json_data = json.loads(decoded_line[6:])
                             if not isinstance(json_data, dict) or "choices" not in json_data:
-                                print(f"[ERROR] Unexpected LMStudio chunk: {json_data}")
+                                logger.error("Unexpected LMStudio chunk: %s", LazyPreview(json_data, 300))
                                 continue
                             token = json_data["choices"][0].get("delta", {}).get("content", "")
                             if token is not None and token != "":
                                 printed_any_token = True
-                                sys.stdout.write(token)
-                                sys.stdout.flush()
+                                token_count += 1
+                                _token_sampler.log(logger, logging.DEBUG, "lmstudio_token",
+                                                   "Streamed %d tokens (%d chars)", token_count, len(full_response))
                                 
                                 # Call the thinking callback if provided
                                 if thinking_callback:
                                     try:
                                         await thinking_callback(token)
                                     except Exception as e:
-                                        print(f"[ERROR] Thinking callback failed: {e}")
+                                        logger.error("Thinking callback failed: %s", e)
                                         
                             full_response += token if token is not None else ""
                             if json_data["choices"][0].get("finish_reason") is not None:
                                 break
                         except json.JSONDecodeError:
-                            print("[ERROR] Failed to parse streamed JSON chunk:", decoded_line)
+                            logger.error("Failed to parse streamed JSON chunk: %s", LazyPreview(decoded_line, 300))
                     else:
-                        print(f"[LMStudio stream] {decoded_line}")
+                        logger.debug("[LMStudio stream] %s", decoded_line)
                 
                 if "data: [DONE]" in decoded_chunk:
                     break
 
             if not printed_any_token:
-                print("\n[DEBUG] No tokens were received in the stream.")
+                logger.warning("No tokens were received in the LMStudio stream.")
 
-            print("\n[DEBUG] Full Response Received:", full_response)
+            log_event(logger, logging.INFO, "LMStudio response", tokens=token_count, chars=len(full_response))
+            logger.debug("Full response received: %s", LazyPreview(full_response, 4000))
             
             # --- Attempt to extract and parse JSON action --- 
             if full_response:
@@ -192,14 +207,14 @@ async def call_lmstudio_model(messages, objective, model, thinking_callback=None
                 match = re.search(r"```json\s*([\s\S]*?)\s*```", full_response)
                 if match:
                     json_str = match.group(1).strip()
-                    print(f"[DEBUG] Found JSON code block: {json_str[:100]}...")
+                    logger.debug("Found JSON code block: %s", LazyPreview(json_str, 100))
                 else:
                     # If no code block, try to extract raw JSON array from the response
                     # Look for JSON array pattern starting with [ and ending with ]
                     array_match = re.search(r'\[\s*\{[\s\S]*?\}\s*\]', full_response)
                     if array_match:
                         json_str = array_match.group(0).strip()
-                        print(f"[DEBUG] Found raw JSON array: {json_str[:100]}...")
+                        logger.debug("Found raw JSON array: %s", LazyPreview(json_str, 100))
                     else:
                         # Look for single JSON object pattern with better brace matching
                         # This regex will properly match opening and closing braces
@@ -220,68 +235,59 @@ async def call_lmstudio_model(messages, objective, model, thinking_callback=None
                         
                         if start_idx != -1 and end_idx != -1:
                             json_str = full_response[start_idx:end_idx].strip()
-                            print(f"[DEBUG] Found raw JSON object: {json_str[:100]}...")
+                            logger.debug("Found raw JSON object: %s", LazyPreview(json_str, 100))
                         else:
                             json_str = None
                 
                 if json_str:
                     try:
                         parsed_json = json.loads(json_str)
-                        print(f"[DEBUG] LMStudio parsed JSON type: {type(parsed_json)}")
-                        if isinstance(parsed_json, list):
-                            print(f"[DEBUG] LMStudio parsed list with {len(parsed_json)} items")
-                            if len(parsed_json) > 0:
-                                print(f"[DEBUG] First item type: {type(parsed_json[0])}")
-                                if isinstance(parsed_json[0], dict):
-                                    print(f"[DEBUG] First item keys: {list(parsed_json[0].keys())}")
-                                    print(f"[DEBUG] Has step_number: {'step_number' in parsed_json[0]}")
-                        elif isinstance(parsed_json, dict):
-                            print(f"[DEBUG] LMStudio parsed dict with keys: {list(parsed_json.keys())}")
-                        
+                        logger.debug("LMStudio parsed JSON: %s", LazyPreview(parsed_json, 300))
+
                         # Check if it's a single action object (direct action format)
                         if isinstance(parsed_json, dict) and ("type" in parsed_json or "action_type" in parsed_json):
-                            print(f"[DEBUG] Extracted single JSON action from LMStudio: {parsed_json}")
+                            logger.debug("Extracted single JSON action from LMStudio")
                             return json.dumps(parsed_json) # Return single action as JSON string
                         # Check if it's a list of steps (for step generation) - MOVED BEFORE general list check
                         elif isinstance(parsed_json, list) and len(parsed_json) > 0 and "step_number" in parsed_json[0]:
-                            print(f"[DEBUG] Extracted JSON steps from LMStudio: {len(parsed_json)} steps")
+                            logger.debug("Extracted JSON steps from LMStudio: %d steps", len(parsed_json))
                             return json.dumps(parsed_json) # Return the full steps array
                         # Check if it's a list of actions (as per DEFAULT_PROMPT)
                         elif isinstance(parsed_json, list) and len(parsed_json) > 0:
-                            # For action generation, return the first action
-                            action_to_return = parsed_json[0]
-                            print(f"[DEBUG] Extracted JSON action from LMStudio list: {action_to_return}")
-                            return json.dumps(action_to_return) # Return single action as JSON string
+                            # Keep the whole list: it may be a multi-action plan, and
+                            # handle_llm_response picks the first action when it is not
+                            logger.debug("Extracted JSON action list from LMStudio: %d actions", len(parsed_json))
+                            return json.dumps(parsed_json)
                         # Check if it's a single action object with "operation" field
                         elif isinstance(parsed_json, dict) and "operation" in parsed_json:
-                            print(f"[DEBUG] Extracted single JSON action object from LMStudio: {parsed_json}")
+                            logger.debug("Extracted single JSON action object from LMStudio")
                             return json.dumps(parsed_json) # Return as single action
                         else:
-                            print(f"[DEBUG] Parsed JSON from LMStudio is not in expected format: {type(parsed_json)}, keys: {list(parsed_json.keys()) if isinstance(parsed_json, dict) else 'Not a dict'}")
-                            print(f"[DEBUG] Returning extracted JSON anyway: {parsed_json}")
+                            logger.debug("Parsed JSON from LMStudio is not in expected format (%s); returning it anyway",
+                                         type(parsed_json).__name__)
                             return json.dumps(parsed_json)
                     except json.JSONDecodeError as e:
-                        print(f"[ERROR] Failed to decode JSON from LMStudio response: {e}. Raw JSON string: {json_str}")
+                        logger.error("Failed to decode JSON from LMStudio response: %s. Raw JSON string: %s", e, LazyPreview(json_str, 500))
                 else:
-                    print("[DEBUG] No JSON found in LMStudio response. Returning full response.")
+                    logger.debug("No JSON found in LMStudio response. Returning full response.")
             # --- End JSON extraction attempt ---
 
             return full_response if full_response.strip() else "[ERROR] No valid response from the model."
     except requests.Timeout:
         error_msg = "[ERROR] LMStudio API call timed out after 45 seconds. Check if LMStudio is running and responsive."
-        print(error_msg)
+        logger.error(error_msg)
         return error_msg
     except requests.ConnectionError:
         error_msg = "[ERROR] Cannot connect to LMStudio API. Check if LMStudio is running and accessible."
-        print(error_msg)
+        logger.error(error_msg)
         return error_msg
     except requests.RequestException as e:
         error_msg = f"[ERROR] API connection failed: {e}"
-        print(error_msg)
+        logger.error(error_msg)
         return error_msg
     except Exception as e:
         error_msg = f"[ERROR] Unexpected error in call_lmstudio_model: {e}"
-        print(error_msg)
+        logger.error(error_msg)
         return error_msg
 
 async def test_lmstudio(model):
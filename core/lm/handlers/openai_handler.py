@@ -1,29 +1,38 @@
 import sys
 import pathlib
 import json
-import traceback
 import re
 import tiktoken
 import httpx # Add httpx for sending updates to GUI
+import logging
 
 # Load Config
 sys.path.append(str(pathlib.Path(__file__).parent.parent.parent.parent / "config"))
 from config import Config
 
+sys.path.append(str(pathlib.Path(__file__).parent.parent.parent.parent))
+from core.utils.structured_logging import LazyJSON, LazyPreview, Sampler, log_event
+
 config = Config()
 
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# Streamed tokens are only logged every LOG_SAMPLE_EVERY tokens
+_token_sampler = Sampler()
+
 def extract_json_from_text(content):
     json_match = re.search(r"```json\s*(.*?)\s*```", content, re.DOTALL)
     if json_match:
         return json_match.group(1).strip()
-    print("[ERROR] No JSON block detected in OpenAI response. Returning raw content.")
+    logger.debug("No JSON block detected in OpenAI response. Returning raw content.")
     return content.strip()  # fallback to raw content
 
 def fix_json_format(raw_response):
     try:
         return json.loads(raw_response)
     except json.JSONDecodeError:
-        print("[WARNING] Attempting to fix JSON format...")
+        logger.warning("Attempting to fix JSON format...")
         cleaned_response = re.sub(r'[^a-zA-Z0-9:{}\[\],"\'.\s]', '', raw_response)
         cleaned_response = re.sub(r',?\s*{}\s*', '', cleaned_response)
         cleaned_response = re.sub(r'"done"\s*:\s*{(.*?)\s*}', r'"done": {"summary": "\1"}', cleaned_response)
@@ -31,7 +40,7 @@ def fix_json_format(raw_response):
         try:
             return json.loads(cleaned_response)
         except json.JSONDecodeError as e:
-            print(f"[ERROR] JSON Decode Failed After Fixing: {e}")
+            logger.error("JSON decode failed after fixing: %s", e)
             return []
 
 def count_tokens(messages, model_name):
@@ -52,7 +61,7 @@ def transform_operations(response_list):
         if isinstance(item, dict) and "operation" in item:
             transformed.append(item)
         else:
-            print(f"[WARNING] Unexpected operation format: {item}")
+            logger.warning("Unexpected operation format: %s", LazyPreview(item, 300))
     return transformed
 
 async def _update_gui_with_stream_chunk(chunk_text: str):
@@ -72,16 +81,10 @@ async def call_openai_model(messages, objective, model_name=None, thinking_callb
         model_name = model_name or config.get_model()
         temperature = config.get_temperature()
         
-        # Always print messages for objective formulation to debug
-        if "formulate" in str(messages).lower() or "objective" in str(messages).lower():
-            print(f"\n[OBJECTIVE_DEBUG] ******* OPENAI HANDLER CALLED FOR OBJECTIVE FORMULATION *******")
-            print(f"[OBJECTIVE_DEBUG] Model: {model_name}")
-            print(f"[OBJECTIVE_DEBUG] Temperature: {temperature}")
-            print(f"[OBJECTIVE_DEBUG] Raw messages: {json.dumps(messages, indent=2)}")
-            print(f"[OBJECTIVE_DEBUG] Objective arg: {objective}")
-        
-        if config.get("DEBUG", False):
-            print(f"[DEBUG] Raw messages:\n{json.dumps(messages, indent=2)}")
+        log_event(logger, logging.INFO, "OpenAI request", model=model_name, temperature=temperature,
+                  messages=len(messages))
+        logger.debug("Objective arg: %s", LazyPreview(objective, 500))
+        logger.debug("Raw messages:\n%s", LazyJSON(messages, indent=2))
 
         content = messages[-1]["content"] if messages and "content" in messages[-1] else ""
 
@@ -97,18 +100,16 @@ async def call_openai_model(messages, objective, model_name=None, thinking_callb
         truncated_data = truncate_messages([{"role": "system", "content": content}], max_tokens=6000, model_name=model_name)
         messages = messages[:-1] + truncated_data
         
-        if config.get("DEBUG", False):
-            print(f"[DEBUG] Truncated messages:\n{json.dumps(messages, indent=2)}")
+        logger.debug("Truncated messages:\n%s", LazyJSON(messages, indent=2))
             
         import openai
         
         # Check if API key is available
         api_key = config.get("OPENAI_API_KEY")
         if not api_key:
-            print("[CRITICAL ERROR] No OpenAI API key found! Cannot call LLM API.")
+            logger.critical("No OpenAI API key found! Cannot call LLM API.")
             return "ERROR: No OpenAI API key configured. Please add your API key to config."
             
-        print(f"[API_DEBUG] Using API key: {api_key[:5]}...{api_key[-4:] if len(api_key) > 8 else ''}")
         client = openai.OpenAI(api_key=api_key)
 
         stream = client.chat.completions.create(
@@ -121,27 +122,24 @@ async def call_openai_model(messages, objective, model_name=None, thinking_callb
         )
 
         collected_content = ""
+        token_count = 0
+        _token_sampler.reset("openai_token")
         # Clear previous stream content on GUI if applicable
         await _update_gui_with_stream_chunk("__STREAM_START__") # Signal stream start
 
         for chunk in stream:
             delta = getattr(chunk.choices[0].delta, "content", None)
             if delta:
-                if config.get("DEBUG", False):
-                    print(delta, end="", flush=True)
+                token_count += 1
+                _token_sampler.log(logger, logging.DEBUG, "openai_token",
+                                   "Streamed %d tokens (%d chars)", token_count, len(collected_content))
                 collected_content += delta
                 await _update_gui_with_stream_chunk(delta) # Send chunk to GUI
 
         await _update_gui_with_stream_chunk("__STREAM_END__") # Signal stream end
         
-        if config.get("DEBUG", False):
-            print(f"\n[DEBUG] Raw GPT Response Content (streamed):\n{repr(collected_content)}")
-            
-        # Always print response for objective formulation
-        if "formulate" in str(messages).lower() or "objective" in str(messages).lower():
-            print(f"\n[OBJECTIVE_DEBUG] ******* LLM RESPONSE FOR OBJECTIVE FORMULATION *******")
-            print(f"[OBJECTIVE_DEBUG] Raw response: {repr(collected_content)}")
-            print(f"[OBJECTIVE_DEBUG] Response length: {len(collected_content)}")
+        log_event(logger, logging.INFO, "OpenAI response", tokens=token_count, chars=len(collected_content))
+        logger.debug("Raw GPT response content (streamed): %s", LazyPreview(collected_content, 4000))
 
         raw_json_text = extract_json_from_text(collected_content)
         
@@ -177,7 +175,5 @@ async def call_openai_model(messages, objective, model_name=None, thinking_callb
 
 
     except Exception as e:
-        print(f"[ERROR] Exception in call_openai_model: {e}")
-        if config.get("DEBUG", False):
-            traceback.print_exc()
+        logger.error("Exception in call_openai_model: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return []
@@ -12,6 +12,8 @@ logger = logging.getLogger(__name__)
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
+from core.utils.structured_logging import LazyJSON, LazyPreview, log_event
+
 # Adjust imports to use absolute paths consistently
 # NOTE: Removed problematic import that was causing hanging: from core.utils.region.mapper import map_elements_to_coords
 from .handlers.openai_handler import call_openai_model
@@ -156,6 +158,60 @@ def standardize_action_fields(action_dict: Dict[str, Any]) -> Dict[str, Any]:
     return standardized
 
 
+def _load_well_formed_json(text: str):
+    """
+    Parse ``text`` as JSON without any repair, bare or inside a ```json fence.
+
+    Well-formed JSON (e.g. the pre-extracted string call_lmstudio_model returns)
+    must not go through the repair heuristics in handle_llm_response, which are
+    meant for malformed output and corrupt valid strings such as
+    ``json.dumps`` lists.
+
+    Returns:
+        (json string, parsed value), or None if neither form is valid JSON
+    """
+    candidates = [text.strip()]
+    fenced = re.search(r"```(?:json)?\s*(.*?)\s*```", text, re.DOTALL)
+    if fenced:
+        candidates.append(fenced.group(1).strip())
+    for candidate in candidates:
+        try:
+            return candidate, json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def _finish_parsed_json(parsed_json, json_str: str, context_description: str, batch: bool):
+    """Shape parsed JSON for the caller: standardized action(s) for action generation."""
+    # If the context is action generation and the parsed JSON is a list,
+    # return the first element if the list is not empty.
+    if context_description == "action_generation" and isinstance(parsed_json, list):
+        if len(parsed_json) > 0 and batch:
+            actions = [standardize_action_fields(a) for a in parsed_json]
+            logger.info(f"Parsed JSON for action generation is a plan of {len(actions)} action(s)")
+            return actions
+        elif len(parsed_json) > 0:
+            action = parsed_json[0]
+            # Standardize field names for compatibility
+            if isinstance(action, dict):
+                action = standardize_action_fields(action)
+            logger.info(f"Parsed JSON for action generation was a list. Returning first element: {action}")
+            return action
+        else:
+            # Fix: Ensure json_str is a string before slicing
+            json_preview = str(json_str)[:500] if json_str else "None"
+            logger.error(f"Parsed JSON for action generation was an empty list. Original string: '{json_preview}...'")
+            return {"error": "EMPTY_ACTION_LIST", "message": "LLM returned an empty list for actions."}
+
+    # For single actions (not in a list), also standardize field names
+    if context_description == "action_generation" and isinstance(parsed_json, dict):
+        parsed_json = standardize_action_fields(parsed_json)
+        logger.info(f"Standardized action fields: {parsed_json}")
+
+    return parsed_json
+
+
 # Replaced original handle_llm_response with a new version
 # to match usage in core/operate.py for parsing and cleaning LLM outputs.
 def handle_llm_response(
@@ -165,13 +221,16 @@ def handle_llm_response(
     llm_interface=None,  # Parameter is present as per operate.py's usage
     objective: str = None,  # The current objective/goal
     current_step_description: str = None,  # The current step being processed
-    visual_analysis_output: str = None  # Visual analysis output for better fallback coordinates
+    visual_analysis_output: str = None,  # Visual analysis output for better fallback coordinates
+    batch: bool = False  # Return every action of a multi-action plan instead of the first
 ) -> any:
     """
     Processes raw LLM response text.
     If is_json is True, attempts to extract and parse JSON from a markdown code block.
     Otherwise, (or for the text part if JSON extraction fails), cleans the text,
     notably by stripping <think>...</think> tags and other common XML/HTML tags.
+    For action generation with ``batch=True``, a JSON array is returned as a list
+    of standardized actions (core/utils/action_batch.py).
     """
     logger.debug(f"Handling LLM response for '{context_description}'. Raw length: {len(raw_response_text)}. is_json: {is_json}")
     
@@ -216,16 +275,13 @@ def handle_llm_response(
     # Try multiple JSON extraction methods
     json_str_to_parse = None
     
-    # Check if the response is already valid JSON (from LMStudio handler that pre-extracts JSON)
-    try:
-        # First check if it's already valid JSON by trying to parse it directly
-        stripped_text = text_to_search_json_in.strip()
-        test_parse = json.loads(stripped_text)
-        json_str_to_parse = stripped_text
-        logger.debug(f"Using pre-extracted JSON for '{context_description}' - detected valid JSON directly")
-    except json.JSONDecodeError:
-        # If direct parsing fails, continue with extraction methods
-        logger.debug(f"Text is not directly parseable JSON, trying extraction methods for '{context_description}'")
+    # Valid JSON as is (bare, e.g. pre-extracted by the LMStudio handler, or fenced) needs no repair
+    well_formed = _load_well_formed_json(text_to_search_json_in)
+    if well_formed is not None:
+        logger.debug(f"Using well-formed JSON for '{context_description}' without repair")
+        json_str_to_parse, parsed_json = well_formed
+        return _finish_parsed_json(parsed_json, json_str_to_parse, context_description, batch)
+    logger.debug(f"Text is not directly parseable JSON, trying extraction methods for '{context_description}'")
     
     # If not already valid JSON, try extraction methods
     if not json_str_to_parse:
@@ -773,28 +829,7 @@ def handle_llm_response(
                     # Re-raise the original error for other contexts
                     raise first_error
 
-            # If the context is action generation and the parsed JSON is a list,
-            # return the first element if the list is not empty.
-            if context_description == "action_generation" and isinstance(parsed_json, list):
-                if len(parsed_json) > 0:
-                    action = parsed_json[0]
-                    # Standardize field names for compatibility
-                    if isinstance(action, dict):
-                        action = standardize_action_fields(action)
-                    logger.info(f"Parsed JSON for action generation was a list. Returning first element: {action}")
-                    return action
-                else:
-                    # Fix: Ensure json_str_to_parse is a string before slicing
-                    json_preview = str(json_str_to_parse)[:500] if json_str_to_parse else "None"
-                    logger.error(f"Parsed JSON for action generation was an empty list. Original string: '{json_preview}...'")
-                    return {"error": "EMPTY_ACTION_LIST", "message": "LLM returned an empty list for actions."}
-
-            # For single actions (not in a list), also standardize field names
-            if context_description == "action_generation" and isinstance(parsed_json, dict):
-                parsed_json = standardize_action_fields(parsed_json)
-                logger.info(f"Standardized action fields: {parsed_json}")
-
-            return parsed_json
+            return _finish_parsed_json(parsed_json, json_str_to_parse, context_description, batch)
         except json.JSONDecodeError as e:
             # Fix: Ensure json_str_to_parse is a string before slicing
             json_preview = str(json_str_to_parse)[:500] if json_str_to_parse else "None"
@@ -974,7 +1009,7 @@ class MainInterface:
         Returns:
             tuple[str, str, None]: (response_text, session_id, None)
         """
-        print(f"[MainInterface] Using model: {model} via API source: {self.api_source}")  # Updated log
+        logger.debug("Using model %s via API source %s", model, self.api_source)
         
         # Safety check: If a screenshot path is provided, validate that visual analysis will work
         if screenshot_path:
@@ -982,15 +1017,15 @@ class MainInterface:
                 # Basic validation - check if screenshot exists and has reasonable size
                 import os
                 if not os.path.exists(screenshot_path):
-                    print(f"[WARNING] Screenshot path does not exist: {screenshot_path}")
+                    logger.warning("Screenshot path does not exist: %s", screenshot_path)
                 else:
                     file_size = os.path.getsize(screenshot_path)
                     if file_size < 1000:  # Less than 1KB is suspicious for a screenshot
-                        print(f"[WARNING] Screenshot file size suspiciously small: {file_size} bytes")
+                        logger.warning("Screenshot file size suspiciously small: %d bytes", file_size)
                     else:
-                        print(f"[INFO] Screenshot validation passed: {file_size} bytes")
+                        logger.debug("Screenshot validation passed: %d bytes", file_size)
             except Exception as e:
-                print(f"[WARNING] Screenshot validation error: {e}")
+                logger.warning("Screenshot validation error: %s", e)
 
         if self.api_source == "openai":
             # call_openai_model now returns a string (either JSON string for actions, or plain text for other stages)
@@ -1002,12 +1037,12 @@ class MainInterface:
             # The `handle_llm_response` in `operate.py` for action stage expects the JSON to be parsed from the string.
 
             # No change needed here if call_openai_model returns a string as expected by callers.
-            # The `DEBUG` print might show a JSON string or plain text.
-            print(f"[DEBUG] OpenAI Response String: {response_str}") 
+            # The debug log might show a JSON string or plain text.
+            logger.debug("OpenAI response: %s", LazyPreview(response_str, 2000))
             return (response_str, session_id, None)
         elif self.api_source == "lmstudio":
             response = await call_lmstudio_model(messages, objective, model, thinking_callback)
-            print(f"[DEBUG] LMStudio Response: {response}")
+            logger.debug("LMStudio response: %s", LazyPreview(response, 2000))
             return (response, session_id, None)
 
         raise ModelNotRecognizedException(model)
@@ -1018,10 +1053,10 @@ class MainInterface:
         Unified interface for obtaining LLM responses across contexts.
         Delegates to get_next_action but can handle different response formats based on context.
         """
-        print(f"\n[OBJECTIVE_FORMULATION] Starting LLM call for {response_format_type}")
-        print(f"[OBJECTIVE_FORMULATION] Model: {model}")
-        print(f"[OBJECTIVE_FORMULATION] Objective: {objective}")
-        print(f"[OBJECTIVE_FORMULATION] Messages: {json.dumps(messages, indent=2)}")
+        log_event(logger, logging.INFO, "LLM call", stage=response_format_type, model=model,
+                  messages=len(messages))
+        logger.debug("LLM objective: %s", LazyPreview(objective, 500))
+        logger.debug("LLM messages: %s", LazyJSON(messages, indent=2))
         
         # Add a timeout for LLM calls
         try:
@@ -1035,7 +1070,6 @@ class MainInterface:
             
         except asyncio.TimeoutError:
             logger.error("LLM call timed out after 30 seconds")
-            print("[ERROR] LLM call timed out after 30 seconds")
             
             if self.api_source == "lmstudio":
                 error_message = (
@@ -1049,13 +1083,11 @@ class MainInterface:
             
         except Exception as e:
             logger.error(f"Error during LLM call: {e}")
-            print(f"[ERROR] LLM call failed: {e}")
             return f"ERROR: LLM connection failed: {str(e)}", session_id, str(e)
         
         # Special handling for objective formulation to ensure we get a proper response
         if response_format_type == "objective_generation":
-            print(f"\n[OBJECTIVE_FORMULATION] Raw LLM response (first 300 chars): {response[:300] if isinstance(response, str) else str(response)[:300]}")
-            logger.info(f"Processing LLM response for objective formulation: {response[:100] if isinstance(response, str) else str(response)[:100]}...")
+            logger.info("Processing LLM response for objective formulation: %s", LazyPreview(response, 300))
             
             # First check if the response is an error message
             if isinstance(response, str) and response.startswith("[ERROR]"):
@@ -1070,13 +1102,12 @@ class MainInterface:
                 # Remove any XML-like tags
                 response_clean = re.sub(r"<.*?>", "", response_clean)
                 
-                print(f"[OBJECTIVE_FORMULATION] Cleaned response: {response_clean[:300]}")
+                logger.debug("Cleaned objective response: %s", LazyPreview(response_clean, 300))
                 
                 # We don't need additional processing here as that's done in main.py
                 return response_clean, sid, error
             else:
-                logger.warning(f"Empty or invalid response from LLM for objective formulation: {response}")
-                print(f"[OBJECTIVE_FORMULATION] Empty or invalid response from LLM: {response}")
+                logger.warning("Empty or invalid response from LLM for objective formulation: %s", LazyPreview(response, 300))
                 return "ERROR: Failed to generate objective. LLM returned an invalid response.", sid, "Empty or invalid response"
                 
         return response, sid, error
@@ -32,7 +32,7 @@ except ImportError:
 
 # --- Project-specific Imports ---
 from config.config import (
-    VERSION, DEBUG_MODE, GUI_HOST, GUI_PORT, GUI_WIDTH, GUI_HEIGHT,
+    Config, VERSION, DEBUG_MODE, GUI_HOST, GUI_PORT, GUI_WIDTH, GUI_HEIGHT,
     GUI_RESIZABLE, GUI_ON_TOP, OMNIPARSER_BASE_URL, AUTOMOY_APP_NAME,
     LOG_FILE_PATH, LOG_FILE_CORE, MAIN_LOOP_SLEEP_INTERVAL, MAX_LOG_FILE_SIZE, LOG_BACKUP_COUNT
 )
@@ -46,8 +46,13 @@ from core.data_models import (
     write_state, 
     GOAL_REQUEST_FILE
 )
+from core.exceptions import GUIError, StartupError
 from core.lm.lm_interface import MainInterface # CHANGED
 from core.operate import AutomoyOperator
+from core.utils.loop_monitor import start_monitor as start_loop_monitor
+from core.utils.metrics import start_exporter as start_metrics_exporter
+from core.utils.startup import StartupOrchestrator
+from core.utils.structured_logging import StructuredFormatter, configure_logging
 # Removed debug_utils imports that were causing issues
 # from core.utils.debug_utils import (
 #     log_system_info,
@@ -121,7 +126,7 @@ logger = logging.getLogger(AUTOMOY_APP_NAME) # Use imported AUTOMOY_APP_NAME
 
 def setup_logging(console_level=logging.INFO, file_level=logging.DEBUG):
     logger.setLevel(min(console_level, file_level))
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(threadName)s - %(levelname)s - %(message)s')
+    formatter = StructuredFormatter('%(asctime)s - %(name)s - %(threadName)s - %(levelname)s - %(message)s')
 
     # Clear existing handlers to prevent duplicate logging
     if logger.hasHandlers():
@@ -167,10 +172,19 @@ def setup_logging(console_level=logging.INFO, file_level=logging.DEBUG):
         print(f"Failed to set up file logging: {e}", file=sys.stderr)
         # Continue without file logging
 
+    # Module loggers (core.*) share the app's handlers; LOG_LEVEL / LOG_LEVELS gate them per subsystem
+    configure_logging(handlers=logger.handlers)
+
 def start_gui_and_create_webview_window(gui_host_local: str, gui_port_local: int, stop_event_local: threading.Event):
-    global gui_process_global, webview_window_global # Removed app_config from global as it's not used here directly
+    """Start the GUI server, wait for /health, then create the webview window."""
+    return (start_gui_server(gui_host_local, gui_port_local)
+            and create_webview_window(gui_host_local, gui_port_local, stop_event_local))
+
+def start_gui_server(gui_host_local: str, gui_port_local: int) -> bool:
+    """Start the GUI subprocess and wait until it answers /health."""
+    global gui_process_global
     
-    logger.info("Starting GUI and creating webview window...")
+    logger.info("Starting GUI server...")
     if PYWEBVIEW_AVAILABLE:
         logger.info("pywebview is available and will be used for native window")
     else:
@@ -228,6 +242,11 @@ def start_gui_and_create_webview_window(gui_host_local: str, gui_port_local: int
         return False # Indicate failure
 
     logger.info("GUI is healthy and responsive.")
+    return True
+
+def create_webview_window(gui_host_local: str, gui_port_local: int, stop_event_local: threading.Event) -> bool:
+    """Create the PyWebview window for the running GUI server (main thread, before pywebview.start())."""
+    global webview_window_global
 
     # --- Ensure original URL and title are used ---
     gui_url = f"http://{gui_host_local}:{gui_port_local}" # THIS IS THE CORRECT URL
@@ -361,47 +380,24 @@ async def update_gui_state(updates: Dict[str, Any]):
     except Exception as e:
         logger.error(f"Failed to update GUI state file: {e}", exc_info=True)
 
-async def main_async_operations(stop_event: asyncio.Event):
-    global webview_window_global, gui_process_global
-
-    logger.info(f"main_async_operations started.")
-
-    gui_host_local = GUI_HOST
-    gui_port_local = GUI_PORT
-    
-    # Initialize OmniParser for visual analysis
+def start_omniparser():
+    """Reuse a running OmniParser server or launch one; returns its interface, or None."""
     logger.info("Initializing OmniParser for visual analysis...")
     try:
         from core.utils.omniparser.omniparser_server_manager import OmniParserServerManager
         omniparser_manager = OmniParserServerManager()
         
-        # Check if server is already running by testing both ways
-        logger.info("Checking if OmniParser server is running...")
-        server_running = False
-        
-        # Direct check first
-        try:
-            import requests
-            response = requests.get("http://127.0.0.1:8111/probe/", timeout=5)
-            if response.status_code == 200:
-                logger.info("✅ Found existing OmniParser server running on port 8111")
-                server_running = True
-        except Exception as e:
-            logger.info(f"Direct server check failed: {e}")
-        
-        if server_running:
-            logger.info("Using existing OmniParser server")
+        # One probe decides whether to reuse a running (e.g. daemon) server or launch one
+        if omniparser_manager.is_server_ready():
+            logger.info("✅ Warm start: using existing OmniParser server")
             omniparser = omniparser_manager.get_interface()
         else:
             logger.info("Starting new OmniParser server...")
-            server_process = omniparser_manager.start_server()
-            if server_process:
-                if omniparser_manager.wait_for_server(timeout=120):  # Increased timeout
-                    logger.info("OmniParser server started successfully")
-                    omniparser = omniparser_manager.get_interface()
-                else:
-                    logger.error("OmniParser server failed to become ready within timeout")
-                    omniparser = None
+            # launch_server only returns once the server has logged readiness and answered a probe
+            if omniparser_manager.start_server(check_running=False):
+                cold_start = omniparser_manager.startup_metrics.get("cold_start_seconds")
+                logger.info(f"OmniParser server started successfully (cold start {cold_start}s)")
+                omniparser = omniparser_manager.get_interface()
             else:
                 logger.error("Failed to start OmniParser server")
                 omniparser = None
@@ -411,18 +407,84 @@ async def main_async_operations(stop_event: asyncio.Event):
     
     if omniparser:
         logger.info("✅ OmniParser initialized successfully for visual analysis")
-        # Test the connection immediately
-        try:
-            import requests
-            test_response = requests.get("http://127.0.0.1:8111/probe/", timeout=3)
-            if test_response.status_code == 200:
-                logger.info("✅ OmniParser server connection verified")
-            else:
-                logger.warning(f"⚠️ OmniParser server test failed with status: {test_response.status_code}")
-        except Exception as test_error:
-            logger.error(f"❌ OmniParser server connection test failed: {test_error}")
     else:
         logger.warning("❌ OmniParser initialization failed - visual analysis will be limited")
+    return omniparser
+
+def start_llm_interface():
+    """Create the LLM interface and check that its LM Studio backend answers; returns the interface."""
+    llm_interface = MainInterface()
+    if llm_interface.api_source != "lmstudio":
+        # OpenAI can only be checked with a billed request; the first call reports any problem
+        return llm_interface
+    _, api_url = llm_interface.config.get_api_source()
+    models_url = api_url.rstrip("/") + "/v1/models"
+    try:
+        with urllib.request.urlopen(models_url, timeout=5.0) as response:
+            models = json.load(response).get("data", [])
+    except Exception as e:
+        raise ConnectionError(f"LM Studio is not reachable at {models_url}: {e}") from e
+    logger.info(f"✅ LM Studio reachable at {api_url} ({len(models)} models available)")
+    return llm_interface
+
+def omniparser_required(config) -> bool:
+    """Whether startup waits for OmniParser before the operator runs (STARTUP_WAIT_FOR_OMNIPARSER)."""
+    return bool(config.get("STARTUP_WAIT_FOR_OMNIPARSER", False))
+
+def build_startup(config=None) -> StartupOrchestrator:
+    """
+    Startup components shared by main() and main_async_operations().
+
+    The GUI server, OmniParser and the LLM backend check come up concurrently.
+    The webview window is resolved by the main thread (PyWebview needs it) and
+    the operator is added by main_async_operations. OmniParser joins the minimum
+    set only with STARTUP_WAIT_FOR_OMNIPARSER; the LLM check never does, since a
+    goal can still be typed while LM Studio loads its model.
+    """
+    config = config or Config()
+    startup = StartupOrchestrator()
+
+    def gui():
+        if not start_gui_server(GUI_HOST, GUI_PORT):
+            raise GUIError("GUI server did not become healthy")
+        return f"http://{GUI_HOST}:{GUI_PORT}"
+
+    startup.add("gui", gui)
+    startup.add_external("window", depends=("gui",))
+    startup.add("omniparser", start_omniparser, required=omniparser_required(config))
+    startup.add("llm", start_llm_interface, required=False)
+    return startup
+
+async def attach_omniparser(operator_local, startup: StartupOrchestrator, config=None) -> None:
+    """Give the operator the OmniParser interface, waiting for the server if it is still starting."""
+    if operator_local is None or operator_local.omniparser is not None:
+        return
+    if not startup.done("omniparser"):
+        timeout = float((config or Config()).get("STARTUP_OMNIPARSER_TIMEOUT", 180))
+        logger.info(f"Waiting up to {timeout:.0f}s for OmniParser to finish starting...")
+        write_state({"current_step_details": "Waiting for the OmniParser server to finish starting..."})
+        try:
+            await startup.ready("omniparser", timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("OmniParser is still starting; running this goal without visual analysis")
+        except StartupError as e:
+            logger.warning(f"OmniParser unavailable: {e}")
+    operator_local.omniparser = startup.result("omniparser")
+
+async def main_async_operations(stop_event: asyncio.Event, startup: Optional[StartupOrchestrator] = None):
+    global webview_window_global, gui_process_global
+
+    logger.info(f"main_async_operations started.")
+
+    gui_host_local = GUI_HOST
+    gui_port_local = GUI_PORT
+
+    if startup is None:
+        # Without main(): the GUI and window are already up (or not used)
+        startup = StartupOrchestrator()
+        startup.add("window", lambda: webview_window_global)
+        startup.add("omniparser", start_omniparser, required=omniparser_required(Config()))
+        startup.add("llm", start_llm_interface, required=False)
             
     pause_event = asyncio.Event()
     pause_event.set()  # Start unpaused
@@ -431,7 +493,7 @@ async def main_async_operations(stop_event: asyncio.Event):
     write_state(get_initial_state())
 
     # Initialize AutomoyOperator
-    try:
+    async def build_operator(window):
         global operator
         logger.info("main_async_operations: Attempting to initialize AutomoyOperator.")
         
@@ -469,14 +531,14 @@ async def main_async_operations(stop_event: asyncio.Event):
         operator = AutomoyOperator(
             objective="", # Initial objective is empty until set by user
             manage_gui_window_func=async_manage_gui_window,
-            omniparser=omniparser,  # Restored visual analysis capability
+            omniparser=startup.result("omniparser"),  # Attached on the first goal if still starting
             pause_event=pause_event,
             update_gui_state_func=async_update_gui_state_wrapper
         )
         
         # Set additional attributes after initialization
         operator._update_gui_state_func = async_update_gui_state_wrapper
-        operator.webview_window = webview_window_global
+        operator.webview_window = window
         operator.gui_host = gui_host_local
         operator.gui_port = gui_port_local
         operator.stop_event = stop_event
@@ -491,14 +553,22 @@ async def main_async_operations(stop_event: asyncio.Event):
             operator.desktop_utils = None
         
         # Verify dependencies are properly set
-        logger.info(f"Operator dependencies set - omniparser: {omniparser is not None}, "
+        logger.info(f"Operator dependencies set - omniparser: {operator.omniparser is not None}, "
                    f"manage_gui_window_func: {operator.manage_gui_window_func is not None}, "
                    f"_update_gui_state_func: {operator._update_gui_state_func is not None}, "
                    f"desktop_utils: {operator.desktop_utils is not None}")
         
         logger.info("main_async_operations: AutomoyOperator initialized successfully.")
-    except Exception as e:
-        logger.error(f"main_async_operations: Failed to initialize AutomoyOperator: {e}", exc_info=True)
+        return operator
+
+    startup.add("operator", build_operator, depends=("window",))
+    startup.start()
+    try:
+        # GUI, window and operator (plus OmniParser with STARTUP_WAIT_FOR_OMNIPARSER);
+        # the LLM check and otherwise OmniParser keep starting in the background
+        await startup.wait_minimum()
+    except StartupError as e:
+        logger.error(f"main_async_operations: Startup failed: {e}", exc_info=True)
         if stop_event: stop_event.set()
         return
 
@@ -524,6 +594,11 @@ async def main_async_operations(stop_event: asyncio.Event):
         "goal": ""
     })
     
+    # Snapshot for the GUI's /metrics endpoint; the task ends with stop_event
+    metrics_task = start_metrics_exporter(stop_event, operator.config)
+    # Logs the stack of anything that blocks this loop past LOOP_STALL_THRESHOLD
+    loop_monitor = start_loop_monitor(operator.config)
+
     logger.info("Entering main polling loop to monitor for goal requests.")
 
     while not stop_event.is_set():
@@ -605,7 +680,7 @@ async def main_async_operations(stop_event: asyncio.Event):
                 # --- Objective Formulation & Execution ---
                 try:
                     logger.info("Instantiating MainInterface to formulate objective.")
-                    llm_interface = MainInterface() # Correct class from the import
+                    llm_interface = startup.result("llm") or MainInterface()
                     logger.info(f"Successfully instantiated llm_interface. Type: {type(llm_interface)}")
                     logger.info("Calling formulate_objective on llm_interface...")
                     
@@ -631,6 +706,9 @@ async def main_async_operations(stop_event: asyncio.Event):
                         })
                         continue
 
+                    # Objective formulation overlapped the OmniParser cold start; the operator needs it from here on
+                    await attach_omniparser(operator, startup)
+
                     if error:
                         logger.error(f"Error formulating objective: {error}")
                         
@@ -777,6 +855,8 @@ async def main_async_operations(stop_event: asyncio.Event):
             await asyncio.sleep(5)
 
     logger.info("main_async_operations loop has exited.")
+    if loop_monitor is not None:
+        loop_monitor.stop()
 
 def signal_handler(sig, frame):
     global gui_process_global 
@@ -823,35 +903,11 @@ def main():
     setup_signal_handlers(stop_event_threading)
     print("Signal handlers set up for graceful shutdown.")
 
-    # Start the GUI and create the PyWebview window
-    print("\n==== STARTING GUI AND WEBVIEW ====")
-    if not start_gui_and_create_webview_window(GUI_HOST, GUI_PORT, stop_event_threading):
-        logger.error("main: Failed to start GUI or create webview window. Exiting.")
-        print("CRITICAL ERROR: Failed to start GUI or create webview window. Exiting.")
-        cleanup() # Ensure cleanup is called
-        return
-
-    print(f"GUI process started successfully (PID: {gui_process_global.pid if gui_process_global else 'Unknown'})")
-    print("Webview window created successfully.")
-    
-    if PYWEBVIEW_AVAILABLE:
-        print("✓ PyWebView is available - native window will be displayed")
-    else:
-        print("⚠ PyWebView not available - using Microsoft Edge app mode for native-like window")
-    
-    logger.info(f"main: GUI process started (PID: {gui_process_global.pid if gui_process_global else 'Unknown'}) and webview_window_global created.")
-
-    def signal_handler_main(sig, frame):
-        logger.info("Signal received in main, initiating shutdown...")
-        if not stop_event_threading.is_set():
-            stop_event_threading.set()
-
-    signal.signal(signal.SIGINT, signal_handler_main)
-    signal.signal(signal.SIGTERM, signal_handler_main)
-    logger.info("main: Signal handlers registered.")
-    
     # CRITICAL FIX: PyWebView MUST run on main thread, async operations in background thread
-    # This ensures both PyWebView and goal polling work properly
+    # This ensures both PyWebView and goal polling work properly.
+    # The async thread brings up the GUI server, OmniParser and the LLM interface concurrently;
+    # this thread only waits for the GUI server, then creates the webview window.
+    startup = build_startup()
     logger.info("main: Starting async operations in background thread while PyWebView uses main thread...")
     
     # Global variables to track async components
@@ -875,7 +931,7 @@ def main():
             
             # Start the stop event monitor and main operations
             thread_loop.create_task(monitor_stop_event())
-            thread_loop.run_until_complete(main_async_operations(stop_event_async))
+            thread_loop.run_until_complete(main_async_operations(stop_event_async, startup))
             
         except Exception as e:
             logger.error(f"Error in async operations thread: {e}", exc_info=True)
@@ -888,6 +944,43 @@ def main():
     
     logger.info("main: Async operations started in background thread for proper goal polling")
 
+    # Wait for the GUI server and create the PyWebview window
+    print("\n==== STARTING GUI AND WEBVIEW ====")
+    try:
+        startup.wait_sync("gui", timeout=60)
+        window_created = create_webview_window(GUI_HOST, GUI_PORT, stop_event_threading)
+    except Exception as e:
+        logger.error(f"main: GUI startup failed: {e}")
+        window_created = False
+    if not window_created:
+        logger.error("main: Failed to start GUI or create webview window. Exiting.")
+        print("CRITICAL ERROR: Failed to start GUI or create webview window. Exiting.")
+        startup.fail("window", GUIError("webview window was not created"))
+        stop_event_threading.set()
+        async_thread.join(timeout=10)
+        cleanup() # Ensure cleanup is called
+        return
+    startup.resolve("window", webview_window_global)
+
+    print(f"GUI process started successfully (PID: {gui_process_global.pid if gui_process_global else 'Unknown'})")
+    print("Webview window created successfully.")
+    
+    if PYWEBVIEW_AVAILABLE:
+        print("✓ PyWebView is available - native window will be displayed")
+    else:
+        print("⚠ PyWebView not available - using Microsoft Edge app mode for native-like window")
+    
+    logger.info(f"main: GUI process started (PID: {gui_process_global.pid if gui_process_global else 'Unknown'}) and webview_window_global created.")
+
+    def signal_handler_main(sig, frame):
+        logger.info("Signal received in main, initiating shutdown...")
+        if not stop_event_threading.is_set():
+            stop_event_threading.set()
+
+    signal.signal(signal.SIGINT, signal_handler_main)
+    signal.signal(signal.SIGTERM, signal_handler_main)
+    logger.info("main: Signal handlers registered.")
+
     # ADDED: Check window object before starting webview
     if webview_window_global:
         logger.info(f"main: webview_window_global is set. Proceeding to call pywebview.start(). Window title: '{webview_window_global.title}'")
@@ -5,7 +5,6 @@ import os
 import pathlib
 import socket
 import sys
-import psutil
 import requests
 import logging # Import logging
 import platform # Add this import
@@ -23,10 +22,14 @@ from core.prompts.prompts import (
     STEP_GENERATION_SYSTEM_PROMPT, 
     STEP_GENERATION_USER_PROMPT_TEMPLATE, 
     ACTION_GENERATION_SYSTEM_PROMPT,
+    ACTION_BATCH_SYSTEM_PROMPT,
 )
 from config import Config
 from core.data_models import read_state, write_state
-import pyautogui
+from core.utils.plugins import lazy_module
+
+# Imported on first use; see core/utils/plugins.py
+psutil = lazy_module("psutil")
 
 # Get a logger for this module
 logger = logging.getLogger(__name__)
@@ -44,14 +47,22 @@ if __name__ == "__main__" and (__package__ is None or __package__ == ''):
 OPERATE_PY_PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
 
 # Import visual analysis utilities
-from core.utils.screenshot_utils import capture_screen_pil
+from core.utils.screenshot_utils import capture_screen_pil, get_screen_size
+from core.utils.region.capture_region import CaptureRegion, resolve_capture_region
+from core.utils.display_topology import DisplayTopology, merge_monitor_results
+from core.utils.screen_settle import ScreenSettleDetector
+from core.utils.action_batch import ActionBatch
+from core.utils.timeline import SessionTimeline, timeline_export_dir
+from core.utils.metrics import ACTION_RETRIES, PLAN_STEPS_PENDING, observe_span
+from core.utils.session_trace import TraceRecorder, trace_dir
 from core.utils.operating_system.desktop_utils import DesktopUtils
+from core.utils.operating_system.action_executor import ActionExecutor
 
 # Import other required utilities
 from core.utils.operating_system.os_interface import OSInterface
-from core.utils.vmware.vmware_interface import VMWareInterface
-from core.utils.web_scraping.webscrape_interface import WebScrapeInterface
 from core.utils.region.mapper import map_elements_to_coords
+from core.utils.omniparser.captions import elements_to_caption
+from core.utils.omniparser.overlay import overlay_enabled
 
 # 👉 Integrated LLM interface (merged MainInterface + handle_llm_response)
 from core.lm.lm_interface import MainInterface, handle_llm_response
@@ -142,8 +153,10 @@ async def _update_gui_state(endpoint: str, payload: dict):
         elif endpoint == "/state/screenshot":
             state_updates["path"] = payload.get("path", "")
         elif endpoint == "/state/screenshot_processed":
-            # Just a notification, no state change needed
-            pass
+            # The GUI decodes the overlay when the page asks for it; the timestamp
+            # changes the streamed state so open viewers refresh the image
+            state_updates["processed_screenshot_available"] = True
+            state_updates["processed_screenshot_timestamp"] = time.time()
         else:
             # For unknown endpoints, try to apply the payload directly
             state_updates.update(payload)
@@ -163,232 +176,6 @@ async def _update_gui_state(endpoint: str, payload: dict):
     except Exception as e:
         logger.error(f"Unexpected error in _update_gui_state for endpoint {endpoint}: {e}", exc_info=True)
 
-class ActionExecutor:
-    """Executes actions on Windows using multiple methods with fallbacks."""
-    def __init__(self):
-        pyautogui.FAILSAFE = False
-        
-    def _press_key_with_fallbacks(self, key: str) -> str:
-        """Press a key using multiple methods with fallbacks."""
-        import ctypes
-        import time
-        
-        # Method 1: Try PyAutoGUI first (works for Windows key)
-        try:
-            pyautogui.press(key)
-            return f"Pressed key via PyAutoGUI: {key}"
-        except Exception as e1:
-            logger.info(f"PyAutoGUI failed for key '{key}': {e1}")
-        
-        # Method 2: Try keyboard library
-        try:
-            import keyboard
-            keyboard.press_and_release(key)
-            return f"Pressed key via keyboard library: {key}"
-        except Exception as e2:
-            logger.info(f"Keyboard library failed for key '{key}': {e2}")
-        
-        # Method 3: Try Windows API directly
-        try:
-            # Map common keys to virtual key codes
-            vk_map = {
-                'a': 0x41, 'b': 0x42, 'c': 0x43, 'd': 0x44, 'e': 0x45, 'f': 0x46, 'g': 0x47,
-                'h': 0x48, 'i': 0x49, 'j': 0x4A, 'k': 0x4B, 'l': 0x4C, 'm': 0x4D, 'n': 0x4E,
-                'o': 0x4F, 'p': 0x50, 'q': 0x51, 'r': 0x52, 's': 0x53, 't': 0x54, 'u': 0x55,
-                'v': 0x56, 'w': 0x57, 'x': 0x58, 'y': 0x59, 'z': 0x5A,
-                '0': 0x30, '1': 0x31, '2': 0x32, '3': 0x33, '4': 0x34, '5': 0x35,
-                '6': 0x36, '7': 0x37, '8': 0x38, '9': 0x39,
-                'space': 0x20, 'enter': 0x0D, 'escape': 0x1B, 'esc': 0x1B, 'tab': 0x09,
-                'shift': 0x10, 'ctrl': 0x11, 'alt': 0x12, 'win': 0x5B, 'winleft': 0x5B,
-                'backspace': 0x08, 'delete': 0x2E, 'home': 0x24, 'end': 0x23,
-                'pageup': 0x21, 'pagedown': 0x22, 'up': 0x26, 'down': 0x28,
-                'left': 0x25, 'right': 0x27, 'f1': 0x70, 'f2': 0x71, 'f3': 0x72,
-                'f4': 0x73, 'f5': 0x74, 'f6': 0x75, 'f7': 0x76, 'f8': 0x77,
-                'f9': 0x78, 'f10': 0x79, 'f11': 0x7A, 'f12': 0x7B
-            }
-            
-            # Convert key name to virtual key code
-            vk_code = vk_map.get(key.lower())
-            if vk_code:
-                user32 = ctypes.windll.user32
-                # Key down
-                user32.keybd_event(vk_code, 0, 0, 0)
-                time.sleep(0.01)  # Brief pause
-                # Key up
-                user32.keybd_event(vk_code, 0, 2, 0)
-                return f"Pressed key via Windows API: {key}"
-            else:
-                return f"Key '{key}' not found in virtual key mapping"
-                
-        except Exception as e3:
-            logger.info(f"Windows API failed for key '{key}': {e3}")
-        
-        # Method 4: As last resort, try OSInterface
-        try:
-            from core.utils.operating_system.os_interface import OSInterface
-            os_interface = OSInterface()
-            os_interface.press(key)
-            return f"Pressed key via OSInterface: {key}"
-        except Exception as e4:
-            logger.info(f"OSInterface failed for key '{key}': {e4}")
-        
-        # If all methods failed
-        return f"ERROR: All keyboard methods failed for key '{key}'"
-
-    def execute(self, action: dict) -> str:
-        try:
-            action_type = action.get("action_type") or action.get("type")
-            if action_type == "key":
-                key = action.get("key")
-                if key:
-                    return self._press_key_with_fallbacks(key)
-            elif action_type == "key_sequence":
-                keys = action.get("keys")
-                if isinstance(keys, list):
-                    # Try multiple methods for key sequences
-                    try:
-                        pyautogui.hotkey(*keys)
-                        return f"Pressed key sequence via PyAutoGUI: {keys}"
-                    except Exception as e1:
-                        logger.info(f"PyAutoGUI hotkey failed for {keys}: {e1}")
-                        try:
-                            import keyboard
-                            combo = "+".join(keys)
-                            keyboard.press_and_release(combo)
-                            return f"Pressed key sequence via keyboard library: {keys}"
-                        except Exception as e2:
-                            logger.info(f"Keyboard library hotkey failed for {keys}: {e2}")
-                            return f"ERROR: Key sequence failed for {keys}"
-                elif isinstance(keys, str):
-                    # Handle string format like "win+s"
-                    key_list = [k.strip() for k in keys.replace('+', ',').split(',')]
-                    try:
-                        pyautogui.hotkey(*key_list)
-                        return f"Pressed key sequence via PyAutoGUI: {key_list}"
-                    except Exception as e1:
-                        logger.info(f"PyAutoGUI hotkey failed for {key_list}: {e1}")
-                        try:
-                            import keyboard
-                            combo = "+".join(key_list)
-                            keyboard.press_and_release(combo)
-                            return f"Pressed key sequence via keyboard library: {key_list}"
-                        except Exception as e2:
-                            logger.info(f"Keyboard library hotkey failed for {key_list}: {e2}")
-                            return f"ERROR: Key sequence failed for {key_list}"
-            elif action_type == "type":
-                text = action.get("text")
-                if text:
-                    # Try multiple methods for typing
-                    try:
-                        pyautogui.typewrite(text)
-                        return f"Typed text via PyAutoGUI: {text}"
-                    except Exception as e1:
-                        logger.info(f"PyAutoGUI typewrite failed: {e1}")
-                        try:
-                            import keyboard
-                            keyboard.write(text)
-                            return f"Typed text via keyboard library: {text}"
-                        except Exception as e2:
-                            logger.info(f"Keyboard library write failed: {e2}")
-                            try:
-                                # Enhanced character-by-character typing via Windows API
-                                import ctypes
-                                import time
-                                user32 = ctypes.windll.user32
-                                
-                                # Extended virtual key mapping for better compatibility
-                                char_map = {
-                                    'a': 0x41, 'b': 0x42, 'c': 0x43, 'd': 0x44, 'e': 0x45, 'f': 0x46,
-                                    'g': 0x47, 'h': 0x48, 'i': 0x49, 'j': 0x4A, 'k': 0x4B, 'l': 0x4C,
-                                    'm': 0x4D, 'n': 0x4E, 'o': 0x4F, 'p': 0x50, 'q': 0x51, 'r': 0x52,
-                                    's': 0x53, 't': 0x54, 'u': 0x55, 'v': 0x56, 'w': 0x57, 'x': 0x58,
-                                    'y': 0x59, 'z': 0x5A, ' ': 0x20, '0': 0x30, '1': 0x31, '2': 0x32,
-                                    '3': 0x33, '4': 0x34, '5': 0x35, '6': 0x36, '7': 0x37, '8': 0x38, '9': 0x39
-                                }
-                                
-                                typed_chars = []
-                                for char in text.lower():
-                                    if char in char_map:
-                                        vk_code = char_map[char]
-                                        # Key down
-                                        user32.keybd_event(vk_code, 0, 0, 0)
-                                        time.sleep(0.02)  # Slightly longer delay for reliability
-                                        # Key up
-                                        user32.keybd_event(vk_code, 0, 2, 0)
-                                        time.sleep(0.02)
-                                        typed_chars.append(char)
-                                    else:
-                                        logger.warning(f"Character '{char}' not in Windows API mapping, skipping")
-                                
-                                return f"Typed text via Windows API: {''.join(typed_chars)} (original: {text})"
-                            except Exception as e3:
-                                logger.info(f"Windows API typing failed: {e3}")
-                                return f"ERROR: All typing methods failed for text: {text}"
-            elif action_type == "click":
-                coord = action.get("coordinate") or action
-                x = coord.get("x")
-                y = coord.get("y")
-                if x is not None and y is not None:
-                    pyautogui.click(x, y)
-                    return f"Clicked at ({x}, {y})"
-            elif action_type == "screenshot":
-                # Screenshot actions request a new visual analysis
-                target = action.get("target", "screen")
-                return f"Screenshot requested for: {target}"
-            elif action_type == "special":
-                # Handle special actions like show_desktop
-                target = action.get("target", "")
-                if target == "show_desktop":
-                    # Minimize all windows to show desktop
-                    import subprocess
-                    subprocess.run(['powershell', '-Command', '(New-Object -comObject Shell.Application).minimizeall()'], 
-                                   capture_output=True, text=True)
-                    return "Desktop shown (all windows minimized)"
-                else:
-                    return f"Special action executed: {target}"
-            elif action_type == "visual_search":
-                # Visual search actions will be handled by the step executor
-                target = action.get("target", "unknown")
-                return f"Visual search initiated for: {target}"
-            elif action_type == "check_process":
-                # Check if a specific process is running
-                process_name = action.get("process_name", "")
-                if process_name:
-                    try:
-                        import psutil
-                        running_processes = []
-                        for proc in psutil.process_iter(['pid', 'name']):
-                            try:
-                                if process_name.lower() in proc.info['name'].lower():
-                                    running_processes.append(f"{proc.info['name']} (PID: {proc.info['pid']})")
-                            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                                continue
-                        
-                        if running_processes:
-                            return f"Process '{process_name}' found: {', '.join(running_processes)}"
-                        else:
-                            return f"Process '{process_name}' not found"
-                    except Exception as e:
-                        return f"Error checking process '{process_name}': {e}"
-                else:
-                    return "ERROR: No process_name specified for check_process action"
-            elif action_type == "wait":
-                # Wait for a specified duration
-                duration = action.get("duration", 1.0)
-                try:
-                    import time
-                    time.sleep(float(duration))
-                    return f"Waited for {duration} seconds"
-                except Exception as e:
-                    return f"Error waiting: {e}"
-            
-            # If we get here, the action format wasn't recognized
-            # Try to extract a reasonable summary from the action
-            summary = action.get("summary", action.get("description", str(action)))
-            return f"Action format not fully supported: {summary}"
-        except Exception as e:
-            return f"Action execution error: {e}"
-
 class AutomoyOperator:
     """Central orchestrator for Automoy autonomous operation."""
 
@@ -410,6 +197,8 @@ class AutomoyOperator:
         # Desktop utilities will be set by main.py after initialization
         self.desktop_utils = None  
         self.action_executor = ActionExecutor()
+        self.settle_detector = ScreenSettleDetector.from_config(self.config)
+        self.action_batch = ActionBatch.from_config(self.config, self.settle_detector)
 
         self.steps: List[Dict[str, Any]] = []
         self.steps_for_gui: List[Dict[str, Any]] = []
@@ -417,6 +206,10 @@ class AutomoyOperator:
         
         self.current_step_index: int = 0
         self.current_screenshot_path: Optional[Path] = None
+        self.screenshot_region: Optional[CaptureRegion] = None
+        self.display_topology: Optional[DisplayTopology] = None
+        self.monitor_frames: List[Tuple[Any, Any]] = []
+        self.multi_monitor = bool(self.config.get("MULTI_MONITOR", False))
         self.current_processed_screenshot_path: Optional[Path] = None
         self.visual_analysis_output: Optional[str] = None
         self.thinking_process_output: Optional[str] = None
@@ -428,6 +221,11 @@ class AutomoyOperator:
         self.consecutive_error_count = 0
         
         self.session_id = f"automoy-op-{int(time.time())}"
+        # Per-stage latency spans for the current session (see core/utils/timeline.py)
+        self.timeline = SessionTimeline(self.session_id, on_span=observe_span)
+        self._step_started_at: Optional[float] = None
+        # Record a replayable trace of each objective (see core/utils/session_trace.py)
+        self.record_sessions = trace_dir(self.config) is not None
         logger.info(f"AutomoyOperator initialized with session ID: {self.session_id}")
         logger.info(f"Objective: {self.objective}")
         logger.info("Visual analysis and desktop utilities disabled")
@@ -476,6 +274,69 @@ class AutomoyOperator:
             logger.warning("Desktop utilities not available - skipping anchor")
             await self._update_gui_state_func("/state/thinking", {"text": "Desktop utilities not available - skipping anchor point"})
     
+    async def _wait_for_screen_settle(self, context: str, fallback_delay: float, expect_change: bool = False) -> None:
+        """Wait until the screen stops changing, bounded by ``fallback_delay`` seconds.
+
+        The wait is also capped by SETTLE_TIMEOUT. Falls back to a plain sleep of
+        ``fallback_delay`` if settle detection is disabled or frames cannot be captured.
+        """
+        with self.timeline.span("settle_wait", context=context) as span:
+            if not self.settle_detector.enabled:
+                await asyncio.sleep(fallback_delay)
+                return
+            result = await self.settle_detector.async_wait(timeout=fallback_delay, expect_change=expect_change)
+            if result.frames == 0:
+                await asyncio.sleep(fallback_delay)
+                return
+            span["settled"] = result.settled
+        logger.debug(f"Screen settle ({context}): settled={result.settled}, changed={result.changed}, "
+                     f"elapsed={result.elapsed * 1000:.0f}ms, frames={result.frames}")
+
+    def _first_token_timer(self, callback, stage: str, llm_span: Optional[Dict[str, Any]] = None):
+        """
+        Wrap a streaming callback so the first token records an ``llm_ttft`` span.
+
+        Tokens are counted into ``llm_span["tokens"]`` (the enclosing ``llm_total``
+        span) for the tokens/sec metric.
+        """
+        start = self.timeline.now()
+        step = self.timeline.step
+        seen_first = False
+
+        async def timed_callback(token):
+            nonlocal seen_first
+            if not seen_first:
+                seen_first = True
+                self.timeline.record("llm_ttft", start, self.timeline.now(), step=step, stage=stage)
+            if llm_span is not None:
+                llm_span["tokens"] = llm_span.get("tokens", 0) + 1
+            await callback(token)
+
+        return timed_callback
+
+    def _begin_step_span(self, step_index: Optional[int]) -> None:
+        """Close the running ``step`` span (if any) and start timing ``step_index``."""
+        now = self.timeline.now()
+        if self._step_started_at is not None:
+            self.timeline.record("step", self._step_started_at, now, step=self.timeline.step)
+        self.timeline.step = step_index
+        self._step_started_at = now if step_index is not None else None
+        PLAN_STEPS_PENDING.set(max(0, len(self.steps) - step_index) if step_index is not None else 0)
+
+    def _finish_timeline(self) -> None:
+        """Log the per-stage latency summary and export the session timeline."""
+        if not self.timeline.spans:
+            return
+        logger.info(f"Stage latency summary for {self.timeline.session_id}:\n{self.timeline.summary_table()}")
+        directory = timeline_export_dir(self.config)
+        if directory is None:
+            return
+        try:
+            trace_path = self.timeline.export(directory)
+            logger.info(f"📈 Timeline exported → {trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+        except OSError as e:
+            logger.error(f"Could not export timeline: {e}")
+
     def _extract_visual_summary(self, visual_json_str: str) -> str:
         """Extract a concise 1-2 sentence summary from visual analysis JSON."""
         try:
@@ -528,6 +389,97 @@ class AutomoyOperator:
             logger.error(f"Error extracting visual summary: {e}", exc_info=True)
             return f"Visual analysis completed but summary extraction failed: {str(e)}"
 
+    async def _capture_screen(self) -> Optional[Any]:
+        """
+        Capture the configured region of interest (or the full screen).
+
+        Records the captured area in ``self.screenshot_region`` so element boxes
+        parsed from this frame can be mapped back to global coordinates. With
+        MULTI_MONITOR enabled each monitor is grabbed separately (and later parsed
+        in parallel); the returned image is the monitors stitched together.
+        """
+        with self.timeline.span("capture"):
+            if self.display_topology is None:
+                self.display_topology = await asyncio.to_thread(DisplayTopology.detect)
+
+            self.monitor_frames = []
+            region = await asyncio.to_thread(resolve_capture_region, self.config)
+            if region is None and self.multi_monitor and len(self.display_topology.monitors) > 1:
+                frames = await asyncio.to_thread(self.display_topology.capture_monitors)
+                if frames:
+                    self.monitor_frames = frames
+                    self.screenshot_region = self.display_topology.virtual_region
+                    return await asyncio.to_thread(self.display_topology.stitch, frames)
+
+            if region is None:
+                region = self.display_topology.primary.region
+            screenshot_pil = await asyncio.to_thread(capture_screen_pil, None, region.as_tuple())
+            if screenshot_pil:
+                self.screenshot_region = region
+                logger.debug(f"Captured region {region.as_tuple()}")
+            return screenshot_pil
+
+    async def _parse_screenshot(self, screenshot_path: Path) -> Optional[dict]:
+        """
+        Run OmniParser on the last capture.
+
+        Multi-monitor captures are parsed one monitor per request, concurrently,
+        and merged into a single result normalized to the virtual desktop.
+        """
+        with self.timeline.span("omniparser", monitors=max(1, len(self.monitor_frames))):
+            if not self.monitor_frames:
+                return await asyncio.to_thread(self.omniparser.parse_screenshot, str(screenshot_path))
+
+            async def save_monitor(monitor, image):
+                monitor_path = screenshot_path.with_name(f"{screenshot_path.stem}_monitor{monitor.index}.png")
+                await asyncio.to_thread(image.save, str(monitor_path))
+                return str(monitor_path)
+
+            async def parse_monitor(monitor, image):
+                monitor_path = await save_monitor(monitor, image)
+                # The GUI shows one overlay; only the primary monitor's is worth producing
+                overlay = None if monitor.primary else False
+                return monitor, await asyncio.to_thread(self.omniparser.parse_screenshot, monitor_path, overlay)
+
+            monitors = [monitor for monitor, _ in self.monitor_frames]
+            if hasattr(self.omniparser, "parse_many") and getattr(self.omniparser, "size", 1) == 1:
+                # One server: a single batch request instead of requests queueing at the server
+                paths = await asyncio.gather(*(save_monitor(m, img) for m, img in self.monitor_frames))
+                parsed = await asyncio.to_thread(self.omniparser.parse_many, paths,
+                                                 [m.primary and overlay_enabled() for m in monitors])
+                results = list(zip(monitors, parsed))
+                logger.info(f"Parsed {len(results)} monitors in one batch")
+            else:
+                results = await asyncio.gather(*(parse_monitor(m, img) for m, img in self.monitor_frames))
+                logger.info(f"Parsed {len(results)} monitors in parallel")
+            return merge_monitor_results(results, self.display_topology.virtual_region)
+
+    async def _caption_on_demand(self, parsed_result: dict, screenshot_path: Path, task_context: str) -> None:
+        """
+        Caption the blank icons of a detection-only parse when the task needs them.
+
+        Nothing is requested when the OCR text already covers the task's words
+        (see ``elements_to_caption``). Multi-monitor results are normalized to
+        the virtual desktop rather than one screenshot, so they are left as is.
+        """
+        if parsed_result.get("captions", True) or self.monitor_frames:
+            return
+        element_ids = elements_to_caption(parsed_result["parsed_content_list"], task_context)
+        if not element_ids:
+            return
+        with self.timeline.span("caption", elements=len(element_ids)):
+            captions = await asyncio.to_thread(
+                self.omniparser.caption_elements, str(screenshot_path), parsed_result, element_ids)
+        logger.info(f"Captioned {len(captions)}/{len(element_ids)} icons on demand for: {task_context}")
+
+    def _element_click_point(self, bbox) -> Optional[Tuple[int, int]]:
+        """Map a normalized element box from the last screenshot to a global click point."""
+        region = self.screenshot_region or CaptureRegion.from_size(get_screen_size())
+        point = region.normalized_center_to_global(bbox)
+        if point is None or self.display_topology is None:
+            return point
+        return self.display_topology.to_input(*point)
+
     async def _take_screenshot(self, context: str) -> Optional[Path]:
         """Take a screenshot and save it to the debug/screenshots directory."""
         try:
@@ -535,7 +487,7 @@ class AutomoyOperator:
             await self._update_gui_state_func("/state/current_operation", {"text": f"Taking screenshot for: {context}"})
             
             # Capture screenshot
-            screenshot_pil = await asyncio.to_thread(capture_screen_pil)
+            screenshot_pil = await self._capture_screen()
             if not screenshot_pil:
                 logger.error("Failed to capture screenshot")
                 return None
@@ -547,7 +499,8 @@ class AutomoyOperator:
             screenshot_path.parent.mkdir(parents=True, exist_ok=True)
             
             # Save screenshot
-            await asyncio.to_thread(screenshot_pil.save, str(screenshot_path))
+            with self.timeline.span("encode"):
+                await asyncio.to_thread(screenshot_pil.save, str(screenshot_path))
             logger.info(f"Screenshot saved: {screenshot_path}")
             
             # Update GUI with screenshot path
@@ -580,7 +533,7 @@ class AutomoyOperator:
             
             # Perform the visual analysis
             logger.info(f"🔍 Calling OmniParser.parse_screenshot with: {screenshot_path}")
-            parsed_result = self.omniparser.parse_screenshot(str(screenshot_path))
+            parsed_result = await self._parse_screenshot(screenshot_path)
             logger.info(f"🔍 OmniParser returned result type: {type(parsed_result)}")
             logger.info(f"🔍 OmniParser result is None: {parsed_result is None}")
             logger.info(f"🔍 OmniParser result is truthy: {bool(parsed_result)}")
@@ -610,6 +563,9 @@ class AutomoyOperator:
                     await self._update_gui_state_func("/state/thinking", {"text": f"⚠️ WARNING: Only {elements_found} visual elements detected. This is unusually low and may indicate screen or analysis issues."})
                 
                 
+                # Detection-only parses leave icons blank until a step needs their captions
+                await self._caption_on_demand(parsed_result, screenshot_path, task_context)
+
                 # Process the visual analysis results
                 await self._update_gui_state_func("/state/current_operation", {"text": f"Visual analysis complete: Found {elements_found} UI elements. Processing results for action planning."})
                 
@@ -622,19 +578,10 @@ class AutomoyOperator:
                 formatted_analysis = self._format_visual_analysis_for_thinking(parsed_result)
                 await self._update_gui_state_func("/state/thinking", {"text": formatted_analysis})
                 
-                # Check if processed screenshot is available
+                # The overlay (if requested) was stored for the GUI, which decodes it on demand
                 processed_screenshot_path = None
-                if "som_image_base64" in parsed_result:
-                    # The OmniParser interface should have saved the processed screenshot
-                    possible_paths = [
-                        Path(__file__).parent / "utils" / "omniparser" / "processed_screenshot.png",
-                        Path("gui/static/processed_screenshot.png"),
-                        screenshot_path.parent / "processed_screenshot.png"
-                    ]
-                    for path in possible_paths:
-                        if path.exists():
-                            processed_screenshot_path = path
-                            break
+                if parsed_result.get("overlay_path"):
+                    processed_screenshot_path = Path(parsed_result["overlay_path"])
                 
                 # If processed screenshot is found, immediately update GUI
                 if processed_screenshot_path:
@@ -684,60 +631,14 @@ class AutomoyOperator:
                 bbox = element["bbox_normalized"]
                 logger.debug(f"📍 Element {i+1} bbox_normalized: {bbox} (type: {type(bbox)})")
                 
-                # Handle multiple possible bbox formats flexibly
-                valid_coords = False
-                pixel_x, pixel_y = 0, 0
-                
-                try:
-                    # Get actual screen dimensions
-                    import pyautogui
-                    screen_width, screen_height = pyautogui.size()
-                    logger.debug(f"📏 Screen dimensions: {screen_width}x{screen_height}")
-                    
-                    # Handle various bbox formats that OmniParser might return
-                    if isinstance(bbox, (list, tuple)) and len(bbox) >= 4:
-                        # Standard format: [x1, y1, x2, y2] in normalized coordinates (0.0-1.0)
-                        coords = [float(coord) for coord in bbox[:4]]  # Take first 4 elements
-                        x1, y1, x2, y2 = coords
-                        
-                        # Ensure coordinates are within valid range (0.0-1.0)
-                        if all(0.0 <= coord <= 1.0 for coord in coords):
-                            # Calculate center point in pixels
-                            pixel_x = int((x1 + x2) / 2 * screen_width)
-                            pixel_y = int((y1 + y2) / 2 * screen_height)
-                            
-                            # Ensure pixel coordinates are within screen bounds
-                            pixel_x = max(0, min(pixel_x, screen_width - 1))
-                            pixel_y = max(0, min(pixel_y, screen_height - 1))
-                            
-                            logger.debug(f"📍 Normalized coords: x1={x1:.3f}, y1={y1:.3f}, x2={x2:.3f}, y2={y2:.3f}")
-                            logger.debug(f"📍 Converted to pixels: ({pixel_x}, {pixel_y})")
-                            valid_coords = True
-                        else:
-                            logger.warning(f"⚠️ Normalized coordinates out of range (0-1): {coords}")
-                    else:
-                        logger.warning(f"❌ Invalid bbox format for element {i+1}: expected list/tuple with 4+ elements, got {type(bbox)} with length {len(bbox) if hasattr(bbox, '__len__') else 'unknown'}")
-                        
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"❌ Failed to convert bbox {bbox} for element {i+1}: {e}")
-                except ImportError:
-                    logger.warning("⚠️ pyautogui not available, using fallback screen size")
-                    # Use fallback screen size
-                    screen_width, screen_height = 1920, 1080
-                    if isinstance(bbox, (list, tuple)) and len(bbox) >= 4:
-                        try:
-                            coords = [float(coord) for coord in bbox[:4]]
-                            x1, y1, x2, y2 = coords
-                            if all(0.0 <= coord <= 1.0 for coord in coords):
-                                pixel_x = int((x1 + x2) / 2 * screen_width)
-                                pixel_y = int((y1 + y2) / 2 * screen_height)
-                                pixel_x = max(0, min(pixel_x, screen_width - 1))
-                                pixel_y = max(0, min(pixel_y, screen_height - 1))
-                                valid_coords = True
-                        except (ValueError, TypeError):
-                            pass
-                except Exception as e:
-                    logger.error(f"❌ Unexpected error in coordinate conversion for element {i+1}: {e}")
+                # Map the box (normalized to the captured image) back to global screen pixels
+                click_point = self._element_click_point(bbox)
+                valid_coords = click_point is not None
+                if valid_coords:
+                    pixel_x, pixel_y = click_point
+                    logger.debug(f"📍 Converted to pixels: ({pixel_x}, {pixel_y})")
+                else:
+                    logger.warning(f"❌ Invalid bbox {bbox} for element {i+1}: expected 4 normalized (0-1) coordinates")
                 
                 # Format based on whether coordinates were successfully converted
                 if valid_coords:
@@ -830,12 +731,13 @@ class AutomoyOperator:
             
             # Construct the prompt for step generation
             system_prompt_steps = STEP_GENERATION_SYSTEM_PROMPT
-            user_prompt_steps = self.llm_interface.construct_step_generation_prompt(
-                objective=self.objective,
-                visual_analysis_output=visual_analysis_output or "No visual context available",
-                thinking_process_output=self.thinking_process_output or "Initial step generation for objective",
-                previous_steps_output="N/A" # Assuming this is for initial generation
-            )
+            with self.timeline.span("prompt_build", stage="steps"):
+                user_prompt_steps = self.llm_interface.construct_step_generation_prompt(
+                    objective=self.objective,
+                    visual_analysis_output=visual_analysis_output or "No visual context available",
+                    thinking_process_output=self.thinking_process_output or "Initial step generation for objective",
+                    previous_steps_output="N/A" # Assuming this is for initial generation
+                )
             messages_steps = [
                 {"role": "system", "content": system_prompt_steps},
                 {"role": "user", "content": user_prompt_steps}
@@ -859,14 +761,15 @@ class AutomoyOperator:
             
             logger.debug(f"Messages for step generation LLM call (first 200 chars of user prompt): {str(messages_steps)[:200]}...")
             
-            raw_llm_response, _, llm_error = await self.llm_interface.get_llm_response( # Using get_llm_response, ignoring thinking output here
-                model=self.config.get_model(),
-                messages=messages_steps,
-                objective=self.objective,
-                session_id=self.session_id,
-                response_format_type="step_generation",
-                thinking_callback=step_stream_callback  # Add streaming callback
-            )
+            with self.timeline.span("llm_total", stage="steps") as llm_span:
+                raw_llm_response, _, llm_error = await self.llm_interface.get_llm_response( # Using get_llm_response, ignoring thinking output here
+                    model=self.config.get_model(),
+                    messages=messages_steps,
+                    objective=self.objective,
+                    session_id=self.session_id,
+                    response_format_type="step_generation",
+                    thinking_callback=self._first_token_timer(step_stream_callback, "steps", llm_span)  # Add streaming callback
+                )
 
             if llm_error:
                 logger.error(f"LLM error during step generation: {llm_error}")
@@ -886,7 +789,8 @@ class AutomoyOperator:
 
             # Get parsed JSON directly from handle_llm_response
             from core.lm.lm_interface import handle_llm_response
-            parsed_steps_data = handle_llm_response(raw_llm_response, "step_generation", is_json=True)
+            with self.timeline.span("json_parse", stage="steps"):
+                parsed_steps_data = handle_llm_response(raw_llm_response, "step_generation", is_json=True)
             logger.debug(f"handle_llm_response returned for step generation - Type: {type(parsed_steps_data)}")
             logger.debug(f"Parsed steps data (first 500 chars): {str(parsed_steps_data)[:500]}...")
 
@@ -946,6 +850,17 @@ class AutomoyOperator:
         action_to_execute: Optional[Dict[str, Any]] = None
         self.thinking_process_output = self.thinking_process_output if hasattr(self, 'thinking_process_output') else None # Ensure initialized
 
+        # A previous multi-action plan may already cover this step: no screenshot, parse or LLM call
+        planned_action = self.action_batch.next_for(current_step_index)
+        if planned_action:
+            logger.info(f"Using planned action for step {current_step_index + 1}: {planned_action}")
+            self.operations_generated_for_gui = [planned_action] + self.action_batch.queued_actions
+            await self._update_gui_state_func("/state/operations_generated", {
+                "operations": self.operations_generated_for_gui,
+                "thinking_process": self.thinking_process_output or "N/A"
+            })
+            return planned_action
+
         try:
             # Skip automatic screenshot capture - only take screenshots when explicitly requested
             await self._update_gui_state_func("/state/current_operation", {"text": f"Generating action for step: {current_step_description}"})
@@ -974,6 +889,8 @@ class AutomoyOperator:
                  await self._update_gui_state_func("/state/operator_status", {"text": f"Resumed. Processing step {current_step_index + 1}"}) # MODIFIED (payload key)
 
             logger.info(f"Attempt {step_retry_count + 1}/{self.max_retries_per_step} to generate action for step: {current_step_description}")
+            if step_retry_count:
+                ACTION_RETRIES.inc()
             await self._update_gui_state_func("/state/operator_status", {"text": f"Formulating action for step {current_step_index + 1} (Attempt {step_retry_count + 1})"}) # MODIFIED (payload key)
 
             try:
@@ -1019,12 +936,11 @@ class AutomoyOperator:
                                 if element.get("type"):
                                     element_dict["type"] = element["type"]
                                 if element.get("bbox_normalized"):
-                                    bbox = element["bbox_normalized"]
-                                    # Convert normalized bbox to pixel coordinates
-                                    screen_width, screen_height = 1920, 1080  # Default assumption
-                                    x1, y1, x2, y2 = bbox
-                                    pixel_x = int((x1 + x2) / 2 * screen_width)
-                                    pixel_y = int((y1 + y2) / 2 * screen_height)
+                                    click_point = self._element_click_point(element["bbox_normalized"])
+                                    if click_point is None:
+                                        formatted_elements.append(element_dict)
+                                        continue
+                                    pixel_x, pixel_y = click_point
                                     element_dict["coordinates"] = [pixel_x, pixel_y]
                                     
                                     # Format for LLM as expected in prompt template
@@ -1062,19 +978,27 @@ class AutomoyOperator:
                 # === END FRESH VISUAL ANALYSIS ===
                 
                 system_prompt_action = ACTION_GENERATION_SYSTEM_PROMPT
+                followups = self.action_batch.followup_budget(current_step_index, len(self.steps))
+                if followups:
+                    upcoming_steps = self.steps[current_step_index + 1:current_step_index + 1 + followups]
+                    system_prompt_action += ACTION_BATCH_SYSTEM_PROMPT.format(
+                        max_followups=followups,
+                        upcoming_steps="\n".join(f"{current_step_index + 2 + i}. {s['description']}"
+                                                  for i, s in enumerate(upcoming_steps)))
                 previous_action = self.executed_steps[-1]["summary"] if self.executed_steps else "N/A"
                 
-                user_prompt_action = self.llm_interface.construct_action_prompt(
-                    objective=self.objective,
-                    current_step_description=current_step_description,
-                    all_steps=[s['description'] for s in self.steps],
-                    current_step_index=current_step_index,
-                    visual_analysis_output=self.visual_analysis_output or "No visual analysis available.",
-                    thinking_process_output=self.thinking_process_output or "No prior thinking process output for this action.",
-                    previous_action_summary=self.last_action_summary or "This is the first action or previous action summary is not available.",
-                    max_retries=self.max_retries_per_step,
-                    current_retry_count=step_retry_count
-                )
+                with self.timeline.span("prompt_build", stage="action"):
+                    user_prompt_action = self.llm_interface.construct_action_prompt(
+                        objective=self.objective,
+                        current_step_description=current_step_description,
+                        all_steps=[s['description'] for s in self.steps],
+                        current_step_index=current_step_index,
+                        visual_analysis_output=self.visual_analysis_output or "No visual analysis available.",
+                        thinking_process_output=self.thinking_process_output or "No prior thinking process output for this action.",
+                        previous_action_summary=self.last_action_summary or "This is the first action or previous action summary is not available.",
+                        max_retries=self.max_retries_per_step,
+                        current_retry_count=step_retry_count
+                    )
 
                 messages_action = [
                     {"role": "system", "content": system_prompt_action},
@@ -1105,14 +1029,15 @@ class AutomoyOperator:
                 # Take fresh screenshot for LLM action generation
                 screenshot_path = await self._take_screenshot(f"Action generation for step {current_step_index + 1}")
                 
-                raw_llm_response, thinking_output, llm_error = await self.llm_interface.get_next_action(
-                    model=self.config.get_model(),
-                    messages=messages_action,
-                    objective=self.objective,
-                    session_id=self.session_id,
-                    screenshot_path=screenshot_path,  # Enable visual analysis
-                    thinking_callback=thinking_stream_callback  # Add streaming callback
-                )
+                with self.timeline.span("llm_total", stage="action", attempt=step_retry_count + 1) as llm_span:
+                    raw_llm_response, thinking_output, llm_error = await self.llm_interface.get_next_action(
+                        model=self.config.get_model(),
+                        messages=messages_action,
+                        objective=self.objective,
+                        session_id=self.session_id,
+                        screenshot_path=screenshot_path,  # Enable visual analysis
+                        thinking_callback=self._first_token_timer(thinking_stream_callback, "action", llm_span)  # Add streaming callback
+                    )
                 
                 # Update thinking process output and display it in the thinking tab
                 self.thinking_process_output = thinking_output
@@ -1135,7 +1060,7 @@ class AutomoyOperator:
                     })
                     await self._update_gui_state_func("/state/operator_status", {"text": f"LLM error on step {current_step_index + 1}"})
                     step_retry_count += 1
-                    await asyncio.sleep(1)
+                    await self._wait_for_screen_settle("action generation retry", fallback_delay=1)
                     continue
 
                 if not raw_llm_response:
@@ -1148,19 +1073,21 @@ class AutomoyOperator:
                     })
                     await self._update_gui_state_func("/state/operator_status", {"text": f"No LLM response for step {current_step_index + 1}"})
                     step_retry_count += 1
-                    await asyncio.sleep(1) 
+                    await self._wait_for_screen_settle("action generation retry", fallback_delay=1)
                     continue
                 
                 # Update current operation with action parsing
                 await self._update_gui_state_func("/state/current_operation", {"text": "Processing LLM response and extracting action..."})
                 
                 from core.lm.lm_interface import handle_llm_response
-                action_result = handle_llm_response(raw_llm_response, "action_generation", 
-                                                   is_json=True,
-                                                   llm_interface=self.llm_interface,
-                                                   objective=self.objective,
-                                                   current_step_description=current_step_description,
-                                                   visual_analysis_output=self.visual_analysis_output)
+                with self.timeline.span("json_parse", stage="action"):
+                    action_result = handle_llm_response(raw_llm_response, "action_generation", 
+                                                       is_json=True,
+                                                       llm_interface=self.llm_interface,
+                                                       objective=self.objective,
+                                                       current_step_description=current_step_description,
+                                                       visual_analysis_output=self.visual_analysis_output,
+                                                       batch=bool(followups))
                 logger.debug(f"handle_llm_response result for action generation: {action_result}")
 
                 if not action_result:
@@ -1171,17 +1098,21 @@ class AutomoyOperator:
                         "thinking_process": self.thinking_process_output or "Could not parse LLM action."
                     })
                     step_retry_count += 1
-                    await asyncio.sleep(1)
+                    await self._wait_for_screen_settle("action generation retry", fallback_delay=1)
                     continue
 
                 # Check if action_result is already a dictionary (from fallback) or a JSON string
-                if isinstance(action_result, dict):
+                if isinstance(action_result, list):
+                    # Multi-action plan: run the first action, queue the rest for the next steps
+                    parsed_action = self.action_batch.load(action_result, current_step_index, len(self.steps))
+                elif isinstance(action_result, dict):
                     # It's already a parsed action (likely from fallback)
                     parsed_action = action_result
                 elif isinstance(action_result, str):
                     # It's a JSON string that needs parsing
                     try:
-                        parsed_action = json.loads(action_result)
+                        with self.timeline.span("json_parse", stage="action_json"):
+                            parsed_action = json.loads(action_result)
                     except json.JSONDecodeError as jde:
                         logger.error(f"JSONDecodeError parsing action_result: {jde}. Content: {action_result}")
                         await self._update_gui_state_func("/state/thinking", {"text": f"JSON decode error parsing action: {jde}"})
@@ -1190,7 +1121,7 @@ class AutomoyOperator:
                             "thinking_process": self.thinking_process_output or f"JSON Error: {jde}"
                         })
                         step_retry_count += 1
-                        await asyncio.sleep(1)
+                        await self._wait_for_screen_settle("action generation retry", fallback_delay=1)
                         continue
                 else:
                     logger.error(f"Unexpected action_result type: {type(action_result)}")
@@ -1200,13 +1131,13 @@ class AutomoyOperator:
                         "thinking_process": self.thinking_process_output or "Unexpected response type."
                     })
                     step_retry_count += 1
-                    await asyncio.sleep(1)
+                    await self._wait_for_screen_settle("action generation retry", fallback_delay=1)
                     continue
 
                 # Validate the parsed action has required fields
                 if isinstance(parsed_action, dict) and "type" in parsed_action and "summary" in parsed_action:
                     action_to_execute = parsed_action 
-                    self.operations_generated_for_gui = [action_to_execute]
+                    self.operations_generated_for_gui = [action_to_execute] + self.action_batch.queued_actions
                     logger.info(f"Action proposed by LLM: {action_to_execute}")
                     await self._update_gui_state_func("/state/thinking", {"text": f"Valid action extracted: {action_to_execute['type']} - {action_to_execute['summary']}"})
                     await self._update_gui_state_func("/state/operations_generated", {
@@ -1222,7 +1153,7 @@ class AutomoyOperator:
                         "thinking_process": self.thinking_process_output or "Action format error."
                     })
                     step_retry_count += 1
-                    await asyncio.sleep(1)
+                    await self._wait_for_screen_settle("action generation retry", fallback_delay=1)
                     continue
 
             except Exception as e_llm_action: # This except block pairs with the outer try for the LLM call attempt
@@ -1257,6 +1188,22 @@ class AutomoyOperator:
         return action_to_execute
 
     async def operate_loop(self):
+        """Run the objective to completion, recording a per-stage latency timeline (and a session trace if enabled)."""
+        self.timeline.reset(f"{self.session_id}-{int(time.time())}")
+        self._step_started_at = None
+        directory = trace_dir(self.config) if self.record_sessions else None
+        try:
+            if directory is None:
+                await self._run_operate_loop()
+            else:
+                recorder = TraceRecorder(directory / self.timeline.session_id, self.session_id, self.objective)
+                with recorder.attach(self):
+                    await self._run_operate_loop()
+        finally:
+            self._begin_step_span(None)
+            self._finish_timeline()
+
+    async def _run_operate_loop(self):
         logger.info("AutomoyOperator.operate_loop started.")
         await self._update_gui_state_func("/state/operator_status", {"text": "Starting Operator..."}) # MODIFIED (payload key)
         
@@ -1303,13 +1250,11 @@ class AutomoyOperator:
                                 if element.get("type"):
                                     element_dict["type"] = element["type"]
                                 if element.get("bbox_normalized"):
-                                    bbox = element["bbox_normalized"]
-                                    # Convert normalized bbox to pixel coordinates
-                                    # Assuming standard screen size - this should be improved
-                                    screen_width, screen_height = 1920, 1080  # Default assumption
-                                    x1, y1, x2, y2 = bbox
-                                    pixel_x = int((x1 + x2) / 2 * screen_width)
-                                    pixel_y = int((y1 + y2) / 2 * screen_height)
+                                    click_point = self._element_click_point(element["bbox_normalized"])
+                                    if click_point is None:
+                                        formatted_elements.append(element_dict)
+                                        continue
+                                    pixel_x, pixel_y = click_point
                                     element_dict["coordinates"] = [pixel_x, pixel_y]
                                     
                                     # Format for LLM as expected in prompt template
@@ -1406,6 +1351,7 @@ class AutomoyOperator:
         
         # Main loop for executing steps
         self.current_step_index = 0 # Ensure it starts at 0
+        self.action_batch.clear()
         self.consecutive_error_count = 0 # Reset consecutive error counter
 
         while self.current_step_index < len(self.steps):
@@ -1416,6 +1362,7 @@ class AutomoyOperator:
                  await self.pause_event.wait()
                  logger.info("Operation resumed by user.")
             
+            self._begin_step_span(self.current_step_index)
             current_step = self.steps[self.current_step_index]
             current_step_description = current_step.get("description", "No description")
             logger.info(f"Processing step {self.current_step_index + 1}/{len(self.steps)}: {current_step_description}")
@@ -1445,14 +1392,15 @@ class AutomoyOperator:
                     await self._update_gui_state_func("/state/thinking", {"text": "Screenshot action requested - capturing screen for analysis"})
                     
                     # Capture fresh screenshot
-                    screenshot_pil = await asyncio.to_thread(capture_screen_pil)
+                    screenshot_pil = await self._capture_screen()
                     if screenshot_pil:
                         screenshot_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
                         screenshot_filename = f"automoy_screenshot_action_{screenshot_timestamp}.png"
                         screenshot_path = Path("debug/screenshots") / screenshot_filename
                         screenshot_path.parent.mkdir(parents=True, exist_ok=True)
                         
-                        await asyncio.to_thread(screenshot_pil.save, str(screenshot_path))
+                        with self.timeline.span("encode"):
+                            await asyncio.to_thread(screenshot_pil.save, str(screenshot_path))
                         
                         # Immediately update GUI with screenshot path
                         await self._update_gui_state_func("/state/screenshot", {"path": str(screenshot_path)})
@@ -1470,6 +1418,8 @@ class AutomoyOperator:
                     else:
                         await self._update_gui_state_func("/state/thinking", {"text": "Screenshot capture failed - proceeding to next step"})
                     
+                    # The plan was made without this screenshot; re-plan from it
+                    self.action_batch.clear("screenshot requested")
                     self.current_step_index += 1
                     continue
                 elif action_type == "visual_search":
@@ -1487,7 +1437,12 @@ class AutomoyOperator:
                 else:
                     # --- Real action execution ---
                     await self._update_gui_state_func("/state/thinking", {"text": f"Executing action: {action_to_execute.get('type', 'unknown')} - {action_to_execute.get('summary', 'No description')}"})
-                    execution_details = self.action_executor.execute(action_to_execute)
+                    if self.action_batch.pending:
+                        # Reference frame for checking this action before the planned follow-ups run
+                        await asyncio.to_thread(self.action_batch.mark_before)
+                    with self.timeline.span("action_execute", action=action_to_execute.get("type", "unknown")):
+                        # Input calls and their pauses block; keep the loop (GUI updates, stop signal) responsive
+                        execution_details = await asyncio.to_thread(self.action_executor.execute, action_to_execute)
                     
                     # Special handling for Windows key press - wait and take follow-up screenshot
                     if (action_to_execute.get("type") == "key" and 
@@ -1496,8 +1451,8 @@ class AutomoyOperator:
                         logger.info("🔍 Windows key pressed - waiting for Start menu and taking follow-up screenshot")
                         await self._update_gui_state_func("/state/thinking", {"text": "Windows key pressed - waiting for Start menu to appear and taking follow-up screenshot"})
                         
-                        # Wait for Start menu to appear
-                        await asyncio.sleep(2)
+                        # Wait for Start menu to finish opening (bounded by the old 2s delay)
+                        await self._wait_for_screen_settle("Windows key", fallback_delay=2, expect_change=True)
                         
                         # Take immediate follow-up screenshot to see Start menu
                         followup_screenshot_path = await self._take_screenshot("After Windows key press")
@@ -1507,7 +1462,8 @@ class AutomoyOperator:
                             # Analyze the Start menu screen
                             if self.omniparser:
                                 try:
-                                    parsed_result = self.omniparser.parse_screenshot(str(followup_screenshot_path))
+                                    parsed_result = await asyncio.to_thread(
+                                        self.omniparser.parse_screenshot, str(followup_screenshot_path), False)
                                     if parsed_result and "parsed_content_list" in parsed_result:
                                         elements = parsed_result["parsed_content_list"]
                                         logger.info(f"🔍 Start menu analysis: found {len(elements)} elements")
@@ -1537,7 +1493,7 @@ class AutomoyOperator:
                     
                     # Return to desktop anchor after real UI actions (but not after screenshots or special Windows key handling)
                     elif action_type in ["key_sequence", "type", "click"]:
-                        await asyncio.sleep(0.5)  # Allow action to complete
+                        await self._wait_for_screen_settle(action_type, fallback_delay=0.5, expect_change=True)  # Allow action to complete
                         await self._ensure_desktop_anchor()
                 
                 logger.info(f"Action execution result: {execution_details}")
@@ -1588,8 +1544,11 @@ class AutomoyOperator:
                 # --- Update GUI with completion status ---
                 await self._update_gui_state_func("/state/thinking", {"text": f"Step {self.current_step_index} completed successfully, proceeding to next step"})
                 await self._update_gui_state_func("/state/operator_status", {"text": f"Completed step {self.current_step_index}"})
-                # Add small delay between steps for stability
-                await asyncio.sleep(1)
+                # Let the screen settle between steps instead of a fixed delay
+                await self._wait_for_screen_settle("between steps", fallback_delay=1)
+                if self.action_batch.pending:
+                    with self.timeline.span("plan_checkpoint"):
+                        await asyncio.to_thread(self.action_batch.checkpoint, action_to_execute)
             else:
                 # ...existing code for error handling...
                 logger.error(f"Failed to get a valid action for step {self.current_step_index + 1}. Stopping operation.")
@@ -1625,10 +1584,14 @@ class AutomoyOperator:
         """Verify if a process is running by name"""
         try:
             import psutil
-            running_processes = []
-            for process in psutil.process_iter(['name', 'pid']):
-                if process_name.lower() in process.info['name'].lower():
-                    running_processes.append(f"{process.info['name']} (PID: {process.info['pid']})")
+
+            def find_processes():
+                # Walking the process table takes tens of ms; done off the event loop
+                return [f"{p.info['name']} (PID: {p.info['pid']})"
+                        for p in psutil.process_iter(['name', 'pid'])
+                        if process_name.lower() in (p.info['name'] or '').lower()]
+
+            running_processes = await asyncio.to_thread(find_processes)
             
             if running_processes:
                 logger.info(f"✓ Process '{process_name}' is running: {', '.join(running_processes)}")
@@ -462,6 +462,28 @@ MANDATORY REQUIREMENTS:
 5. Respond with ONLY the JSON object - no explanations or markdown
 """
 
+# Appended to ACTION_GENERATION_SYSTEM_PROMPT when ACTION_BATCH is on
+ACTION_BATCH_SYSTEM_PROMPT = """
+MULTI-ACTION PLANS:
+You may also cover the steps that directly follow the current one, so they run without another screen analysis.
+Respond with a JSON array instead of a single object: the action for the current step first, then at most
+{max_followups} more actions, one per following step, in order. Upcoming steps:
+{upcoming_steps}
+
+Only add a follow-up action if you can predict it without seeing the screen again (e.g. typing into the
+search box that the previous key press opens, then pressing Enter). Stop the array at the first step that
+needs new visual information, such as clicking an element that is not on the current screen.
+Add "expect_change": false to an action that does not visibly change the screen; actions are checked after
+they run, and the rest of the array is discarded if an action did not have its expected effect.
+
+Example:
+[
+  {{"type": "key", "key": "win", "summary": "Open the Start menu", "confidence": 90}},
+  {{"type": "type", "text": "chrome", "summary": "Search for Chrome", "confidence": 85}},
+  {{"type": "key", "key": "enter", "summary": "Launch Chrome", "confidence": 80}}
+]
+"""
+
 ACTION_GENERATION_USER_PROMPT_TEMPLATE = """
 CURRENT SCREEN ANALYSIS:
 {visual_analysis}
@@ -0,0 +1,170 @@
+"""
+Multi-action plans from a single LLM call.
+
+When batching is on, the action prompt lets the model answer with a JSON array:
+the action for the current step followed by actions for the next steps that it
+can predict without seeing the screen again (press Win, type "chrome", press
+Enter). The first action runs as usual; the rest are queued by step index and
+handed out by ``next_for`` without another screenshot, OmniParser parse or LLM
+round trip.
+
+Queued actions are speculative, so every batched action is checked: a
+thumbnail is taken before it runs and compared tile by tile with one taken
+after the screen has settled. If an action that should visibly change the
+screen left every tile unchanged, the rest of the plan is dropped and the next
+step is planned from a fresh screenshot.
+
+Config keys:
+    ACTION_BATCH: True      # Let one LLM call plan the current step and the following ones
+    ACTION_BATCH_MAX: 4     # Maximum actions per plan, including the current step
+"""
+
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from core.utils.metrics import BATCHED_ACTIONS
+from core.utils.screenshot_utils import capture_screen_thumbnail, frame_changed
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# Action types that are expected to change the screen unless the plan says otherwise
+VISIBLE_ACTION_TYPES = ("key", "key_sequence", "hotkey", "type", "click", "double_click", "right_click")
+
+
+def expects_change(action: Dict[str, Any]) -> bool:
+    """Whether ``action`` should visibly change the screen (``expect_change`` overrides the type default)."""
+    if "expect_change" in action:
+        return bool(action["expect_change"])
+    return str(action.get("type", action.get("action_type", ""))).lower() in VISIBLE_ACTION_TYPES
+
+
+def is_valid_action(action: Any) -> bool:
+    """Same shape check the operator applies to single actions."""
+    return isinstance(action, dict) and "type" in action and "summary" in action
+
+
+class ActionBatch:
+    """
+    Queue of planned follow-up actions, keyed by the step they belong to.
+
+    Args:
+        enabled: If False, ``followup_budget`` is 0 and nothing is ever queued
+        max_actions: Maximum actions per plan, including the current step
+        threshold: Minimum mean tile difference (0.0-1.0) that counts as a visible change
+        tile_size: Tile edge length in thumbnail pixels
+        grab_func: Frame source returning a grayscale thumbnail (defaults to the screen)
+    """
+
+    def __init__(self,
+                 enabled: bool = True,
+                 max_actions: int = 4,
+                 threshold: float = 0.02,
+                 tile_size: int = 4,
+                 grab_func: Optional[Callable[[], Any]] = None):
+        self.enabled = enabled and max_actions > 1
+        self.max_actions = max_actions
+        self.threshold = threshold
+        self.tile_size = tile_size
+        self._grab = grab_func or capture_screen_thumbnail
+        self._queue: Deque[Tuple[int, Dict[str, Any]]] = deque()
+        self._before: Any = None
+
+    @classmethod
+    def from_config(cls, config, settle_detector=None) -> "ActionBatch":
+        """
+        Build from the ACTION_BATCH* keys in config.txt.
+
+        With a ``settle_detector``, its frame source and tile settings are reused;
+        batching is off when the detector cannot sample frames, since queued
+        actions could not be checked.
+        """
+        enabled = bool(config.get("ACTION_BATCH", True))
+        options = {}
+        if settle_detector is not None:
+            enabled = enabled and settle_detector.enabled
+            options = dict(threshold=settle_detector.threshold, tile_size=settle_detector.tile_size,
+                           grab_func=settle_detector._grab)
+        return cls(enabled=enabled, max_actions=int(config.get("ACTION_BATCH_MAX", 4)), **options)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._queue)
+
+    @property
+    def queued_actions(self) -> List[Dict[str, Any]]:
+        return [action for _, action in self._queue]
+
+    def followup_budget(self, step_index: int, total_steps: int) -> int:
+        """How many actions after the current step's one a plan may contain."""
+        if not self.enabled:
+            return 0
+        return max(0, min(self.max_actions - 1, total_steps - step_index - 1))
+
+    def load(self, actions: List[Any], step_index: int, total_steps: int) -> Optional[Dict[str, Any]]:
+        """
+        Take a plan returned by the LLM.
+
+        Returns:
+            The action for ``step_index`` (None if the plan does not start with a
+            valid action); valid follow-ups are queued for the next steps, up to
+            the first invalid one
+        """
+        self.clear()
+        if not actions or not is_valid_action(actions[0]):
+            return None
+        budget = self.followup_budget(step_index, total_steps)
+        for offset, action in enumerate(actions[1:budget + 1], start=1):
+            if not is_valid_action(action):
+                logger.warning(f"Dropping plan from action {offset + 1} on: invalid action {action}")
+                break
+            self._queue.append((step_index + offset, action))
+        if len(actions) > 1 + len(self._queue):
+            BATCHED_ACTIONS.inc(len(actions) - 1 - len(self._queue), result="dropped")
+        if self._queue:
+            BATCHED_ACTIONS.inc(len(self._queue), result="planned")
+            logger.info(f"LLM planned {len(self._queue)} follow-up action(s) after step {step_index + 1}")
+        return actions[0]
+
+    def next_for(self, step_index: int) -> Optional[Dict[str, Any]]:
+        """The queued action for ``step_index``, or None (a plan for other steps is dropped)."""
+        if not self._queue:
+            return None
+        queued_index, action = self._queue[0]
+        if queued_index != step_index:
+            self.clear(f"plan was for step {queued_index + 1}, now at step {step_index + 1}")
+            return None
+        self._queue.popleft()
+        BATCHED_ACTIONS.inc(result="executed")
+        return action
+
+    def mark_before(self) -> None:
+        """Grab the reference frame for ``checkpoint``; only needed while follow-ups are queued."""
+        self._before = self._grab() if self._queue else None
+
+    def checkpoint(self, action: Dict[str, Any]) -> bool:
+        """
+        Check that ``action`` had a visible effect, after the screen has settled.
+
+        Returns:
+            False if the rest of the plan was dropped because the screen did not
+            change as expected (or could not be compared); True otherwise
+        """
+        before, self._before = self._before, None
+        if before is None or not self._queue:
+            return True
+        if expects_change(action) and not frame_changed(before, self._grab(), self.tile_size, self.threshold):
+            self.clear(f"'{action.get('summary', action.get('type'))}' did not change the screen")
+            return False
+        logger.debug(f"Plan checkpoint passed for '{action.get('summary')}'")
+        return True
+
+    def clear(self, reason: Optional[str] = None) -> None:
+        """Drop the queued follow-ups; the next step is planned from a fresh screenshot."""
+        if self._queue:
+            BATCHED_ACTIONS.inc(len(self._queue), result="dropped")
+            if reason:
+                logger.info(f"Dropping {len(self._queue)} planned action(s): {reason}")
+        self._queue.clear()
+        self._before = None
@@ -0,0 +1,242 @@
+"""
+Display topology for Automoy.
+
+Describes the monitors that make up the virtual desktop so that each monitor can
+be captured and parsed on its own, and so that points found in a capture can be
+turned into coordinates the input layer (pyautogui / ctypes) understands.
+
+Two coordinate spaces are involved:
+
+* capture space - pixels as returned by the capture backend (physical pixels)
+* input space   - coordinates used for mouse input; these differ from capture
+                  space on Windows when the process is not DPI aware and a
+                  monitor is scaled (e.g. 150%)
+
+Each ``Monitor`` records its bounds in capture space, its origin in input space
+and ``scale`` (capture pixels per input pixel).
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.utils.region.capture_region import CaptureRegion
+from core.utils.screen_capture import get_capture_backend
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class Monitor:
+    """One physical display."""
+    index: int                   # mss-style index, 1..N
+    region: CaptureRegion        # bounds in capture space
+    input_left: int = 0          # origin in input space
+    input_top: int = 0
+    scale: float = 1.0           # capture pixels per input pixel
+    primary: bool = False
+    name: str = ""
+
+    def to_input(self, x: float, y: float) -> Tuple[int, int]:
+        """Convert a capture-space point on this monitor to input space."""
+        return (int(round(self.input_left + (x - self.region.left) / self.scale)),
+                int(round(self.input_top + (y - self.region.top) / self.scale)))
+
+
+class DisplayTopology:
+    """The set of monitors forming the virtual desktop."""
+
+    def __init__(self, monitors: Sequence[Monitor]):
+        if not monitors:
+            raise ValueError("DisplayTopology needs at least one monitor")
+        self.monitors: List[Monitor] = list(monitors)
+
+    @property
+    def primary(self) -> Monitor:
+        for monitor in self.monitors:
+            if monitor.primary:
+                return monitor
+        return self.monitors[0]
+
+    @property
+    def virtual_region(self) -> CaptureRegion:
+        """Bounding box of all monitors in capture space."""
+        return CaptureRegion(
+            min(m.region.left for m in self.monitors),
+            min(m.region.top for m in self.monitors),
+            max(m.region.right for m in self.monitors),
+            max(m.region.bottom for m in self.monitors),
+        )
+
+    def monitor_at(self, x: float, y: float) -> Monitor:
+        """Monitor containing a capture-space point (nearest one if the point is in a gap)."""
+        for monitor in self.monitors:
+            r = monitor.region
+            if r.left <= x < r.right and r.top <= y < r.bottom:
+                return monitor
+
+        def distance(monitor: Monitor) -> float:
+            r = monitor.region
+            dx = max(r.left - x, 0, x - r.right + 1)
+            dy = max(r.top - y, 0, y - r.bottom + 1)
+            return dx * dx + dy * dy
+
+        return min(self.monitors, key=distance)
+
+    def to_input(self, x: float, y: float) -> Tuple[int, int]:
+        """Convert a capture-space point to input-space coordinates."""
+        monitor = self.monitor_at(x, y)
+        x, y = monitor.region.clamp(int(x), int(y))
+        return monitor.to_input(x, y)
+
+    def capture_monitors(self) -> List[Tuple[Monitor, Any]]:
+        """
+        Grab every monitor separately.
+
+        Returns:
+            List of (Monitor, PIL Image); empty if any grab fails
+        """
+        backend = get_capture_backend()
+        if backend is None:
+            return []
+        frames = []
+        for monitor in self.monitors:
+            try:
+                frames.append((monitor, backend.grab(region=monitor.region.as_tuple())))
+            except Exception as e:
+                logger.error(f"Failed to capture monitor {monitor.index}: {e}")
+                return []
+        return frames
+
+    def stitch(self, frames: Sequence[Tuple[Monitor, Any]]) -> Any:
+        """Paste per-monitor frames onto one virtual-desktop image (for display only)."""
+        virtual = self.virtual_region
+        canvas = Image.new("RGB", (virtual.width, virtual.height))
+        for monitor, image in frames:
+            canvas.paste(image, (monitor.region.left - virtual.left, monitor.region.top - virtual.top))
+        return canvas
+
+    def describe(self) -> str:
+        """One line per monitor, for logs."""
+        lines = []
+        for m in self.monitors:
+            r = m.region
+            lines.append(f"#{m.index}{' (primary)' if m.primary else ''} {m.name} "
+                         f"{r.width}x{r.height} at ({r.left}, {r.top}) scale {m.scale:g}")
+        return "\n".join(lines)
+
+    @classmethod
+    def detect(cls) -> "DisplayTopology":
+        """
+        Build the topology from the capture backend, refined with screeninfo.
+
+        The capture backend supplies capture-space bounds. screeninfo (when
+        installed) supplies names, the primary flag and the input-space geometry
+        used to derive each monitor's scale. Falls back to a single monitor of
+        the primary screen size.
+        """
+        backend = get_capture_backend()
+        bounds: List[Tuple[int, int, int, int]] = []
+        if backend is not None:
+            try:
+                bounds = list(backend.monitors()[1:])
+            except Exception as e:
+                logger.warning(f"Could not enumerate monitors from capture backend: {e}")
+        if not bounds:
+            from core.utils.screenshot_utils import get_screen_size
+            width, height = get_screen_size()
+            bounds = [(0, 0, width, height)]
+
+        logical = _screeninfo_monitors()
+        if logical and len(logical) != len(bounds):
+            logger.debug("screeninfo and capture backend disagree on monitor count; ignoring screeninfo")
+            logical = []
+
+        # Scaled monitors do not share origins across the two spaces, so pair
+        # capture-space and input-space monitors by their position order.
+        pairing: Dict[int, Dict[str, Any]] = {}
+        if logical:
+            order = sorted(range(len(bounds)), key=lambda i: (bounds[i][0], bounds[i][1]))
+            ordered_logical = sorted(logical, key=lambda m: (m["x"], m["y"]))
+            pairing = dict(zip(order, ordered_logical))
+
+        monitors = []
+        for i, bbox in enumerate(bounds):
+            region = CaptureRegion(*bbox)
+            info = pairing.get(i)
+            if info:
+                scale = region.width / info["width"] if info["width"] else 1.0
+                monitors.append(Monitor(i + 1, region, info["x"], info["y"], scale,
+                                        info["is_primary"], info["name"]))
+            else:
+                monitors.append(Monitor(i + 1, region, region.left, region.top, 1.0,
+                                        region.left == 0 and region.top == 0))
+
+        topology = cls(monitors)
+        logger.info(f"Detected {len(monitors)} monitor(s):\n{topology.describe()}")
+        return topology
+
+
+def _screeninfo_monitors() -> List[Dict[str, Any]]:
+    """Monitor geometry in input space via screeninfo, or [] if unavailable."""
+    try:
+        from screeninfo import get_monitors
+    except ImportError:
+        return []
+    try:
+        return [
+            {"x": m.x, "y": m.y, "width": m.width, "height": m.height,
+             "is_primary": bool(getattr(m, "is_primary", False)), "name": m.name or ""}
+            for m in get_monitors()
+        ]
+    except Exception as e:
+        logger.debug(f"screeninfo failed: {e}")
+        return []
+
+
+def merge_monitor_results(results: Sequence[Tuple[Monitor, Optional[Dict[str, Any]]]],
+                          virtual: CaptureRegion) -> Dict[str, Any]:
+    """
+    Merge per-monitor OmniParser results into one result for the virtual desktop.
+
+    Each element's ``bbox_normalized`` is re-normalized from its monitor image to
+    the virtual-desktop bounding box, so the merged result can be used exactly
+    like a parse of a single full-desktop screenshot.
+
+    Args:
+        results: (Monitor, parsed result) pairs; failed parses may be None
+        virtual: Virtual-desktop region the merged boxes are normalized to
+
+    Returns:
+        Dict with ``parsed_content_list`` (and the first ``overlay_path`` seen)
+    """
+    merged: Dict[str, Any] = {"parsed_content_list": []}
+    for monitor, parsed in results:
+        if not parsed or not isinstance(parsed, dict):
+            logger.warning(f"No parse result for monitor {monitor.index}")
+            continue
+        if "overlay_path" in parsed and "overlay_path" not in merged:
+            merged["overlay_path"] = parsed["overlay_path"]
+
+        r = monitor.region
+        for element in parsed.get("parsed_content_list", []):
+            element = dict(element)
+            bbox = element.get("bbox_normalized")
+            if bbox and len(bbox) >= 4:
+                x1, y1, x2, y2 = (float(v) for v in bbox[:4])
+                element["bbox_normalized"] = [
+                    (r.left + x1 * r.width - virtual.left) / virtual.width,
+                    (r.top + y1 * r.height - virtual.top) / virtual.height,
+                    (r.left + x2 * r.width - virtual.left) / virtual.width,
+                    (r.top + y2 * r.height - virtual.top) / virtual.height,
+                ]
+            element["monitor"] = monitor.index
+            merged["parsed_content_list"].append(element)
+    return merged
@@ -0,0 +1,169 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+The operator runs on one asyncio loop; any synchronous call made from a
+coroutine (an HTTP request, ``time.sleep``, ``psutil.process_iter``) freezes
+the whole loop, including GUI updates and the stop signal. ``LoopMonitor``
+makes those stalls visible:
+
+* a heartbeat coroutine wakes every ``interval`` seconds and records how late
+  it ran (``automoy_event_loop_lag_seconds``)
+* a watchdog thread notices when the heartbeat stops, captures the loop
+  thread's stack while it is still blocked, logs it and counts the stall
+  (``automoy_event_loop_stalls_total``)
+
+In tests, use it as an async context manager and assert on ``stalls``::
+
+    async with LoopMonitor(threshold=0.1) as monitor:
+        await code_under_test()
+    assert not monitor.stalls, monitor.stalls[0].stack
+
+Config keys:
+    LOOP_MONITOR: True            # run the monitor alongside the operator
+    LOOP_STALL_THRESHOLD: 0.25    # seconds without a heartbeat before a stall is reported
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, List, Optional
+
+from .metrics import LOOP_LAG, LOOP_STALLS
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_INTERVAL = 0.05
+DEFAULT_THRESHOLD = 0.25
+
+# Stalls kept for inspection
+MAX_STALLS = 50
+
+
+@dataclass
+class Stall:
+    """One period during which the loop did not run the heartbeat."""
+
+    started_at: float                 # time.time() of the last heartbeat before the stall
+    detected_after: float             # seconds blocked when the stack was captured
+    stack: str                        # loop thread stack at detection
+    culprit: str                      # innermost project frame, "path:line in func"
+    duration: Optional[float] = None  # total seconds blocked, once the loop recovered
+
+
+def _culprit(frames: List[traceback.FrameSummary]) -> str:
+    """Innermost frame in project code (outside this module), else the innermost frame."""
+    for frame in reversed(frames):
+        path = Path(frame.filename)
+        if path.name != Path(__file__).name and PROJECT_ROOT in path.resolve().parents:
+            return f"{path.relative_to(PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    if frames:
+        return f"{frames[-1].filename}:{frames[-1].lineno} in {frames[-1].name}"
+    return "unknown"
+
+
+class LoopMonitor:
+    """Heartbeat on the loop plus a watchdog thread that reports stalls with stacks."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, threshold: float = DEFAULT_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[Stall] = deque(maxlen=MAX_STALLS)
+        self.max_lag = 0.0
+        self._last_beat = time.monotonic()
+        self._current: Optional[Stall] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ――― lifecycle ―――
+    def start(self) -> "LoopMonitor":
+        """Start monitoring the running loop (call from a coroutine)."""
+        if self._task is not None:
+            return self
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.debug(f"Loop monitor started (interval={self.interval}s, threshold={self.threshold}s)")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None and self._watchdog is not threading.current_thread():
+            self._watchdog.join(timeout=1)
+        self._watchdog = None
+
+    async def __aenter__(self) -> "LoopMonitor":
+        return self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        # Let the heartbeat observe the end of a stall that finished just before exit
+        await asyncio.sleep(0)
+        self._end_stall()
+        self.stop()
+
+    # ――― loop side ―――
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - due)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+            self._last_beat = time.monotonic()
+            self._end_stall()
+
+    def _end_stall(self) -> None:
+        stall = self._current
+        if stall is None:
+            return
+        self._current = None
+        stall.duration = time.time() - stall.started_at
+        logger.warning(f"Event loop was blocked for {stall.duration * 1000:.0f}ms by {stall.culprit}")
+
+    # ――― watchdog thread ―――
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            blocked = time.monotonic() - self._last_beat - self.interval
+            if blocked > self.threshold and self._current is None:
+                self._report(blocked)
+
+    def _report(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        frames = traceback.extract_stack(frame) if frame is not None else []
+        stall = Stall(
+            started_at=time.time() - blocked - self.interval,
+            detected_after=blocked,
+            stack="".join(traceback.format_list(frames)),
+            culprit=_culprit(frames),
+        )
+        self._current = stall
+        self.stalls.append(stall)
+        LOOP_STALLS.inc()
+        logger.warning(f"Event loop blocked for {blocked * 1000:.0f}ms+ in {stall.culprit}; "
+                       f"loop thread stack:\n{stall.stack}")
+
+
+def start_monitor(config=None) -> Optional[LoopMonitor]:
+    """Start a ``LoopMonitor`` on the running loop unless LOOP_MONITOR is off."""
+    get = config.get if config is not None else (lambda key, default=None: default)
+    if not get("LOOP_MONITOR", True):
+        return None
+    threshold = float(get("LOOP_STALL_THRESHOLD", DEFAULT_THRESHOLD) or DEFAULT_THRESHOLD)
+    return LoopMonitor(threshold=threshold).start()
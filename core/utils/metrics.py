@@ -0,0 +1,323 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are updated from the operator loop, worker
+threads (``asyncio.to_thread`` parses) and streaming callbacks. Updates never
+take a lock: every thread writes to its own cell and readers sum the cells
+when a snapshot is rendered, so instrumenting a hot path costs a dict update.
+
+The GUI runs in a separate process, so the backend periodically writes a
+snapshot to ``METRICS_FILE`` (Prometheus textfile format) and the GUI's
+``/metrics`` endpoint serves it. Event-loop lag is sampled by
+``core/utils/loop_monitor.py``.
+
+Config keys:
+    METRICS_EXPORT: True      # write the snapshot the GUI serves at /metrics
+    METRICS_INTERVAL: 5       # seconds between snapshots
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Read by gui/gui.py, which cannot import core; keep the two paths in sync
+METRICS_FILE = PROJECT_ROOT / "debug" / "metrics" / "automoy.prom"
+
+DEFAULT_INTERVAL = 5.0
+
+# Seconds; spans from a few ms (capture, encode) to minutes (cold LLM calls)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _ThreadCells:
+    """One mutable cell per writing thread; only the owning thread mutates its cell."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._local = threading.local()
+        self._cells: List[Any] = []
+
+    def get(self) -> Any:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._factory()
+            self._cells.append(cell)  # list.append is atomic
+            return cell
+
+    def all(self) -> List[Any]:
+        return list(self._cells)
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+
+    def samples(self) -> List[Tuple[str, LabelKey, Sequence[Tuple[str, str]], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(key, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonic count, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str = ""):
+        super().__init__(name, help_text)
+        self._cells = _ThreadCells(dict)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        cell = self._cells.get()
+        key = _label_key(labels)
+        cell[key] = cell.get(key, 0.0) + amount
+
+    def values(self) -> Dict[LabelKey, float]:
+        totals: Dict[LabelKey, float] = {}
+        for cell in self._cells.all():
+            for key, value in cell.copy().items():
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def value(self, **labels: Any) -> float:
+        return self.values().get(_label_key(labels), 0.0)
+
+    def samples(self):
+        return [("_total" if not self.name.endswith("_total") else "", key, (), value)
+                for key, value in sorted(self.values().items())]
+
+
+class Gauge(Metric):
+    """
+    Current value. ``set()`` records an absolute value, ``inc()``/``dec()`` track
+    a level such as requests in flight; use one style per series.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str = ""):
+        super().__init__(name, help_text)
+        self._set: Dict[LabelKey, float] = {}
+        self._cells = _ThreadCells(dict)
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._set[_label_key(labels)] = value  # single dict store
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        cell = self._cells.get()
+        key = _label_key(labels)
+        cell[key] = cell.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def values(self) -> Dict[LabelKey, float]:
+        totals = dict(self._set)
+        for cell in self._cells.all():
+            for key, value in cell.copy().items():
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def value(self, **labels: Any) -> float:
+        return self.values().get(_label_key(labels), 0.0)
+
+    def samples(self):
+        return [("", key, (), value) for key, value in sorted(self.values().items())]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in fixed buckets (plus sum and count)."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        self._cells = _ThreadCells(dict)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        cell = self._cells.get()
+        key = _label_key(labels)
+        series = cell.get(key)
+        if series is None:
+            # [per-bucket counts..., +Inf count, sum]
+            series = cell[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        series[index] += 1
+        series[-1] += value
+
+    def snapshot(self) -> Dict[LabelKey, Dict[str, Any]]:
+        """{labels: {"buckets": cumulative counts (last is +Inf), "sum": ..., "count": ...}}"""
+        merged: Dict[LabelKey, List[float]] = {}
+        for cell in self._cells.all():
+            for key, series in cell.copy().items():
+                series = list(series)
+                total = merged.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        result = {}
+        for key, series in merged.items():
+            cumulative, running = [], 0
+            for count in series[:-1]:
+                running += count
+                cumulative.append(running)
+            result[key] = {"buckets": cumulative, "sum": series[-1], "count": running}
+        return result
+
+    def samples(self):
+        rows = []
+        for key, data in sorted(self.snapshot().items()):
+            bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, data["buckets"]):
+                rows.append(("_bucket", key, (("le", bound),), count))
+            rows.append(("_sum", key, (), data["sum"]))
+            rows.append(("_count", key, (), data["count"]))
+        return rows
+
+
+class MetricsRegistry:
+    """Named metrics; creation is locked, updates are not."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, help_text, **kwargs)
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.type_name}")
+        return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+    def write_textfile(self, path: Optional[os.PathLike] = None) -> Path:
+        """Write ``render()`` atomically, so readers never see a partial snapshot."""
+        path = Path(path or METRICS_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return path
+
+
+REGISTRY = MetricsRegistry()
+
+# ――― Automoy metrics ―――
+STEPS = REGISTRY.counter("automoy_steps_total", "Operator steps executed")
+ACTION_RETRIES = REGISTRY.counter("automoy_action_retries_total", "Action generation attempts after the first")
+STAGE_SECONDS = REGISTRY.histogram("automoy_stage_duration_seconds",
+                                   "Latency of each operator stage (capture, omniparser, llm_total, ...)")
+LLM_TOKENS = REGISTRY.counter("automoy_llm_tokens_total", "Streamed LLM tokens")
+LLM_TOKENS_PER_SECOND = REGISTRY.histogram("automoy_llm_tokens_per_second", "Streaming throughput per LLM call",
+                                           buckets=(1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 250))
+PARSE_CACHE = REGISTRY.counter("automoy_parse_cache_total", "OmniParser client cache lookups by result")
+STATE_WRITES = REGISTRY.counter("automoy_gui_state_writes_total", "Writes of the GUI state file")
+PARSES_IN_FLIGHT = REGISTRY.gauge("automoy_omniparser_in_flight", "OmniParser requests in flight (queue depth)")
+PLAN_STEPS_PENDING = REGISTRY.gauge("automoy_plan_steps_pending", "Planned steps not yet executed")
+TYPED_CHARACTERS = REGISTRY.counter("automoy_typed_characters_total", "Characters entered by input method")
+BATCHED_ACTIONS = REGISTRY.counter("automoy_batched_actions_total",
+                                   "Follow-up actions from multi-action LLM plans by result")
+STARTUP_SECONDS = REGISTRY.gauge("automoy_startup_ready_seconds",
+                                 "Seconds from launch until each startup component was ready")
+LOOP_LAG = REGISTRY.histogram("automoy_event_loop_lag_seconds", "Delay of scheduled event-loop wakeups",
+                              buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_STALLS = REGISTRY.counter("automoy_event_loop_stalls_total", "Times the event loop was blocked past the threshold")
+SNAPSHOT_TIME = REGISTRY.gauge("automoy_metrics_snapshot_timestamp_seconds", "When this snapshot was written")
+
+
+def observe_span(span) -> None:
+    """Timeline listener: feed finished spans into the stage, step and token metrics."""
+    STAGE_SECONDS.observe(span.duration, stage=span.name)
+    if span.name == "step":
+        STEPS.inc()
+    elif span.name == "llm_total":
+        tokens = span.attrs.get("tokens", 0)
+        if tokens:
+            LLM_TOKENS.inc(tokens, stage=span.attrs.get("stage", ""))
+            if span.duration > 0:
+                LLM_TOKENS_PER_SECOND.observe(tokens / span.duration)
+
+
+async def run_exporter(stop_event: asyncio.Event, interval: Optional[float] = None,
+                       path: Optional[os.PathLike] = None) -> None:
+    """Write a snapshot every ``interval`` seconds until ``stop_event`` is set."""
+    interval = float(interval or DEFAULT_INTERVAL)
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        SNAPSHOT_TIME.set(time.time())
+        try:
+            await asyncio.to_thread(REGISTRY.write_textfile, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+
+
+def start_exporter(stop_event: asyncio.Event, config=None) -> Optional[asyncio.Task]:
+    """Start ``run_exporter`` on the running loop unless METRICS_EXPORT is off."""
+    get = config.get if config is not None else (lambda key, default=None: default)
+    if not get("METRICS_EXPORT", True):
+        return None
+    interval = get("METRICS_INTERVAL", DEFAULT_INTERVAL) or DEFAULT_INTERVAL
+    logger.info(f"Writing metrics snapshots to {METRICS_FILE} every {interval}s")
+    return asyncio.create_task(run_exporter(stop_event, interval))
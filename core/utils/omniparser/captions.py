@@ -0,0 +1,82 @@
+"""
+On-demand icon captions for detection-only parses.
+
+Captioning every detected icon with Florence-2 is most of a parse's cost, and
+many steps only need the OCR text and the boxes. A detection-only parse
+(``captions=False``) skips the caption model and leaves icons with empty
+content; ``OmniParserInterface.caption_elements`` later captions just the
+element IDs (indexes into ``parsed_content_list``) that are asked about.
+
+``elements_to_caption`` is the operator's policy: when the OCR text already
+mentions everything the task names, no captions are requested at all.
+
+Config keys:
+    OMNIPARSER_CAPTIONS: True   # False = detection + OCR only, icons captioned on demand
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# Words in task descriptions that never name an on-screen element
+_TASK_STOPWORDS = frozenset("""
+    action actions after analysis button click clicks double drag enter find from generation icon
+    initial into open press right screen screenshot select step that then this type using verify
+    window with your
+""".split())
+
+
+def captions_enabled() -> bool:
+    """Whether parses should caption icons by default (OMNIPARSER_CAPTIONS)."""
+    try:
+        from config.config import Config
+        return bool(Config().get("OMNIPARSER_CAPTIONS", True))
+    except Exception as e:
+        logger.debug(f"Could not read OMNIPARSER_CAPTIONS from config: {e}")
+        return True
+
+
+def uncaptioned_ids(elements: Iterable[dict]) -> List[int]:
+    """IDs of icon elements that have no content yet."""
+    return [i for i, element in enumerate(elements)
+            if element.get("type") == "icon" and not str(element.get("content") or "").strip()]
+
+
+def task_words(task: str) -> set:
+    """Words of a task description that could name an on-screen element."""
+    return {word for word in re.findall(r"[a-z0-9]{4,}", task.lower()) if word not in _TASK_STOPWORDS}
+
+
+def elements_to_caption(elements: List[dict], task: str) -> List[int]:
+    """
+    Pick the icons to caption for ``task``.
+
+    Returns:
+        The uncaptioned icon IDs when some word of the task is missing from the
+        elements' text, otherwise an empty list
+    """
+    ids = uncaptioned_ids(elements)
+    if not ids:
+        return []
+    text = " ".join(str(element.get("content") or "") for element in elements).lower()
+    missing = {word for word in task_words(task) if word not in text}
+    if not missing:
+        return []
+    logger.debug(f"Task words not in OCR text: {sorted(missing)}; captioning {len(ids)} icons")
+    return ids
+
+
+def apply_captions(parsed: dict, captions: Dict[int, str]) -> None:
+    """Write ``captions`` (ID → text) into a parse result's elements and legacy ``coords``."""
+    elements: List[dict] = parsed.get("parsed_content_list") or []
+    coords: Optional[List[dict]] = parsed.get("coords")
+    for element_id, caption in captions.items():
+        if 0 <= element_id < len(elements):
+            elements[element_id]["content"] = caption
+            if coords is not None and element_id < len(coords):
+                coords[element_id]["content"] = caption
@@ -1,7 +1,18 @@
 """
 omniparser_interface.py · 2025‑05‑03
-RAW‑first encode strategy + optional CUDA‑cache flush.
-Saves the overlay image as processed_screenshot.png
+RAW‑first encode strategy. The client is torch-free: models (and their CUDA
+memory) live in the server process, which frees its own cache after each
+parse (installer/omniparser_setup.py).
+The overlay image is optional per request and stored undecoded for the GUI
+(see overlay.py).
+
+Config keys:
+    OMNIPARSER_DEVICE: cpu        # cpu, cuda or auto
+    OMNIPARSER_CPU_BACKEND: torch # torch, onnx or int8 (exports made by the installer)
+    OMNIPARSER_CPU_THREADS: 0     # server inference threads (0 = every core)
+    OMNIPARSER_CAPTION_CACHE_SIZE: 4096     # icon captions cached by the server (0 = off)
+    OMNIPARSER_CAPTION_CACHE_PERSIST: True  # keep them in debug/omniparser/caption_cache.json
+    OMNIPARSER_CAPTIONS: True               # False = detection + OCR only (see captions.py)
 """
 
 from __future__ import annotations
@@ -11,11 +22,12 @@ import io
 import json
 import os
 import pathlib
+import shutil
 import subprocess
 import sys
 import threading
 import time
-from typing import Optional, Iterable
+from typing import Iterable, List, Optional, Sequence
 
 import requests
 
@@ -23,19 +35,16 @@ import requests
 import logging
 logger = logging.getLogger(__name__)
 
-# torch is optional – used only to free CUDA cache if available
-try:
-    import torch
-except ImportError:
-    torch = None  # type: ignore
-
 # Pillow is optional – used only for JPEG fallback
 try:
     from PIL import Image
 except ImportError:
     Image = None  # type: ignore
 
-import shutil  # for copying processed screenshot
+from .captions import apply_captions, captions_enabled
+from .overlay import overlay_enabled, publish_overlay
+from ..metrics import PARSE_CACHE, PARSES_IN_FLIGHT
+from ..structured_logging import LazyJSON, log_event
 
 
 # ───────────────────────── helper: locate conda ────────────────────────────
@@ -76,6 +85,34 @@ def _auto_find_conda() -> Optional[str]:
     return None
 
 
+def _find_env_python(conda_env: str, conda_path: Optional[str] = None) -> Optional[str]:
+    """
+    Locate the python executable of a conda env so the server can be started
+    directly, skipping the (slow) ``conda run`` wrapper.
+    """
+    # Already running inside the requested env
+    if os.environ.get("CONDA_DEFAULT_ENV") == conda_env:
+        return sys.executable
+
+    roots = []
+    if conda_path:
+        # <root>/Scripts/conda.exe, <root>/bin/conda or <root>/condabin/conda.bat
+        roots.append(pathlib.Path(conda_path).resolve().parents[1])
+    for var in ("CONDA_PREFIX", "CONDA_ROOT"):
+        prefix = os.environ.get(var)
+        if prefix:
+            prefix_path = pathlib.Path(prefix)
+            # CONDA_PREFIX may point at an env inside <root>/envs/
+            roots.append(prefix_path.parents[1] if prefix_path.parent.name == "envs" else prefix_path)
+
+    for root in roots:
+        env_dir = root / "envs" / conda_env
+        for candidate in (env_dir / "python.exe", env_dir / "bin" / "python"):
+            if candidate.is_file():
+                return str(candidate)
+    return None
+
+
 # ───────────────────────────── paths / constants ────────────────────────────
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[3]
 
@@ -86,6 +123,69 @@ DEFAULT_MODEL_PATH = PROJECT_ROOT / "dependencies" / "OmniParser-master" / \
 DEFAULT_CAPTION_MODEL_DIR = PROJECT_ROOT / "dependencies" / "OmniParser-master" / \
     "weights" / "icon_caption_florence"
 
+# CPU serving backends → icon-detect weights. The ONNX exports are written next to
+# model.pt by installer/omniparser_setup.py (apply_cpu_patches); "int8" also makes
+# the patched server quantize Florence-2 to int8 when it loads.
+CPU_BACKEND_MODELS = {"torch": "model.pt", "onnx": "model.onnx", "int8": "model.int8.onnx"}
+
+# Daemon-mode servers log here (and record their pid) so later runs can reuse them
+SERVER_LOG_DIR = PROJECT_ROOT / "debug" / "omniparser"
+
+# Icon captions persisted by the patched server between runs
+CAPTION_CACHE_FILE = SERVER_LOG_DIR / "caption_cache.json"
+
+# Lines uvicorn prints once the app has loaded its models and is accepting requests
+READY_MARKERS = ("Application startup complete", "Uvicorn running on")
+
+
+def _serving_options(device: Optional[str], cpu_backend: Optional[str],
+                     model_path: Optional[str | os.PathLike]) -> tuple[str, pathlib.Path, dict]:
+    """
+    Resolve the server's device, icon-detect weights and extra environment.
+
+    Unset arguments fall back to OMNIPARSER_DEVICE, OMNIPARSER_CPU_BACKEND and
+    OMNIPARSER_CPU_THREADS. ``auto`` picks CUDA only when ``nvidia-smi`` is on
+    PATH. A CPU backend whose export is missing falls back to the stock model.
+    """
+    from config.config import Config
+    config = Config()
+    device = device or str(config.get("OMNIPARSER_DEVICE", "cpu")).lower()
+    cpu_backend = cpu_backend or str(config.get("OMNIPARSER_CPU_BACKEND", "torch")).lower()
+    # Has no argument of its own, so it applies however device and backend were chosen
+    threads = int(config.get("OMNIPARSER_CPU_THREADS", 0))
+    if device == "auto":
+        device = "cuda" if shutil.which("nvidia-smi") else "cpu"
+
+    weights = pathlib.Path(model_path or DEFAULT_MODEL_PATH)
+    env: dict = {}
+    if device != "cpu" or model_path is not None:
+        return device, weights, env
+
+    if cpu_backend not in CPU_BACKEND_MODELS:
+        logger.warning(f"Unknown OMNIPARSER_CPU_BACKEND {cpu_backend!r}; using torch")
+        cpu_backend = "torch"
+    exported = weights.with_name(CPU_BACKEND_MODELS[cpu_backend])
+    if exported.is_file():
+        weights = exported
+        env["OMNIPARSER_INT8"] = "1" if cpu_backend == "int8" else "0"
+    elif cpu_backend != "torch":
+        logger.warning(f"{exported.name} not found (run installer/omniparser_setup.py --cpu); "
+                       "serving the PyTorch model")
+    if threads > 0:
+        env.update({"OMNIPARSER_THREADS": str(threads), "OMP_NUM_THREADS": str(threads),
+                    "MKL_NUM_THREADS": str(threads)})
+    return device, weights, env
+
+
+def _caption_cache_env() -> dict:
+    """Caption-cache settings for a server patched by the installer (apply_caption_cache_patch)."""
+    from config.config import Config
+    config = Config()
+    env = {"OMNIPARSER_CAPTION_CACHE_SIZE": str(int(config.get("OMNIPARSER_CAPTION_CACHE_SIZE", 4096)))}
+    if config.get("OMNIPARSER_CAPTION_CACHE_PERSIST", True):
+        env["OMNIPARSER_CAPTION_CACHE_FILE"] = str(CAPTION_CACHE_FILE)
+    return env
+
 
 # ───────────────────────── image encoding helpers ───────────────────────────
 def _raw_b64(img_path: pathlib.Path) -> str:
@@ -113,6 +213,27 @@ def _encoding_sequence(img_path: pathlib.Path) -> Iterable[tuple[str, str]]:
         yield f"JPEG‑{dim}px", _jpeg_b64(img_path, dim)
 
 
+# ───────────────────────── server process helpers ───────────────────────────
+def _detached_popen_kwargs() -> dict:
+    """Popen arguments that let a daemon server outlive this process."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _follow_log(log_path: pathlib.Path, process: subprocess.Popen, on_line, stop: threading.Event) -> None:
+    """Feed lines appended to a daemon's log file to ``on_line`` until it is ready or exits."""
+    with log_path.open("r", encoding="utf-8", errors="replace") as f:
+        while not stop.is_set():
+            line = f.readline()
+            if line:
+                on_line(line)
+            elif process.poll() is not None:
+                break
+            else:
+                time.sleep(0.05)
+
+
 # ─────────────────────────── main interface class ───────────────────────────
 class OmniParserInterface:
     def __init__(self, server_url: str = "http://localhost:8111") -> None:
@@ -121,6 +242,10 @@ class OmniParserInterface:
          # cache last screenshot parse
          self._last_image_path: Optional[pathlib.Path] = None
          self._last_parsed: Optional[dict] = None
+         self._daemon = False
+         self.startup_metrics: dict = {}
+         # Cleared when the server turns out not to have the /parse_batch/ endpoint
+         self._batch_supported = True
 
     # ――― context manager ―――
     def __enter__(self):
@@ -142,74 +267,144 @@ class OmniParserInterface:
         port: int = 8111,
         model_path: Optional[str | os.PathLike] = None,
         caption_model_dir: Optional[str | os.PathLike] = None,
+        device: Optional[str] = None,
+        cpu_backend: Optional[str] = None,
+        extra_env: Optional[dict] = None,
+        daemon: bool = False,
+        timeout: float = 120,
     ) -> bool:
+        """
+        Start an OmniParser server and block until it is ready.
 
+        The env's python is used directly when it can be found (``conda run`` is
+        only a fallback). Readiness is detected from the server's own log stream
+        (uvicorn's startup lines) rather than by polling /probe/, and confirmed
+        with a single probe.
+
+        With ``daemon=True`` the server is detached, logs to
+        ``debug/omniparser/omniparser_<port>.log`` and keeps running after
+        Automoy exits, so the next start finds it warm.
+
+        ``device`` (cpu/cuda/auto) and ``cpu_backend`` (torch/onnx/int8) default
+        to OMNIPARSER_DEVICE and OMNIPARSER_CPU_BACKEND. The CPU backends serve
+        the ONNX icon detector exported by the installer, with ``int8`` also
+        quantizing the caption model; ``extra_env`` thread settings win over
+        OMNIPARSER_CPU_THREADS. The server's icon-caption cache is sized from
+        OMNIPARSER_CAPTION_CACHE_SIZE / OMNIPARSER_CAPTION_CACHE_PERSIST.
+
+        The measured cold start is stored in ``self.startup_metrics``.
+        """
+        t0 = time.time()
         conda_path = conda_path or _auto_find_conda()
-        if not conda_path:
-            print("❌ Could not locate conda.")
+        env_python = _find_env_python(conda_env, conda_path)
+        if env_python:
+            launcher = "env-python"
+            cmd = [env_python]
+        elif conda_path:
+            launcher = "conda-run"
+            cmd = [conda_path, "run", "--no-capture-output", "-n", conda_env, "python"]
+        else:
+            print("❌ Could not locate conda or the automoy_env python.")
             return False
 
         cwd = str(cwd or DEFAULT_SERVER_CWD)
-        cmd = [
-            conda_path, "run", "-n", conda_env,
-            sys.executable, f"{omiparser_module}.py",
-            "--som_model_path", str(model_path or DEFAULT_MODEL_PATH),
+        device, weights, serving_env = _serving_options(device, cpu_backend, model_path)
+        cmd += [
+            f"{omiparser_module}.py",
+            "--som_model_path", str(weights),
             "--caption_model_name", "florence2",
             "--caption_model_path", str(caption_model_dir or DEFAULT_CAPTION_MODEL_DIR),
-            "--device", "cpu",  # Force CPU to avoid CUDA issues
+            "--device", device,
             "--BOX_TRESHOLD", "0.15",
             "--port", str(port),
         ]
+        env = {**os.environ, "PYTHONUNBUFFERED": "1", **serving_env, **_caption_cache_env(),
+               **(extra_env or {})}
 
-        print(f"Launching OmniParser on :{port}")
+        print(f"Launching OmniParser on :{port} ({launcher}, {device}/{weights.name}"
+              f"{', daemon' if daemon else ''})")
+        self._daemon = daemon
+        log_path: Optional[pathlib.Path] = None
         try:
-            self.server_process = subprocess.Popen(
-                cmd,
-                cwd=cwd,
-                env={**os.environ, "PYTHONUNBUFFERED": "1"},
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-            )
+            if daemon:
+                SERVER_LOG_DIR.mkdir(parents=True, exist_ok=True)
+                log_path = SERVER_LOG_DIR / f"omniparser_{port}.log"
+                with log_path.open("w", encoding="utf-8") as log_file:
+                    self.server_process = subprocess.Popen(
+                        cmd, cwd=cwd, env=env,
+                        stdout=log_file, stderr=subprocess.STDOUT,
+                        **_detached_popen_kwargs(),
+                    )
+                (SERVER_LOG_DIR / f"omniparser_{port}.pid").write_text(str(self.server_process.pid))
+            else:
+                self.server_process = subprocess.Popen(
+                    cmd,
+                    cwd=cwd,
+                    env=env,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                )
         except Exception as e:
             print(f"❌ Spawn failed: {e}")
             return False
 
-        def _tail():
-            for line in iter(self.server_process.stdout.readline, ""):
-                if line:
-                    logger.info(f"[OmniParser Server] {line.rstrip()}")
-                if self.server_process.poll() is not None:
-                    break
-
-        threading.Thread(target=_tail, daemon=True).start()
-
-        t0 = time.time()
-        while time.time() - t0 < 120:
-            if self.server_process.poll() is not None:
-                logger.error("❌ OmniParser exited.")
-                # Try to get exit code and any stderr
-                exit_code = self.server_process.returncode
-                stderr_output = ""
-                if self.server_process.stderr:
-                    try:
-                        stderr_output = self.server_process.stderr.read()
-                    except:
-                        pass
-                logger.error(f"Exit code: {exit_code}, stderr: {stderr_output}")
+        ready = threading.Event()
+        process = self.server_process
+
+        def _watch(line: str) -> None:
+            logger.info(f"[OmniParser Server] {line.rstrip()}")
+            if any(marker in line for marker in READY_MARKERS):
+                ready.set()
+
+        if log_path is not None:
+            threading.Thread(target=_follow_log, args=(log_path, process, _watch, ready),
+                             daemon=True).start()
+        else:
+            def _tail():
+                for line in iter(process.stdout.readline, ""):
+                    if line:
+                        _watch(line)
+                    if process.poll() is not None:
+                        break
+
+            threading.Thread(target=_tail, daemon=True).start()
+
+        deadline = t0 + timeout
+        while time.time() < deadline:
+            if ready.wait(timeout=0.5):
+                break
+            if process.poll() is not None:
+                logger.error(f"❌ OmniParser exited with code {process.returncode}.")
+                self.server_process = None
                 return False
-            try:
-                if requests.get(f"http://localhost:{port}/probe/", timeout=3).status_code == 200:
-                    logger.info(f"✅ Ready at http://localhost:{port}")
-                    return True
-            except requests.RequestException as e:
-                logger.debug(f"Probe failed: {e}")
-            time.sleep(2)
+
+        if ready.is_set() and self._probe(port, timeout=5):
+            elapsed = time.time() - t0
+            self.startup_metrics = {
+                "port": port,
+                "launcher": launcher,
+                "device": device,
+                "model": weights.name,
+                "daemon": daemon,
+                "cold_start_seconds": round(elapsed, 3),
+            }
+            logger.info(f"✅ Ready at http://localhost:{port}")
+            logger.info(f"📈 OmniParser cold start on :{port}: {elapsed:.1f}s ({launcher})")
+            return True
 
         print("❌ OmniParser did not become ready.")
-        self.stop_server()
+        self.stop_server(force=True)
         return False
 
+    @staticmethod
+    def _probe(port: int, timeout: float = 2) -> bool:
+        try:
+            return requests.get(f"http://127.0.0.1:{port}/probe/", timeout=timeout).status_code == 200
+        except requests.RequestException as e:
+            logger.debug(f"Probe failed: {e}")
+            return False
+
     def _check_server_ready(self) -> bool:
         """
         Check if the OmniParser HTTP API is up and responding.
@@ -220,7 +415,13 @@ class OmniParserInterface:
         except requests.RequestException:
             return False
 
-    def stop_server(self) -> None:
+    def stop_server(self, force: bool = False) -> None:
+        """Stop the server this interface launched. Daemon servers are left running unless ``force``."""
+        if self._daemon and not force:
+            if self.server_process:
+                logger.info("Leaving OmniParser daemon running for the next start")
+            self.server_process = None
+            return
         if self.server_process and self.server_process.poll() is None:
             print("Stopping OmniParser...")
             self.server_process.terminate()
@@ -231,74 +432,217 @@ class OmniParserInterface:
         self.server_process = None
 
     # ――― parse screenshot ―――
-    def parse_screenshot(self, image_path: str | os.PathLike) -> Optional[dict]:
+    def parse_screenshot(self, image_path: str | os.PathLike, overlay: Optional[bool] = None,
+                         captions: Optional[bool] = None) -> Optional[dict]:
+        """
+        Parse a screenshot on the server.
+
+        Args:
+            image_path: Screenshot to parse
+            overlay: Request the set-of-marks overlay for the GUI. Defaults to
+                OMNIPARSER_OVERLAY. The overlay is stored as base64 and only
+                decoded when a viewer fetches /processed_screenshot.png; its
+                PNG path is returned as ``overlay_path``.
+            captions: Caption icons with the caption model. Defaults to
+                OMNIPARSER_CAPTIONS; False asks a patched server for detection
+                and OCR only (see ``caption_elements``).
+
+        Returns:
+            Parsed result with ``parsed_content_list``, legacy ``coords`` and
+            ``captions`` (whether icons were captioned), or None
+        """
         img_path = pathlib.Path(image_path)
+        if overlay is None:
+            overlay = overlay_enabled()
+        if captions is None:
+            captions = captions_enabled()
 
         # Reuse if cached
         # if we already parsed this exact file, re-use the result
-        if self._last_image_path == img_path and self._last_parsed is not None:
+        if self._last_image_path == img_path and self._last_parsed is not None \
+                and (not overlay or "overlay_path" in self._last_parsed) \
+                and (not captions or self._last_parsed.get("captions", True)):
             print("♻️ Re-using cached parse result")
+            PARSE_CACHE.inc(result="hit")
             return self._last_parsed
+        PARSE_CACHE.inc(result="miss")
+
+        PARSES_IN_FLIGHT.inc()
+        try:
+            return self._request_parse(img_path, overlay, captions)
+        finally:
+            PARSES_IN_FLIGHT.dec()
+
+    def parse_many(self, image_paths: Sequence[str | os.PathLike],
+                   overlay: bool | Sequence[bool] = False, captions: Optional[bool] = None,
+                   batch_size: int = 8) -> List[Optional[dict]]:
+        """
+        Parse several screenshots with as few requests as possible.
+
+        Frames go to the batch endpoint of a patched server ``batch_size`` at a
+        time, where the detector runs over each batch in one forward pass.
+        Servers without /parse_batch/ get one /parse/ request per frame.
+
+        Args:
+            image_paths: Screenshots to parse (tiles, monitors, recorded frames)
+            overlay: Store the overlay for the GUI; a bool for every frame or
+                one per frame. Off by default, since only one overlay is shown.
+            captions: As for ``parse_screenshot``
+
+        Returns:
+            One result (or None) per frame, in order
+        """
+        paths = [pathlib.Path(p) for p in image_paths]
+        overlays = [overlay] * len(paths) if isinstance(overlay, bool) else [bool(o) for o in overlay]
+        if captions is None:
+            captions = captions_enabled()
+
+        results: List[Optional[dict]] = []
+        for start in range(0, len(paths), max(1, batch_size)):
+            chunk, chunk_overlays = paths[start:start + batch_size], overlays[start:start + batch_size]
+            PARSES_IN_FLIGHT.inc(len(chunk))
+            try:
+                batch = self._request_batch(chunk, chunk_overlays, captions) if self._batch_supported else None
+            finally:
+                PARSES_IN_FLIGHT.dec(len(chunk))
+            if batch is None:
+                batch = [self.parse_screenshot(p, overlay=o, captions=captions) for p, o in zip(chunk, chunk_overlays)]
+            results.extend(batch)
+        return results
+
+    def _request_batch(self, paths: List[pathlib.Path], overlays: List[bool],
+                       captions: bool) -> Optional[List[Optional[dict]]]:
+        """POST a batch to /parse_batch/; None when the server has no batch endpoint or fails."""
+        url = f"{self.server_url}/parse_batch/"
+        try:
+            images = [_raw_b64(p) for p in paths]
+            log_event(logger, logging.DEBUG, "OmniParser batch request", frames=len(images),
+                      bytes=sum(len(i) for i in images), url=url)
+            r = requests.post(url, json={"images": images, "overlay": any(overlays), "captions": captions},
+                              timeout=120 * len(images))
+            if r.status_code in (404, 405):
+                logger.info("OmniParser server has no /parse_batch/ (not patched); parsing frames one by one")
+                self._batch_supported = False
+                return None
+            r.raise_for_status()
+            raw_results = r.json().get("results")
+        except (requests.RequestException, ValueError, OSError) as e:
+            logger.error(f"❌ Batch request failed: {e}; parsing frames one by one")
+            return None
+        if not isinstance(raw_results, list) or len(raw_results) != len(paths):
+            logger.warning("⚠️ Batch response does not match the %d frames sent", len(paths))
+            return None
+
+        log_event(logger, logging.DEBUG, "OmniParser batch response", frames=len(paths),
+                  bytes=len(r.content), elapsed_ms=round(r.elapsed.total_seconds() * 1000))
+        PARSE_CACHE.inc(len(paths), result="miss")
+        results = [self._normalize_result(raw, o) for raw, o in zip(raw_results, overlays)]
+        logger.info("✅ Batch-parsed %d frames in one request", len(paths))
+        if results[-1] is not None:
+            self._last_image_path, self._last_parsed = paths[-1], results[-1]
+        return results
+
+    def caption_elements(self, image_path: str | os.PathLike, parsed: dict,
+                         element_ids: Iterable[int]) -> dict[int, str]:
+        """
+        Caption selected elements of a detection-only parse.
+
+        Only the requested boxes go through the server's caption model. The
+        captions are written into ``parsed`` (elements and ``coords``).
 
+        Args:
+            image_path: The screenshot ``parsed`` came from
+            parsed: Result of ``parse_screenshot``
+            element_ids: Indexes into ``parsed["parsed_content_list"]``
+
+        Returns:
+            Element ID → caption; empty if the server cannot caption on demand
+        """
+        elements = parsed.get("parsed_content_list") or []
+        ids = [i for i in dict.fromkeys(element_ids) if 0 <= i < len(elements)
+               and isinstance(elements[i].get("bbox_normalized"), list)]
+        if not ids:
+            return {}
+
+        url = f"{self.server_url}/caption/"
+        bboxes = [elements[i]["bbox_normalized"] for i in ids]
+        try:
+            r = requests.post(url, json={"base64_image": _raw_b64(pathlib.Path(image_path)), "bboxes": bboxes},
+                              timeout=120)
+            r.raise_for_status()
+            texts = r.json().get("captions")
+        except (requests.RequestException, ValueError, OSError) as e:
+            logger.warning(f"⚠️ On-demand captioning failed (server not patched for /caption/?): {e}")
+            return {}
+        if not isinstance(texts, list) or len(texts) != len(ids):
+            logger.warning("⚠️ Caption response does not match the %d requested boxes", len(ids))
+            return {}
+
+        captions = {i: str(text) for i, text in zip(ids, texts)}
+        apply_captions(parsed, captions)
+        log_event(logger, logging.DEBUG, "OmniParser captions", elements=len(ids),
+                  elapsed_ms=round(r.elapsed.total_seconds() * 1000))
+        return captions
+
+    @staticmethod
+    def _normalize_result(parsed, overlay: bool) -> Optional[dict]:
+        """Check a server result, add legacy ``coords`` and store the overlay if one was wanted."""
+        # ← HERE ←
+        if not isinstance(parsed, dict) or "parsed_content_list" not in parsed:
+            logger.warning("⚠️ Unexpected response structure: %s", LazyJSON(parsed, limit=1000))
+            return None
+        # Unpatched servers ignore the flag and always caption
+        parsed["captions"] = bool(parsed.get("captions", True))
+
+        # Convert parsed_content_list → coords (legacy format expected by mapper)
+        if isinstance(parsed.get("parsed_content_list"), list):
+            coords = []
+            logger.debug("📦 Parsed items: %s", LazyJSON(parsed["parsed_content_list"], indent=2))
+            for item in parsed["parsed_content_list"]:
+                coords.append({
+                    "bbox": item["bbox_normalized"] if isinstance(item.get("bbox_normalized"), list) else [0, 0, 0, 0],
+                    "content": item.get("content", ""),
+                    "type": item.get("type", ""),
+                    "interactivity": item.get("interactivity", False),
+                    "source": item.get("source", ""),
+                })
+            parsed["coords"] = coords
+            logger.debug("✅ Converted %d items to coords", len(coords))
+
+        # Unpatched servers always send the overlay; drop it undecoded when unwanted
+        som_image_base64 = parsed.pop("som_image_base64", None)
+        if overlay and som_image_base64:
+            try:
+                parsed["overlay_path"] = str(publish_overlay(som_image_base64))
+                logger.debug("🖼️  Overlay stored → %s", parsed["overlay_path"])
+            except OSError as e:
+                logger.error(f"[ERROR] Could not store overlay for the GUI: {e}")
+        return parsed
+
+    def _request_parse(self, img_path: pathlib.Path, overlay: bool, captions: bool = True) -> Optional[dict]:
+        """POST the screenshot (RAW first, JPEG on a 5xx) and normalize the response."""
         url = f"{self.server_url}/parse/"
 
         for label, encoded in _encoding_sequence(img_path):
-            logger.info(f"[DEBUG] Sending {label} → {len(encoded):,} bytes to {url}")
+            log_event(logger, logging.DEBUG, "OmniParser request", encoding=label, bytes=len(encoded), url=url)
             try:
-                logger.info(f"[DEBUG] Making POST request to {url} with timeout=120")
-                r = requests.post(url, json={"base64_image": encoded}, timeout=120)
-                logger.info(f"[DEBUG] Response status code: {r.status_code}")
-                logger.info(f"[DEBUG] Response headers: {dict(r.headers)}")
+                # Servers patched by the installer skip the overlay / captions when not requested
+                r = requests.post(url, json={"base64_image": encoded, "overlay": overlay, "captions": captions},
+                                  timeout=120)
+                log_event(logger, logging.DEBUG, "OmniParser response", status=r.status_code,
+                          bytes=len(r.content), elapsed_ms=round(r.elapsed.total_seconds() * 1000))
                 r.raise_for_status()
-                
-                raw_response = r.text
-                logger.info(f"[DEBUG] Raw response length: {len(raw_response)} characters")
-                logger.info(f"[DEBUG] Raw response preview: {raw_response[:200]}...")
-                
-                parsed = r.json()
-                logger.info(f"[DEBUG] Parsed JSON type: {type(parsed)}")
-                logger.info(f"[DEBUG] Parsed JSON keys: {list(parsed.keys()) if isinstance(parsed, dict) else 'not a dict'}")
-
-                # ← HERE ←
-                if not isinstance(parsed, dict) or "parsed_content_list" not in parsed:
-                    logger.warning(f"⚠️ Unexpected response structure: {parsed}")
+
+                parsed = self._normalize_result(r.json(), overlay)
+                if parsed is None:
                     return None
 
-                # Convert parsed_content_list → coords (legacy format expected by mapper)
-                if isinstance(parsed.get("parsed_content_list"), list):
-                    coords = []
-                    for item in parsed["parsed_content_list"]:
-                        logger.info(f"📦 Parsed Item: {json.dumps(item, indent=2)}")
-                        coords.append({
-                            "bbox": item["bbox_normalized"] if isinstance(item.get("bbox_normalized"), list) else [0, 0, 0, 0],
-                            "content": item.get("content", ""),
-                            "type": item.get("type", ""),
-                            "interactivity": item.get("interactivity", False),
-                            "source": item.get("source", ""),
-                        })
-                    parsed["coords"] = coords
-                    logger.info(f"✅ Converted {len(coords)} items to coords")
-
-                if torch and torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-
-                if "som_image_base64" in parsed:
-                    out = pathlib.Path(__file__).with_name("processed_screenshot.png")
-                    out.write_bytes(base64.b64decode(parsed["som_image_base64"]))
-                    logger.info(f"🖼️  Overlay saved → {out}")
-                    try:
-                        gui_dest = PROJECT_ROOT / "gui" / "static" / "processed_screenshot.png"
-                        shutil.copy2(out, gui_dest)
-                        logger.info(f"[DEBUG] Copied processed screenshot to GUI static: {gui_dest}")
-                    except Exception as e:
-                        logger.error(f"[ERROR] Could not copy processed screenshot to GUI static: {e}")
-
-                    logger.info(f"✅ Parsed OK with {label}")
-
-                    # cache and return
-                    self._last_image_path = img_path
-                    self._last_parsed = parsed
-                    return parsed
+                logger.info("✅ Parsed OK with %s (%d elements)", label, len(parsed.get("parsed_content_list") or []))
+
+                # cache and return
+                self._last_image_path = img_path
+                self._last_parsed = parsed
+                return parsed
 
             except requests.HTTPError as e:
                 logger.error(f"❌ HTTPError ({r.status_code}) after {label}: {e}")
@@ -0,0 +1,200 @@
+"""
+Pool of local OmniParser servers.
+
+A single OmniParser process handles one parse at a time, so concurrent parses
+(multi-monitor, tiles, several sessions) queue behind it. The pool runs N
+servers on consecutive ports, probes each one separately and sends every parse
+to the healthy server with the fewest outstanding requests.
+
+``OmniParserPool`` exposes the same ``parse_screenshot`` / ``stop_server``
+surface as ``OmniParserInterface``, so callers can use either.
+
+Config keys:
+    OMNIPARSER_POOL_SIZE: 1     # number of servers
+    OMNIPARSER_BASE_PORT: 8111  # first port; worker i listens on BASE_PORT + i
+    OMNIPARSER_DAEMON: False    # keep servers running across Automoy restarts
+    OMNIPARSER_CPU_THREADS: 0   # thread budget split between the servers (0 = every core)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from .omniparser_interface import OmniParserInterface
+
+logger = logging.getLogger(__name__)
+
+# How long an unhealthy worker is left alone before it is probed again
+REPROBE_INTERVAL = 10.0
+
+
+class PoolWorker:
+    """One OmniParser server in the pool and its routing state."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.interface = OmniParserInterface(server_url=f"http://127.0.0.1:{port}")
+        self.outstanding = 0
+        self.healthy = False
+        self.last_probe = 0.0
+        self.launching = False
+
+    def probe(self) -> bool:
+        """Check this worker's /probe/ endpoint and record the result."""
+        self.healthy = self.interface._check_server_ready()
+        self.last_probe = time.time()
+        return self.healthy
+
+    def __repr__(self) -> str:
+        return f"PoolWorker(port={self.port}, healthy={self.healthy}, outstanding={self.outstanding})"
+
+
+class OmniParserPool:
+    """Least-outstanding-requests balancer over several OmniParser servers."""
+
+    def __init__(self, size: Optional[int] = None, base_port: Optional[int] = None,
+                 daemon: Optional[bool] = None, cpu_threads: Optional[int] = None):
+        if size is None or base_port is None or daemon is None or cpu_threads is None:
+            from config.config import Config
+            config = Config()
+            size = size if size is not None else int(config.get("OMNIPARSER_POOL_SIZE", 1))
+            base_port = base_port if base_port is not None else int(config.get("OMNIPARSER_BASE_PORT", 8111))
+            daemon = daemon if daemon is not None else bool(config.get("OMNIPARSER_DAEMON", False))
+            cpu_threads = cpu_threads if cpu_threads is not None else int(config.get("OMNIPARSER_CPU_THREADS", 0))
+
+        self.size = max(1, size)
+        self.base_port = base_port
+        self.daemon = daemon
+        # Thread budget shared by the workers (0 = every core)
+        self.cpu_threads = cpu_threads
+        self.workers: List[PoolWorker] = [PoolWorker(base_port + i) for i in range(self.size)]
+        self._lock = threading.Lock()
+
+    # ――― compatibility with OmniParserInterface ―――
+    @property
+    def server_url(self) -> str:
+        return self.workers[0].interface.server_url
+
+    def _check_server_ready(self) -> bool:
+        return bool(self.probe())
+
+    # ――― lifecycle ―――
+    def probe(self) -> List[PoolWorker]:
+        """Probe every worker; returns the healthy ones."""
+        return [w for w in self.workers if w.probe()]
+
+    def _threads_per_worker(self) -> int:
+        return max(1, (self.cpu_threads or os.cpu_count() or 1) // self.size)
+
+    def _launch_worker(self, worker: PoolWorker, conda_env: str) -> bool:
+        threads = str(self._threads_per_worker())
+        try:
+            ok = worker.interface.launch_server(
+                conda_env=conda_env,
+                port=worker.port,
+                daemon=self.daemon,
+                extra_env={"OMP_NUM_THREADS": threads, "MKL_NUM_THREADS": threads,
+                           "OMNIPARSER_THREADS": threads},
+            )
+        finally:
+            worker.launching = False
+        worker.healthy = ok
+        worker.last_probe = time.time()
+        if ok:
+            logger.info(f"OmniParser pool worker on :{worker.port} is ready")
+        else:
+            logger.error(f"OmniParser pool worker on :{worker.port} failed to start")
+        return ok
+
+    def start(self, conda_env: str = "automoy_env", wait: bool = True) -> bool:
+        """
+        Launch every worker that is not already answering its probe.
+
+        Servers are started concurrently. CPU threads are split evenly between
+        them (OMP_NUM_THREADS / MKL_NUM_THREADS, and OMNIPARSER_THREADS for the
+        CPU-patched server) so N processes do not oversubscribe the machine.
+
+        Args:
+            conda_env: Conda environment the servers run in
+            wait: Block until every launch finished; otherwise return immediately
+                and let workers join the rotation as they become ready
+
+        Returns:
+            True if at least one worker is healthy (always True when ``wait`` is False)
+        """
+        threads = []
+        for worker in self.workers:
+            if worker.probe() or worker.launching:
+                continue
+            worker.launching = True
+            thread = threading.Thread(target=self._launch_worker, args=(worker, conda_env),
+                                      name=f"omniparser-pool-{worker.port}", daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        if not wait:
+            return True
+        for thread in threads:
+            thread.join()
+        healthy = [w.port for w in self.workers if w.healthy]
+        logger.info(f"OmniParser pool: {len(healthy)}/{self.size} workers healthy {healthy}")
+        return bool(healthy)
+
+    def stop_server(self) -> None:
+        """Stop every server this pool launched."""
+        for worker in self.workers:
+            worker.interface.stop_server()
+            worker.healthy = False
+
+    # ――― routing ―――
+    def _acquire(self) -> PoolWorker:
+        now = time.time()
+        # Give workers that failed a while ago another chance
+        for worker in self.workers:
+            if not worker.healthy and not worker.launching and now - worker.last_probe > REPROBE_INTERVAL:
+                worker.probe()
+
+        with self._lock:
+            candidates = [w for w in self.workers if w.healthy] or self.workers[:1]
+            worker = min(candidates, key=lambda w: w.outstanding)
+            worker.outstanding += 1
+            return worker
+
+    def _release(self, worker: PoolWorker) -> None:
+        with self._lock:
+            worker.outstanding -= 1
+
+    def parse_screenshot(self, image_path: str | os.PathLike, overlay: Optional[bool] = None,
+                         captions: Optional[bool] = None) -> Optional[dict]:
+        """Parse on the least-loaded healthy server."""
+        worker = self._acquire()
+        logger.debug(f"Routing parse to :{worker.port} ({worker.outstanding} outstanding)")
+        try:
+            # Only forwarded when set, so stand-in parsers without the argument keep working
+            kwargs = {"captions": captions} if captions is not None else {}
+            result = worker.interface.parse_screenshot(image_path, overlay=overlay, **kwargs)
+        finally:
+            self._release(worker)
+        if result is None and not worker.probe():
+            logger.warning(f"OmniParser worker on :{worker.port} is not responding; removed from rotation")
+        return result
+
+    def parse_many(self, image_paths, overlay=False, captions: Optional[bool] = None) -> List[Optional[dict]]:
+        """Send a batch of frames to the least-loaded healthy server."""
+        worker = self._acquire()
+        try:
+            return worker.interface.parse_many(image_paths, overlay=overlay, captions=captions)
+        finally:
+            self._release(worker)
+
+    def caption_elements(self, image_path: str | os.PathLike, parsed: dict, element_ids) -> dict:
+        """Caption selected elements on the least-loaded healthy server."""
+        worker = self._acquire()
+        try:
+            return worker.interface.caption_elements(image_path, parsed, element_ids)
+        finally:
+            self._release(worker)
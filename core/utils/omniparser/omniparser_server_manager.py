@@ -5,37 +5,37 @@ import sys
 
 # Assuming OmniParserInterface is in the same directory and provides config
 from .omniparser_interface import OmniParserInterface
+from .omniparser_pool import OmniParserPool
+from .tiling import TiledParser
 
 class OmniParserServerManager:
-    def __init__(self):
-        # This interface instance is used for launching and checking the server.
-        self._interface = OmniParserInterface()
+    def __init__(self, pool_size=None, base_port=None):
+        # Pool of servers on consecutive ports (size 1 unless OMNIPARSER_POOL_SIZE says otherwise).
+        # The first worker's interface is the primary server used for launching and checking.
+        self.pool = OmniParserPool(size=pool_size, base_port=base_port)
+        self._interface = self.pool.workers[0].interface
         # self.server_process will be populated by the interface's launch_server method
         # if this manager instance successfully starts the server.
         self.server_process = None
+        # Cold-start measurements from launch_server (empty when an existing server was reused)
+        self.startup_metrics = {}
+
+        from config.config import Config
+        config = Config()
+        self.tiling = bool(config.get("OMNIPARSER_TILING", False))
+        self.tile_size = int(config.get("OMNIPARSER_TILE_SIZE", 1920))
+        self.tile_overlap = int(config.get("OMNIPARSER_TILE_OVERLAP", 160))
 
     def is_server_ready(self):
-        # Check both the interface and direct HTTP request
-        try:
-            # First check the interface
-            if self._interface._check_server_ready():
-                print("[OmniParserServerManager] Server ready via interface check")
-                return True
-            
-            # Also try direct check to the running server
-            import requests
-            resp = requests.get("http://127.0.0.1:8111/probe/", timeout=3)
-            if resp.status_code == 200:
-                print("[OmniParserServerManager] Server ready via direct check")
-                return True
-                
-        except Exception as e:
-            print(f"[OmniParserServerManager] Server check failed: {e}")
-        
+        # A single probe of the primary server (127.0.0.1 avoids slow IPv6 "localhost" lookups)
+        if self._interface._probe(self.pool.base_port, timeout=3):
+            print("[OmniParserServerManager] Server ready")
+            return True
         return False
 
-    def start_server(self, conda_env_name="automoy_env"): # Added conda_env_name parameter
-        if self.is_server_ready():
+    def start_server(self, conda_env_name="automoy_env", check_running=True): # Added conda_env_name parameter
+        # Pass check_running=False when the caller has just probed the server itself.
+        if check_running and self.is_server_ready():
             print("[OmniParserServerManager] Server already running (checked via interface).")
             # If the server is already running, this manager instance didn't start it.
             # The _interface.server_process might be None or belong to another context.
@@ -50,11 +50,13 @@ class OmniParserServerManager:
         # We can pass specific parameters to launch_server if needed, otherwise it uses defaults.
         # Example: self._interface.launch_server(conda_env="my_other_env", port=8112)
         
-        # Using the provided conda_env_name
-        if self._interface.launch_server(conda_env=conda_env_name):
+        # Launched like any pool worker, so it gets its share of the CPU threads
+        # rather than every core while the other workers start next to it
+        if self.pool._launch_worker(self.pool.workers[0], conda_env_name):
             print("[OmniParserServerManager] OmniParser server launched successfully via interface.")
             # Store the process object started by the interface for potential management (e.g., stop_server)
             self.server_process = self._interface.server_process 
+            self.startup_metrics = self._interface.startup_metrics
             return self.server_process 
         else:
             print("[OmniParserServerManager][ERROR] Failed to launch OmniParser server via interface.")
@@ -87,14 +89,28 @@ class OmniParserServerManager:
         print("[OmniParserServerManager][ERROR] Timeout waiting for OmniParser server to become ready.")
         return False
 
-    def get_interface(self):
-        # Returns the OmniParserInterface instance, which can be used for parsing.
-        return self._interface
+    def get_interface(self, conda_env_name="automoy_env"):
+        # Returns the object used for parsing: the single OmniParserInterface, or the
+        # pool when more than one server is configured. Extra pool workers are started
+        # in the background and join the rotation once their probe passes.
+        # With OMNIPARSER_TILING enabled, large frames are split into tiles on top of that.
+        parser = self._interface
+        if self.pool.size > 1:
+            self.pool.workers[0].probe()
+            self.pool.start(conda_env=conda_env_name, wait=False)
+            print(f"[OmniParserServerManager] Using OmniParser pool of {self.pool.size} servers "
+                  f"on ports {self.pool.base_port}-{self.pool.base_port + self.pool.size - 1}")
+            parser = self.pool
+        if self.tiling:
+            print(f"[OmniParserServerManager] Tiled parsing enabled ({self.tile_size}px tiles, "
+                  f"{self.tile_overlap}px overlap)")
+            parser = TiledParser(parser, tile_size=self.tile_size, overlap=self.tile_overlap)
+        return parser
 
     def stop_server(self):
         print("[OmniParserServerManager] Attempting to stop OmniParser server via interface...")
         # The interface's stop_server method handles the actual termination.
-        self._interface.stop_server()
+        self.pool.stop_server()
         # If this manager instance was tracking a process, clear it.
         if self.server_process:
             self.server_process = None
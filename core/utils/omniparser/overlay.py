@@ -0,0 +1,81 @@
+"""
+Set-of-marks overlay storage for the GUI.
+
+OmniParser returns the annotated screenshot as base64 text. Decoding it and
+writing a PNG on every parse is wasted work when nobody is watching, so the
+parse path only writes the base64 text, once, straight into the GUI's static
+directory. The PNG is decoded lazily the first time a viewer asks for it
+(see ``/processed_screenshot.png`` in gui/gui.py) and reused until a newer
+overlay arrives.
+
+Config keys:
+    OMNIPARSER_OVERLAY: True   # request the overlay; set False for headless batch runs
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+import os
+import pathlib
+from typing import Optional
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[3]
+
+OVERLAY_DIR = PROJECT_ROOT / "gui" / "static"
+OVERLAY_NAME = "processed_screenshot"
+
+
+def overlay_paths(directory: Optional[str | os.PathLike] = None) -> tuple[pathlib.Path, pathlib.Path]:
+    """Return the (base64, png) paths of the overlay in ``directory`` (default: gui/static)."""
+    directory = pathlib.Path(directory or OVERLAY_DIR)
+    return directory / f"{OVERLAY_NAME}.b64", directory / f"{OVERLAY_NAME}.png"
+
+
+def overlay_enabled() -> bool:
+    """Whether parses should request the overlay by default (OMNIPARSER_OVERLAY)."""
+    try:
+        from config.config import Config
+        return bool(Config().get("OMNIPARSER_OVERLAY", True))
+    except Exception as e:
+        logger.debug(f"Could not read OMNIPARSER_OVERLAY from config: {e}")
+        return True
+
+
+def publish_overlay(som_image_base64: str, directory: Optional[str | os.PathLike] = None) -> pathlib.Path:
+    """
+    Store an overlay for the GUI without decoding it.
+
+    The text is written to a temporary file and renamed into place so a viewer
+    never reads a half-written overlay.
+
+    Returns:
+        Path the PNG will be served from once decoded
+    """
+    b64_path, png_path = overlay_paths(directory)
+    b64_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = b64_path.with_suffix(".b64.tmp")
+    tmp_path.write_text(som_image_base64, encoding="ascii")
+    os.replace(tmp_path, b64_path)
+    logger.debug(f"Overlay stored → {b64_path} ({len(som_image_base64):,} bytes)")
+    return png_path
+
+
+def materialize_overlay(directory: Optional[str | os.PathLike] = None) -> Optional[pathlib.Path]:
+    """
+    Decode the stored overlay to PNG if it is newer than the existing PNG.
+
+    Returns:
+        Path of the PNG, or None if no overlay has been stored
+    """
+    b64_path, png_path = overlay_paths(directory)
+    if b64_path.exists() and (not png_path.exists()
+                              or b64_path.stat().st_mtime_ns > png_path.stat().st_mtime_ns):
+        tmp_path = png_path.with_suffix(".png.tmp")
+        tmp_path.write_bytes(base64.b64decode(b64_path.read_bytes()))
+        os.replace(tmp_path, png_path)
+        logger.debug(f"Overlay decoded → {png_path}")
+    return png_path if png_path.exists() else None
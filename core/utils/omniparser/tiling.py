@@ -0,0 +1,309 @@
+"""
+Tiled OmniParser parsing for high-resolution screens.
+
+Instead of uploading one huge frame (slow, and rejected often enough that the
+client falls back to lossy downscaled JPEGs), the frame is split into
+overlapping full-resolution tiles. With a server pool the tiles are parsed in
+parallel. A single server gets them all in one batch request (``parse_many``),
+so the detector runs once over every tile.
+
+Per-tile results are mapped back onto the full frame and merged:
+
+* boxes cut by a tile seam are joined with their counterpart from the
+  neighbouring tile
+* duplicates from the overlap zones are removed with non-maximum suppression,
+  preferring boxes that were not clipped by a seam
+
+Tiles are parsed without OmniParser's overlay (per-tile overlays would only
+overwrite each other in the GUI). When the caller asks for an overlay, the
+merged boxes are drawn onto a copy of the frame scaled down to one tile, and
+stored for the GUI like a server overlay.
+
+Config keys:
+    OMNIPARSER_TILING: False         # enable tiling for frames larger than one tile
+    OMNIPARSER_TILE_SIZE: 1920       # maximum tile width/height in pixels
+    OMNIPARSER_TILE_OVERLAP: 160     # overlap between neighbouring tiles in pixels
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import logging
+import math
+import os
+import pathlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .overlay import overlay_enabled, publish_overlay
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = None  # type: ignore
+
+Box = Tuple[float, float, float, float]
+
+# Distance (px) from an interior tile edge within which a box counts as clipped
+SEAM_TOLERANCE = 2
+
+
+def _axis_spans(length: int, tile: int, overlap: int) -> List[Tuple[int, int]]:
+    """Fewest equal spans of at most ``tile`` px covering ``length`` with ``overlap`` px shared."""
+    if length <= tile:
+        return [(0, length)]
+    count = math.ceil((length - overlap) / (tile - overlap))
+    size = math.ceil((length + (count - 1) * overlap) / count)
+    spans = []
+    for i in range(count):
+        start = min(i * (size - overlap), length - size)
+        spans.append((start, start + size))
+    return spans
+
+
+def plan_tiles(width: int, height: int, tile_size: int = 1920, overlap: int = 160) -> List[Box]:
+    """
+    Split a frame into overlapping tiles.
+
+    Uses the fewest tiles of at most ``tile_size`` per side, sized equally so
+    that neighbouring tiles share at least ``overlap`` pixels.
+
+    Returns:
+        List of (left, top, right, bottom) in frame pixels
+    """
+    overlap = min(overlap, tile_size // 2)
+    columns = _axis_spans(width, tile_size, overlap)
+    rows = _axis_spans(height, tile_size, overlap)
+    return [(x1, y1, x2, y2) for y1, y2 in rows for x1, x2 in columns]
+
+
+def _area(box: Box) -> float:
+    return max(0.0, box[2] - box[0]) * max(0.0, box[3] - box[1])
+
+
+def _intersection(a: Box, b: Box) -> float:
+    return _area((max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])))
+
+
+def iou(a: Box, b: Box) -> float:
+    """Intersection over union of two boxes."""
+    inter = _intersection(a, b)
+    union = _area(a) + _area(b) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def merge_tile_elements(tile_results: Sequence[Tuple[Box, Optional[List[dict]]]],
+                        frame_size: Tuple[int, int],
+                        iou_threshold: float = 0.5,
+                        containment_threshold: float = 0.8) -> List[dict]:
+    """
+    Merge per-tile OmniParser elements into one list for the whole frame.
+
+    Args:
+        tile_results: (tile box, parsed_content_list) pairs; boxes in the
+            elements are normalized to their tile
+        frame_size: (width, height) of the full frame
+        iou_threshold: Boxes overlapping more than this are duplicates
+        containment_threshold: A box this much inside a kept box is a duplicate
+
+    Returns:
+        Elements with ``bbox_normalized`` relative to the full frame
+    """
+    width, height = frame_size
+    candidates: List[Dict[str, Any]] = []
+
+    for tile, elements in tile_results:
+        left, top, right, bottom = tile
+        tile_w, tile_h = right - left, bottom - top
+        for element in elements or []:
+            bbox = element.get("bbox_normalized")
+            if not bbox or len(bbox) < 4:
+                continue
+            x1, y1, x2, y2 = (float(v) for v in bbox[:4])
+            box = (left + x1 * tile_w, top + y1 * tile_h, left + x2 * tile_w, top + y2 * tile_h)
+            clipped = (
+                (left > 0 and box[0] <= left + SEAM_TOLERANCE)
+                or (top > 0 and box[1] <= top + SEAM_TOLERANCE)
+                or (right < width and box[2] >= right - SEAM_TOLERANCE)
+                or (bottom < height and box[3] >= bottom - SEAM_TOLERANCE)
+            )
+            candidates.append({"element": element, "box": box, "clipped": clipped, "tile": tile})
+
+    # Join halves of elements cut by a seam (clipped boxes from different tiles that overlap)
+    clipped = [c for c in candidates if c["clipped"]]
+    joined: List[Dict[str, Any]] = []
+    for candidate in clipped:
+        for group in joined:
+            if candidate["tile"] not in group["tiles"] and _intersection(candidate["box"], group["box"]) > 0:
+                a, b = group["box"], candidate["box"]
+                group["box"] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                group["tiles"].add(candidate["tile"])
+                if len(str(candidate["element"].get("content", ""))) > len(str(group["element"].get("content", ""))):
+                    group["element"] = candidate["element"]
+                break
+        else:
+            joined.append({**candidate, "tiles": {candidate["tile"]}})
+    for group in joined:
+        # A box rebuilt from several tiles is as good as an unclipped one
+        group["clipped"] = len(group["tiles"]) == 1
+
+    # Non-maximum suppression: unclipped boxes first, larger boxes first
+    pool = [c for c in candidates if not c["clipped"]] + joined
+    pool.sort(key=lambda c: (not c["clipped"], _area(c["box"])), reverse=True)
+    kept: List[Dict[str, Any]] = []
+    for candidate in pool:
+        box = candidate["box"]
+        duplicate = False
+        for other in kept:
+            inter = _intersection(box, other["box"])
+            smaller = min(_area(box), _area(other["box"])) or 1.0
+            if iou(box, other["box"]) > iou_threshold or inter / smaller > containment_threshold:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(candidate)
+
+    merged = []
+    for candidate in sorted(kept, key=lambda c: (c["box"][1], c["box"][0])):
+        x1, y1, x2, y2 = candidate["box"]
+        element = dict(candidate["element"])
+        element["bbox_normalized"] = [x1 / width, y1 / height, x2 / width, y2 / height]
+        merged.append(element)
+    return merged
+
+
+def draw_overlay(frame, elements: Sequence[dict], max_size: int = 1920) -> str:
+    """
+    Draw numbered element boxes on a scaled-down copy of ``frame``.
+
+    The numbers are the elements' indices in ``parsed_content_list``, as in
+    OmniParser's own set-of-marks image.
+
+    Returns:
+        The PNG as base64 text, ready for ``publish_overlay``
+    """
+    # Integer box reduction: a fraction of the cost of a resampling resize on 4K frames
+    factor = math.ceil(max(frame.size) / max_size)
+    image = (frame.reduce(factor) if factor > 1 else frame).convert("RGB")
+    width, height = image.size
+    draw = ImageDraw.Draw(image)
+    for index, element in enumerate(elements):
+        x1, y1, x2, y2 = element["bbox_normalized"]
+        box = (x1 * width, y1 * height, x2 * width, y2 * height)
+        color = (255, 0, 0) if element.get("interactivity") or element.get("type") == "icon" else (0, 160, 255)
+        draw.rectangle(box, outline=color, width=2)
+        label = str(index)
+        left, top, right, bottom = draw.textbbox((box[0], box[1]), label)
+        draw.rectangle((left, top, right + 2, bottom + 1), fill=color)
+        draw.text((box[0] + 1, box[1]), label, fill=(255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+class TiledParser:
+    """
+    Wraps an OmniParserInterface (or pool) and parses large frames in tiles.
+
+    Frames that fit in a single tile are passed straight through.
+    """
+
+    def __init__(self, parser, tile_size: int = 1920, overlap: int = 160,
+                 max_workers: Optional[int] = None, iou_threshold: float = 0.5):
+        self.parser = parser
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.iou_threshold = iou_threshold
+        # Pools parse in parallel; a single server still benefits from 2 workers
+        # because the next tile is cropped and encoded while one is in flight.
+        self.max_workers = max_workers or max(2, getattr(parser, "size", 1))
+        # A pool spreads tiles over its servers; a single server takes them as one batch
+        self.batched = getattr(parser, "size", 1) == 1 and hasattr(parser, "parse_many")
+
+    def __getattr__(self, name):
+        # Pass everything else (stop_server, server_url, ...) to the wrapped parser
+        return getattr(self.parser, name)
+
+    def parse_many(self, image_paths, overlay=False, captions: Optional[bool] = None) -> List[Optional[dict]]:
+        """Parse several frames, tiling each one that needs it (its tiles are batched per frame)."""
+        overlays = [overlay] * len(image_paths) if isinstance(overlay, bool) else list(overlay)
+        return [self.parse_screenshot(path, overlay=o, captions=captions) for path, o in zip(image_paths, overlays)]
+
+    def parse_screenshot(self, image_path: str | os.PathLike, overlay: Optional[bool] = None,
+                         captions: Optional[bool] = None) -> Optional[dict]:
+        # Only forwarded when set, so wrapped parsers without the argument keep working
+        kwargs = {"captions": captions} if captions is not None else {}
+        if Image is None:
+            return self.parser.parse_screenshot(image_path, overlay=overlay, **kwargs)
+
+        img_path = pathlib.Path(image_path)
+        with Image.open(img_path) as frame:
+            frame.load()
+        tiles = plan_tiles(frame.width, frame.height, self.tile_size, self.overlap)
+        if len(tiles) == 1:
+            return self.parser.parse_screenshot(img_path, overlay=overlay, **kwargs)
+
+        if overlay is None:
+            overlay = overlay_enabled()
+        logger.info(f"Parsing {frame.width}x{frame.height} frame as {len(tiles)} tiles "
+                    f"({'one batch' if self.batched else f'{self.max_workers} concurrent'})")
+
+        captioned: List[bool] = []
+        with tempfile.TemporaryDirectory(prefix="automoy_tiles_") as tmp:
+            def save_tile(index, tile):
+                tile_path = pathlib.Path(tmp) / f"{img_path.stem}_tile{index}.png"
+                frame.crop(tile).save(tile_path)
+                return tile_path
+
+            def tile_elements(index, tile, result):
+                if not result:
+                    logger.warning(f"Tile {index} {tile} returned no result")
+                    return tile, None
+                captioned.append(result.get("captions", True))
+                return tile, result.get("parsed_content_list", [])
+
+            def parse_tile(indexed_tile):
+                index, tile = indexed_tile
+                # Per-tile overlays would only overwrite each other in the GUI
+                result = self.parser.parse_screenshot(save_tile(index, tile), overlay=False, **kwargs)
+                return tile_elements(index, tile, result)
+
+            if self.batched:
+                # One server: a single batch request, detector run once over all tiles
+                paths = [save_tile(index, tile) for index, tile in enumerate(tiles)]
+                results = self.parser.parse_many(paths, overlay=False, **kwargs)
+                tile_results = [tile_elements(i, tile, r) for i, (tile, r) in enumerate(zip(tiles, results))]
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    tile_results = list(executor.map(parse_tile, enumerate(tiles)))
+
+        if all(elements is None for _, elements in tile_results):
+            return None
+
+        elements = merge_tile_elements(tile_results, frame.size, self.iou_threshold)
+        logger.info(f"Merged {sum(len(e or []) for _, e in tile_results)} tile elements into {len(elements)}")
+        result = {
+            "parsed_content_list": elements,
+            # Legacy format expected by the mapper
+            "coords": [{
+                "bbox": item["bbox_normalized"],
+                "content": item.get("content", ""),
+                "type": item.get("type", ""),
+                "interactivity": item.get("interactivity", False),
+                "source": item.get("source", ""),
+            } for item in elements],
+            "tiles": len(tiles),
+            # Tile elements are merged into full-frame boxes, so on-demand captions
+            # go against the full frame (caption_elements is passed through)
+            "captions": all(captioned),
+        }
+        if overlay:
+            try:
+                result["overlay_path"] = str(publish_overlay(draw_overlay(frame, elements, self.tile_size)))
+            except Exception as e:
+                logger.error(f"Could not store the tiled overlay for the GUI: {e}")
+        return result
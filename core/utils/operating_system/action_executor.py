@@ -0,0 +1,129 @@
+"""
+Action execution for Automoy.
+
+``ActionExecutor`` turns the operator's action dicts (key, key_sequence, type,
+click, wait, ...) into input through the process-wide input backend
+(input_backend.py) and returns a one-line result for the GUI and the step log.
+It has no LLM or GUI dependencies, so it can run (and be benchmarked) headless
+with the recording backend.
+"""
+
+import logging
+from typing import Optional
+
+from core.utils.operating_system.input_backend import InputBackend, get_input_backend, require_input_backend
+from core.utils.operating_system.text_input import TextTyper
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+class ActionExecutor:
+    """Executes actions through the input backend selected at startup (input_backend.py)."""
+
+    def __init__(self, input_backend: Optional[InputBackend] = None):
+        self.input = input_backend or get_input_backend()
+        self.typer = TextTyper.from_config(clipboard=getattr(self.input, "clipboard", None))
+
+    def _backend(self) -> InputBackend:
+        if self.input is None:
+            self.input = require_input_backend()
+        return self.input
+
+    def execute(self, action: dict) -> str:
+        try:
+            action_type = action.get("action_type") or action.get("type")
+            if action_type == "key":
+                key = action.get("key")
+                if key:
+                    backend = self._backend()
+                    backend.press(key)
+                    return f"Pressed key via {backend.name}: {key}"
+            elif action_type == "key_sequence":
+                keys = action.get("keys")
+                if isinstance(keys, str):
+                    # Handle string format like "win+s"
+                    keys = [k.strip() for k in keys.replace('+', ',').split(',')]
+                if isinstance(keys, list):
+                    backend = self._backend()
+                    try:
+                        backend.hotkey(*keys)
+                        return f"Pressed key sequence via {backend.name}: {keys}"
+                    except Exception as e:
+                        logger.info(f"{backend.name} hotkey failed for {keys}: {e}")
+                        return f"ERROR: Key sequence failed for {keys}: {e}"
+            elif action_type == "type":
+                text = action.get("text")
+                if text:
+                    # Long runs are pasted from the clipboard (text_input.py)
+                    backend = self._backend()
+                    try:
+                        method = self.typer.type(text, write=backend.write, hotkey=backend.hotkey, press=backend.press)
+                        return f"Typed text via {backend.name} ({method}): {text}"
+                    except Exception as e:
+                        logger.info(f"{backend.name} typing failed: {e}")
+                        return f"ERROR: Typing failed for text: {text}"
+            elif action_type == "click":
+                coord = action.get("coordinate") or action
+                x = coord.get("x")
+                y = coord.get("y")
+                if x is not None and y is not None:
+                    self._backend().click(x, y)
+                    return f"Clicked at ({x}, {y})"
+            elif action_type == "screenshot":
+                # Screenshot actions request a new visual analysis
+                target = action.get("target", "screen")
+                return f"Screenshot requested for: {target}"
+            elif action_type == "special":
+                # Handle special actions like show_desktop
+                target = action.get("target", "")
+                if target == "show_desktop":
+                    # Minimize all windows to show desktop
+                    import subprocess
+                    subprocess.run(['powershell', '-Command', '(New-Object -comObject Shell.Application).minimizeall()'], 
+                                   capture_output=True, text=True)
+                    return "Desktop shown (all windows minimized)"
+                else:
+                    return f"Special action executed: {target}"
+            elif action_type == "visual_search":
+                # Visual search actions will be handled by the step executor
+                target = action.get("target", "unknown")
+                return f"Visual search initiated for: {target}"
+            elif action_type == "check_process":
+                # Check if a specific process is running
+                process_name = action.get("process_name", "")
+                if process_name:
+                    try:
+                        import psutil
+                        running_processes = []
+                        for proc in psutil.process_iter(['pid', 'name']):
+                            try:
+                                if process_name.lower() in proc.info['name'].lower():
+                                    running_processes.append(f"{proc.info['name']} (PID: {proc.info['pid']})")
+                            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                                continue
+                        
+                        if running_processes:
+                            return f"Process '{process_name}' found: {', '.join(running_processes)}"
+                        else:
+                            return f"Process '{process_name}' not found"
+                    except Exception as e:
+                        return f"Error checking process '{process_name}': {e}"
+                else:
+                    return "ERROR: No process_name specified for check_process action"
+            elif action_type == "wait":
+                # Wait for a specified duration
+                duration = action.get("duration", 1.0)
+                try:
+                    import time
+                    time.sleep(float(duration))
+                    return f"Waited for {duration} seconds"
+                except Exception as e:
+                    return f"Error waiting: {e}"
+            
+            # If we get here, the action format wasn't recognized
+            # Try to extract a reasonable summary from the action
+            summary = action.get("summary", action.get("description", str(action)))
+            return f"Action format not fully supported: {summary}"
+        except Exception as e:
+            return f"Action execution error: {e}"
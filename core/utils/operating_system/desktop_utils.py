@@ -3,9 +3,12 @@ import ctypes
 import os
 from pathlib import Path
 from datetime import datetime
-import pyautogui
 from typing import Optional # Added
 
+from core.utils.plugins import lazy_module
+
+pyautogui = lazy_module("pyautogui")
+
 class DesktopUtils:
     _original_settings = None
 
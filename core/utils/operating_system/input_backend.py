@@ -0,0 +1,439 @@
+"""
+Input injection backends for Automoy.
+
+All keyboard and mouse input goes through a single ``InputBackend``, chosen
+once per process, so an action either works with the selected backend or
+reports its error. It no longer fails through a chain of libraries on every
+call.
+
+* ``pyautogui`` - cross-platform via pyautogui (Windows, macOS, X11)
+* ``windows``   - ``keybd_event``/``mouse_event`` through ``ctypes.windll``
+* ``xdotool``   - X11 via the xdotool command-line tool
+* ``recording`` - records every call and injects nothing; used for headless
+                  runs and benchmarks. Calls can be given a simulated cost.
+
+Key names follow pyautogui ("enter", "win", "ctrl", "f5", single characters).
+Each backend maps them to its own key codes.
+
+Config keys:
+    INPUT_BACKEND: auto     # auto (first available for this platform), pyautogui, windows, xdotool or recording
+"""
+
+import importlib.util
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from core.utils.plugins import lazy_module
+
+# Imported on first use; see core/utils/plugins.py
+pyautogui = lazy_module("pyautogui", on_load=lambda module: setattr(module, "FAILSAFE", False))
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+def _has_display() -> bool:
+    """Whether GUI input can reach a display (always true outside Linux)."""
+    return platform.system() != "Linux" or bool(os.environ.get("DISPLAY"))
+
+
+class InputBackend:
+    """Base class for input injection backends."""
+
+    name = "base"
+
+    # Object with copy(text)/paste() for clipboard pastes; None = the system clipboard (pyperclip)
+    clipboard: Any = None
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether this backend can be used in the current environment."""
+        return False
+
+    def press(self, key: str) -> None:
+        """Press and release one key."""
+        raise NotImplementedError
+
+    def hotkey(self, *keys: str) -> None:
+        """Press a key combination: keys go down in order and come up in reverse."""
+        raise NotImplementedError
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        """Type ``text`` key by key, ``interval`` seconds apart."""
+        raise NotImplementedError
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None,
+              button: str = "left", clicks: int = 1) -> None:
+        """Click at (x, y), or at the current pointer position if omitted."""
+        raise NotImplementedError
+
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        """Move the pointer to (x, y)."""
+        raise NotImplementedError
+
+    def drag(self, x: int, y: int, duration: float = 0.5, button: str = "left") -> None:
+        """Drag from the current pointer position to (x, y)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class PyAutoGUIInputBackend(InputBackend):
+    """pyautogui (FAILSAFE off)."""
+
+    name = "pyautogui"
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec("pyautogui") is not None and _has_display()
+
+    def press(self, key: str) -> None:
+        pyautogui.press(key)
+
+    def hotkey(self, *keys: str) -> None:
+        pyautogui.hotkey(*keys)
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        pyautogui.write(text, interval=interval)
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None,
+              button: str = "left", clicks: int = 1) -> None:
+        pyautogui.click(x, y, clicks=clicks, button=button)
+
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        pyautogui.moveTo(x, y, duration=duration)
+
+    def drag(self, x: int, y: int, duration: float = 0.5, button: str = "left") -> None:
+        pyautogui.dragTo(x, y, duration=duration, button=button)
+
+
+class WindowsInputBackend(InputBackend):
+    """Win32 ``keybd_event``/``mouse_event``; needs no third-party package."""
+
+    name = "windows"
+
+    # Windows virtual key codes
+    VK_CODES = {
+        'a': 0x41, 'b': 0x42, 'c': 0x43, 'd': 0x44, 'e': 0x45, 'f': 0x46, 'g': 0x47,
+        'h': 0x48, 'i': 0x49, 'j': 0x4A, 'k': 0x4B, 'l': 0x4C, 'm': 0x4D, 'n': 0x4E,
+        'o': 0x4F, 'p': 0x50, 'q': 0x51, 'r': 0x52, 's': 0x53, 't': 0x54, 'u': 0x55,
+        'v': 0x56, 'w': 0x57, 'x': 0x58, 'y': 0x59, 'z': 0x5A,
+        '0': 0x30, '1': 0x31, '2': 0x32, '3': 0x33, '4': 0x34, '5': 0x35,
+        '6': 0x36, '7': 0x37, '8': 0x38, '9': 0x39,
+        'space': 0x20, 'enter': 0x0D, 'escape': 0x1B, 'esc': 0x1B, 'tab': 0x09,
+        'shift': 0x10, 'ctrl': 0x11, 'alt': 0x12, 'win': 0x5B, 'winleft': 0x5B,
+        'backspace': 0x08, 'delete': 0x2E, 'home': 0x24, 'end': 0x23,
+        'pageup': 0x21, 'pagedown': 0x22, 'up': 0x26, 'down': 0x28,
+        'left': 0x25, 'right': 0x27, 'f1': 0x70, 'f2': 0x71, 'f3': 0x72,
+        'f4': 0x73, 'f5': 0x74, 'f6': 0x75, 'f7': 0x76, 'f8': 0x77,
+        'f9': 0x78, 'f10': 0x79, 'f11': 0x7A, 'f12': 0x7B
+    }
+
+    KEYEVENTF_KEYUP = 0x0002
+    # VkKeyScanW shift-state bits → modifier virtual keys (shift, ctrl, alt)
+    SHIFT_STATE_KEYS = ((0x01, 0x10), (0x02, 0x11), (0x04, 0x12))
+    # (down, up) mouse_event flags per button
+    MOUSE_BUTTONS = {"left": (0x0002, 0x0004), "right": (0x0008, 0x0010), "middle": (0x0020, 0x0040)}
+
+    def __init__(self):
+        import ctypes
+        self._user32 = ctypes.windll.user32
+        self._user32.VkKeyScanW.restype = ctypes.c_short
+
+    @classmethod
+    def available(cls) -> bool:
+        return platform.system() == "Windows"
+
+    def _vk(self, key: str) -> int:
+        vk_code = self.VK_CODES.get("space" if key == " " else key.lower())
+        if vk_code is None:
+            raise ValueError(f"Key '{key}' not found in virtual key mapping")
+        return vk_code
+
+    def press(self, key: str) -> None:
+        vk_code = self._vk(key)
+        self._user32.keybd_event(vk_code, 0, 0, 0)
+        time.sleep(0.01)  # Brief pause
+        self._user32.keybd_event(vk_code, 0, self.KEYEVENTF_KEYUP, 0)
+
+    def hotkey(self, *keys: str) -> None:
+        codes = [self._vk(key) for key in keys]
+        for vk_code in codes:
+            self._user32.keybd_event(vk_code, 0, 0, 0)
+        for vk_code in reversed(codes):
+            self._user32.keybd_event(vk_code, 0, self.KEYEVENTF_KEYUP, 0)
+
+    def _char_keys(self, char: str) -> Tuple[int, List[int]]:
+        """Virtual key and modifier keys that type ``char`` on the active keyboard layout."""
+        scan = self._user32.VkKeyScanW(ord(char))
+        if scan == -1:
+            raise ValueError(f"Character '{char}' cannot be typed on the active keyboard layout")
+        state = (scan >> 8) & 0xFF
+        return scan & 0xFF, [vk for bit, vk in self.SHIFT_STATE_KEYS if state & bit]
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        # Every character is mapped before anything is typed, so an unmappable one types nothing
+        strokes = [self._char_keys(char) for char in text]
+        for vk_code, modifiers in strokes:
+            for modifier in modifiers:
+                self._user32.keybd_event(modifier, 0, 0, 0)
+            self._user32.keybd_event(vk_code, 0, 0, 0)
+            self._user32.keybd_event(vk_code, 0, self.KEYEVENTF_KEYUP, 0)
+            for modifier in reversed(modifiers):
+                self._user32.keybd_event(modifier, 0, self.KEYEVENTF_KEYUP, 0)
+            if interval:
+                time.sleep(interval)
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None,
+              button: str = "left", clicks: int = 1) -> None:
+        if x is not None and y is not None:
+            self._user32.SetCursorPos(int(x), int(y))
+        down, up = self.MOUSE_BUTTONS[button]
+        for _ in range(clicks):
+            self._user32.mouse_event(down, 0, 0, 0, 0)
+            self._user32.mouse_event(up, 0, 0, 0, 0)
+
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._user32.SetCursorPos(int(x), int(y))
+
+    def drag(self, x: int, y: int, duration: float = 0.5, button: str = "left") -> None:
+        down, up = self.MOUSE_BUTTONS[button]
+        self._user32.mouse_event(down, 0, 0, 0, 0)
+        time.sleep(duration)
+        self._user32.SetCursorPos(int(x), int(y))
+        self._user32.mouse_event(up, 0, 0, 0, 0)
+
+
+class XdotoolInputBackend(InputBackend):
+    """X11 input through the ``xdotool`` command (one process per call)."""
+
+    name = "xdotool"
+
+    # pyautogui key names that differ from X keysyms
+    KEYSYMS = {
+        "enter": "Return", "return": "Return", "esc": "Escape", "escape": "Escape",
+        "win": "super", "winleft": "super", "winright": "super", "command": "super", "cmd": "super",
+        "ctrl": "ctrl", "control": "ctrl", "alt": "alt", "shift": "shift",
+        "backspace": "BackSpace", "delete": "Delete", "del": "Delete", "insert": "Insert",
+        "tab": "Tab", "space": "space", " ": "space", "up": "Up", "down": "Down", "left": "Left",
+        "right": "Right", "home": "Home", "end": "End", "pageup": "Prior", "pagedown": "Next",
+        "capslock": "Caps_Lock", "printscreen": "Print",
+    }
+    BUTTONS = {"left": "1", "middle": "2", "right": "3"}
+
+    @classmethod
+    def available(cls) -> bool:
+        return platform.system() == "Linux" and _has_display() and shutil.which("xdotool") is not None
+
+    @classmethod
+    def keysym(cls, key: str) -> str:
+        lowered = key.lower()
+        if lowered in cls.KEYSYMS:
+            return cls.KEYSYMS[lowered]
+        if len(lowered) in (2, 3) and lowered[0] == "f" and lowered[1:].isdigit():
+            return lowered.upper()
+        return key
+
+    def _run(self, *args: str) -> None:
+        subprocess.run(["xdotool", *args], check=True, capture_output=True, timeout=30)
+
+    def press(self, key: str) -> None:
+        self._run("key", "--clearmodifiers", self.keysym(key))
+
+    def hotkey(self, *keys: str) -> None:
+        self._run("key", "--clearmodifiers", "+".join(self.keysym(key) for key in keys))
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        self._run("type", "--delay", str(int(interval * 1000)), "--", text)
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None,
+              button: str = "left", clicks: int = 1) -> None:
+        args = ["mousemove", str(int(x)), str(int(y))] if x is not None and y is not None else []
+        self._run(*args, "click", "--repeat", str(clicks), self.BUTTONS[button])
+
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._run("mousemove", str(int(x)), str(int(y)))
+
+    def drag(self, x: int, y: int, duration: float = 0.5, button: str = "left") -> None:
+        self._run("mousedown", self.BUTTONS[button], "sleep", f"{duration:.3f}",
+                  "mousemove", str(int(x)), str(int(y)), "mouseup", self.BUTTONS[button])
+
+
+class MemoryClipboard:
+    """In-process clipboard for the recording backend."""
+
+    def __init__(self, text: str = ""):
+        self.text = text
+
+    def copy(self, text: str) -> None:
+        self.text = text
+
+    def paste(self) -> str:
+        return self.text
+
+
+class RecordingInputBackend(InputBackend):
+    """
+    Records calls instead of injecting input.
+
+    Args:
+        event_latency: Simulated seconds per call (a key press, hotkey, click, ...)
+        key_latency: Additional simulated seconds per character typed by ``write``
+    """
+
+    name = "recording"
+
+    def __init__(self, event_latency: float = 0.0, key_latency: float = 0.0):
+        self.event_latency = event_latency
+        self.key_latency = key_latency
+        self.clipboard = MemoryClipboard()
+        self.events: List[Tuple[float, str, Tuple[Any, ...]]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def _record(self, method: str, *args: Any, cost: float = 0.0) -> None:
+        cost += self.event_latency
+        if cost:
+            time.sleep(cost)
+        with self._lock:
+            self.events.append((time.perf_counter(), method, args))
+
+    def calls(self, method: Optional[str] = None) -> List[Tuple[Any, ...]]:
+        """Recorded call arguments, optionally only for one method."""
+        return [args for _, name, args in self.events if method is None or name == method]
+
+    def press(self, key: str) -> None:
+        self._record("press", key)
+
+    def hotkey(self, *keys: str) -> None:
+        # Record what a paste shortcut would have delivered
+        if len(keys) == 2 and keys[1].lower() == "v" and keys[0].lower() in ("ctrl", "command"):
+            self._record("paste", self.clipboard.paste())
+        else:
+            self._record("hotkey", *keys)
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        self._record("write", text, cost=len(text) * (self.key_latency + interval))
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None,
+              button: str = "left", clicks: int = 1) -> None:
+        self._record("click", x, y, button, clicks)
+
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._record("move", x, y)
+
+    def drag(self, x: int, y: int, duration: float = 0.5, button: str = "left") -> None:
+        self._record("drag", x, y, button)
+
+
+BACKENDS = {
+    PyAutoGUIInputBackend.name: PyAutoGUIInputBackend,
+    WindowsInputBackend.name: WindowsInputBackend,
+    XdotoolInputBackend.name: XdotoolInputBackend,
+    RecordingInputBackend.name: RecordingInputBackend,
+}
+
+# Auto-selection order per platform; the recording backend is never auto-selected
+PLATFORM_ORDER = {
+    "Windows": (PyAutoGUIInputBackend.name, WindowsInputBackend.name),
+    "Linux": (XdotoolInputBackend.name, PyAutoGUIInputBackend.name),
+    "Darwin": (PyAutoGUIInputBackend.name,),
+}
+
+
+def create_backend(name: str, **kwargs) -> InputBackend:
+    """Instantiate a backend by name."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown input backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
+
+def select_backend(preferred: str = "auto") -> Optional[InputBackend]:
+    """
+    Pick an input backend.
+
+    With ``preferred="auto"`` the first available backend in this platform's
+    order (``PLATFORM_ORDER``) is used. Unlike screen capture, backends are not
+    timed: a trial would inject real input.
+
+    Args:
+        preferred: "auto" or a backend name
+
+    Returns:
+        InputBackend, or None if nothing can inject input
+    """
+    preferred = (preferred or "auto").lower()
+    if preferred != "auto":
+        backend_cls = BACKENDS.get(preferred)
+        if backend_cls and backend_cls.available():
+            logger.info(f"Using '{preferred}' input backend")
+            return create_backend(preferred)
+        logger.warning(f"Input backend '{preferred}' unavailable, falling back to auto selection")
+
+    for name in PLATFORM_ORDER.get(platform.system(), (PyAutoGUIInputBackend.name,)):
+        if not BACKENDS[name].available():
+            continue
+        try:
+            backend = create_backend(name)
+        except Exception as e:
+            logger.warning(f"Input backend '{name}' failed to start: {e}")
+            continue
+        logger.info(f"Selected '{name}' input backend")
+        return backend
+
+    logger.error("No working input backend found")
+    return None
+
+
+_backend: Optional[InputBackend] = None
+_backend_selected = False
+_backend_lock = threading.Lock()
+
+
+def get_input_backend() -> Optional[InputBackend]:
+    """
+    Return the process-wide input backend, selecting one on first use.
+
+    Selection honours INPUT_BACKEND in config.txt.
+    """
+    global _backend, _backend_selected
+    if not _backend_selected:
+        with _backend_lock:
+            if not _backend_selected:
+                preferred = "auto"
+                try:
+                    from config.config import Config
+                    preferred = str(Config().get("INPUT_BACKEND", "auto"))
+                except Exception as e:
+                    logger.debug(f"Could not read input settings from config: {e}")
+                _backend = select_backend(preferred)
+                _backend_selected = True
+    return _backend
+
+
+def set_input_backend(backend: Optional[InputBackend]) -> None:
+    """Override the process-wide input backend (e.g. with a recording backend)."""
+    global _backend, _backend_selected
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+        _backend_selected = True
+
+
+def require_input_backend() -> InputBackend:
+    """The process-wide input backend; raises RuntimeError if none is available."""
+    backend = get_input_backend()
+    if backend is None:
+        raise RuntimeError("No input backend available (see INPUT_BACKEND in config.txt)")
+    return backend
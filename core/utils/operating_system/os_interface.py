@@ -1,19 +1,38 @@
 import platform
-import pyautogui
-import time
 import ctypes
-import mouse
-import pyperclip
-import pyscreeze
-import keyboard
 from typing import Union, Sequence
 
+from core.utils.operating_system.input_backend import require_input_backend
+from core.utils.operating_system.text_input import TextTyper
+from core.utils.plugins import lazy_module
+from core.utils.screenshot_utils import capture_screen_pil
+
+# Libraries are imported on first use; see core/utils/plugins.py
+pyautogui = lazy_module("pyautogui")
+pyscreeze = lazy_module("pyscreeze")
+pyperclip = lazy_module("pyperclip")
+
 
 class OSInterface:
     def __init__(self):
         self.os_type = platform.system()
         if self.os_type not in ["Windows", "Linux", "Darwin"]:
             raise RuntimeError(f"Unsupported OS: {self.os_type}")
+        self._input = None
+        self._typer = None
+
+    @property
+    def input(self):
+        """The process-wide input backend (input_backend.py), selected on first use."""
+        if self._input is None:
+            self._input = require_input_backend()
+        return self._input
+
+    @property
+    def typer(self) -> TextTyper:
+        if self._typer is None:
+            self._typer = TextTyper.from_config(clipboard=self.input.clipboard)
+        return self._typer
 
     # Press Keys or Type Text
     def press(self,
@@ -24,16 +43,15 @@ class OSInterface:
          • a simultaneous combo press if you pass a list/tuple of valid key names
          • a single key press if you pass a string that's a known key
          • or types the string literally if the 'key' isn't recognized.
+
+        ``interval`` is kept for compatibility; the input backend decides how long keys are held.
         """
         try:
             # try real key-press
             if isinstance(keys, (list, tuple)):
-                combo = "+".join(keys)
-                keyboard.press_and_release(combo)
+                self.input.hotkey(*keys)
             else:
-                keyboard.press(keys)
-                time.sleep(interval)
-                keyboard.release(keys)
+                self.input.press(keys)
         except ValueError:
             # fallback: type the literal text
             text = "".join(keys) if isinstance(keys, (list, tuple)) else keys
@@ -41,28 +59,27 @@ class OSInterface:
 
     def hotkey(self, *keys: str) -> None:
         """Simulates pressing multiple keys simultaneously (e.g., Ctrl+C)."""
-        keyboard.press_and_release("+".join(keys))
+        self.input.hotkey(*keys)
 
     # Mouse Functions
     def move_mouse(self, x: int, y: int, duration: float = 0) -> None:
         """Moves the mouse to (x, y) over a specified duration."""
-        pyautogui.moveTo(x, y, duration=duration)
+        self.input.move(x, y, duration=duration)
 
     def click_mouse(self, button: str = "left") -> None:
         """Clicks the mouse using the specified button (left or right)."""
-        # pyautogui.click() handles screen coordinates directly.
-        # The mouse should have already been moved to the target coordinates
-        # by the calling function (e.g., _execute_action using self.os_interface.move_mouse).
-        pyautogui.click(button=button)
+        # Clicks at the current pointer position; the caller moves the mouse
+        # first (e.g., _execute_action using self.os_interface.move_mouse).
+        self.input.click(button=button)
 
     def drag_mouse(self, x: int, y: int, duration: float = 0.5) -> None:
         """Drags the mouse to a new position."""
-        pyautogui.dragTo(x, y, duration=duration)
+        self.input.drag(x, y, duration=duration)
 
     # Typing and Clipboard Functions
     def type_text(self, text: str) -> None:
-        """Types text into the active window."""
-        pyautogui.write(text, interval=0.05)
+        """Types text into the active window, pasting long runs from the clipboard (see text_input.py)."""
+        self.typer.type(text, write=self.input.write, hotkey=self.input.hotkey, press=self.input.press)
 
     def copy_to_clipboard(self, text: str) -> None:
         """Copies text to the clipboard."""
@@ -75,7 +92,9 @@ class OSInterface:
     # Screenshot Functions
     def take_screenshot(self, filename: str = "screenshot.png") -> str:
         """Captures a screenshot and saves it to a file."""
-        screenshot = pyautogui.screenshot()
+        screenshot = capture_screen_pil()
+        if screenshot is None:
+            screenshot = pyautogui.screenshot()
         screenshot.save(filename)
         return filename
 
@@ -0,0 +1,193 @@
+"""
+Text entry strategies for Automoy.
+
+Typing a URL or a paragraph one keystroke at a time takes seconds. ``TextTyper``
+splits the text into runs and enters each run the fastest safe way:
+
+* printable runs of at least ``paste_min_chars`` characters, and any run with
+  non-ASCII characters (which per-key typing cannot produce), are pasted from
+  the clipboard; the user's clipboard text is saved first and restored after
+  the paste has been delivered
+* short ASCII runs are typed key by key, which avoids the clipboard round trip
+* newlines and tabs are pressed as Enter and Tab, so they keep their keystroke
+  meaning (submitting a form, moving focus) instead of being pasted
+
+If the clipboard is unavailable (e.g. no xclip/xsel on Linux) every run is
+typed key by key. The input functions are passed per call, normally those of
+the selected input backend (input_backend.py).
+
+Config keys:
+    TYPING_STRATEGY: auto             # auto, paste (whenever possible) or keys (never paste)
+    TYPING_PASTE_MIN_CHARS: 8         # Shorter ASCII runs are typed key by key
+    TYPING_KEY_INTERVAL: 0.01         # Seconds between keystrokes when typing key by key
+    TYPING_RESTORE_DELAY: 0.15        # Seconds the target app gets to read the clipboard before it is restored
+"""
+
+import logging
+import platform
+import re
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from core.utils.metrics import TYPED_CHARACTERS
+from core.utils.plugins import lazy_module
+
+pyperclip = lazy_module("pyperclip")
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("auto", "paste", "keys")
+
+# Characters that are entered as key presses rather than text
+CONTROL_KEYS = {"\r\n": "enter", "\n": "enter", "\r": "enter", "\t": "tab"}
+_CONTROL_SPLIT = re.compile(r"(\r\n|[\r\n\t])")
+
+
+def paste_hotkey() -> Tuple[str, str]:
+    """The paste shortcut for this platform."""
+    return ("command", "v") if platform.system() == "Darwin" else ("ctrl", "v")
+
+
+class TextTyper:
+    """
+    Enters text by clipboard paste or per-key typing, run by run.
+
+    Args:
+        strategy: ``auto``, ``paste`` or ``keys`` (see module docstring)
+        paste_min_chars: Shortest ASCII run pasted under ``auto``
+        key_interval: Seconds between keystrokes for typed runs
+        restore_delay: Seconds to wait after a paste before restoring the clipboard
+        clipboard: Object with ``copy(text)`` and ``paste()`` (defaults to pyperclip)
+    """
+
+    def __init__(self,
+                 strategy: str = "auto",
+                 paste_min_chars: int = 8,
+                 key_interval: float = 0.01,
+                 restore_delay: float = 0.15,
+                 clipboard: Any = None):
+        if strategy not in STRATEGIES:
+            logger.warning(f"Unknown typing strategy '{strategy}'; using auto")
+            strategy = "auto"
+        self.strategy = strategy
+        self.paste_min_chars = paste_min_chars
+        self.key_interval = key_interval
+        self.restore_delay = restore_delay
+        self.clipboard = clipboard if clipboard is not None else pyperclip
+        self.clipboard_ok = strategy != "keys"
+
+    @classmethod
+    def from_config(cls, config=None, clipboard: Any = None) -> "TextTyper":
+        """Build a typer from the TYPING_* keys in config.txt (``clipboard`` as in the constructor)."""
+        try:
+            if config is None:
+                from config.config import Config
+                config = Config()
+            return cls(strategy=str(config.get("TYPING_STRATEGY", "auto")).lower(),
+                       paste_min_chars=int(config.get("TYPING_PASTE_MIN_CHARS", 8)),
+                       key_interval=float(config.get("TYPING_KEY_INTERVAL", 0.01)),
+                       restore_delay=float(config.get("TYPING_RESTORE_DELAY", 0.15)),
+                       clipboard=clipboard)
+        except Exception as e:
+            logger.debug(f"Could not read typing settings from config: {e}")
+            return cls(clipboard=clipboard)
+
+    def should_paste(self, text: str) -> bool:
+        """Whether a printable run should be pasted rather than typed."""
+        if not self.clipboard_ok:
+            return False
+        if self.strategy == "paste":
+            return True
+        return len(text) >= self.paste_min_chars or not text.isascii()
+
+    def plan(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Split ``text`` into ``(method, value)`` runs.
+
+        Returns:
+            List of ``("paste", text)``, ``("keys", text)`` and ``("press", key name)``
+        """
+        runs = []
+        for part in _CONTROL_SPLIT.split(text):
+            if not part:
+                continue
+            if part in CONTROL_KEYS:
+                runs.append(("press", CONTROL_KEYS[part]))
+            else:
+                runs.append(("paste" if self.should_paste(part) else "keys", part))
+        return runs
+
+    def type(self,
+             text: str,
+             write: Callable[..., Any],
+             hotkey: Callable[..., Any],
+             press: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Enter ``text`` into the focused window.
+
+        Args:
+            text: Text to enter
+            write: ``write(text, interval=...)`` typing a string key by key
+            hotkey: ``hotkey(*keys)`` pressing a key combination (used for paste)
+            press: ``press(key)`` for Enter/Tab (defaults to ``hotkey``)
+
+        Returns:
+            The methods used, e.g. ``"paste"`` or ``"paste+keys"``
+
+        Raises:
+            Whatever the input functions raise
+        """
+        press = press or hotkey
+        saved: Optional[str] = None
+        pasted: Optional[str] = None
+        used = []
+        try:
+            for method, value in self.plan(text):
+                if method == "paste":
+                    if pasted is None:
+                        saved = self._read_clipboard()
+                    if self._paste(value, hotkey):
+                        pasted = value
+                    else:
+                        method = "keys"
+                if method == "keys":
+                    write(value, interval=self.key_interval)
+                elif method == "press":
+                    press(value)
+                TYPED_CHARACTERS.inc(len(value) if method != "press" else 1, method=method)
+                if method not in used:
+                    used.append(method)
+        finally:
+            if pasted is not None:
+                self._restore_clipboard(saved, pasted)
+        return "+".join(used) or "nothing"
+
+    def _read_clipboard(self) -> Optional[str]:
+        try:
+            return self.clipboard.paste()
+        except Exception as e:
+            # Non-text contents (e.g. an image) can't be saved; they are lost either way
+            logger.debug(f"Could not save clipboard contents: {e}")
+            return None
+
+    def _paste(self, text: str, hotkey: Callable[..., Any]) -> bool:
+        """Paste ``text``; False (and key-by-key typing from now on) if the clipboard is unusable."""
+        try:
+            self.clipboard.copy(text)
+        except Exception as e:
+            logger.warning(f"Clipboard unavailable, typing text key by key instead: {e}")
+            self.clipboard_ok = False
+            return False
+        hotkey(*paste_hotkey())
+        return True
+
+    def _restore_clipboard(self, saved: Optional[str], pasted: str) -> None:
+        # The target app reads the clipboard when it handles the paste, which can
+        # be after the hotkey returns; restoring too early would paste the old text
+        time.sleep(self.restore_delay)
+        try:
+            if saved is not None and self.clipboard.paste() == pasted:
+                self.clipboard.copy(saved)
+        except Exception as e:
+            logger.debug(f"Could not restore clipboard contents: {e}")
@@ -0,0 +1,168 @@
+"""
+Lazily loaded integrations for Automoy.
+
+Optional dependencies are registered here by module path and imported the
+first time they are used, not when ``core.operate`` is imported. Today that is
+pyautogui, psutil and the other input libraries, registered through
+``lazy_module``.
+
+``lazy_module(name)`` returns a stand-in for a module that imports it on first
+attribute access, so ``import pyautogui`` can become
+``pyautogui = lazy_module("pyautogui")`` without touching call sites.
+``registry.register(name, module, attr, config_key=...)`` adds an integration
+that is fetched with ``registry.get(name)``. With a ``config_key`` it is only
+imported while that key is on; otherwise ``PluginDisabledError`` is raised.
+``registry.load_report()`` lists what was actually imported and how long each
+import took. ``evaluations/benchmark_startup.py`` tracks the import cost of
+the entry points over time.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from core.exceptions import PluginDisabledError
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Plugin:
+    """A lazily imported integration: ``module`` (and optionally one of its attributes)."""
+
+    name: str
+    module: str
+    attr: Optional[str] = None
+    config_key: Optional[str] = None
+    load_seconds: Optional[float] = None
+    on_load: List[Callable[[Any], None]] = field(default_factory=list, repr=False)
+    _value: Any = field(default=None, repr=False)
+
+    @property
+    def loaded(self) -> bool:
+        return self.load_seconds is not None
+
+
+class PluginRegistry:
+    """Name → ``Plugin`` table that imports each plugin once, on first ``get``."""
+
+    def __init__(self):
+        self._plugins: Dict[str, Plugin] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, module: str, attr: Optional[str] = None,
+                 config_key: Optional[str] = None) -> Plugin:
+        """Register (or replace) a plugin without importing it."""
+        with self._lock:
+            plugin = Plugin(name=name, module=module, attr=attr, config_key=config_key)
+            self._plugins[name] = plugin
+            return plugin
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._plugins
+
+    def _plugin(self, name: str) -> Plugin:
+        try:
+            return self._plugins[name]
+        except KeyError:
+            raise KeyError(f"Unknown plugin '{name}'. Registered: {', '.join(sorted(self._plugins))}") from None
+
+    def enabled(self, name: str) -> bool:
+        """Whether a plugin may be loaded; plugins without a config key always may."""
+        plugin = self._plugin(name)
+        if plugin.config_key is None:
+            return True
+        try:
+            from config.config import Config
+            return bool(Config().get(plugin.config_key, False))
+        except Exception as e:
+            logger.debug(f"Could not read {plugin.config_key} from config: {e}")
+            return False
+
+    def get(self, name: str) -> Any:
+        """
+        Return the plugin's module (or attribute), importing it on first use.
+
+        Raises:
+            PluginDisabledError: The plugin's config key is off
+            ImportError: The plugin's dependencies are not installed
+        """
+        plugin = self._plugin(name)
+        if plugin.loaded:
+            return plugin._value
+        if not self.enabled(name):
+            raise PluginDisabledError(name, plugin.config_key)
+        with self._lock:
+            if not plugin.loaded:
+                started = time.perf_counter()
+                value = importlib.import_module(plugin.module)
+                if plugin.attr:
+                    value = getattr(value, plugin.attr)
+                for hook in plugin.on_load:
+                    hook(value)
+                plugin._value = value
+                plugin.load_seconds = time.perf_counter() - started
+                logger.debug(f"Loaded plugin '{name}' ({plugin.module}) in {plugin.load_seconds * 1000:.0f} ms")
+        return plugin._value
+
+    def lazy(self, name: str) -> "LazyModule":
+        """A stand-in for ``get(name)`` that defers the import to first attribute access."""
+        self._plugin(name)
+        return LazyModule(self, name)
+
+    def load_report(self) -> List[Dict[str, Any]]:
+        """Loaded plugins with their import time, slowest first."""
+        loaded = [p for p in self._plugins.values() if p.loaded]
+        return [{"name": p.name, "module": p.module, "seconds": p.load_seconds}
+                for p in sorted(loaded, key=lambda p: p.load_seconds, reverse=True)]
+
+
+class LazyModule:
+    """Forwards attribute reads and writes to a plugin, importing it on first access."""
+
+    __slots__ = ("_registry", "_name")
+
+    def __init__(self, registry: PluginRegistry, name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._registry.get(self._name), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._registry.get(self._name), attr, value)
+
+    def __repr__(self) -> str:
+        plugin = self._registry._plugin(self._name)
+        state = "loaded" if plugin.loaded else "not loaded"
+        return f"<lazy module '{plugin.module}' ({state})>"
+
+
+registry = PluginRegistry()
+
+
+def lazy_module(module: str, on_load: Optional[Callable[[Any], None]] = None) -> LazyModule:
+    """
+    Lazy stand-in for an importable module, registered under its own name.
+
+    Args:
+        module: Module to import on first use
+        on_load: Called with the module once it is imported (right away if it already is),
+            e.g. to apply settings the eager import used to set at startup
+    """
+    with registry._lock:
+        if module not in registry:
+            registry.register(module, module)
+        plugin = registry._plugin(module)
+        if on_load is not None:
+            if plugin.loaded:
+                on_load(plugin._value)
+            else:
+                plugin.on_load.append(on_load)
+    return registry.lazy(module)
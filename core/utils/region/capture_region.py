@@ -0,0 +1,207 @@
+"""
+Region-of-interest support for Automoy.
+
+When DEFINE_REGION is enabled only the configured region is captured and sent to
+OmniParser. OmniParser returns boxes normalized to the uploaded image, so they
+are mapped back to global screen coordinates through the region that was
+captured.
+
+Config keys (config.txt / environment.txt):
+    DEFINE_REGION: True
+    REGION: 100, 100, 1380, 900     # left, top, right, bottom in screen pixels
+    REGION_WINDOW: Calculator       # or: track a window by title (re-resolved per capture)
+
+Run ``python -m core.utils.region.capture_region --select area`` (or
+``--select window``) to pick a region with the interactive selectors and print
+the matching REGION line.
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence, Tuple
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CaptureRegion:
+    """A rectangle of the screen in global pixel coordinates."""
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+    @classmethod
+    def from_bbox(cls, bbox: Sequence[float]) -> "CaptureRegion":
+        """
+        Build a region from any two corners, e.g. raw selector coordinates.
+
+        Args:
+            bbox: (x1, y1, x2, y2); corners may be given in any order and as floats
+        """
+        x1, y1, x2, y2 = (int(round(float(v))) for v in bbox[:4])
+        return cls(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+    @classmethod
+    def from_size(cls, size: Tuple[int, int]) -> "CaptureRegion":
+        """Region covering a full screen of the given (width, height)."""
+        return cls(0, 0, int(size[0]), int(size[1]))
+
+    @property
+    def width(self) -> int:
+        return self.right - self.left
+
+    @property
+    def height(self) -> int:
+        return self.bottom - self.top
+
+    @property
+    def area(self) -> int:
+        return max(0, self.width) * max(0, self.height)
+
+    def as_tuple(self) -> Tuple[int, int, int, int]:
+        """(left, top, right, bottom), the form capture backends accept."""
+        return (self.left, self.top, self.right, self.bottom)
+
+    def clamp(self, x: int, y: int) -> Tuple[int, int]:
+        """Clamp a global point into this region."""
+        return (max(self.left, min(x, self.right - 1)),
+                max(self.top, min(y, self.bottom - 1)))
+
+    def to_global(self, x: float, y: float) -> Tuple[int, int]:
+        """Map a pixel position inside the captured image to global coordinates."""
+        return self.clamp(int(self.left + x), int(self.top + y))
+
+    def normalized_center_to_global(self, bbox: Sequence[float]) -> Optional[Tuple[int, int]]:
+        """
+        Convert a normalized OmniParser box to a global click point.
+
+        Args:
+            bbox: [x1, y1, x2, y2] normalized (0.0-1.0) to the captured image
+
+        Returns:
+            (x, y) centre of the box in global pixels, or None if the box is invalid
+        """
+        try:
+            x1, y1, x2, y2 = (float(v) for v in bbox[:4])
+        except (TypeError, ValueError):
+            return None
+        if not all(0.0 <= v <= 1.0 for v in (x1, y1, x2, y2)):
+            return None
+        return self.to_global((x1 + x2) / 2 * self.width, (y1 + y2) / 2 * self.height)
+
+
+def parse_region(value: Any) -> Optional[CaptureRegion]:
+    """
+    Parse a REGION config value ("l, t, r, b" string or a 4-item sequence).
+
+    Returns:
+        CaptureRegion, or None if the value is empty or malformed
+    """
+    if value in (None, "", False):
+        return None
+    try:
+        parts = value.split(",") if isinstance(value, str) else list(value)
+        if len(parts) != 4:
+            raise ValueError(f"expected 4 values, got {len(parts)}")
+        region = CaptureRegion.from_bbox([float(p) for p in parts])
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Ignoring invalid REGION value {value!r}: {e}")
+        return None
+    if region.area == 0:
+        logger.warning(f"Ignoring empty REGION value {value!r}")
+        return None
+    return region
+
+
+def find_window_region(title: str) -> Optional[CaptureRegion]:
+    """
+    Look up the current bounds of the first visible window whose title contains ``title``.
+
+    Returns:
+        CaptureRegion, or None if no such window exists or pygetwindow is unavailable
+    """
+    try:
+        import pygetwindow as gw
+    except ImportError:
+        logger.warning("pygetwindow not available, cannot track REGION_WINDOW")
+        return None
+
+    needle = title.lower()
+    for window in gw.getAllWindows():
+        if window.title and needle in window.title.lower() and not window.isMinimized:
+            region = CaptureRegion(window.left, window.top, window.right, window.bottom)
+            if region.area > 0:
+                return region
+    logger.warning(f"No visible window matching REGION_WINDOW '{title}'")
+    return None
+
+
+def resolve_capture_region(config) -> Optional[CaptureRegion]:
+    """
+    Resolve the configured region of interest.
+
+    REGION_WINDOW wins over REGION so that a tracked window is followed when it
+    moves. Returns None (capture the full screen) when DEFINE_REGION is off or
+    nothing usable is configured.
+    """
+    if not config.get("DEFINE_REGION", False):
+        return None
+
+    window_title = config.get("REGION_WINDOW", "")
+    if window_title:
+        region = find_window_region(str(window_title))
+        if region:
+            return region
+
+    region = parse_region(config.get("REGION", ""))
+    if region is None and not window_title:
+        logger.warning("DEFINE_REGION is enabled but neither REGION nor REGION_WINDOW is set; using full screen")
+    return region
+
+
+def select_region(mode: str = "area") -> Optional[CaptureRegion]:
+    """
+    Let the user pick a region with the interactive selectors.
+
+    Args:
+        mode: "area" to drag a rectangle, "window" to pick an open window
+
+    Returns:
+        The selected CaptureRegion, or None if the selection was cancelled
+    """
+    import tkinter as tk
+
+    selected = []
+    root = tk.Tk()
+    root.withdraw()
+
+    def on_selected(coords):
+        if coords:
+            selected.append(CaptureRegion.from_bbox(coords))
+        root.quit()
+
+    if mode == "window":
+        from core.environmental.region.window_region_selector import select_window_popup
+        select_window_popup(on_selected)
+        root.mainloop()
+    else:
+        from core.environmental.region.area_region_selector import select_area
+        select_area(on_selected)
+    root.destroy()
+    return selected[0] if selected else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick a capture region for config.txt")
+    parser.add_argument("--select", choices=["area", "window"], default="area")
+    args = parser.parse_args()
+
+    chosen = select_region(args.select)
+    if chosen:
+        print("DEFINE_REGION: True")
+        print(f"REGION: {chosen.left}, {chosen.top}, {chosen.right}, {chosen.bottom}")
+    else:
+        print("No region selected.")
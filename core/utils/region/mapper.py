@@ -10,9 +10,6 @@ PROJECT_ROOT = THIS_FILE.parents[3]  # go from core/utils/region/mapper.py → p
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-# ✅ Now import OmniParserInterface AFTER sys.path is fixed
-from core.utils.omniparser.omniparser_interface import OmniParserInterface
-
 
 def map_elements_to_coords(parsed_result, image_path):
     """Convert normalized bbox to pixel coordinates and map by lowercase content."""
@@ -80,6 +77,7 @@ if __name__ == "__main__":
         default_json = Path(args.image).with_name("parsed_result.json")
         if not default_json.exists():
             print(f"⚠️ No JSON found at {default_json}, generating with OmniParser...")
+            from core.utils.omniparser.omniparser_interface import OmniParserInterface
             op = OmniParserInterface()
             if not op.launch_server():
                 print("❌ Failed to launch OmniParser server.")
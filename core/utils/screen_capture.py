@@ -0,0 +1,380 @@
+"""
+Screen capture backends for Automoy.
+
+All screenshots go through a single ``CaptureBackend`` so the grab method can be
+swapped without touching callers:
+
+* ``mss``    - fast native grabs via the mss package (GDI / XShm / CoreGraphics),
+               with an optional reusable-buffer mode
+* ``pil``    - ``PIL.ImageGrab.grab()`` (the original behaviour)
+* ``replay`` - serves frames from a directory of images or synthesises them;
+               used for headless runs and benchmarks
+
+Regions are ``(left, top, right, bottom)`` tuples in virtual-desktop pixels.
+Monitors follow the mss numbering: 0 is the whole virtual desktop, 1..N are
+individual displays.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageGrab
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+Region = Tuple[int, int, int, int]
+
+
+class CaptureBackend:
+    """Base class for screen capture backends."""
+
+    name = "base"
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether this backend can be used in the current environment."""
+        return False
+
+    def monitors(self) -> List[Region]:
+        """
+        List the capturable areas.
+
+        Returns:
+            List of (left, top, right, bottom); index 0 is the whole virtual desktop
+        """
+        raise NotImplementedError
+
+    def grab(self, region: Optional[Region] = None, monitor: Optional[int] = None) -> Any:
+        """
+        Capture a frame.
+
+        Args:
+            region: Area to capture; takes precedence over ``monitor``
+            monitor: Monitor index (0 = all monitors). Defaults to the primary monitor.
+
+        Returns:
+            RGB PIL Image
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any native resources."""
+
+    def _resolve_region(self, region: Optional[Region], monitor: Optional[int]) -> Region:
+        """Turn a region/monitor selection into a concrete bounding box."""
+        if region is not None:
+            return tuple(int(v) for v in region)
+        monitors = self.monitors()
+        index = 1 if monitor is None else monitor
+        if index < 0 or index >= len(monitors):
+            logger.warning(f"Monitor {index} not found, capturing the primary monitor instead")
+            index = 1 if len(monitors) > 1 else 0
+        return monitors[index]
+
+
+class PILCaptureBackend(CaptureBackend):
+    """Capture via ``PIL.ImageGrab``."""
+
+    name = "pil"
+
+    @classmethod
+    def available(cls) -> bool:
+        if not PILLOW_AVAILABLE:
+            return False
+        try:
+            ImageGrab.grab(bbox=(0, 0, 1, 1))
+            return True
+        except Exception:
+            return False
+
+    def __init__(self):
+        # ImageGrab has no size query; the size is taken from the last full grab
+        self._size: Optional[Tuple[int, int]] = None
+
+    def monitors(self) -> List[Region]:
+        # ImageGrab cannot enumerate displays; expose the primary screen only.
+        if self._size is None:
+            self._size = ImageGrab.grab().size
+        width, height = self._size
+        return [(0, 0, width, height), (0, 0, width, height)]
+
+    def grab(self, region: Optional[Region] = None, monitor: Optional[int] = None) -> Any:
+        if region is None and monitor in (None, 0, 1):
+            image = ImageGrab.grab(all_screens=monitor == 0)
+            if monitor != 0:
+                self._size = image.size
+            return image
+        return ImageGrab.grab(bbox=self._resolve_region(region, monitor), all_screens=True)
+
+
+class MSSCaptureBackend(CaptureBackend):
+    """
+    Capture via the ``mss`` package.
+
+    mss handles are not thread-safe, and captures run in ``asyncio.to_thread``
+    workers, so one handle is kept per thread.
+
+    With ``reuse_buffer=True`` each grab of a given size decodes into the same
+    PIL image instead of allocating a new one. Callers that keep a frame across
+    grabs must ``copy()`` it.
+    """
+
+    name = "mss"
+
+    def __init__(self, reuse_buffer: bool = False):
+        self.reuse_buffer = reuse_buffer
+        self._local = threading.local()
+
+    @classmethod
+    def available(cls) -> bool:
+        if not MSS_AVAILABLE or not PILLOW_AVAILABLE:
+            return False
+        try:
+            with mss.mss() as sct:
+                return bool(sct.monitors)
+        except Exception:
+            return False
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            self._local.buffers = {}
+        return sct
+
+    def monitors(self) -> List[Region]:
+        return [
+            (m["left"], m["top"], m["left"] + m["width"], m["top"] + m["height"])
+            for m in self._sct().monitors
+        ]
+
+    def grab(self, region: Optional[Region] = None, monitor: Optional[int] = None) -> Any:
+        left, top, right, bottom = self._resolve_region(region, monitor)
+        shot = self._sct().grab({"left": left, "top": top,
+                                 "width": right - left, "height": bottom - top})
+        if not self.reuse_buffer:
+            return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+        buffers: Dict[Tuple[int, int], Any] = self._local.buffers
+        frame = buffers.get(shot.size)
+        if frame is None:
+            frame = Image.new("RGB", shot.size)
+            buffers[shot.size] = frame
+        frame.frombytes(shot.bgra, "raw", "BGRX")
+        return frame
+
+    def close(self) -> None:
+        sct = getattr(self._local, "sct", None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+
+class ReplayCaptureBackend(CaptureBackend):
+    """
+    Headless backend that replays recorded frames or synthesises them.
+
+    Args:
+        source: Directory of images, a list of image paths, or a list of PIL
+            Images. If omitted, frames are generated at ``size``.
+        size: Frame size for synthetic frames
+        loop: Restart from the first frame after the last one
+    """
+
+    name = "replay"
+
+    IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self,
+                 source: Union[str, os.PathLike, Sequence[Any], None] = None,
+                 size: Tuple[int, int] = (1920, 1080),
+                 loop: bool = True):
+        self.size = size
+        self.loop = loop
+        self._frames: List[Any] = []
+        self._index = 0
+        self._lock = threading.Lock()
+
+        if isinstance(source, (str, os.PathLike)):
+            directory = Path(source)
+            self._frames = sorted(p for p in directory.iterdir()
+                                  if p.suffix.lower() in self.IMAGE_SUFFIXES)
+        elif source is not None:
+            self._frames = list(source)
+
+        if self._frames:
+            self.size = self._load(self._frames[0]).size
+
+    @classmethod
+    def available(cls) -> bool:
+        return PILLOW_AVAILABLE
+
+    @staticmethod
+    def _load(frame: Any) -> Any:
+        if isinstance(frame, (str, os.PathLike)):
+            with Image.open(frame) as image:
+                return image.convert("RGB")
+        return frame
+
+    def _synthetic_frame(self, index: int) -> Any:
+        """Plain desktop with a small block that moves every frame."""
+        width, height = self.size
+        frame = Image.new("RGB", self.size, (30, 60, 120))
+        block = max(8, width // 40)
+        x = (index * block) % max(1, width - block)
+        frame.paste((255, 255, 255), (x, height // 2, x + block, height // 2 + block))
+        return frame
+
+    def monitors(self) -> List[Region]:
+        width, height = self.size
+        return [(0, 0, width, height), (0, 0, width, height)]
+
+    def grab(self, region: Optional[Region] = None, monitor: Optional[int] = None) -> Any:
+        with self._lock:
+            index = self._index
+            if self._frames and index >= len(self._frames):
+                index = 0 if self.loop else len(self._frames) - 1
+            self._index = index + 1
+
+        frame = self._load(self._frames[index]) if self._frames else self._synthetic_frame(index)
+        if region is not None:
+            return frame.crop(self._resolve_region(region, monitor))
+        return frame.copy() if self._frames else frame
+
+
+BACKENDS = {
+    MSSCaptureBackend.name: MSSCaptureBackend,
+    PILCaptureBackend.name: PILCaptureBackend,
+    ReplayCaptureBackend.name: ReplayCaptureBackend,
+}
+
+
+def benchmark_backend(backend: CaptureBackend, iterations: int = 5,
+                      region: Optional[Region] = None,
+                      monitor: Optional[int] = None) -> float:
+    """
+    Time a backend.
+
+    Returns:
+        Mean milliseconds per grab, or ``float("inf")`` if grabbing fails
+    """
+    try:
+        backend.grab(region, monitor)  # warm-up
+        start = time.perf_counter()
+        for _ in range(iterations):
+            backend.grab(region, monitor)
+        return (time.perf_counter() - start) * 1000.0 / iterations
+    except Exception as e:
+        logger.warning(f"Capture backend '{backend.name}' failed during benchmark: {e}")
+        return float("inf")
+
+
+def create_backend(name: str, reuse_buffer: bool = False, **kwargs) -> CaptureBackend:
+    """Instantiate a backend by name."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown capture backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    if name == MSSCaptureBackend.name:
+        return MSSCaptureBackend(reuse_buffer=reuse_buffer)
+    return BACKENDS[name](**kwargs)
+
+
+def select_backend(preferred: str = "auto", reuse_buffer: bool = False,
+                   iterations: int = 3) -> Optional[CaptureBackend]:
+    """
+    Pick a capture backend.
+
+    With ``preferred="auto"`` every available live backend (mss, pil) is timed
+    with a short micro-benchmark and the fastest wins. The replay backend is
+    never auto-selected; request it explicitly for headless runs.
+
+    Args:
+        preferred: "auto" or a backend name
+        reuse_buffer: Enable the reusable-buffer mode where supported
+        iterations: Grabs per backend in the auto benchmark
+
+    Returns:
+        CaptureBackend, or None if nothing can capture the screen
+    """
+    preferred = (preferred or "auto").lower()
+    if preferred != "auto":
+        backend_cls = BACKENDS.get(preferred)
+        if backend_cls and backend_cls.available():
+            logger.info(f"Using '{preferred}' capture backend")
+            return create_backend(preferred, reuse_buffer=reuse_buffer)
+        logger.warning(f"Capture backend '{preferred}' unavailable, falling back to auto selection")
+
+    timings: Dict[str, float] = {}
+    candidates: Dict[str, CaptureBackend] = {}
+    for name in (MSSCaptureBackend.name, PILCaptureBackend.name):
+        if not BACKENDS[name].available():
+            continue
+        backend = create_backend(name, reuse_buffer=reuse_buffer)
+        timings[name] = benchmark_backend(backend, iterations)
+        candidates[name] = backend
+
+    usable = {name: ms for name, ms in timings.items() if ms != float("inf")}
+    if not usable:
+        logger.error("No working screen capture backend found")
+        return None
+
+    best = min(usable, key=usable.get)
+    for name, backend in candidates.items():
+        if name != best:
+            backend.close()
+    summary = ", ".join(f"{name}={ms:.1f}ms" for name, ms in timings.items())
+    logger.info(f"Selected '{best}' capture backend ({summary})")
+    return candidates[best]
+
+
+_backend: Optional[CaptureBackend] = None
+_backend_selected = False
+_backend_lock = threading.Lock()
+
+
+def get_capture_backend() -> Optional[CaptureBackend]:
+    """
+    Return the process-wide capture backend, selecting one on first use.
+
+    Selection honours CAPTURE_BACKEND and CAPTURE_REUSE_BUFFER in config.txt.
+    """
+    global _backend, _backend_selected
+    if not _backend_selected:
+        with _backend_lock:
+            if not _backend_selected:
+                preferred, reuse_buffer = "auto", False
+                try:
+                    from config.config import Config
+                    config = Config()
+                    preferred = str(config.get("CAPTURE_BACKEND", "auto"))
+                    reuse_buffer = bool(config.get("CAPTURE_REUSE_BUFFER", False))
+                except Exception as e:
+                    logger.debug(f"Could not read capture settings from config: {e}")
+                _backend = select_backend(preferred, reuse_buffer)
+                _backend_selected = True
+    return _backend
+
+
+def set_capture_backend(backend: Optional[CaptureBackend]) -> None:
+    """Override the process-wide capture backend (e.g. with a replay backend)."""
+    global _backend, _backend_selected
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+        _backend_selected = True
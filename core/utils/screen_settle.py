@@ -0,0 +1,158 @@
+"""
+Screen settle detection for Automoy.
+
+This module replaces fixed post-action sleeps with a short polling loop that
+samples low-resolution frames and returns as soon as the screen has stopped
+changing, bounded by a timeout.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from core.utils.screenshot_utils import (
+    NUMPY_AVAILABLE,
+    PILLOW_AVAILABLE,
+    capture_screen_thumbnail,
+    frame_changed,
+)
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SettleResult:
+    """Outcome of a settle wait."""
+    settled: bool
+    elapsed: float
+    frames: int
+    changed: bool
+
+
+class ScreenSettleDetector:
+    """
+    Waits until the screen is visually stable.
+
+    Consecutive low-resolution frames are compared tile by tile, so a change
+    confined to a few tiles (a typed word, a toggled checkbox) still counts.
+    The screen is considered settled once no tile has changed for at least
+    ``stable_ms`` milliseconds.
+    """
+
+    def __init__(self,
+                 threshold: float = 0.02,
+                 tile_size: int = 4,
+                 stable_ms: int = 250,
+                 timeout: float = 3.0,
+                 sample_interval_ms: int = 30,
+                 change_timeout: float = 0.5,
+                 enabled: bool = True,
+                 grab_func: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            threshold: Minimum mean tile difference (0.0-1.0) counted as a change
+            tile_size: Tile edge length in thumbnail pixels
+            stable_ms: How long the screen must stay unchanged to count as settled
+            timeout: Upper bound on the whole wait in seconds
+            sample_interval_ms: Delay between frame samples
+            change_timeout: When a change is expected, how long to wait for it to start
+            enabled: If False, callers fall back to their fixed delays
+            grab_func: Frame source returning a grayscale thumbnail (defaults to the screen)
+        """
+        self.threshold = threshold
+        self.tile_size = tile_size
+        self.stable_ms = stable_ms
+        self.timeout = timeout
+        self.sample_interval_ms = sample_interval_ms
+        self.change_timeout = change_timeout
+        self.enabled = enabled and PILLOW_AVAILABLE and NUMPY_AVAILABLE
+        self._grab = grab_func or capture_screen_thumbnail
+
+    @classmethod
+    def from_config(cls, config) -> "ScreenSettleDetector":
+        """Build a detector from the SETTLE_* keys in config.txt."""
+        return cls(
+            threshold=float(config.get("SETTLE_THRESHOLD", 0.02)),
+            tile_size=int(config.get("SETTLE_TILE_SIZE", 4)),
+            stable_ms=int(config.get("SETTLE_STABLE_MS", 250)),
+            timeout=float(config.get("SETTLE_TIMEOUT", 3.0)),
+            sample_interval_ms=int(config.get("SETTLE_SAMPLE_INTERVAL_MS", 30)),
+            change_timeout=float(config.get("SETTLE_CHANGE_TIMEOUT", 0.5)),
+            enabled=bool(config.get("SETTLE_DETECTION", True)),
+        )
+
+    def wait(self,
+             timeout: Optional[float] = None,
+             expect_change: bool = False) -> SettleResult:
+        """
+        Block until the screen settles or the timeout expires.
+
+        Args:
+            timeout: Override for the detector's default timeout, capped by it
+            expect_change: If True, first wait (up to ``change_timeout``) for the
+                screen to start changing so that an action whose effect has not
+                yet been painted is not mistaken for a settled screen.
+
+        Returns:
+            SettleResult describing how the wait ended
+        """
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        interval = self.sample_interval_ms / 1000.0
+        stable_window = self.stable_ms / 1000.0
+
+        start = time.perf_counter()
+        previous = self._grab()
+        frames = 1
+        if previous is None:
+            return SettleResult(settled=False, elapsed=0.0, frames=0, changed=False)
+
+        changed = False
+        stable_since = start
+
+        while True:
+            time.sleep(interval)
+            now = time.perf_counter()
+            elapsed = now - start
+
+            current = self._grab()
+            if current is None:
+                logger.warning("Frame capture failed during settle wait; giving up early")
+                return SettleResult(settled=False, elapsed=elapsed, frames=frames, changed=changed)
+            frames += 1
+            tile_changed = frame_changed(previous, current, self.tile_size, self.threshold)
+            previous = current
+
+            if tile_changed:
+                changed = True
+                stable_since = now
+            else:
+                waiting_for_change = expect_change and not changed and elapsed < self.change_timeout
+                if not waiting_for_change and now - stable_since >= stable_window:
+                    return SettleResult(settled=True, elapsed=elapsed, frames=frames, changed=changed)
+
+            if elapsed >= timeout:
+                return SettleResult(settled=False, elapsed=elapsed, frames=frames, changed=changed)
+
+    async def async_wait(self,
+                         timeout: Optional[float] = None,
+                         expect_change: bool = False) -> SettleResult:
+        """Run :meth:`wait` in a worker thread so the event loop is not blocked."""
+        return await asyncio.to_thread(self.wait, timeout, expect_change)
+
+
+def wait_for_screen_settle(timeout: float = 3.0, expect_change: bool = False, **kwargs) -> SettleResult:
+    """
+    Convenience wrapper: wait for the screen to settle with default settings.
+
+    Falls back to sleeping for ``timeout`` seconds if frames cannot be sampled.
+    """
+    detector = ScreenSettleDetector(timeout=timeout, **kwargs)
+    if detector.enabled:
+        result = detector.wait(expect_change=expect_change)
+        if result.frames > 0:
+            return result
+    time.sleep(timeout)
+    return SettleResult(settled=False, elapsed=timeout, frames=0, changed=False)
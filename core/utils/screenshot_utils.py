@@ -10,6 +10,8 @@ import os
 import platform
 import subprocess
 import time
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Tuple, Optional, List, Dict, Any, Union
@@ -26,6 +28,18 @@ except ImportError:
     # Create a dummy class for type hints when PIL is not available
     Image = type('DummyImage', (), {})
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    logger.warning("NumPy not available, frame differencing will be disabled")
+    NUMPY_AVAILABLE = False
+
+from core.utils.screen_capture import Region, get_capture_backend
+
+# Default thumbnail size used for change detection (16:9, 10px tiles -> 16x9 grid)
+THUMBNAIL_SIZE = (160, 90)
+
 
 def get_screen_size() -> Tuple[int, int]:
     """
@@ -34,39 +48,44 @@ def get_screen_size() -> Tuple[int, int]:
     Returns:
         Tuple of (width, height)
     """
-    if not PILLOW_AVAILABLE:
-        logger.error("Cannot get screen size without Pillow library")
+    backend = get_capture_backend()
+    if backend is None:
+        logger.error("Cannot get screen size without a capture backend")
         return (1920, 1080)  # Default fallback
     
     try:
-        # Use a small screenshot to determine screen size
-        img = ImageGrab.grab()
-        return img.size
+        left, top, right, bottom = backend.monitors()[1]
+        return (right - left, bottom - top)
     except Exception as e:
         logger.error(f"Error getting screen size: {e}")
         return (1920, 1080)  # Default fallback
 
 
-def capture_screen_pil(output_path: Optional[str] = None) -> Any:
+def capture_screen_pil(output_path: Optional[str] = None,
+                       region: Optional[Region] = None,
+                       monitor: Optional[int] = None) -> Any:
     """
-    Capture the screen using PIL.
+    Capture the screen using the active capture backend.
     
     Args:
         output_path: Path to save the screenshot. If None, the screenshot is not saved.
+        region: Optional (left, top, right, bottom) area to capture
+        monitor: Optional monitor index (0 = all monitors, 1 = primary)
     
     Returns:
         PIL Image object if successful, None otherwise
     """
-    if not PILLOW_AVAILABLE:
-        logger.error("Cannot capture screen without Pillow library")
+    backend = get_capture_backend()
+    if backend is None:
+        logger.error("Cannot capture screen without a capture backend")
         return None
     
     try:
-        screenshot = ImageGrab.grab()
+        screenshot = backend.grab(region=region, monitor=monitor)
         
         if output_path:
             # Ensure directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
             screenshot.save(output_path)
             logger.info(f"Screenshot saved to {output_path}")
             
@@ -77,6 +96,271 @@ def capture_screen_pil(output_path: Optional[str] = None) -> Any:
         return None
 
 
+def make_thumbnail(image: Any, size: Tuple[int, int] = THUMBNAIL_SIZE) -> Any:
+    """
+    Downsample an image to a small grayscale thumbnail.
+
+    The image is first box-reduced by an integer factor (cheap on 4K frames) and
+    only then converted to grayscale and resized to the exact target size.
+
+    Args:
+        image: Source PIL Image
+        size: Target (width, height) of the thumbnail
+
+    Returns:
+        Grayscale PIL Image of exactly ``size``
+    """
+    factor = max(1, min(image.width // size[0], image.height // size[1]))
+    if factor > 1:
+        image = image.reduce(factor)
+    return image.convert("L").resize(size, Image.BILINEAR)
+
+
+def capture_screen_thumbnail(size: Tuple[int, int] = THUMBNAIL_SIZE) -> Any:
+    """
+    Capture the screen as a small grayscale thumbnail.
+
+    Intended for cheap change detection (e.g. waiting for the screen to settle),
+    not for analysis.
+
+    Args:
+        size: Target (width, height) of the thumbnail
+
+    Returns:
+        Grayscale PIL Image if successful, None otherwise
+    """
+    screenshot = capture_screen_pil()
+    if screenshot is None:
+        return None
+
+    try:
+        return make_thumbnail(screenshot, size)
+    except Exception as e:
+        logger.error(f"Error capturing screen thumbnail: {e}")
+        return None
+
+
+def perceptual_hash(image: Any, hash_size: int = 8) -> int:
+    """
+    Compute a difference hash (dHash) of an image.
+
+    Visually similar frames produce hashes with a small Hamming distance, which
+    makes this a cheap "is this roughly the same screen?" check.
+
+    Args:
+        image: PIL Image (any mode/size; thumbnails are fastest)
+        hash_size: Hash is ``hash_size * hash_size`` bits
+
+    Returns:
+        Hash as an integer
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Number of differing bits between two perceptual hashes."""
+    return bin(hash_a ^ hash_b).count("1")
+
+
+def frame_difference(previous: Any, current: Any) -> float:
+    """
+    Mean absolute difference between two grayscale thumbnails.
+
+    Args:
+        previous: Earlier thumbnail (PIL Image, mode "L")
+        current: Later thumbnail of the same size
+
+    Returns:
+        Difference in the range 0.0 (identical) to 1.0; 1.0 if either frame is
+        missing or the sizes differ
+    """
+    if previous is None or current is None or previous.size != current.size:
+        return 1.0
+    a = np.asarray(previous, dtype=np.int16)
+    b = np.asarray(current, dtype=np.int16)
+    return float(np.abs(a - b).mean()) / 255.0
+
+
+def tile_change_mask(previous: Any, current: Any,
+                     tile_size: int = 10,
+                     threshold: float = 0.02) -> Any:
+    """
+    Compute which tiles of a thumbnail changed between two frames.
+
+    Args:
+        previous: Earlier thumbnail (PIL Image, mode "L")
+        current: Later thumbnail of the same size
+        tile_size: Tile edge length in thumbnail pixels
+        threshold: Minimum mean tile difference (0-1) counted as a change
+
+    Returns:
+        Boolean NumPy array of shape (rows, cols); partial edge tiles are dropped
+    """
+    a = np.asarray(previous, dtype=np.int16)
+    b = np.asarray(current, dtype=np.int16)
+    rows, cols = a.shape[0] // tile_size, a.shape[1] // tile_size
+    diff = np.abs(a - b)[:rows * tile_size, :cols * tile_size]
+    tiles = diff.reshape(rows, tile_size, cols, tile_size).mean(axis=(1, 3))
+    return tiles > threshold * 255.0
+
+
+def frame_changed(previous: Any, current: Any,
+                  tile_size: int = 10,
+                  threshold: float = 0.02) -> bool:
+    """
+    Whether any tile changed between two thumbnails.
+
+    Unlike :func:`frame_difference`, a small change such as a word typed into
+    a search box is not averaged away over the whole frame.
+
+    Args:
+        previous: Earlier thumbnail (PIL Image, mode "L")
+        current: Later thumbnail
+        tile_size: Tile edge length in thumbnail pixels
+        threshold: Minimum mean tile difference (0-1) counted as a change
+
+    Returns:
+        True if a tile changed, or if either frame is missing or the sizes differ
+    """
+    if previous is None or current is None or previous.size != current.size:
+        return True
+    return bool(tile_change_mask(previous, current, tile_size, threshold).any())
+
+
+def changed_regions(mask: Any, frame_size: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+    """
+    Group changed tiles into bounding boxes in full-resolution coordinates.
+
+    Adjacent (4-connected) changed tiles are merged into one region.
+
+    Args:
+        mask: Boolean tile mask from :func:`tile_change_mask`
+        frame_size: (width, height) of the original full-resolution frame
+
+    Returns:
+        List of (left, top, right, bottom) boxes, largest first
+    """
+    rows, cols = mask.shape
+    if rows == 0 or cols == 0:
+        return []
+    tile_w = frame_size[0] / cols
+    tile_h = frame_size[1] / rows
+
+    seen = np.zeros_like(mask, dtype=bool)
+    boxes = []
+    for r, c in zip(*np.nonzero(mask)):
+        if seen[r, c]:
+            continue
+        seen[r, c] = True
+        queue = deque([(r, c)])
+        min_r, max_r, min_c, max_c = r, r, c, c
+        while queue:
+            y, x = queue.popleft()
+            min_r, max_r = min(min_r, y), max(max_r, y)
+            min_c, max_c = min(min_c, x), max(max_c, x)
+            for ny, nx in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                if 0 <= ny < rows and 0 <= nx < cols and mask[ny, nx] and not seen[ny, nx]:
+                    seen[ny, nx] = True
+                    queue.append((ny, nx))
+        boxes.append((
+            int(min_c * tile_w),
+            int(min_r * tile_h),
+            min(frame_size[0], int(round((max_c + 1) * tile_w))),
+            min(frame_size[1], int(round((max_r + 1) * tile_h))),
+        ))
+
+    boxes.sort(key=lambda b: (b[2] - b[0]) * (b[3] - b[1]), reverse=True)
+    return boxes
+
+
+@dataclass
+class FrameDiff:
+    """Result of comparing two frames."""
+    changed: bool
+    mean_difference: float
+    hash_distance: int
+    changed_ratio: float
+    regions: List[Tuple[int, int, int, int]] = field(default_factory=list)
+
+
+def diff_frames(previous: Any, current: Any,
+                frame_size: Optional[Tuple[int, int]] = None,
+                tile_size: int = 10,
+                tile_threshold: float = 0.02) -> FrameDiff:
+    """
+    Compare two grayscale thumbnails.
+
+    Args:
+        previous: Earlier thumbnail (PIL Image, mode "L")
+        current: Later thumbnail of the same size
+        frame_size: Size of the full-resolution frames, used to scale regions.
+            Defaults to the thumbnail size.
+        tile_size: Tile edge length in thumbnail pixels
+        tile_threshold: Minimum mean tile difference (0-1) counted as a change
+
+    Returns:
+        FrameDiff with a tile-based change verdict and changed regions
+    """
+    if previous is None or current is None or previous.size != current.size:
+        size = frame_size or (current.size if current is not None else (0, 0))
+        return FrameDiff(changed=True, mean_difference=1.0, hash_distance=64,
+                         changed_ratio=1.0, regions=[(0, 0, size[0], size[1])])
+
+    mask = tile_change_mask(previous, current, tile_size, tile_threshold)
+    regions = changed_regions(mask, frame_size or current.size) if mask.any() else []
+    return FrameDiff(
+        changed=bool(mask.any()),
+        mean_difference=frame_difference(previous, current),
+        hash_distance=hamming_distance(perceptual_hash(previous), perceptual_hash(current)),
+        changed_ratio=float(mask.mean()) if mask.size else 0.0,
+        regions=regions,
+    )
+
+
+class FrameDiffer:
+    """
+    Keeps the previous frame's thumbnail and reports changes against it.
+
+    Example:
+        differ = FrameDiffer()
+        differ.update(capture_screen_pil())
+        ...
+        diff = differ.update(capture_screen_pil())
+        if not diff.changed:
+            # reuse the previous parse result
+    """
+
+    def __init__(self, thumbnail_size: Tuple[int, int] = THUMBNAIL_SIZE,
+                 tile_size: int = 10, tile_threshold: float = 0.02):
+        self.thumbnail_size = thumbnail_size
+        self.tile_size = tile_size
+        self.tile_threshold = tile_threshold
+        self.previous = None
+
+    def update(self, image: Any) -> FrameDiff:
+        """
+        Compare a full-resolution frame with the previous one and remember it.
+
+        Args:
+            image: Full-resolution PIL Image
+
+        Returns:
+            FrameDiff; the first call always reports the whole frame as changed
+        """
+        current = make_thumbnail(image, self.thumbnail_size)
+        diff = diff_frames(self.previous, current, image.size,
+                           self.tile_size, self.tile_threshold)
+        self.previous = current
+        return diff
+
+    def reset(self) -> None:
+        """Forget the previous frame."""
+        self.previous = None
+
+
 def get_active_window_title() -> Optional[str]:
     """
     Get the title of the active window based on the current platform.
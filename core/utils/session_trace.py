@@ -0,0 +1,507 @@
+"""
+Session trace recorder and deterministic replay harness.
+
+A trace captures everything the operator loop consumed from the outside world
+during one objective, so the loop can be re-run offline at full speed:
+
+* captured frames (PNG, stored once per distinct frame)
+* OmniParser results and on-demand icon captions
+* LLM calls: prompts (messages), responses, streamed token counts
+* executed actions and what the executor reported
+
+On disk a trace is a directory::
+
+    <trace>/trace.jsonl.gz     header line, then one JSON event per line
+    <trace>/frames/<sha1>.png  deduplicated frames referenced by frame events
+
+Recording is switched on with SESSION_RECORD; ``AutomoyOperator.operate_loop``
+attaches a ``TraceRecorder`` for each objective. Replay attaches a
+``TraceReplayer`` instead, which swaps in stub capture, OmniParser, LLM and
+executor implementations fed from the trace::
+
+    python -m core.utils.session_trace debug/traces/<session>
+
+Config keys:
+    SESSION_RECORD: False          # record a trace per objective
+    SESSION_TRACE_DIR: debug/traces
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from PIL import Image
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+TRACE_VERSION = 1
+EVENTS_FILE = "trace.jsonl.gz"
+FRAMES_DIR = "frames"
+
+
+def frame_digest(image: Any) -> str:
+    """Content hash of a PIL image (pixels, size and mode)."""
+    digest = hashlib.sha1(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def _jsonable(value: Any) -> Any:
+    """Round-trip through JSON so recorded objects cannot change after the fact."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class TraceRecorder:
+    """Writes one session's trace events and deduplicated frames."""
+
+    def __init__(self, directory: str | os.PathLike, session_id: str = "", objective: str = ""):
+        self.directory = Path(directory)
+        self.frames_dir = self.directory / FRAMES_DIR
+        self.frames_dir.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.directory / EVENTS_FILE, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._frames_seen = set()
+        self._suppress_parse = 0
+        self.step: Optional[int] = None
+        self.counts: Dict[str, int] = {}
+        self._write({"kind": "header", "version": TRACE_VERSION, "session_id": session_id,
+                     "objective": objective, "created_at": time.time()})
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, default=str, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self.counts[event["kind"]] = self.counts.get(event["kind"], 0) + 1
+
+    def _event(self, kind: str, **fields: Any) -> None:
+        self._write({"kind": kind, "step": self.step, "t": time.time(), **fields})
+
+    # ――― events ―――
+    def record_frame(self, image: Any, region: Optional[Tuple[int, int, int, int]] = None) -> str:
+        """Store ``image`` unless an identical frame was already stored; returns its digest."""
+        digest = frame_digest(image)
+        if digest not in self._frames_seen:
+            path = self.frames_dir / f"{digest}.png"
+            if not path.exists():
+                # Fast compression: frames are written on the hot path, size is already cut by dedup
+                image.save(path, format="PNG", compress_level=1)
+            self._frames_seen.add(digest)
+        self._event("frame", frame=digest, region=list(region) if region else None)
+        return digest
+
+    def record_parse(self, result: Optional[dict]) -> None:
+        if self._suppress_parse:
+            return
+        if result is not None:
+            # Overlay files live outside the trace; replay never produces them
+            result = {k: v for k, v in result.items() if k != "overlay_path"}
+        self._event("parse", result=result)
+
+    def record_caption(self, element_ids: List[int], captions: Dict[int, str]) -> None:
+        # JSON object keys are strings; keep the IDs as (id, caption) pairs
+        self._event("caption", element_ids=list(element_ids), captions=sorted(captions.items()))
+
+    def record_llm(self, method: str, messages: Any, response: Tuple[Any, Any, Any], tokens: int = 0,
+                   **kwargs: Any) -> None:
+        raw, thinking, error = response
+        self._event("llm", method=method, messages=messages, response=raw, thinking=thinking,
+                    error=error, tokens=tokens, args=kwargs)
+
+    def record_action(self, action: Any, result: Any) -> None:
+        self._event("action", action=action, result=result)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    # ――― wiring ―――
+    @contextmanager
+    def attach(self, operator) -> Iterator["TraceRecorder"]:
+        """
+        Record everything ``operator`` consumes while the block runs.
+
+        Wraps the operator's capture and parse steps and its OmniParser, LLM and
+        executor objects; the originals are restored on exit.
+        """
+        recorder = self
+        capture_screen = operator._capture_screen
+        parse_screenshot = operator._parse_screenshot
+        originals = (operator.omniparser, operator.llm_interface, operator.action_executor)
+
+        async def recording_capture():
+            image = await capture_screen()
+            recorder.step = operator.timeline.step
+            if image is not None:
+                region = operator.screenshot_region.as_tuple() if operator.screenshot_region else None
+                await asyncio.to_thread(recorder.record_frame, image, region)
+            return image
+
+        async def recording_parse(screenshot_path):
+            # One event for the merged result, not one per monitor request
+            recorder._suppress_parse += 1
+            try:
+                result = await parse_screenshot(screenshot_path)
+            finally:
+                recorder._suppress_parse -= 1
+            recorder.step = operator.timeline.step
+            recorder.record_parse(result)
+            return result
+
+        operator._capture_screen = recording_capture
+        operator._parse_screenshot = recording_parse
+        if operator.omniparser is not None:
+            operator.omniparser = _RecordingOmniParser(operator.omniparser, recorder, operator)
+        operator.llm_interface = _RecordingLLM(operator.llm_interface, recorder, operator)
+        operator.action_executor = _RecordingExecutor(operator.action_executor, recorder, operator)
+        try:
+            yield self
+        finally:
+            del operator._capture_screen, operator._parse_screenshot
+            operator.omniparser, operator.llm_interface, operator.action_executor = originals
+            self.close()
+            logger.info(f"Session trace written to {self.directory} ({self.counts})")
+
+
+class _Proxy:
+    """Delegates everything it does not override to the wrapped object."""
+
+    def __init__(self, inner, trace, operator):
+        self._inner = inner
+        self._trace = trace
+        self._operator = operator
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class _RecordingOmniParser(_Proxy):
+    def parse_screenshot(self, image_path, overlay=None, captions=None):
+        kwargs = {"captions": captions} if captions is not None else {}
+        result = self._inner.parse_screenshot(image_path, overlay=overlay, **kwargs)
+        self._trace.step = self._operator.timeline.step
+        self._trace.record_parse(result)
+        return result
+
+    def caption_elements(self, image_path, parsed, element_ids):
+        element_ids = list(element_ids)
+        captions = self._inner.caption_elements(image_path, parsed, element_ids)
+        self._trace.step = self._operator.timeline.step
+        self._trace.record_caption(element_ids, captions)
+        return captions
+
+
+class _RecordingLLM(_Proxy):
+    async def _call(self, method: str, messages, thinking_callback=None, **kwargs):
+        tokens = 0
+
+        async def counting_callback(token):
+            nonlocal tokens
+            tokens += 1
+            await thinking_callback(token)
+
+        response = await getattr(self._inner, method)(
+            messages=messages, thinking_callback=counting_callback if thinking_callback else None, **kwargs)
+        self._trace.step = self._operator.timeline.step
+        args = {k: v for k, v in kwargs.items() if k in ("response_format_type", "model")}
+        self._trace.record_llm(method, _jsonable(messages), response, tokens, **args)
+        return response
+
+    async def get_llm_response(self, messages=None, thinking_callback=None, **kwargs):
+        return await self._call("get_llm_response", messages, thinking_callback, **kwargs)
+
+    async def get_next_action(self, messages=None, thinking_callback=None, **kwargs):
+        return await self._call("get_next_action", messages, thinking_callback, **kwargs)
+
+
+class _RecordingExecutor(_Proxy):
+    def execute(self, action):
+        result = self._inner.execute(action)
+        self._trace.step = self._operator.timeline.step
+        self._trace.record_action(_jsonable(action), result)
+        return result
+
+
+# ――― replay ―――
+class SessionTrace:
+    """A recorded trace loaded into memory."""
+
+    def __init__(self, directory: str | os.PathLike, header: Dict[str, Any], events: List[Dict[str, Any]]):
+        self.directory = Path(directory)
+        self.header = header
+        self.events = events
+
+    @classmethod
+    def load(cls, directory: str | os.PathLike) -> "SessionTrace":
+        directory = Path(directory)
+        with gzip.open(directory / EVENTS_FILE, "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get("kind") != "header":
+            raise ValueError(f"{directory} is not a session trace")
+        if lines[0].get("version") != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version {lines[0].get('version')} in {directory}")
+        return cls(directory, lines[0], lines[1:])
+
+    @property
+    def objective(self) -> str:
+        return self.header.get("objective", "")
+
+    @property
+    def session_id(self) -> str:
+        return self.header.get("session_id", "")
+
+    def of_kind(self, kind: str) -> List[Dict[str, Any]]:
+        return [e for e in self.events if e["kind"] == kind]
+
+    def load_frame(self, digest: str) -> Any:
+        with Image.open(self.directory / FRAMES_DIR / f"{digest}.png") as image:
+            return image.convert("RGB")
+
+
+class TraceReplayer:
+    """
+    Feeds an operator from a ``SessionTrace`` instead of the desktop, OmniParser and LLM.
+
+    Each kind of event is replayed in recorded order. When the operator asks for
+    more than was recorded, capture repeats the last frame, parses return None,
+    and LLM calls return an error so the loop winds down. Actions are not
+    executed; the recorded result is returned. Prompts, caption requests and
+    actions that differ from the recorded ones are listed in ``mismatches``.
+    """
+
+    def __init__(self, trace: SessionTrace, stream_tokens: bool = True):
+        self.trace = trace
+        self.stream_tokens = stream_tokens
+        kinds = ("frame", "parse", "llm", "action") + (("caption",) if trace.of_kind("caption") else ())
+        self._queues: Dict[str, Deque[Dict[str, Any]]] = {kind: deque(trace.of_kind(kind)) for kind in kinds}
+        self._frames: Dict[str, Any] = {}
+        self._last_frame: Optional[Dict[str, Any]] = None
+        self.mismatches: List[Dict[str, Any]] = []
+        self.exhausted: Dict[str, int] = {}
+
+    def _next(self, kind: str) -> Optional[Dict[str, Any]]:
+        queue = self._queues.get(kind)
+        if queue:
+            return queue.popleft()
+        self.exhausted[kind] = self.exhausted.get(kind, 0) + 1
+        return None
+
+    def remaining(self) -> Dict[str, int]:
+        return {kind: len(queue) for kind, queue in self._queues.items()}
+
+    def frame(self) -> Tuple[Optional[Any], Optional[List[int]]]:
+        event = self._next("frame") or self._last_frame
+        if event is None:
+            return None, None
+        self._last_frame = event
+        digest = event["frame"]
+        if digest not in self._frames:
+            self._frames[digest] = self.trace.load_frame(digest)
+        return self._frames[digest].copy(), event.get("region")
+
+    def parse(self) -> Optional[dict]:
+        event = self._next("parse")
+        return event["result"] if event else None
+
+    def caption(self, element_ids: List[int]) -> Dict[int, str]:
+        event = self._next("caption")
+        if event is None:
+            return {}
+        if list(element_ids) != event["element_ids"]:
+            self.mismatches.append({"kind": "caption", "step": event.get("step"),
+                                    "expected": event["element_ids"], "actual": list(element_ids)})
+        return {int(element_id): caption for element_id, caption in event["captions"]}
+
+    async def llm(self, method: str, messages: Any = None, thinking_callback=None) -> Tuple[Any, Any, Any]:
+        event = self._next("llm")
+        if event is None:
+            return None, None, "Session trace has no more LLM responses"
+        if event["method"] != method:
+            self.mismatches.append({"kind": "llm", "expected": event["method"], "actual": method})
+        elif messages is not None and _jsonable(messages) != event.get("messages"):
+            # Prompt drift: the loop built a different prompt from the same inputs
+            self.mismatches.append({"kind": "prompt", "step": event.get("step"),
+                                    "expected": event.get("messages"), "actual": messages})
+        response = event.get("response") or ""
+        if thinking_callback and self.stream_tokens and response:
+            # Re-stream the response in as many pieces as were recorded
+            pieces = max(1, int(event.get("tokens") or 1))
+            size = max(1, -(-len(response) // pieces))
+            for i in range(0, len(response), size):
+                await thinking_callback(response[i:i + size])
+        return event.get("response"), event.get("thinking"), event.get("error")
+
+    def action(self, action: Any) -> Any:
+        event = self._next("action")
+        if event is None:
+            return "ERROR: session trace has no more actions"
+        if _jsonable(action) != event["action"]:
+            self.mismatches.append({"kind": "action", "expected": event["action"], "actual": action})
+        return event["result"]
+
+    @contextmanager
+    def attach(self, operator) -> Iterator["TraceReplayer"]:
+        """Swap the operator's external dependencies for stubs fed from the trace."""
+        from core.utils.region.capture_region import CaptureRegion
+
+        replayer = self
+        originals = (operator.omniparser, operator.llm_interface, operator.action_executor,
+                     operator.record_sessions)
+
+        async def replay_capture():
+            with operator.timeline.span("capture", replay=True):
+                image, region = replayer.frame()
+            operator.monitor_frames = []
+            if image is not None:
+                operator.screenshot_region = CaptureRegion(*region) if region else CaptureRegion.from_size(image.size)
+            return image
+
+        async def replay_parse(screenshot_path):
+            with operator.timeline.span("omniparser", monitors=1, replay=True):
+                return replayer.parse()
+
+        async def no_settle_wait(context, fallback_delay, expect_change=False):
+            # Recorded frames already reflect the settled screen
+            operator.timeline.record("settle_wait", operator.timeline.now(), operator.timeline.now(),
+                                     context=context, replay=True)
+
+        operator._capture_screen = replay_capture
+        operator._parse_screenshot = replay_parse
+        operator._wait_for_screen_settle = no_settle_wait
+        operator.omniparser = _ReplayOmniParser(replayer)
+        operator.llm_interface = _ReplayLLM(operator.llm_interface, replayer)
+        operator.action_executor = _ReplayExecutor(replayer)
+        operator.record_sessions = False
+        try:
+            yield self
+        finally:
+            del operator._capture_screen, operator._parse_screenshot, operator._wait_for_screen_settle
+            (operator.omniparser, operator.llm_interface, operator.action_executor,
+             operator.record_sessions) = originals
+
+
+class _ReplayOmniParser:
+    def __init__(self, replayer: TraceReplayer):
+        self._replayer = replayer
+
+    def parse_screenshot(self, image_path, overlay=None, captions=None):
+        return self._replayer.parse()
+
+    def caption_elements(self, image_path, parsed, element_ids):
+        from core.utils.omniparser.captions import apply_captions
+
+        captions = self._replayer.caption(element_ids)
+        apply_captions(parsed, captions)
+        return captions
+
+
+class _ReplayLLM:
+    """Prompt construction stays real (it is part of the loop); responses come from the trace."""
+
+    def __init__(self, inner, replayer: TraceReplayer):
+        self._inner = inner
+        self._replayer = replayer
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def get_llm_response(self, messages=None, thinking_callback=None, **kwargs):
+        return await self._replayer.llm("get_llm_response", messages, thinking_callback)
+
+    async def get_next_action(self, messages=None, thinking_callback=None, **kwargs):
+        return await self._replayer.llm("get_next_action", messages, thinking_callback)
+
+
+class _ReplayExecutor:
+    def __init__(self, replayer: TraceReplayer):
+        self._replayer = replayer
+
+    def execute(self, action):
+        return self._replayer.action(action)
+
+
+def trace_dir(config=None) -> Optional[Path]:
+    """Directory traces are recorded to, or None when SESSION_RECORD is off."""
+    get = config.get if config is not None else (lambda key, default=None: default)
+    if not get("SESSION_RECORD", False):
+        return None
+    directory = Path(get("SESSION_TRACE_DIR", "") or "debug/traces")
+    return directory if directory.is_absolute() else PROJECT_ROOT / directory
+
+
+async def _noop_gui_update(endpoint: str, payload: dict) -> None:
+    return None
+
+
+async def replay_session(trace: SessionTrace | str | os.PathLike, operator=None,
+                         on_gui_update: Optional[Callable[..., Any]] = None) -> Dict[str, Any]:
+    """
+    Run the operator loop against a recorded trace.
+
+    Args:
+        trace: A loaded trace or its directory
+        operator: Operator to drive; a fresh ``AutomoyOperator`` when omitted
+        on_gui_update: Async GUI update function (defaults to a no-op)
+
+    Returns:
+        {"elapsed", "steps", "mismatches", "exhausted", "remaining", "stages"}
+    """
+    if not isinstance(trace, SessionTrace):
+        trace = SessionTrace.load(trace)
+    if operator is None:
+        from core.operate import AutomoyOperator
+
+        pause_event = asyncio.Event()
+        pause_event.set()
+        operator = AutomoyOperator(objective=trace.objective, manage_gui_window_func=None, omniparser=None,
+                                   pause_event=pause_event, update_gui_state_func=on_gui_update or _noop_gui_update)
+    operator.objective = trace.objective
+
+    replayer = TraceReplayer(trace)
+    started = time.perf_counter()
+    with replayer.attach(operator):
+        await operator.operate_loop()
+    elapsed = time.perf_counter() - started
+
+    stages = operator.timeline.summary()
+    return {
+        "elapsed": elapsed,
+        "steps": stages.get("step", {}).get("count", 0),
+        "mismatches": replayer.mismatches,
+        "exhausted": replayer.exhausted,
+        "remaining": replayer.remaining(),
+        "stages": stages,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.insert(0, str(PROJECT_ROOT))
+    parser = argparse.ArgumentParser(description="Replay a recorded Automoy session offline.")
+    parser.add_argument("trace", help="trace directory (see SESSION_TRACE_DIR)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    result = asyncio.run(replay_session(args.trace))
+    rate = result["steps"] / result["elapsed"] if result["elapsed"] else 0.0
+    print(f"Replayed {result['steps']} steps in {result['elapsed']:.2f}s ({rate:.1f} steps/s)")
+    print(f"Mismatches: {len(result['mismatches'])}  exhausted: {result['exhausted']}  "
+          f"unused: {result['remaining']}")
@@ -0,0 +1,296 @@
+"""
+Concurrent startup orchestration.
+
+Automoy's startup pieces (GUI server, webview window, OmniParser server, LLM
+interface, operator) are components of a ``StartupOrchestrator``. Each one
+starts as soon as the components it depends on are ready; blocking work runs
+in a worker thread, so a 60 s OmniParser cold start overlaps the GUI health
+wait instead of following it. Every component has a readiness future: the
+goal loop starts once the minimum set is ready and awaits the rest (usually
+OmniParser) only when a goal first needs it.
+
+``report()`` gives each component's wait, run and ready times and the critical
+path, i.e. the dependency chain that decided when the minimum set was ready.
+
+Config keys:
+    STARTUP_WAIT_FOR_OMNIPARSER: False   # True = accept goals only once OmniParser is up
+    STARTUP_OMNIPARSER_TIMEOUT: 180      # seconds a goal waits for OmniParser before running without it
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.exceptions import StartupError
+from core.utils.metrics import STARTUP_SECONDS
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Component:
+    """One startup unit. ``func`` gets the results of ``depends`` as keyword arguments."""
+
+    name: str
+    func: Optional[Callable[..., Any]]
+    depends: Sequence[str] = ()
+    required: bool = True
+    started_at: Optional[float] = None
+    ready_at: Optional[float] = None
+    error: Optional[BaseException] = None
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    @property
+    def external(self) -> bool:
+        """Resolved from outside with ``resolve``/``fail`` instead of by running ``func``."""
+        return self.func is None
+
+
+class StartupOrchestrator:
+    """
+    Runs startup components concurrently, respecting their dependencies.
+
+    Register components with ``add``/``add_external`` before ``start``, which
+    must be called from the event loop that will run them. ``ready``,
+    ``wait_minimum`` and ``result`` are for that loop; ``wait_sync``,
+    ``resolve`` and ``fail`` may be called from any thread.
+    """
+
+    def __init__(self):
+        self.components: Dict[str, Component] = {}
+        self.minimum_ready_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._started = threading.Event()
+        self._t0: Optional[float] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, func: Callable[..., Any], depends: Sequence[str] = (),
+            required: bool = True) -> Component:
+        """
+        Register a component.
+
+        Args:
+            name: Component name, used by ``depends`` and ``ready``
+            func: Callable or coroutine function; a plain callable runs in a worker thread
+            depends: Components that must be ready first; their results are passed as keyword arguments
+            required: Part of the minimum set ``wait_minimum`` waits for
+        """
+        if self._started.is_set():
+            raise RuntimeError(f"Cannot add startup component '{name}' after start()")
+        component = Component(name=name, func=func, depends=tuple(depends), required=required)
+        self.components[name] = component
+        return component
+
+    def add_external(self, name: str, depends: Sequence[str] = (), required: bool = True) -> Component:
+        """Register a component that another thread resolves, e.g. the webview window on the main thread."""
+        return self.add(name, None, depends, required)
+
+    def start(self) -> None:
+        """Create the readiness futures and launch every component."""
+        unknown = {dep for c in self.components.values() for dep in c.depends if dep not in self.components}
+        if unknown:
+            raise ValueError(f"Unknown startup dependencies: {', '.join(sorted(unknown))}")
+        self._loop = asyncio.get_running_loop()
+        self._t0 = time.perf_counter()
+        for component in self.components.values():
+            component.future = self._loop.create_future()
+            # Failures are reported through ready()/report(); don't log "never retrieved"
+            component.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        for component in self.components.values():
+            if not component.external:
+                self._tasks.append(asyncio.create_task(self._run(component), name=f"startup:{component.name}"))
+        self._started.set()
+        logger.info(f"Startup: launching {', '.join(self.components)} concurrently")
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    async def _dependencies(self, component: Component) -> Dict[str, Any]:
+        results = {}
+        for dep in component.depends:
+            try:
+                results[dep] = await asyncio.shield(self.components[dep].future)
+            except Exception as e:
+                raise StartupError(component.name, f"dependency '{dep}' failed") from e
+        return results
+
+    async def _run(self, component: Component) -> None:
+        try:
+            kwargs = await self._dependencies(component)
+            component.started_at = self._elapsed()
+            if inspect.iscoroutinefunction(component.func):
+                result = await component.func(**kwargs)
+            else:
+                result = await asyncio.to_thread(component.func, **kwargs)
+        except Exception as e:
+            self._set_failed(component, e)
+        else:
+            self._set_ready(component, result)
+
+    def _set_ready(self, component: Component, result: Any) -> None:
+        if component.future.done():
+            return
+        component.ready_at = self._elapsed()
+        if component.started_at is None:
+            component.started_at = component.ready_at
+        component.future.set_result(result)
+        STARTUP_SECONDS.set(component.ready_at, component=component.name)
+        logger.info(f"Startup: '{component.name}' ready at {component.ready_at:.2f}s "
+                    f"(ran {component.ready_at - component.started_at:.2f}s)")
+        self._log_if_complete()
+
+    def _set_failed(self, component: Component, error: BaseException) -> None:
+        if component.future.done():
+            return
+        component.ready_at = self._elapsed()
+        component.error = error
+        if not isinstance(error, StartupError):
+            wrapped = StartupError(component.name, str(error))
+            wrapped.__cause__ = error
+            error = wrapped
+        component.future.set_exception(error)
+        log = logger.error if component.required else logger.warning
+        log(f"Startup: '{component.name}' failed at {component.ready_at:.2f}s: {error}")
+        self._log_if_complete()
+
+    def _log_if_complete(self) -> None:
+        # The minimum-set report is logged by wait_minimum(); this covers the stragglers
+        if self.minimum_ready_at is not None and all(c.future.done() for c in self.components.values()):
+            logger.info(f"Startup complete at {self._elapsed():.2f}s. {self.format_report()}")
+
+    def resolve(self, name: str, result: Any = None) -> None:
+        """Mark an external component ready (thread-safe)."""
+        self._settle_external(name, result, None)
+
+    def fail(self, name: str, error: BaseException) -> None:
+        """Mark an external component failed (thread-safe)."""
+        self._settle_external(name, None, error)
+
+    def _settle_external(self, name: str, result: Any, error: Optional[BaseException]) -> None:
+        component = self.components[name]
+        if not self._started.wait(timeout=30):
+            logger.warning(f"Startup: orchestrator not started; ignoring result for '{name}'")
+            return
+        self._loop.call_soon_threadsafe(self._resolve_external, component, result, error)
+
+    def _resolve_external(self, component: Component, result: Any, error: Optional[BaseException]) -> None:
+        async def settle():
+            try:
+                await self._dependencies(component)
+            except Exception as e:
+                self._set_failed(component, e)
+                return
+            # Time spent before the external work began counts as waiting, not running
+            component.started_at = max(self.components[d].ready_at or 0.0 for d in component.depends) \
+                if component.depends else 0.0
+            if error is not None:
+                self._set_failed(component, error)
+            else:
+                self._set_ready(component, result)
+        self._tasks.append(asyncio.ensure_future(settle()))
+
+    def done(self, name: str) -> bool:
+        future = self.components[name].future
+        return future is not None and future.done()
+
+    def result(self, name: str, default: Any = None) -> Any:
+        """A ready component's result, or ``default`` if it is not ready, failed or was cancelled."""
+        future = self.components[name].future
+        if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+            return default
+        return future.result()
+
+    async def ready(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for a component and return its result.
+
+        Raises:
+            StartupError: The component (or one of its dependencies) failed
+            asyncio.TimeoutError: It was not ready within ``timeout``
+        """
+        return await asyncio.wait_for(asyncio.shield(self.components[name].future), timeout)
+
+    async def wait_minimum(self) -> Dict[str, Any]:
+        """
+        Wait for every required component; returns their results by name.
+
+        Raises:
+            StartupError: A required component failed
+        """
+        results = {}
+        for component in self.components.values():
+            if component.required:
+                results[component.name] = await self.ready(component.name)
+        self.minimum_ready_at = self._elapsed()
+        STARTUP_SECONDS.set(self.minimum_ready_at, component="minimum")
+        logger.info(self.format_report())
+        return results
+
+    def wait_sync(self, name: str, timeout: Optional[float] = None) -> Any:
+        """``ready(name)`` for threads other than the orchestrator's loop."""
+        if not self._started.wait(timeout):
+            raise StartupError(name, "startup orchestrator was not started")
+        return asyncio.run_coroutine_threadsafe(self.ready(name, timeout), self._loop).result()
+
+    def critical_path(self, names: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        The dependency chain behind the latest-ready component of ``names``
+        (default: the required components), earliest first.
+        """
+        candidates = [self.components[n] for n in (names or [c.name for c in self.components.values()
+                                                            if c.required])]
+        candidates = [c for c in candidates if c.ready_at is not None]
+        if not candidates:
+            return []
+        component = max(candidates, key=lambda c: c.ready_at)
+        path = [component.name]
+        while component.depends:
+            deps = [self.components[d] for d in component.depends if self.components[d].ready_at is not None]
+            if not deps:
+                break
+            component = max(deps, key=lambda c: c.ready_at)
+            path.insert(0, component.name)
+        return path
+
+    def report(self) -> Dict[str, Any]:
+        """Per-component timings (seconds since ``start``) and the critical path."""
+        components = {}
+        for c in self.components.values():
+            status = "pending"
+            if c.future is not None and c.future.cancelled():
+                status = "cancelled"
+            elif c.future is not None and c.future.done():
+                status = "failed" if c.error is not None or c.future.exception() is not None else "ready"
+            components[c.name] = {
+                "status": status,
+                "required": c.required,
+                "depends": list(c.depends),
+                "started_at": c.started_at,
+                "ready_at": c.ready_at,
+                "run_seconds": None if c.ready_at is None or c.started_at is None else c.ready_at - c.started_at,
+            }
+        return {"components": components, "minimum_ready_at": self.minimum_ready_at,
+                "critical_path": self.critical_path()}
+
+    def format_report(self) -> str:
+        """One-line summary for the log."""
+        report = self.report()
+        steps = []
+        for name in report["critical_path"]:
+            run = report["components"][name]["run_seconds"]
+            steps.append(f"{name} {run:.2f}s" if run is not None else name)
+        pending = [f"{name} ({info['status']}" + (f" at {info['ready_at']:.2f}s)" if info["ready_at"] else ")")
+                   for name, info in report["components"].items() if not info["required"]]
+        ready = report["minimum_ready_at"]
+        summary = f"Startup: minimum set ready in {ready:.2f}s" if ready is not None else "Startup: minimum set not ready"
+        summary += f"; critical path: {' → '.join(steps) or '-'}"
+        if pending:
+            summary += f"; off the critical path: {', '.join(pending)}"
+        return summary
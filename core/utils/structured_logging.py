@@ -0,0 +1,202 @@
+"""
+Structured, level-gated logging for Automoy.
+
+Debug detail on the hot paths (every parsed element, every prompt, every
+streamed token) used to be formatted eagerly with f-strings and
+``json.dumps(..., indent=2)`` whether or not anyone read it. The helpers here
+make that detail free unless its level is enabled:
+
+* ``LazyJSON`` / ``Lazy`` defer formatting until a handler actually emits the
+  record, so ``logger.debug("Messages: %s", LazyJSON(messages))`` costs one
+  level check when DEBUG is off
+* ``log_event`` attaches key=value fields to a record instead of baking them
+  into the message; ``StructuredFormatter`` renders them
+* ``Sampler`` lets high-volume events (streamed tokens, per-frame events)
+  through once every N occurrences
+* ``configure_logging`` applies a default level to the ``core`` loggers plus
+  per-subsystem overrides from config.txt
+
+Config keys:
+    LOG_LEVEL: INFO          # level for all core.* loggers
+    LOG_LEVELS:              # per-subsystem overrides, e.g. core.lm=DEBUG, core.utils.omniparser=WARNING
+    LOG_SAMPLE_EVERY: 50     # emit one of every N sampled high-volume events
+"""
+
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+# Root of the loggers that ``configure_logging`` manages (modules use getLogger(__name__))
+CORE_LOGGER = "core"
+
+DEFAULT_SAMPLE_EVERY = 50
+
+
+class Lazy:
+    """Defers ``func(*args, **kwargs)`` until the log record is formatted."""
+
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func: Callable[..., Any], *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return str(self.func(*self.args, **self.kwargs))
+
+
+class LazyJSON:
+    """Serializes ``obj`` to JSON only when the log record is formatted."""
+
+    __slots__ = ("obj", "indent", "limit")
+
+    def __init__(self, obj: Any, indent: Optional[int] = None, limit: Optional[int] = None):
+        self.obj = obj
+        self.indent = indent
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = json.dumps(self.obj, indent=self.indent, default=str, ensure_ascii=False)
+        if self.limit is not None and len(text) > self.limit:
+            return f"{text[:self.limit]}… ({len(text):,} chars)"
+        return text
+
+
+class LazyPreview:
+    """First ``limit`` characters of ``text``, cut only when formatted."""
+
+    __slots__ = ("text", "limit")
+
+    def __init__(self, text: Any, limit: int = 200):
+        self.text = text
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.text if isinstance(self.text, str) else str(self.text)
+        if len(text) > self.limit:
+            return f"{text[:self.limit]}… ({len(text):,} chars)"
+        return text
+
+
+def log_event(log: logging.Logger, level: int, event: str, **fields: Any) -> None:
+    """
+    Log ``event`` with structured fields, skipping all work if ``level`` is disabled.
+
+    Fields are kept on the record (``record.fields``) rather than formatted into
+    the message; values may be ``Lazy`` objects.
+    """
+    if log.isEnabledFor(level):
+        log.log(level, event, extra={"fields": fields}, stacklevel=2)
+
+
+class StructuredFormatter(logging.Formatter):
+    """Standard formatter that appends ``key=value`` pairs from ``log_event`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class Sampler:
+    """
+    Lets one of every ``every`` occurrences of a high-volume event through.
+
+    Counts are kept per key, so unrelated events do not starve each other.
+    """
+
+    def __init__(self, every: Optional[int] = None):
+        self._every = every
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def every(self) -> int:
+        return max(1, self._every or _sample_every)
+
+    def should_log(self, key: str) -> bool:
+        """Count an occurrence of ``key``; True for the 1st, (N+1)th, ... occurrence."""
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+    def count(self, key: str) -> int:
+        """How many times ``key`` has occurred."""
+        return self._counts.get(key, 0)
+
+    def reset(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._counts.clear()
+            else:
+                self._counts.pop(key, None)
+
+    def log(self, log: logging.Logger, level: int, key: str, msg: str, *args: Any) -> None:
+        """Log ``msg`` for a sampled occurrence of ``key`` (no work at all when ``level`` is off)."""
+        if log.isEnabledFor(level) and self.should_log(key):
+            log.log(level, msg, *args, stacklevel=2)
+
+
+_sample_every = DEFAULT_SAMPLE_EVERY
+
+
+def _level(value: Any, default: int = logging.INFO) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).strip().upper())
+    return level if isinstance(level, int) else default
+
+
+def parse_levels(spec: Any) -> Dict[str, int]:
+    """Parse ``"core.lm=DEBUG, core.utils.omniparser=WARNING"`` into {logger: level}."""
+    levels: Dict[str, int] = {}
+    if not spec or not isinstance(spec, str):
+        return levels
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = _level(level)
+    return levels
+
+
+def configure_logging(config=None, handlers: Iterable[logging.Handler] = ()) -> Dict[str, int]:
+    """
+    Apply LOG_LEVEL / LOG_LEVELS / LOG_SAMPLE_EVERY from config.
+
+    Args:
+        config: Config instance; read from config.txt when omitted
+        handlers: Handlers to attach to the ``core`` logger (e.g. the ones the
+            app logger uses) so module loggers reach the same outputs
+
+    Returns:
+        The {logger name: level} mapping that was applied
+    """
+    global _sample_every
+    if config is None:
+        try:
+            from config.config import Config
+            config = Config()
+        except Exception as e:
+            logger.debug(f"Could not read logging settings from config: {e}")
+
+    get = config.get if config is not None else (lambda key, default=None: default)
+    levels = {CORE_LOGGER: _level(get("LOG_LEVEL", "INFO"))}
+    levels.update(parse_levels(get("LOG_LEVELS", "")))
+    _sample_every = max(1, int(get("LOG_SAMPLE_EVERY", DEFAULT_SAMPLE_EVERY) or DEFAULT_SAMPLE_EVERY))
+
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    core_logger = logging.getLogger(CORE_LOGGER)
+    for handler in handlers:
+        if handler not in core_logger.handlers:
+            core_logger.addHandler(handler)
+    return levels
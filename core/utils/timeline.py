@@ -0,0 +1,253 @@
+"""
+Per-session latency timeline for the operator loop.
+
+``AutomoyOperator`` wraps each stage of a step (capture, encode, OmniParser
+request, on-demand captions, prompt build, LLM time-to-first-token and total,
+JSON parse, action execution, settle wait) in a span. Spans are kept in memory
+for the session and can be exported as:
+
+* Chrome trace-event JSON, viewable in chrome://tracing or https://ui.perfetto.dev
+* a summary table with count / mean / p50 / p90 / p99 / max per stage
+
+Config keys:
+    TIMELINE_EXPORT: True            # write the trace and summary when a session ends
+    TIMELINE_DIR: debug/timelines    # where they are written (relative to the project root)
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+# Get a logger for this module
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Stage names used by the operator, in pipeline order (summary rows follow this order)
+STAGES = (
+    "step",
+    "capture",
+    "encode",
+    "omniparser",
+    "caption",
+    "prompt_build",
+    "llm_ttft",
+    "llm_total",
+    "json_parse",
+    "action_execute",
+    "settle_wait",
+)
+
+
+@dataclass
+class Span:
+    """One timed stage. Times are seconds since the timeline's origin."""
+
+    name: str
+    start: float
+    duration: float
+    step: Optional[int] = None
+    track: int = 0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (``pct`` in 0-100) of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class SessionTimeline:
+    """
+    Collects spans for one operator session.
+
+    Safe to use from coroutines and worker threads. Each asyncio task (or
+    thread outside the loop) gets its own track so concurrent spans, such as
+    per-monitor parses, do not overlap on one row of the trace.
+    """
+
+    def __init__(self, session_id: str = "session", enabled: bool = True,
+                 on_span: Optional[Callable[[Span], None]] = None):
+        self.session_id = session_id
+        self.enabled = enabled
+        # Called with every finished span (e.g. ``metrics.observe_span``)
+        self.on_span = on_span
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.step: Optional[int] = None
+        self.spans: List[Span] = []
+        self._tracks: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        """Seconds since the timeline started."""
+        return time.perf_counter() - self.origin
+
+    def _track(self) -> int:
+        try:
+            key: Any = id(asyncio.current_task())
+        except RuntimeError:
+            key = threading.get_ident()
+        with self._lock:
+            return self._tracks.setdefault(key, len(self._tracks))
+
+    def record(self, name: str, start: float, end: float, step: Optional[int] = None, **attrs: Any) -> Optional[Span]:
+        """Add a span measured elsewhere (``start``/``end`` from ``now()``)."""
+        if not self.enabled:
+            return None
+        span = Span(name, start, max(0.0, end - start), self.step if step is None else step,
+                    self._track(), attrs)
+        with self._lock:
+            self.spans.append(span)
+        if self.on_span is not None:
+            try:
+                self.on_span(span)
+            except Exception as e:
+                logger.debug(f"Span listener failed for {name}: {e}")
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block.
+
+        Yields the span's attribute dict, so callers can attach results
+        (``attrs["elements"] = 42``). An exception is recorded as ``error``.
+        """
+        if not self.enabled:
+            yield attrs
+            return
+        start = self.now()
+        step = self.step
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, start, self.now(), step=step, **attrs)
+
+    def reset(self, session_id: Optional[str] = None) -> None:
+        """Drop all spans and restart the clock (e.g. for a new objective)."""
+        with self._lock:
+            self.session_id = session_id or self.session_id
+            self.origin = time.perf_counter()
+            self.started_at = time.time()
+            self.step = None
+            self.spans = []
+            self._tracks = {}
+
+    # ――― export ―――
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event format: one complete ("X") event per span, microseconds."""
+        events: List[Dict[str, Any]] = [{
+            "name": "process_name", "ph": "M", "pid": 1,
+            "args": {"name": f"Automoy {self.session_id}"},
+        }]
+        for track in sorted(set(self._tracks.values())):
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": track,
+                           "args": {"name": "operator" if track == 0 else f"task {track}"}})
+        for span in self.spans:
+            args = dict(span.attrs)
+            if span.step is not None:
+                args["step"] = span.step + 1
+            events.append({
+                "name": span.name,
+                "cat": "automoy",
+                "ph": "X",
+                "ts": round(span.start * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": 1,
+                "tid": span.track,
+                "args": args,
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"session_id": self.session_id, "started_at": self.started_at},
+        }
+
+    def export_chrome_trace(self, path: str | os.PathLike) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome_trace(), default=str), encoding="utf-8")
+        return path
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Latency statistics per stage, in milliseconds.
+
+        Returns:
+            {stage: {count, total_ms, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}}
+        """
+        durations: Dict[str, List[float]] = {}
+        for span in self.spans:
+            durations.setdefault(span.name, []).append(span.duration * 1000.0)
+
+        order = {name: i for i, name in enumerate(STAGES)}
+        stats: Dict[str, Dict[str, float]] = {}
+        for name in sorted(durations, key=lambda n: (order.get(n, len(order)), n)):
+            values = durations[name]
+            stats[name] = {
+                "count": len(values),
+                "total_ms": sum(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": percentile(values, 50),
+                "p90_ms": percentile(values, 90),
+                "p99_ms": percentile(values, 99),
+                "max_ms": max(values),
+            }
+        return stats
+
+    def summary_table(self) -> str:
+        """Plain-text table of ``summary()``."""
+        stats = self.summary()
+        if not stats:
+            return "(no spans recorded)"
+        header = f"{'stage':<16}{'count':>7}{'total':>11}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"
+        lines = [header, "-" * len(header)]
+        for name, s in stats.items():
+            lines.append(f"{name:<16}{s['count']:>7}{s['total_ms']:>9.0f}ms{s['mean_ms']:>8.1f}ms"
+                         f"{s['p50_ms']:>8.1f}ms{s['p90_ms']:>8.1f}ms{s['p99_ms']:>8.1f}ms{s['max_ms']:>8.1f}ms")
+        return "\n".join(lines)
+
+    def export(self, directory: str | os.PathLike) -> Optional[Path]:
+        """
+        Write ``<session>_trace.json`` and ``<session>_summary.txt`` to ``directory``.
+
+        Returns:
+            Path of the trace file, or None if nothing was recorded
+        """
+        if not self.spans:
+            return None
+        directory = Path(directory)
+        trace_path = self.export_chrome_trace(directory / f"{self.session_id}_trace.json")
+        (directory / f"{self.session_id}_summary.txt").write_text(self.summary_table() + "\n", encoding="utf-8")
+        return trace_path
+
+
+def timeline_export_dir(config=None) -> Optional[Path]:
+    """Directory for exported timelines, or None when TIMELINE_EXPORT is off."""
+    get = config.get if config is not None else (lambda key, default=None: default)
+    if not get("TIMELINE_EXPORT", True):
+        return None
+    directory = Path(get("TIMELINE_DIR", "") or "debug/timelines")
+    return directory if directory.is_absolute() else PROJECT_ROOT / directory
@@ -0,0 +1,66 @@
+"""
+Benchmark the screen capture backends in core/utils/screen_capture.py.
+
+Live backends (mss, pil) are only timed when a display is available; on Linux
+that can be a virtual one, e.g.:
+
+    Xvfb :99 -screen 0 3840x2160x24 &
+    DISPLAY=:99 python evaluations/benchmark_capture.py
+
+The replay backend always runs, so the script also works fully headless.
+"""
+
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.utils.screen_capture import (
+    MSSCaptureBackend,
+    PILCaptureBackend,
+    ReplayCaptureBackend,
+    benchmark_backend,
+    select_backend,
+)
+
+
+def run(iterations):
+    backends = []
+    if MSSCaptureBackend.available():
+        backends.append(("mss", MSSCaptureBackend()))
+        backends.append(("mss (reuse buffer)", MSSCaptureBackend(reuse_buffer=True)))
+    else:
+        print("mss: unavailable (package missing or no display)")
+    if PILCaptureBackend.available():
+        backends.append(("pil", PILCaptureBackend()))
+    else:
+        print("pil: unavailable (no display)")
+    backends.append(("replay 1080p", ReplayCaptureBackend(size=(1920, 1080))))
+    backends.append(("replay 4K", ReplayCaptureBackend(size=(3840, 2160))))
+
+    print(f"\n{'backend':<22} {'full ms':>10} {'region ms':>10}")
+    print("-" * 44)
+    for label, backend in backends:
+        full = benchmark_backend(backend, iterations)
+        left, top, right, bottom = backend.monitors()[1]
+        region = (left, top, left + (right - left) // 2, top + (bottom - top) // 2)
+        quarter = benchmark_backend(backend, iterations, region=region)
+        print(f"{label:<22} {full:>10.2f} {quarter:>10.2f}")
+        backend.close()
+
+    selected = select_backend("auto")
+    print(f"\nAuto-selected backend: {selected.name if selected else 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen capture backend benchmark")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Micro-benchmarks for the frame differencing primitives in
+core/utils/screenshot_utils.py at 1080p and 4K.
+
+Uses synthetic frames so it runs headless:
+
+    python evaluations/benchmark_frame_diff.py [--iterations 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.utils.screenshot_utils import (
+    FrameDiffer,
+    changed_regions,
+    diff_frames,
+    frame_difference,
+    make_thumbnail,
+    perceptual_hash,
+    tile_change_mask,
+)
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+
+def make_frames(size):
+    """Build a pseudo-desktop frame and a copy with one window-sized region changed."""
+    width, height = size
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, size=(height // 8, width // 8, 3), dtype=np.uint8)
+    base = np.kron(base, np.ones((8, 8, 1), dtype=np.uint8))
+    changed = base.copy()
+    changed[height // 4:height // 2, width // 3:width // 2] = 255
+    return Image.fromarray(base, "RGB"), Image.fromarray(changed, "RGB")
+
+
+def time_op(func, iterations):
+    """Return mean milliseconds per call."""
+    func()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / iterations
+
+
+def run(iterations):
+    print(f"{'resolution':<10} {'operation':<22} {'ms/call':>10}")
+    print("-" * 44)
+    for label, size in RESOLUTIONS.items():
+        frame_a, frame_b = make_frames(size)
+        thumb_a, thumb_b = make_thumbnail(frame_a), make_thumbnail(frame_b)
+        mask = tile_change_mask(thumb_a, thumb_b)
+
+        differ = FrameDiffer()
+        frames = [frame_a, frame_b]
+
+        def differ_update():
+            differ.update(frames[0])
+            frames.reverse()
+
+        ops = [
+            ("thumbnail", lambda: make_thumbnail(frame_a)),
+            ("perceptual_hash", lambda: perceptual_hash(thumb_a)),
+            ("frame_difference", lambda: frame_difference(thumb_a, thumb_b)),
+            ("tile_change_mask", lambda: tile_change_mask(thumb_a, thumb_b)),
+            ("changed_regions", lambda: changed_regions(mask, size)),
+            ("diff_frames", lambda: diff_frames(thumb_a, thumb_b, size)),
+            ("FrameDiffer.update", differ_update),
+        ]
+        for name, func in ops:
+            print(f"{label:<10} {name:<22} {time_op(func, iterations):>10.3f}")
+
+        diff = diff_frames(thumb_a, thumb_b, size)
+        print(f"{label:<10} regions={diff.regions} hash_distance={diff.hash_distance}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame differencing micro-benchmarks")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Throughput and latency benchmark for ActionExecutor and the input backends.
+
+Runs a mix of actions (key presses, hotkeys, clicks, short and long text)
+through ``ActionExecutor`` and reports per-action latency and actions/sec.
+Text workloads are run with ``TYPING_STRATEGY`` keys and auto so the
+clipboard-paste path can be compared with key-by-key typing.
+
+By default the recording backend is used, so nothing is injected and no
+display is needed. ``--key-latency`` and ``--event-latency`` give recorded
+calls a simulated cost (e.g. 0.002 s per keystroke). A live backend
+(``--backend xdotool``) sends real input to the focused window and needs
+``--live``.
+
+    python evaluations/benchmark_input.py [--backend recording] [--repeat 20]
+        [--key-latency 0.002] [--event-latency 0.0005] [--live] [--json results.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.utils.operating_system.action_executor import ActionExecutor
+from core.utils.operating_system.input_backend import BACKENDS, RecordingInputBackend, create_backend
+from core.utils.operating_system.text_input import TextTyper
+
+PARAGRAPH = ("Automoy status report\n"
+             "All scheduled tasks finished without errors; see https://example.com/reports/latest "
+             "for the full log.\n\tNext run: tomorrow 09:00")
+
+# name: action, whether the text strategy matters
+WORKLOADS = {
+    "key": ({"type": "key", "key": "enter", "summary": "Confirm"}, False),
+    "hotkey": ({"type": "key_sequence", "keys": ["ctrl", "l"], "summary": "Focus the address bar"}, False),
+    "click": ({"type": "click", "coordinate": {"x": 640, "y": 360}, "summary": "Click the button"}, False),
+    "type_short": ({"type": "type", "text": "chrome", "summary": "Search for Chrome"}, True),
+    "type_url": ({"type": "type", "text": "https://example.com/search?q=automoy+benchmark", "summary": "Enter URL"}, True),
+    "type_paragraph": ({"type": "type", "text": PARAGRAPH, "summary": "Write the report"}, True),
+}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_workload(executor, action, repeat):
+    """Execute ``action`` ``repeat`` times; returns the latency summary."""
+    latencies, errors = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = executor.execute(action)
+        latencies.append(time.perf_counter() - started)
+        if result.startswith("ERROR") or result.startswith("Action execution error"):
+            errors += 1
+    total = sum(latencies)
+    return {
+        "runs": repeat,
+        "errors": errors,
+        "actions_per_s": repeat / total if total else 0.0,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p90_ms": _percentile(latencies, 0.9) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ActionExecutor / input backend benchmark")
+    parser.add_argument("--backend", default=RecordingInputBackend.name, choices=sorted(BACKENDS))
+    parser.add_argument("--workload", action="append", choices=sorted(WORKLOADS),
+                        help="workload to run (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=20, help="executions per workload")
+    parser.add_argument("--key-latency", type=float, default=0.002,
+                        help="recording backend: simulated seconds per typed character")
+    parser.add_argument("--event-latency", type=float, default=0.0005,
+                        help="recording backend: simulated seconds per input call")
+    parser.add_argument("--restore-delay", type=float, default=None,
+                        help="override TYPING_RESTORE_DELAY (seconds before the clipboard is restored)")
+    parser.add_argument("--live", action="store_true", help="allow a backend that injects real input")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.backend == RecordingInputBackend.name:
+        backend = RecordingInputBackend(event_latency=args.event_latency, key_latency=args.key_latency)
+    elif not args.live:
+        parser.error(f"--backend {args.backend} sends real input to the focused window; add --live")
+    elif not BACKENDS[args.backend].available():
+        parser.error(f"input backend '{args.backend}' is not available here")
+    else:
+        backend = create_backend(args.backend)
+
+    results = []
+    print(f"Input backend: {backend.name}")
+    print(f"  {'workload':<16}{'strategy':<10}{'actions/s':>10}{'mean':>10}{'p50':>10}{'p90':>10}{'max':>10}")
+    for name in args.workload or list(WORKLOADS):
+        action, text = WORKLOADS[name]
+        for strategy in (("keys", "auto") if text else ("-",)):
+            executor = ActionExecutor(backend)
+            if text:
+                configured = executor.typer
+                executor.typer = TextTyper(strategy=strategy, paste_min_chars=configured.paste_min_chars,
+                                           key_interval=configured.key_interval,
+                                           restore_delay=configured.restore_delay if args.restore_delay is None
+                                           else args.restore_delay,
+                                           clipboard=backend.clipboard)
+            result = {"workload": name, "strategy": strategy, "backend": backend.name,
+                      **run_workload(executor, action, args.repeat)}
+            results.append(result)
+            errors = f"  {result['errors']} errors" if result["errors"] else ""
+            print(f"  {name:<16}{strategy:<10}{result['actions_per_s']:>10.1f}{result['mean_ms']:>8.1f}ms"
+                  f"{result['p50_ms']:>8.1f}ms{result['p90_ms']:>8.1f}ms{result['max_ms']:>8.1f}ms{errors}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark of the OmniParser CPU serving backends against the stock PyTorch path.
+
+For each backend (``torch``, ``onnx`` and ``int8`` by default) a CPU server is
+launched, every frame is parsed ``--repeat`` times and the per-frame latency
+recorded. Elements are compared with the first backend (the baseline): boxes
+are matched one-to-one by IoU, and a matched pair agrees on content when the
+normalized texts are equal.
+
+    python evaluations/benchmark_omniparser_cpu.py shot1.png shot2.png
+        [--backends torch,onnx,int8] [--threads 8] [--repeat 3] [--port 8131]
+        [--url onnx=http://127.0.0.1:8112] [--json results.json]
+
+Launching needs the automoy_env server environment and the exports made by
+``python installer/omniparser_setup.py --cpu``; a backend whose export is
+missing is served by the PyTorch model (shown in the ``model`` column).
+``--url name=URL`` measures a server that is already running instead.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.utils.omniparser.omniparser_interface import OmniParserInterface
+from core.utils.omniparser.tiling import iou
+from core.utils.timeline import percentile
+
+
+def _elements(parsed):
+    """(bbox, normalized content) pairs of a parse result."""
+    elements = []
+    for item in (parsed or {}).get("parsed_content_list") or []:
+        bbox = item.get("bbox_normalized") or item.get("bbox")
+        if bbox and len(bbox) >= 4:
+            content = " ".join(str(item.get("content") or "").lower().split())
+            elements.append((tuple(float(v) for v in bbox[:4]), content))
+    return elements
+
+
+def match_elements(reference, candidate, iou_threshold=0.5):
+    """
+    Compare two element lists from the same frame.
+
+    Pairs are matched greedily by descending IoU, each element at most once.
+
+    Returns:
+        dict with ``matched``, ``precision``, ``recall``, ``f1`` (box agreement)
+        and ``content`` (share of matched pairs whose text is equal)
+    """
+    pairs = sorted(
+        ((iou(ref[0], cand[0]), i, j)
+         for i, ref in enumerate(reference) for j, cand in enumerate(candidate)),
+        reverse=True,
+    )
+    used_ref, used_cand, same_text = set(), set(), 0
+    for overlap, i, j in pairs:
+        if overlap < iou_threshold:
+            break
+        if i in used_ref or j in used_cand:
+            continue
+        used_ref.add(i)
+        used_cand.add(j)
+        same_text += reference[i][1] == candidate[j][1]
+
+    matched = len(used_ref)
+    precision = matched / len(candidate) if candidate else float(not reference)
+    recall = matched / len(reference) if reference else float(not candidate)
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"matched": matched, "precision": precision, "recall": recall, "f1": f1,
+            "content": same_text / matched if matched else float(not reference and not candidate)}
+
+
+def run_backend(name, frames, args, url=None):
+    """Parse every frame on one backend; returns latencies and the last parse of each frame."""
+    port = args.port
+    interface = OmniParserInterface(server_url=url or f"http://127.0.0.1:{port}")
+    result = {"backend": name, "model": "external" if url else None, "cold_start_seconds": None}
+
+    if url is None:
+        extra_env = None
+        if args.threads:
+            threads = str(args.threads)
+            extra_env = {"OMNIPARSER_THREADS": threads, "OMP_NUM_THREADS": threads,
+                         "MKL_NUM_THREADS": threads}
+        if not interface.launch_server(port=port, device="cpu", cpu_backend=name,
+                                       extra_env=extra_env, timeout=args.timeout):
+            print(f"❌ {name}: server did not start")
+            return None
+        result["model"] = interface.startup_metrics.get("model")
+        result["cold_start_seconds"] = interface.startup_metrics.get("cold_start_seconds")
+
+    latencies, parses = [], []
+    try:
+        for frame in frames:
+            # Warm-up parse (first-call allocations, lazy imports in the server)
+            interface._request_parse(frame, overlay=False)
+            parsed = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                # Bypasses parse_screenshot's same-path cache so every repeat hits the server
+                parsed = interface._request_parse(frame, overlay=False)
+                latencies.append(time.perf_counter() - started)
+            parses.append(_elements(parsed))
+    finally:
+        if url is None:
+            interface.stop_server(force=True)
+
+    result.update({
+        "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "elements": sum(len(p) for p in parses) / len(parses) if parses else 0.0,
+        "parses": parses,
+    })
+    return result
+
+
+def compare(baseline, result):
+    """Mean per-frame agreement of ``result`` with ``baseline``."""
+    scores = [match_elements(ref, cand) for ref, cand in zip(baseline["parses"], result["parses"])]
+    if not scores:
+        return {"f1": 0.0, "content": 0.0}
+    return {key: sum(s[key] for s in scores) / len(scores) for key in ("f1", "precision", "recall", "content")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OmniParser CPU backend benchmark")
+    parser.add_argument("frames", nargs="*", help="Screenshots to parse (defaults to the sample screenshot)")
+    parser.add_argument("--backends", default="torch,onnx,int8",
+                        help="Comma-separated backends; the first is the baseline")
+    parser.add_argument("--url", action="append", default=[], metavar="BACKEND=URL",
+                        help="Use an already running server for BACKEND")
+    parser.add_argument("--threads", type=int, default=0, help="Server inference threads (0 = config)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8131)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    frames = [pathlib.Path(f) for f in args.frames] or \
+        [pathlib.Path(PROJECT_ROOT) / "core" / "utils" / "omniparser" / "sample_screenshot.png"]
+    missing = [str(f) for f in frames if not f.is_file()]
+    if missing:
+        parser.error(f"frames not found: {', '.join(missing)}")
+    urls = dict(item.split("=", 1) for item in args.url)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+
+    results = [r for r in (run_backend(b, frames, args, urls.get(b)) for b in backends) if r]
+    if not results:
+        sys.exit(1)
+    baseline = results[0]
+
+    print(f"\n{len(frames)} frame(s) × {args.repeat}, baseline: {baseline['backend']}")
+    print(f"{'backend':<8} {'model':<16} {'cold s':>7} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'speedup':>8} {'elems':>6} {'box F1':>7} {'text':>6}")
+    print("-" * 92)
+    for result in results:
+        result["agreement"] = compare(baseline, result)
+        speedup = baseline["latency_mean"] / result["latency_mean"] if result["latency_mean"] else 0.0
+        result["speedup"] = speedup
+        cold = result["cold_start_seconds"]
+        print(f"{result['backend']:<8} {str(result['model']):<16} {cold if cold is not None else '-':>7} "
+              f"{result['latency_mean'] * 1000:>9.0f} {result['latency_p50'] * 1000:>8.0f} "
+              f"{result['latency_p95'] * 1000:>8.0f} {speedup:>7.2f}x {result['elements']:>6.1f} "
+              f"{result['agreement']['f1']:>7.3f} {result['agreement']['content']:>6.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([{k: v for k, v in r.items() if k != "parses"} for r in results], f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+End-to-end benchmark of the operator pipeline, fully offline.
+
+Runs ``AutomoyOperator.operate_loop`` for a set of scripted objectives against:
+
+* a local mock OmniParser HTTP server (the real ``OmniParserInterface`` client
+  talks to it, so encoding, caching and metrics are exercised)
+* a local mock LM Studio server that streams canned thinking, step and action
+  responses as server-sent events; the real ``MainInterface`` and
+  ``call_lmstudio_model`` talk to it, so prompt construction, streaming, JSON
+  extraction and response parsing all stay real
+* the replay capture backend and a no-op action executor
+
+Scenarios cover the LLM response shapes the JSON parsing has to cope with
+(fenced, bare, <think>-prefixed, debug-polluted and list-wrapped actions), a
+multi-action plan (core/utils/action_batch.py), the Chrome launch goals and the
+calculator goals. For each scenario it reports
+steps/sec, per-stage latency, OmniParser client cache hit rate and memory.
+
+    python evaluations/benchmark_operator.py [--scenario chrome] [--repeat 3]
+        [--parse-latency 0] [--llm-ttft 0] [--settle-ms 60] [--json results.json]
+
+No network or display is needed: pyautogui is only imported when an action is
+executed (core/utils/plugins.py), and the no-op executor never does. The run
+happens in a temporary working directory, so the screenshots the operator saves
+are thrown away. Exits non-zero if any scenario did not execute its script.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image, ImageDraw
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.utils.action_batch import ActionBatch
+from core.utils.metrics import PARSE_CACHE
+from core.utils.omniparser.omniparser_interface import OmniParserInterface
+from core.utils.screen_capture import ReplayCaptureBackend, get_capture_backend, set_capture_backend
+from core.utils.screen_settle import ScreenSettleDetector
+
+
+def _element(content, x, y, kind="icon", w=0.04, h=0.04):
+    return {"type": kind, "content": content, "interactivity": kind == "icon", "source": "mock",
+            "bbox_normalized": [x, y, x + w, y + h]}
+
+
+DESKTOP = [_element("Recycle Bin", 0.01, 0.02), _element("Google Chrome", 0.01, 0.12),
+           _element("Start", 0.0, 0.96, w=0.03), _element("Search", 0.04, 0.96, "text", w=0.1)]
+START_MENU = DESKTOP + [_element("Type here to search", 0.05, 0.9, "text", w=0.2),
+                        _element("Google Chrome", 0.1, 0.3), _element("Calculator", 0.2, 0.3)]
+CALCULATOR = DESKTOP + [_element(label, 0.4 + 0.05 * (i % 4), 0.4 + 0.06 * (i // 4), w=0.045, h=0.05)
+                        for i, label in enumerate("789+456-123*0.=/")] + [_element("0", 0.6, 0.3, "text")]
+
+
+def _action(kind, summary, **fields):
+    return {"type": kind, "summary": summary, **fields}
+
+
+def _fenced(obj):
+    return f"Here is the next action:\n```json\n{json.dumps(obj, indent=2)}\n```"
+
+
+def _bare(obj):
+    return json.dumps(obj)
+
+
+def _think(obj):
+    return f"<think>The step says what to do; one action is enough.</think>\n```json\n{json.dumps(obj)}\n```"
+
+
+def _debug_noise(obj):
+    return f"[DEBUG] stream opened\n```json\n{json.dumps(obj)}\n```\n[DEBUG] stream closed"
+
+
+def _listed(obj):
+    return f"```json\n{json.dumps([obj])}\n```"
+
+
+def _plan(objs):
+    """Multi-action plan: this action and the following ones formatted as ``None``."""
+    return f"```json\n{json.dumps(objs)}\n```"
+
+
+def script_responses(actions, formats):
+    """One LLM response per formatter; ``_plan`` takes its action plus the ``None``-formatted ones after it."""
+    responses = []
+    for i, (fmt, action) in enumerate(zip(formats, actions)):
+        if fmt is _plan:
+            end = i + 1
+            while end < len(formats) and formats[end] is None:
+                end += 1
+            responses.append(_plan(actions[i:end]))
+        elif fmt is not None:
+            responses.append(fmt(action))
+    return responses
+
+
+CHROME_ACTIONS = [
+    _action("key", "Open the Start menu", key="win"),
+    _action("type", "Search for Chrome", text="chrome"),
+    _action("key", "Launch Chrome", key="enter"),
+]
+
+# name: objective, screens returned by the mock parser in turn, actions, response formatter per action
+SCENARIOS = {
+    "json_fenced": ("Open Google Chrome", [DESKTOP, START_MENU], CHROME_ACTIONS, [_fenced] * 3),
+    "json_bare": ("Open Google Chrome", [DESKTOP, START_MENU], CHROME_ACTIONS, [_bare] * 3),
+    "json_mixed": ("Open Google Chrome", [DESKTOP, START_MENU], CHROME_ACTIONS, [_think, _debug_noise, _listed]),
+    "chrome": ("Launch Google Chrome browser", [DESKTOP, START_MENU, DESKTOP], CHROME_ACTIONS + [
+        _action("type", "Enter the address", text="https://example.com"),
+        _action("key", "Load the page", key="enter"),
+    ], [_fenced] * 5),
+    # One LLM call plans Win → type → Enter; needs ACTION_BATCH (the executor repaints the screen per action)
+    "chrome_batched": ("Open Google Chrome", [DESKTOP, START_MENU], CHROME_ACTIONS, [_plan, None, None]),
+    "calculator": ("Open Calculator and compute 12 + 7", [DESKTOP, START_MENU, CALCULATOR], [
+        _action("key", "Open the Start menu", key="win"),
+        _action("type", "Search for Calculator", text="calculator"),
+        _action("key", "Launch Calculator", key="enter"),
+        _action("type", "Enter the sum", text="12+7"),
+        _action("key", "Evaluate", key="enter"),
+    ], [_fenced] * 5),
+}
+
+
+class MockOmniParser:
+    """Local HTTP server speaking the OmniParser /parse/ and /probe/ contract."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.screens = [DESKTOP]
+        self.requests = 0
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._send({"message": "ready"})
+
+            def do_POST(self):
+                json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                screen = outer.screens[min(outer.requests, len(outer.screens) - 1)]
+                outer.requests += 1
+                if outer.latency:
+                    time.sleep(outer.latency)
+                self._send({"parsed_content_list": screen, "latency": outer.latency})
+
+            def _send(self, body):
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def reset(self, screens) -> None:
+        self.screens = screens
+        self.requests = 0
+
+    def close(self) -> None:
+        self.server.shutdown()
+
+
+class MockLMStudio:
+    """Local HTTP server speaking the LM Studio /v1/models and streaming /v1/chat/completions contract."""
+
+    def __init__(self, ttft: float = 0.0, tokens_per_second: float = 0.0):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.pending = []
+        self.requests = 0
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                payload = json.dumps({"data": [{"id": "mock-model", "object": "model"}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                outer.requests += 1
+                text = outer.pending.pop(0) if outer.pending else ""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                if outer.ttft:
+                    time.sleep(outer.ttft)
+                for i in range(0, len(text), 4):
+                    self._event({"choices": [{"delta": {"content": text[i:i + 4]}, "finish_reason": None}]})
+                    if outer.tokens_per_second:
+                        time.sleep(1.0 / outer.tokens_per_second)
+                self._event({"choices": [{"delta": {}, "finish_reason": "stop"}]})
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def _event(self, body):
+                self.wfile.write(f"data: {json.dumps(body)}\n\n".encode())
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def queue(self, text: str) -> None:
+        """Stream ``text`` as the response to the next completion request."""
+        self.pending.append(text)
+
+    def reset(self) -> None:
+        self.pending = []
+        self.requests = 0
+
+    def close(self) -> None:
+        self.server.shutdown()
+
+
+class ScriptedLLM:
+    """Queues the canned response for each call on the mock LM Studio server, then makes the real call."""
+
+    def __init__(self, inner, server, steps, responses):
+        self._inner = inner
+        self.server = server
+        self.steps = steps
+        self.responses = list(responses)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def get_llm_response(self, model=None, messages=None, objective=None, session_id=None,
+                               response_format_type=None, thinking_callback=None, **kwargs):
+        if response_format_type == "step_generation":
+            steps = {"steps": [{"step_number": i + 1, "description": a["summary"]} for i, a in enumerate(self.steps)]}
+            self.server.queue(f"```json\n{json.dumps(steps)}\n```")
+        else:
+            self.server.queue("Open the right application, then act on what is on screen, one step at a time.")
+        return await self._inner.get_llm_response(model, messages, objective, session_id,
+                                                  response_format_type=response_format_type,
+                                                  thinking_callback=thinking_callback)
+
+    async def get_next_action(self, model=None, messages=None, objective=None, session_id=None,
+                              screenshot_path=None, thinking_callback=None, **kwargs):
+        if not self.responses:
+            return None, None, "Script has no more actions"
+        self.server.queue(self.responses.pop(0))
+        return await self._inner.get_next_action(model, messages, objective, session_id,
+                                                 screenshot_path=screenshot_path, thinking_callback=thinking_callback)
+
+
+class NullExecutor:
+    """
+    Accepts every action without touching the desktop.
+
+    With ``repaint``, each action lengthens a line of "typed text" on the replay
+    frame: a change of a few tiles, like typing into a search box.
+    """
+
+    def __init__(self, repaint: bool = False):
+        self.actions = []
+        self.repaint = repaint
+
+    def execute(self, action):
+        self.actions.append(action)
+        if self.repaint:
+            frame = Image.new("RGB", (1920, 1080), (30, 60, 120))
+            ImageDraw.Draw(frame).rectangle((700, 520, 700 + 40 * len(self.actions), 536), fill=(255, 255, 255))
+            set_capture_backend(ReplayCaptureBackend([frame]))
+        return f"Executed {action.get('type')}: {action.get('summary', '')}"
+
+
+def _rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _lmstudio_config(url):
+    """Config class that points LM Studio (and nothing else) at ``url``."""
+    from config import Config
+
+    class BenchmarkConfig(Config):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._data.update({"OPENAI": False, "LMSTUDIO": True, "LMSTUDIO_API_URL": url})
+
+    return BenchmarkConfig
+
+
+def _executed(executed, scripted):
+    """Whether every scripted action ran in order (parsing may add fields such as confidence)."""
+    return len(executed) == len(scripted) and all(
+        all(done.get(k) == v for k, v in action.items()) for done, action in zip(executed, scripted))
+
+
+async def run_scenario(name, parser, llm, args):
+    from core.operate import AutomoyOperator
+
+    objective, screens, actions, formats = SCENARIOS[name]
+    parser.reset(screens)
+    llm.reset()
+    gui_updates = 0
+
+    async def count_gui_update(endpoint, payload):
+        nonlocal gui_updates
+        gui_updates += 1
+
+    pause_event = asyncio.Event()
+    pause_event.set()
+    operator = AutomoyOperator(objective=objective, manage_gui_window_func=None,
+                               omniparser=OmniParserInterface(server_url=parser.url),
+                               pause_event=pause_event, update_gui_state_func=count_gui_update)
+    # Benchmark runs leave no artifacts behind; the static replay screen settles after --settle-ms
+    operator.config._data.update({"TIMELINE_EXPORT": False, "SETTLE_DETECTION": True,
+                                  "SETTLE_STABLE_MS": args.settle_ms,
+                                  "SETTLE_CHANGE_TIMEOUT": args.settle_ms / 1000.0})
+    operator.settle_detector = ScreenSettleDetector.from_config(operator.config)
+    operator.record_sessions = False
+    operator.multi_monitor = False
+    operator.llm_interface.api_source = "lmstudio"
+    operator.llm_interface = ScriptedLLM(operator.llm_interface, llm, actions, script_responses(actions, formats))
+    operator.action_batch = ActionBatch.from_config(operator.config, operator.settle_detector)
+    operator.action_executor = NullExecutor(repaint=None in formats)
+
+    hits, misses = PARSE_CACHE.value(result="hit"), PARSE_CACHE.value(result="miss")
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    await operator.operate_loop()
+    elapsed = time.perf_counter() - started
+    heap_peak = None
+    if args.trace_memory:
+        heap_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    hits = PARSE_CACHE.value(result="hit") - hits
+    misses = PARSE_CACHE.value(result="miss") - misses
+    stages = operator.timeline.summary()
+    steps = stages.get("step", {}).get("count", 0)
+    return {
+        "scenario": name,
+        "completed": _executed(operator.action_executor.actions, actions),
+        "steps": steps,
+        "elapsed_s": elapsed,
+        "steps_per_s": steps / elapsed if elapsed else 0.0,
+        "llm_calls": llm.requests,
+        "parse_requests": parser.requests,
+        "parse_cache_hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "gui_updates": gui_updates,
+        "peak_rss_mb": _rss_mb(),
+        "heap_peak_mb": heap_peak,
+        "stages": {stage: {k: round(v, 3) for k, v in s.items()} for stage, s in stages.items()},
+    }
+
+
+def print_result(result):
+    status = "ok" if result["completed"] else "INCOMPLETE"
+    heap = f"  heap peak {result['heap_peak_mb']:.1f} MB" if result["heap_peak_mb"] is not None else ""
+    print(f"\n{result['scenario']} [{status}]: {result['steps']} steps in {result['elapsed_s']:.2f}s "
+          f"({result['steps_per_s']:.1f} steps/s), {result['llm_calls']} LLM calls, "
+          f"{result['parse_requests']} parses, cache hit rate {result['parse_cache_hit_rate']:.0%}, "
+          f"{result['gui_updates']} GUI updates, peak RSS {result['peak_rss_mb']:.0f} MB{heap}")
+    print(f"  {'stage':<16}{'count':>7}{'mean':>10}{'p50':>10}{'p90':>10}{'max':>10}")
+    for stage, s in result["stages"].items():
+        print(f"  {stage:<16}{s['count']:>7}{s['mean_ms']:>8.1f}ms{s['p50_ms']:>8.1f}ms"
+              f"{s['p90_ms']:>8.1f}ms{s['max_ms']:>8.1f}ms")
+
+
+async def run(args):
+    from core.lm.handlers import lmstudio_handler
+
+    previous_backend = get_capture_backend()
+    # One static frame: settle detection sees a still screen, like an idle desktop
+    set_capture_backend(ReplayCaptureBackend([Image.new("RGB", (1920, 1080), (30, 60, 120))]))
+    parser = MockOmniParser(latency=args.parse_latency)
+    llm = MockLMStudio(ttft=args.llm_ttft, tokens_per_second=args.tokens_per_second)
+    previous_config = lmstudio_handler.Config
+    lmstudio_handler.Config = _lmstudio_config(llm.url)
+    previous_cwd = os.getcwd()
+    results = []
+    try:
+        # The operator saves screenshots relative to the working directory
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            for name in args.scenario or list(SCENARIOS):
+                for _ in range(args.repeat):
+                    result = await run_scenario(name, parser, llm, args)
+                    print_result(result)
+                    results.append(result)
+            os.chdir(previous_cwd)
+    finally:
+        os.chdir(previous_cwd)
+        lmstudio_handler.Config = previous_config
+        parser.close()
+        llm.close()
+        set_capture_backend(previous_backend)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end operator benchmark")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario")
+    parser.add_argument("--parse-latency", type=float, default=0.0, help="mock OmniParser seconds per parse")
+    parser.add_argument("--llm-ttft", type=float, default=0.0, help="mock LM Studio seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="mock LM Studio streaming rate (0 = unthrottled)")
+    parser.add_argument("--settle-ms", type=int, default=60,
+                        help="stable time the settle detector waits for (the screen never changes here)")
+    parser.add_argument("--trace-memory", action="store_true", help="report Python heap peak (slows the run)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show operator logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    incomplete = sorted({r["scenario"] for r in results if not r["completed"]})
+    if incomplete:
+        print(f"\nIncomplete scenarios: {', '.join(incomplete)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
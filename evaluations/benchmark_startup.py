@@ -0,0 +1,164 @@
+"""
+Startup import-cost benchmark, tracked over time.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``
+(``--repeat`` times; the fastest run is kept). The report shows the total
+import time, the heaviest top-level packages and whether any of the lazily
+loaded integrations (core/utils/plugins.py) were imported anyway. Every run is
+appended to a JSON-lines history and compared with the previous entry for the
+same module, so regressions show up as a delta.
+
+    python evaluations/benchmark_startup.py [core.operate ...] [--repeat 5]
+        [--top 15] [--history debug/benchmarks/startup_history.jsonl]
+        [--no-history] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+DEFAULT_MODULES = ["core.operate", "core.utils.omniparser.omniparser_interface"]
+DEFAULT_HISTORY = os.path.join(PROJECT_ROOT, "debug", "benchmarks", "startup_history.jsonl")
+
+# Packages that should only be imported when their integration is used
+LAZY_PACKAGES = ("pyVmomi", "pyVim", "undetected_chromedriver", "selenium", "bs4",
+                 "pyautogui", "psutil", "keyboard", "pyscreeze", "torch")
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        dict of module name → (self µs, cumulative µs), in import order
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return modules
+
+
+def measure(module):
+    """Import ``module`` once in a fresh interpreter; returns (wall seconds, importtime table, error)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=300,
+    )
+    wall = time.perf_counter() - started
+    error = None
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ["import failed"])[-1]
+    return wall, parse_importtime(result.stderr), error
+
+
+def summarize(module, table, wall, error, top, interpreter=()):
+    """Report dict for one module; modules in ``interpreter`` (loaded by a bare interpreter) are left out."""
+    table = {name: times for name, times in table.items() if name not in interpreter}
+    # Top-level packages carry the cumulative cost of their submodules
+    roots = {}
+    for name, (_, cumulative) in table.items():
+        package = name.split(".")[0]
+        if name == package:
+            roots[package] = max(roots.get(package, 0), cumulative)
+    total_us = table[module][1] if module in table else sum(roots.values())
+    heaviest = sorted(roots.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "error": error,
+        "wall_seconds": wall,
+        "import_seconds": total_us / 1e6,
+        "modules_imported": len(table),
+        "heaviest": [{"package": name, "seconds": us / 1e6} for name, us in heaviest],
+        "eager_integrations": sorted(p for p in LAZY_PACKAGES if p in roots),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def previous_runs(history_path):
+    """Last recorded run per module."""
+    previous = {}
+    if os.path.isfile(history_path):
+        with open(history_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                previous[entry.get("module")] = entry
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Automoy startup import-cost benchmark")
+    parser.add_argument("modules", nargs="*", help=f"Modules to import (default: {', '.join(DEFAULT_MODULES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh imports per module; the fastest is kept")
+    parser.add_argument("--top", type=int, default=10, help="heaviest packages to list")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines file runs are appended to")
+    parser.add_argument("--no-history", action="store_true", help="do not read or append the history")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    previous = {} if args.no_history else previous_runs(args.history)
+    commit = _git_commit()
+    interpreter = set(measure(None)[1])
+    results = []
+    for module in args.modules or DEFAULT_MODULES:
+        runs = [measure(module) for _ in range(max(1, args.repeat))]
+        wall, table, error = min(runs, key=lambda run: run[0])
+        report = summarize(module, table, wall, error, args.top, interpreter)
+        report.update({"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit,
+                       "python": platform.python_version(), "platform": platform.system()})
+        results.append(report)
+
+        print(f"\n{module}")
+        if error:
+            print(f"  ❌ import failed: {error}")
+        last = previous.get(module)
+        delta = ""
+        if last and not last.get("error") and not error:
+            change = report["import_seconds"] - last["import_seconds"]
+            delta = f" ({change * 1000:+.0f} ms vs {last.get('commit') or last.get('timestamp')})"
+        print(f"  import {report['import_seconds'] * 1000:.0f} ms{delta}, wall {wall * 1000:.0f} ms, "
+              f"{report['modules_imported']} modules")
+        for item in report["heaviest"]:
+            print(f"    {item['package']:<32} {item['seconds'] * 1000:>8.1f} ms")
+        if report["eager_integrations"]:
+            print(f"  ⚠️ imported eagerly: {', '.join(report['eager_integrations'])}")
+
+    if not args.no_history:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            for report in results:
+                f.write(json.dumps(report) + "\n")
+        print(f"\nHistory appended to {args.history}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
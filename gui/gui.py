@@ -7,16 +7,25 @@ from typing import List, Optional, Dict, Any
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import asyncio
+import sys
+
+# gui.py is started as a script; make the project packages importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.utils.omniparser.overlay import materialize_overlay
 
 # --- Constants ---
 GUI_PORT = 8001
 LOG_DIR_GUI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "debug", "logs", "gui")
 STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gui_state.json") # File in project root to match backend
 GOAL_REQUEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "goal_request.json") # File in project root to match backend
+METRICS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "debug", "metrics", "automoy.prom") # Written by core/utils/metrics.py
 
 # --- Logging Setup ---
 os.makedirs(LOG_DIR_GUI, exist_ok=True)
@@ -153,10 +162,37 @@ async def get_root(request: Request):
         logger.error(f"HTML file not found at {os.path.join(script_dir, 'templates', 'index.html')}")
         raise HTTPException(status_code=500, detail="Internal server error: UI file not found.")
 
+@app.get("/processed_screenshot.png")
+async def get_processed_screenshot():
+    # Decoded on demand, so parses made while nobody is watching cost nothing here
+    path = await asyncio.to_thread(materialize_overlay, static_files_path)
+    if path is None:
+        raise HTTPException(status_code=404, detail="No processed screenshot yet")
+    return FileResponse(path, media_type="image/png", headers={"Cache-Control": "no-store"})
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+def read_metrics() -> str:
+    """Backend metrics snapshot plus its age, so scrapers can tell a stalled backend from an idle one."""
+    try:
+        with open(METRICS_FILE, "r", encoding="utf-8") as f:
+            body = f.read()
+        age = time.time() - os.stat(METRICS_FILE).st_mtime
+    except FileNotFoundError:
+        body, age = "", -1
+    return body + (
+        "# HELP automoy_gui_metrics_snapshot_age_seconds Age of the backend metrics snapshot (-1 if none yet)\n"
+        "# TYPE automoy_gui_metrics_snapshot_age_seconds gauge\n"
+        f"automoy_gui_metrics_snapshot_age_seconds {age:.3f}\n"
+    )
+
+@app.get("/metrics")
+async def metrics():
+    body = await asyncio.to_thread(read_metrics)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
 def run_gui(host="127.0.0.1", port=8001):
     logger.info(f"Attempting to start Uvicorn on {host}:{port} with 1 worker")
     print(f"[GUI_RUN_GUI_PRINT] Attempting to start Uvicorn on {host}:{port} with 1 worker")
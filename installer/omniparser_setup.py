@@ -3,7 +3,9 @@ omniparser_setup.py – pulls / patches / launches OmniParser in GPU‑friendly
 
 Run once inside your `automoy_env`:
     conda activate automoy_env
-    python omniparser_setup.py
+    python omniparser_setup.py [--cpu]
+
+`--cpu` also exports ONNX / int8 models for CPU-only hosts (see apply_cpu_patches).
 """
 
 import os
@@ -84,7 +86,8 @@ def apply_gpu_patches() -> None:
     2. Optional install of xformers / flash-attn
     3. Patch:
        • routers/parse.py       → RGB fix, det.cpu(), fp16 autocast, cache clear
-       • omniparserserver.py    → set reload=False, workers=1
+       • omniparserserver.py    → set reload=False, workers=1, free the
+                                  CUDA cache after each parse
     4. Patch server_startup.py   → load Florence-2 in fp16 on CUDA
     """
     print("\n🔧 Applying GPU-memory patches…")
@@ -167,6 +170,27 @@ def apply_gpu_patches() -> None:
             mono.write_text(patched, "utf-8")
             print("✅ Patched omniparserserver.py → reload=False, workers=1")
 
+    # 3c️⃣ Free the CUDA cache after each parse / caption request (server-side:
+    #     the Automoy client no longer imports torch)
+    if mono.exists():
+        main_txt = mono.read_text("utf-8")
+        main_guard = re.search(r"^if __name__ == [\"']__main__[\"']:", main_txt, re.MULTILINE)
+        if "# Patched by omniparser_setup: CUDA cache" not in main_txt and main_guard:
+            hygiene = textwrap.dedent('''
+                @app.middleware("http")  # Patched by omniparser_setup: CUDA cache
+                async def free_cuda_cache(request, call_next):
+                    response = await call_next(request)
+                    if request.url.path.startswith(("/parse", "/caption")):
+                        import torch
+                        if torch.cuda.is_available():
+                            torch.cuda.empty_cache()
+                    return response
+
+            ''')
+            mono.write_text(main_txt[:main_guard.start()] + hygiene.lstrip("\n") + "\n" +
+                            main_txt[main_guard.start():], "utf-8")
+            print("✅ Patched omniparserserver.py → CUDA cache freed after each parse")
+
     # 4️⃣ Patch server_startup.py for fp16 Florence
     startup = OMNIPARSER_DIR / "omnitool" / "omniparserserver" / "server_startup.py"
     if startup.exists():
@@ -207,6 +231,488 @@ def apply_gpu_patches() -> None:
 
     print("🎉 GPU patches complete.\n")
 
+# =============================================================================
+# OPTIONAL OVERLAY PATCH
+# =============================================================================
+def apply_overlay_patch() -> None:
+    """
+    Make the set-of-marks overlay optional per request.
+
+    Adds ``overlay: bool = True`` to the /parse/ request model and leaves
+    ``som_image_base64`` out of the response when the client sets it to False,
+    so headless parses do not ship (and the client does not parse) a
+    multi-megabyte base64 image.
+    """
+    server = OMNIPARSER_DIR / "omnitool" / "omniparserserver" / "omniparserserver.py"
+    if not server.exists():
+        return
+    txt = server.read_text("utf-8")
+    if "# Patched by omniparser_setup: optional overlay" in txt:
+        return
+
+    patched = re.sub(
+        r"(class\s+ParseRequest\(BaseModel\):\n(\s+)base64_image:\s*str\n)",
+        r"\1\2overlay: bool = True  # Patched by omniparser_setup: optional overlay\n",
+        txt, count=1
+    )
+    patched = re.sub(
+        r"[\"']som_image_base64[\"']\s*:\s*(\w+)\s*,",
+        r"**({'som_image_base64': \1} if parse_request.overlay else {}),",
+        patched, count=1
+    )
+    if "parse_request.overlay" in patched and "overlay: bool" in patched:
+        server.write_text(patched, "utf-8")
+        print("✅ Patched omniparserserver.py → optional overlay")
+    else:
+        print("⚠️  omniparserserver.py layout not recognised – overlay stays mandatory")
+
+# =============================================================================
+# ICON-CAPTION CACHE PATCH
+# =============================================================================
+CAPTION_CACHE_PATCH = textwrap.dedent('''
+
+    # Patched by omniparser_setup: caption cache
+    # Florence captions keyed by a hash of the icon crop, so icons seen on an
+    # earlier parse (taskbar, desktop, toolbars) skip the caption model.
+    # OMNIPARSER_CAPTION_CACHE_SIZE entries are kept (0 disables the cache);
+    # OMNIPARSER_CAPTION_CACHE_FILE persists them across server restarts.
+    import collections as _collections
+    import hashlib as _hashlib
+    import json as _json
+    import os as _os
+    import threading as _threading
+
+    _CAPTION_CACHE_SIZE = int(_os.environ.get("OMNIPARSER_CAPTION_CACHE_SIZE") or 4096)
+    _CAPTION_CACHE_FILE = _os.environ.get("OMNIPARSER_CAPTION_CACHE_FILE") or None
+    _caption_cache = _collections.OrderedDict()
+    _caption_cache_lock = _threading.Lock()
+    _caption_cache_stats = {"hits": 0, "misses": 0}
+
+    if _CAPTION_CACHE_FILE and _os.path.isfile(_CAPTION_CACHE_FILE):
+        try:
+            with open(_CAPTION_CACHE_FILE, encoding="utf-8") as _f:
+                _caption_cache.update(list(_json.load(_f).items())[-_CAPTION_CACHE_SIZE:])
+            print(f"[caption cache] loaded {len(_caption_cache)} captions")
+        except (OSError, ValueError) as _e:
+            print(f"[caption cache] ignoring unreadable {_CAPTION_CACHE_FILE}: {_e}")
+
+
+    def _caption_key(coord, image_source, prompt):
+        """Hash of the crop get_parsed_content_icon would caption, or None if it would skip it."""
+        height, width = image_source.shape[0], image_source.shape[1]
+        xmin, xmax = int(coord[0] * width), int(coord[2] * width)
+        ymin, ymax = int(coord[1] * height), int(coord[3] * height)
+        crop = image_source[ymin:ymax, xmin:xmax, :]
+        if crop.size == 0:
+            return None
+        digest = _hashlib.blake2b(crop.tobytes(), digest_size=16)
+        digest.update(repr((crop.shape, prompt)).encode())
+        return digest.hexdigest()
+
+
+    def _save_caption_cache():
+        tmp = _CAPTION_CACHE_FILE + ".tmp"
+        try:
+            _os.makedirs(_os.path.dirname(_os.path.abspath(_CAPTION_CACHE_FILE)), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                _json.dump(dict(_caption_cache), f)
+            _os.replace(tmp, _CAPTION_CACHE_FILE)
+        except OSError as e:
+            print(f"[caption cache] could not save {_CAPTION_CACHE_FILE}: {e}")
+
+
+    _uncached_get_parsed_content_icon = get_parsed_content_icon
+
+
+    def get_parsed_content_icon(filtered_boxes, starting_idx, image_source, caption_model_processor,
+                                prompt=None, batch_size=128):
+        boxes = filtered_boxes[starting_idx:] if starting_idx else filtered_boxes
+        keys = [_caption_key(coord, image_source, prompt) for coord in boxes] if _CAPTION_CACHE_SIZE else [None]
+        if None in keys:
+            # The stock function drops crops it cannot caption, so results would not line up
+            return _uncached_get_parsed_content_icon(filtered_boxes, starting_idx, image_source,
+                                                     caption_model_processor, prompt, batch_size)
+
+        with _caption_cache_lock:
+            captions = {k: _caption_cache[k] for k in keys if k in _caption_cache}
+            for key in captions:
+                _caption_cache.move_to_end(key)
+        missing = list(dict.fromkeys(k for k in keys if k not in captions))
+        new = {}
+        if missing:
+            first_index = {key: index for index, key in reversed(list(enumerate(keys)))}
+            new = dict(zip(missing, _uncached_get_parsed_content_icon(
+                [boxes[first_index[key]] for key in missing], None, image_source,
+                caption_model_processor, prompt, batch_size)))
+            captions.update(new)
+
+        result = [captions[key] for key in keys]
+        with _caption_cache_lock:
+            _caption_cache.update(new)
+            while len(_caption_cache) > _CAPTION_CACHE_SIZE:
+                _caption_cache.popitem(last=False)
+            _caption_cache_stats["hits"] += len(keys) - len(missing)  # repeats within a frame count as hits
+            _caption_cache_stats["misses"] += len(missing)
+            if new and _CAPTION_CACHE_FILE:
+                _save_caption_cache()
+        print(f"[caption cache] {len(keys) - len(missing)}/{len(keys)} icons cached "
+              f"(total hits {_caption_cache_stats['hits']}, misses {_caption_cache_stats['misses']})")
+        return result
+''')
+
+
+def apply_caption_cache_patch() -> None:
+    """
+    Cache icon captions in the server, keyed by a hash of each icon crop.
+
+    Wraps ``get_parsed_content_icon`` in util/utils.py so only crops that have
+    not been captioned before reach Florence-2. Captions are kept in an LRU
+    dict (OMNIPARSER_CAPTION_CACHE_SIZE) and, when
+    OMNIPARSER_CAPTION_CACHE_FILE is set, persisted as JSON; the client sets
+    both from config when it launches the server.
+    """
+    utils_file = OMNIPARSER_DIR / "util" / "utils.py"
+    if not utils_file.exists():
+        return
+    txt = utils_file.read_text("utf-8")
+    if "# Patched by omniparser_setup: caption cache" in txt:
+        return
+    if not re.search(r"^def get_parsed_content_icon\(", txt, re.MULTILINE):
+        print("⚠️  util/utils.py layout not recognised – icon captions stay uncached")
+        return
+    utils_file.write_text(txt.rstrip("\n") + "\n" + CAPTION_CACHE_PATCH, "utf-8")
+    print("✅ Patched util/utils.py → icon-caption cache")
+
+# =============================================================================
+# DETECTION-ONLY PARSES + ON-DEMAND CAPTIONS PATCH
+# =============================================================================
+CAPTION_ENDPOINT_PATCH = textwrap.dedent('''
+
+    class CaptionRequest(BaseModel):  # Patched by omniparser_setup: on-demand captions
+        base64_image: str
+        bboxes: list[list[float]]
+
+
+    @app.post("/caption/")
+    async def caption(caption_request: CaptionRequest):
+        start = time.time()
+        captions = omniparser.caption(caption_request.base64_image, caption_request.bboxes)
+        return {"captions": captions, "latency": time.time() - start}
+
+''')
+
+CAPTION_METHOD_PATCH = textwrap.dedent('''
+    def caption(self, image_base64: str, bboxes):  # Patched by omniparser_setup: on-demand captions
+        import base64, io
+        import numpy as np
+        from PIL import Image
+        from util import utils
+        image = Image.open(io.BytesIO(base64.b64decode(image_base64))).convert("RGB")
+        return utils.get_parsed_content_icon(bboxes, None, np.asarray(image), self.caption_model_processor)
+
+''')
+
+
+def apply_caption_on_demand_patch() -> None:
+    """
+    Detection-only parses and a /caption/ endpoint.
+
+    1. util/omniparser.py   → ``parse(..., captions=True)`` drives
+       ``use_local_semantics``; new ``caption(image, bboxes)`` method
+    2. omniparserserver.py  → ``captions: bool = True`` on the /parse/ request
+       (echoed in the response) and POST /caption/ for normalized boxes
+
+    The client sets ``captions`` from OMNIPARSER_CAPTIONS and asks for the
+    icons it needs with ``OmniParserInterface.caption_elements``.
+    """
+    parser_file = OMNIPARSER_DIR / "util" / "omniparser.py"
+    server = OMNIPARSER_DIR / "omnitool" / "omniparserserver" / "omniparserserver.py"
+    if not parser_file.exists() or not server.exists():
+        return
+
+    txt = parser_file.read_text("utf-8")
+    if "# Patched by omniparser_setup: on-demand captions" not in txt:
+        patched = re.sub(
+            r"\n([ \t]+)def parse\(self, image_base64: str\):",
+            lambda m: "\n" + textwrap.indent(CAPTION_METHOD_PATCH.lstrip("\n"), m.group(1)) +
+                      f"{m.group(1)}def parse(self, image_base64: str, captions: bool = True):",
+            txt, count=1
+        )
+        patched = re.sub(r"use_local_semantics\s*=\s*True", "use_local_semantics=captions", patched, count=1)
+        if "captions: bool" in patched and "use_local_semantics=captions" in patched:
+            parser_file.write_text(patched, "utf-8")
+            print("✅ Patched util/omniparser.py → detection-only parse, caption()")
+        else:
+            print("⚠️  util/omniparser.py layout not recognised – every parse stays captioned")
+            return
+
+    txt = server.read_text("utf-8")
+    if "# Patched by omniparser_setup: on-demand captions" in txt:
+        return
+    patched = re.sub(
+        r"(class\s+ParseRequest\(BaseModel\):\n(\s+)base64_image:\s*str\n)",
+        r"\1\2captions: bool = True  # Patched by omniparser_setup: detection-only parses\n",
+        txt, count=1
+    )
+    patched = re.sub(r"omniparser\.parse\(parse_request\.base64_image\)",
+                     "omniparser.parse(parse_request.base64_image, parse_request.captions)", patched, count=1)
+    patched = re.sub(r"([\"']latency[\"']\s*:\s*latency)",
+                     r"\1, 'captions': parse_request.captions", patched, count=1)
+    main_guard = re.search(r"^if __name__ == [\"']__main__[\"']:", patched, re.MULTILINE)
+    if "parse_request.captions)" in patched and main_guard:
+        patched = patched[:main_guard.start()] + CAPTION_ENDPOINT_PATCH.lstrip("\n") + "\n" + \
+            patched[main_guard.start():]
+        server.write_text(patched, "utf-8")
+        print("✅ Patched omniparserserver.py → captions flag, /caption/")
+    else:
+        print("⚠️  omniparserserver.py layout not recognised – /caption/ not added")
+
+# =============================================================================
+# BATCH PARSE PATCH
+# =============================================================================
+DETECTOR_BATCH_PATCH = textwrap.dedent('''
+
+    # Patched by omniparser_setup: batched detection
+    # parse_many registers its frames here; the first predict_yolo call then runs
+    # the detector once over all of them and later calls take their results in order.
+    import collections as _batch_collections
+    import threading as _batch_threading
+
+    _detector_batch = _batch_threading.local()
+
+
+    def begin_detector_batch(images):
+        _detector_batch.pending = {"images": list(images), "results": None}
+
+
+    def end_detector_batch():
+        _detector_batch.pending = None
+
+
+    _unbatched_predict_yolo = predict_yolo
+
+
+    def predict_yolo(model, image, box_threshold, imgsz, scale_img, iou_threshold=0.7):
+        batch = getattr(_detector_batch, "pending", None)
+        if batch and not scale_img:
+            if batch["results"] is None:
+                batch["results"] = _batch_collections.deque(
+                    model.predict(source=batch["images"], conf=box_threshold, iou=iou_threshold))
+            result = batch["results"].popleft() if batch["results"] else None
+            if result is not None and tuple(result.orig_shape[:2]) == (image.size[1], image.size[0]):
+                boxes = result.boxes.xyxy
+                return boxes, result.boxes.conf, [str(i) for i in range(len(boxes))]
+            # Out of step with the batch: finish without it
+            end_detector_batch()
+        return _unbatched_predict_yolo(model, image, box_threshold, imgsz, scale_img, iou_threshold)
+''')
+
+PARSE_MANY_PATCH = textwrap.dedent('''
+    def parse_many(self, images_base64, captions: bool = True):  # Patched by omniparser_setup: batch parse
+        import base64, io
+        from PIL import Image
+        from util import utils
+        images = [Image.open(io.BytesIO(base64.b64decode(b))).convert("RGB") for b in images_base64]
+        utils.begin_detector_batch(images)
+        try:
+            return [self.parse(b, captions) for b in images_base64]
+        finally:
+            utils.end_detector_batch()
+
+''')
+
+BATCH_ENDPOINT_PATCH = textwrap.dedent('''
+    class BatchParseRequest(BaseModel):  # Patched by omniparser_setup: batch parse
+        images: list[str]
+        overlay: bool = False
+        captions: bool = True
+
+
+    @app.post("/parse_batch/")
+    async def parse_batch(batch_request: BatchParseRequest):
+        start = time.time()
+        results = omniparser.parse_many(batch_request.images, batch_request.captions)
+        latency = time.time() - start
+        print(f"batch of {len(results)} parsed in {latency:.2f}s")
+        return {"results": [
+            {**({"som_image_base64": image} if batch_request.overlay else {}),
+             "parsed_content_list": parsed, "captions": batch_request.captions}
+            for image, parsed in results
+        ], "latency": latency}
+
+''')
+
+
+def apply_batch_parse_patch() -> None:
+    """
+    Add POST /parse_batch/ for several frames per request.
+
+    1. util/utils.py        → ``predict_yolo`` takes its boxes from one batched
+       detector call when a batch is registered (``begin_detector_batch``)
+    2. util/omniparser.py   → ``parse_many(images, captions)``
+    3. omniparserserver.py  → /parse_batch/ taking ``images`` (base64 list),
+       ``overlay`` and ``captions``
+
+    Needs the on-demand captions patch (``parse(..., captions)``). OCR and
+    captioning still run per frame; the client calls this from ``parse_many``.
+    """
+    utils_file = OMNIPARSER_DIR / "util" / "utils.py"
+    parser_file = OMNIPARSER_DIR / "util" / "omniparser.py"
+    server = OMNIPARSER_DIR / "omnitool" / "omniparserserver" / "omniparserserver.py"
+    if not (utils_file.exists() and parser_file.exists() and server.exists()):
+        return
+
+    txt = utils_file.read_text("utf-8")
+    if "# Patched by omniparser_setup: batched detection" not in txt:
+        if not re.search(r"^def predict_yolo\(", txt, re.MULTILINE):
+            print("⚠️  util/utils.py layout not recognised – /parse_batch/ not added")
+            return
+        utils_file.write_text(txt.rstrip("\n") + "\n" + DETECTOR_BATCH_PATCH, "utf-8")
+        print("✅ Patched util/utils.py → batched detection")
+
+    txt = parser_file.read_text("utf-8")
+    if "# Patched by omniparser_setup: batch parse" not in txt:
+        if "captions: bool = True" not in txt:
+            print("⚠️  util/omniparser.py lacks the on-demand captions patch – /parse_batch/ not added")
+            return
+        patched = re.sub(
+            r"\n([ \t]+)def parse\(self,",
+            lambda m: "\n" + textwrap.indent(PARSE_MANY_PATCH.lstrip("\n"), m.group(1)) + f"{m.group(1)}def parse(self,",
+            txt, count=1
+        )
+        parser_file.write_text(patched, "utf-8")
+        print("✅ Patched util/omniparser.py → parse_many()")
+
+    txt = server.read_text("utf-8")
+    if "# Patched by omniparser_setup: batch parse" in txt:
+        return
+    main_guard = re.search(r"^if __name__ == [\"']__main__[\"']:", txt, re.MULTILINE)
+    if main_guard:
+        server.write_text(txt[:main_guard.start()] + BATCH_ENDPOINT_PATCH + "\n" + txt[main_guard.start():], "utf-8")
+        print("✅ Patched omniparserserver.py → /parse_batch/")
+    else:
+        print("⚠️  omniparserserver.py layout not recognised – /parse_batch/ not added")
+
+# =============================================================================
+# OPTIONAL CPU SERVING PATCHES
+# =============================================================================
+YOLO_ONNX_FILE  = ICON_DETECT_DIR / "model.onnx"
+YOLO_INT8_FILE  = ICON_DETECT_DIR / "model.int8.onnx"
+
+EXPORT_DETECTOR_SCRIPT = textwrap.dedent(f'''
+    from ultralytics import YOLO
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    YOLO(r"{YOLO_MODEL_FILE}").export(format="onnx", dynamic=True, simplify=True)
+    quantize_dynamic(r"{YOLO_ONNX_FILE}", r"{YOLO_INT8_FILE}", weight_type=QuantType.QUInt8)
+''')
+
+CPU_THREADS_PATCH = textwrap.dedent('''
+    # Patched by omniparser_setup: CPU threads
+    import os as _os
+    _threads = int(_os.environ.get("OMNIPARSER_THREADS") or _os.environ.get("OMP_NUM_THREADS") or 0)
+    if _threads:
+        try:
+            import torch as _torch
+            _torch.set_num_threads(_threads)
+            _torch.set_num_interop_threads(1)
+        except Exception:
+            pass
+        try:
+            import onnxruntime as _ort
+            _InferenceSession = _ort.InferenceSession
+
+            def _sized_session(path_or_bytes, sess_options=None, *args, **kwargs):
+                if sess_options is None:
+                    sess_options = _ort.SessionOptions()
+                    sess_options.intra_op_num_threads = _threads
+                    sess_options.inter_op_num_threads = 1
+                return _InferenceSession(path_or_bytes, sess_options, *args, **kwargs)
+
+            _ort.InferenceSession = _sized_session
+        except ImportError:
+            pass
+''')
+
+
+def apply_cpu_patches() -> None:
+    """
+    CPU serving mode for hosts without a GPU.
+
+    1. Install onnx / onnxruntime (CPU build)
+    2. Export icon_detect/model.pt → model.onnx, plus a dynamic int8 copy
+       (model.int8.onnx)
+    3. Patch omniparserserver.py → size the torch / onnxruntime thread pools
+       from OMNIPARSER_THREADS (set by the client from OMNIPARSER_CPU_THREADS)
+    4. Patch util/utils.py → int8 dynamic quantization of Florence-2 when the
+       client sets OMNIPARSER_INT8=1, and keep ONNX detectors off ``.to()``
+
+    The client picks the exported weights with OMNIPARSER_CPU_BACKEND.
+    """
+    print("\n🔧 Applying CPU serving patches…")
+
+    conda = conda_setup.find_conda()
+    if not conda:
+        print("❌ Conda not found."); sys.exit(1)
+
+    # 1️⃣ ONNX runtime (CPU)
+    subprocess.check_call([
+        conda, "run", "-n", CONDA_ENV, "pip", "install", "--upgrade",
+        "onnx", "onnxslim", "onnxruntime",
+    ])
+
+    # 2️⃣ Export the icon detector
+    if YOLO_MODEL_FILE.exists() and not YOLO_INT8_FILE.exists():
+        proc = subprocess.run([
+            conda, "run", "-n", CONDA_ENV, "python", "-c", EXPORT_DETECTOR_SCRIPT
+        ], cwd=str(ICON_DETECT_DIR), capture_output=True, text=True)
+        if proc.returncode == 0 and YOLO_INT8_FILE.exists():
+            print(f"✅ Exported {YOLO_ONNX_FILE.name} and {YOLO_INT8_FILE.name}")
+        else:
+            print(f"⚠️  ONNX export failed – CPU backends fall back to PyTorch\n{proc.stderr[-2000:]}")
+
+    # 3️⃣ Thread tuning in omniparserserver.py
+    server = OMNIPARSER_DIR / "omnitool" / "omniparserserver" / "omniparserserver.py"
+    if server.exists():
+        txt = server.read_text("utf-8")
+        if "# Patched by omniparser_setup: CPU threads" not in txt:
+            server.write_text(CPU_THREADS_PATCH + "\n" + txt, "utf-8")
+            print("✅ Patched omniparserserver.py → OMNIPARSER_THREADS")
+
+    # 4️⃣ int8 Florence-2 and ONNX-safe YOLO loading in util/utils.py
+    utils_file = OMNIPARSER_DIR / "util" / "utils.py"
+    if utils_file.exists():
+        txt = utils_file.read_text("utf-8")
+        if "# Patched by omniparser_setup: int8 captions" not in txt:
+            txt = re.sub(
+                r"\n(\s+)return\s*\{\s*['\"]model['\"]\s*:\s*model\.to\(device\)\s*,"
+                r"\s*['\"]processor['\"]\s*:\s*processor\s*\}",
+                lambda m: (
+                    f"\n{m.group(1)}model = model.to(device)"
+                    f"\n{m.group(1)}import os  # Patched by omniparser_setup: int8 captions"
+                    f"\n{m.group(1)}if device == 'cpu' and os.environ.get('OMNIPARSER_INT8') == '1':"
+                    f"\n{m.group(1)}    model = torch.quantization.quantize_dynamic("
+                    f"model, {{torch.nn.Linear}}, dtype=torch.qint8)"
+                    f"\n{m.group(1)}return {{'model': model, 'processor': processor}}"
+                ),
+                txt, count=1
+            )
+            txt = re.sub(
+                r"\n(\s+)model\s*=\s*YOLO\(model_path\)",
+                lambda m: (
+                    m.group(0) +
+                    f"\n{m.group(1)}if str(model_path).endswith('.onnx'):  # Patched by omniparser_setup: ONNX"
+                    f"\n{m.group(1)}    model.to = lambda *args, **kwargs: model"
+                ),
+                txt, count=1
+            )
+            if "int8 captions" in txt:
+                utils_file.write_text(txt, "utf-8")
+                print("✅ Patched util/utils.py → int8 captions, ONNX detector")
+            else:
+                print("⚠️  util/utils.py layout not recognised – captions stay fp32")
+
+    print("🎉 CPU patches complete.\n")
+
 # =============================================================================
 # ORIGINAL HELPER FUNCTIONS (unchanged)
 # =============================================================================
@@ -301,7 +807,7 @@ def check_server_status() -> bool:
     except Exception:
         return False
 
-def start_omniparser_server():
+def start_omniparser_server(device: str = "cuda", model_file: pathlib.Path = YOLO_MODEL_FILE):
     print("\n🚀 Starting OmniParser server …")
     env = os.environ.copy()
     env["PYTHONPATH"] = str(OMNIPARSER_DIR)
@@ -310,10 +816,10 @@ def start_omniparser_server():
     conda_exe = conda_setup.find_conda()
     command = [
         conda_exe, "run", "-n", CONDA_ENV, "python", "-m", OMNIPARSER_MODULE,
-        "--som_model_path", str(YOLO_MODEL_FILE),
+        "--som_model_path", str(model_file),
         "--caption_model_name", "florence2",
         "--caption_model_path", str(ICON_CAPTION_DIR),
-        "--device", "cuda",
+        "--device", device,
         "--BOX_TRESHOLD", "0.05",
         "--port", str(SERVER_PORT)
     ]
@@ -356,9 +862,21 @@ if __name__ == "__main__":
 
     # apply GPU‑safe patches (fp16 Florence + cache clearing)
     apply_gpu_patches()
+    apply_overlay_patch()
+    apply_caption_cache_patch()
+    apply_caption_on_demand_patch()
+    apply_batch_parse_patch()
+
+    # `--cpu`: ONNX / int8 models and thread tuning for GPU-less hosts
+    cpu_mode = "--cpu" in sys.argv[1:]
+    if cpu_mode:
+        apply_cpu_patches()
 
     validate_server_module()
-    server_process = start_omniparser_server()
+    if cpu_mode and YOLO_ONNX_FILE.exists():
+        server_process = start_omniparser_server(device="cpu", model_file=YOLO_ONNX_FILE)
+    else:
+        server_process = start_omniparser_server()
 
     print("Press ENTER to stop OmniParser, or Ctrl+C to abort.")
     try:
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-action LLM plans (core/utils/action_batch.py).
+Frames come from a scripted grab function, so no display is needed.
+"""
+
+import json
+import os
+import sys
+
+from PIL import Image, ImageDraw
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.action_batch import ActionBatch, expects_change
+from core.utils.metrics import BATCHED_ACTIONS
+
+PLAN = [
+    {"type": "key", "key": "win", "summary": "Open the Start menu"},
+    {"type": "type", "text": "chrome", "summary": "Search for Chrome"},
+    {"type": "key", "key": "enter", "summary": "Launch Chrome"},
+]
+
+
+class Screen:
+    """Grab function whose frame only changes when ``paint`` or ``type_text`` is called."""
+
+    def __init__(self):
+        self.shade = 0
+        self.typed = 0
+
+    def paint(self):
+        self.shade += 60
+
+    def type_text(self, chars):
+        self.typed += chars
+
+    def __call__(self):
+        frame = Image.new("L", (160, 90), self.shade)
+        if self.typed:
+            # Typed text in a search box: one thumbnail pixel per character, two rows high
+            ImageDraw.Draw(frame).rectangle((60, 44, 60 + self.typed - 1, 45), fill=self.shade + 180)
+        return frame
+
+
+def test_plan_is_queued_by_step():
+    batch = ActionBatch(max_actions=4, grab_func=Screen())
+    assert batch.followup_budget(0, 3) == 2 and batch.followup_budget(2, 3) == 0
+    assert ActionBatch(max_actions=2).followup_budget(0, 5) == 1
+    assert not ActionBatch(enabled=False).followup_budget(0, 5)
+
+    executed = BATCHED_ACTIONS.value(result="executed")
+    assert batch.load(PLAN + [{"type": "key", "key": "f5", "summary": "Beyond the last step"}], 0, 3) == PLAN[0]
+    assert batch.queued_actions == PLAN[1:]
+    assert batch.next_for(1) == PLAN[1] and batch.next_for(2) == PLAN[2]
+    assert not batch.pending and batch.next_for(3) is None
+    assert BATCHED_ACTIONS.value(result="executed") - executed == 2
+    print("✅ Follow-up actions are queued for the next steps and handed out in order")
+
+
+def test_invalid_or_out_of_order_plans():
+    batch = ActionBatch(grab_func=Screen())
+    assert batch.load([{"summary": "no type"}] + PLAN, 0, 4) is None and not batch.pending
+    assert batch.load([PLAN[0], "not an action", PLAN[2]], 0, 4) == PLAN[0] and not batch.pending
+
+    batch.load(PLAN, 0, 3)
+    assert batch.next_for(2) is None and not batch.pending
+    print("✅ Invalid follow-ups and a plan for other steps are dropped")
+
+
+def test_checkpoint_drops_plan_without_expected_change():
+    screen = Screen()
+    batch = ActionBatch(grab_func=screen)
+
+    batch.load(PLAN, 0, 3)
+    batch.mark_before()
+    screen.paint()
+    assert batch.checkpoint(PLAN[0]) and batch.pending
+    print("✅ A visible change keeps the plan")
+
+    batch.load(PLAN, 0, 3)
+    dropped = BATCHED_ACTIONS.value(result="dropped")
+    batch.mark_before()
+    assert not batch.checkpoint(PLAN[0]) and not batch.pending
+    assert BATCHED_ACTIONS.value(result="dropped") - dropped == 2
+    print("✅ An action that left the screen unchanged drops the rest of the plan")
+
+    quiet = dict(PLAN[0], expect_change=False)
+    assert not expects_change(quiet) and expects_change(PLAN[1])
+    batch.load([quiet] + PLAN[1:], 0, 3)
+    batch.mark_before()
+    assert batch.checkpoint(quiet) and batch.pending
+    print("✅ expect_change: false skips the change check")
+
+
+def test_checkpoint_keeps_plan_after_typing():
+    screen = Screen()
+    batch = ActionBatch(grab_func=screen)
+    batch.load(PLAN, 0, 3)
+    assert batch.next_for(1) == PLAN[1]
+
+    # Typing "chrome" changes a few tiles and far less than 1% of the frame
+    batch.mark_before()
+    screen.type_text(len("chrome"))
+    assert batch.checkpoint(PLAN[1]) and batch.pending
+    assert batch.next_for(2) == PLAN[2]
+    print("✅ A small, text-sized change keeps the plan")
+
+
+def test_handle_llm_response_batch():
+    from core.lm.lm_interface import handle_llm_response
+
+    # call_lmstudio_model returns an extracted plan as json.dumps(list); models also send it fenced
+    for raw in (json.dumps(PLAN), f"<think>Three steps.</think>\n```json\n{json.dumps(PLAN, indent=2)}\n```"):
+        single = handle_llm_response(raw, "action_generation", is_json=True)
+        plan = handle_llm_response(raw, "action_generation", is_json=True, batch=True)
+        assert single["type"] == "key" and single["key"] == "win", single
+        assert isinstance(plan, list) and [a["summary"] for a in plan] == [a["summary"] for a in PLAN], plan
+        assert plan[1]["text"] == "chrome"
+
+        batch = ActionBatch(grab_func=Screen())
+        assert batch.load(plan, 0, 3)["key"] == "win"
+        assert [a["summary"] for a in batch.queued_actions] == ["Search for Chrome", "Launch Chrome"]
+    print("✅ handle_llm_response returns the whole plan with batch=True, and it is queued")
+
+
+def main():
+    test_plan_is_queued_by_step()
+    test_invalid_or_out_of_order_plans()
+    test_checkpoint_drops_plan_without_expected_change()
+    test_checkpoint_keeps_plan_after_typing()
+    test_handle_llm_response_batch()
+    print("\n🎉 All action batch tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for region-of-interest capture (core/utils/region/capture_region.py).
+Checks config parsing and that normalized OmniParser boxes map back to global
+screen coordinates. No display is required.
+"""
+
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.region.capture_region import (
+    CaptureRegion,
+    parse_region,
+    resolve_capture_region,
+)
+
+
+class FakeConfig(dict):
+    """Stand-in for config.Config, which only needs .get()."""
+
+
+def test_parse_region():
+    assert parse_region("100, 50, 900, 650") == CaptureRegion(100, 50, 900, 650)
+    # Selector coordinates can come back as floats with corners swapped
+    assert parse_region([900.4, 650.0, 100.0, 50.2]) == CaptureRegion(100, 50, 900, 650)
+    assert parse_region("") is None
+    assert parse_region("1, 2, 3") is None
+    assert parse_region("5, 5, 5, 100") is None
+    print("✅ REGION values parsed")
+
+
+def test_normalized_to_global():
+    region = CaptureRegion(1000, 200, 1800, 800)  # 800x600 region
+    assert region.normalized_center_to_global([0.0, 0.0, 0.5, 0.5]) == (1200, 350)
+    assert region.normalized_center_to_global([0.9, 0.9, 1.0, 1.0]) == (1760, 770)
+    # Points never land outside the captured region
+    assert region.normalized_center_to_global([1.0, 1.0, 1.0, 1.0]) == (1799, 799)
+    assert region.normalized_center_to_global([0.1, 0.1, 1.2, 0.3]) is None
+    assert region.normalized_center_to_global(["a", 0, 0, 0]) is None
+    print("✅ Normalized boxes map to global coordinates")
+
+
+def test_full_screen_region():
+    screen = CaptureRegion.from_size((1920, 1080))
+    assert screen.normalized_center_to_global([0.25, 0.5, 0.75, 0.5]) == (960, 540)
+    print("✅ Full-screen region matches the previous conversion")
+
+
+def test_resolve_capture_region():
+    assert resolve_capture_region(FakeConfig(DEFINE_REGION=False, REGION="0, 0, 10, 10")) is None
+    assert resolve_capture_region(FakeConfig(DEFINE_REGION=True, REGION="")) is None
+    region = resolve_capture_region(FakeConfig(DEFINE_REGION=True, REGION="0, 0, 640, 480"))
+    assert region == CaptureRegion(0, 0, 640, 480) and region.area == 640 * 480
+    print("✅ DEFINE_REGION / REGION resolved from config")
+
+
+def main():
+    test_parse_region()
+    test_normalized_to_global()
+    test_full_screen_region()
+    test_resolve_capture_region()
+    print("\n🎉 All capture region tests passed")
+
+
+if __name__ == "__main__":
+    main()
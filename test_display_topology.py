@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-monitor display topology (core/utils/display_topology.py).
+Uses a hand-built two-monitor layout, so no display is required.
+"""
+
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.display_topology import DisplayTopology, Monitor, merge_monitor_results
+from core.utils.region.capture_region import CaptureRegion
+
+# 1080p primary on the left, 4K monitor at 150% scaling on the right.
+# In input space the 4K monitor appears as 2560x1440 starting at x=1920.
+PRIMARY = Monitor(1, CaptureRegion(0, 0, 1920, 1080), 0, 0, 1.0, primary=True)
+SCALED = Monitor(2, CaptureRegion(1920, 0, 5760, 2160), 1920, 0, 1.5)
+TOPOLOGY = DisplayTopology([PRIMARY, SCALED])
+
+
+def test_virtual_region():
+    assert TOPOLOGY.virtual_region == CaptureRegion(0, 0, 5760, 2160)
+    assert TOPOLOGY.primary is PRIMARY
+    print("✅ Virtual desktop spans both monitors")
+
+
+def test_to_input_applies_scaling():
+    assert TOPOLOGY.to_input(960, 540) == (960, 540)
+    # Centre of the 4K monitor: capture (3840, 1080) -> input (1920 + 1280, 720)
+    assert TOPOLOGY.to_input(3840, 1080) == (3200, 720)
+    # Point in the gap below the primary monitor snaps to the nearest monitor edge
+    assert TOPOLOGY.to_input(100, 2000) == (100, 1079)
+    print("✅ Capture-space points converted to input space with DPI scaling")
+
+
+def test_merge_monitor_results():
+    results = [
+        (PRIMARY, {"parsed_content_list": [{"content": "Start", "bbox_normalized": [0.0, 0.9, 0.1, 1.0]}]}),
+        (SCALED, {"parsed_content_list": [{"content": "Chrome", "bbox_normalized": [0.5, 0.5, 0.5, 0.5]}]}),
+        (PRIMARY, None),
+    ]
+    virtual = TOPOLOGY.virtual_region
+    merged = merge_monitor_results(results, virtual)
+    elements = merged["parsed_content_list"]
+    assert [e["content"] for e in elements] == ["Start", "Chrome"]
+    assert [e["monitor"] for e in elements] == [1, 2]
+
+    # Re-normalized boxes land on the right monitor once mapped through the virtual region
+    chrome_point = virtual.normalized_center_to_global(elements[1]["bbox_normalized"])
+    assert chrome_point == (3840, 1080), chrome_point
+    start_point = virtual.normalized_center_to_global(elements[0]["bbox_normalized"])
+    assert start_point == (96, 1026), start_point
+    print("✅ Per-monitor parse results merged onto the virtual desktop")
+
+
+def main():
+    test_virtual_region()
+    test_to_input_applies_scaling()
+    test_merge_monitor_results()
+    print("\n🎉 All display topology tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the frame differencing helpers in core/utils/screenshot_utils.py.
+Uses synthetic images, so no display is required.
+"""
+
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PIL import Image, ImageDraw
+
+from core.utils.screenshot_utils import (
+    FrameDiffer,
+    diff_frames,
+    hamming_distance,
+    make_thumbnail,
+    perceptual_hash,
+)
+
+
+def make_desktop(size=(1920, 1080), window=None):
+    """Plain desktop with an optional white 'window' rectangle."""
+    image = Image.new("RGB", size, (30, 60, 120))
+    if window:
+        ImageDraw.Draw(image).rectangle(window, fill=(255, 255, 255))
+    return image
+
+
+def test_identical_frames():
+    thumb = make_thumbnail(make_desktop())
+    diff = diff_frames(thumb, thumb.copy(), (1920, 1080))
+    assert not diff.changed
+    assert diff.regions == []
+    assert diff.hash_distance == 0
+    print("✅ Identical frames report no change")
+
+
+def test_changed_region_is_located():
+    window = (600, 300, 1000, 700)
+    before = make_desktop()
+    after = make_desktop(window=window)
+    diff = diff_frames(make_thumbnail(before), make_thumbnail(after), after.size)
+    assert diff.changed
+    assert len(diff.regions) == 1, diff.regions
+    left, top, right, bottom = diff.regions[0]
+    # Tiles are 120px at 1080p, so the box may extend up to one tile past the window
+    assert left <= window[0] and top <= window[1], diff.regions
+    assert right >= window[2] and bottom >= window[3], diff.regions
+    assert window[0] - left <= 120 and right - window[2] <= 120, diff.regions
+    print(f"✅ Changed region located: {diff.regions[0]}")
+
+
+def test_separate_regions():
+    after = make_desktop(window=(0, 0, 200, 200))
+    ImageDraw.Draw(after).rectangle((1500, 800, 1900, 1060), fill=(255, 255, 255))
+    diff = diff_frames(make_thumbnail(make_desktop()), make_thumbnail(after), after.size)
+    assert len(diff.regions) == 2, diff.regions
+    # Largest region first
+    assert diff.regions[0][0] >= 1400, diff.regions
+    print(f"✅ Separate regions kept apart: {diff.regions}")
+
+
+def test_perceptual_hash():
+    base = make_desktop(window=(100, 100, 900, 600))
+    similar = make_desktop(window=(104, 100, 904, 600))
+    different = make_desktop(window=(1000, 500, 1900, 1000))
+    h = perceptual_hash(base)
+    assert hamming_distance(h, perceptual_hash(similar)) <= 4
+    assert hamming_distance(h, perceptual_hash(different)) > 4
+    print("✅ Perceptual hash separates similar and different screens")
+
+
+def test_frame_differ():
+    differ = FrameDiffer()
+    first = differ.update(make_desktop())
+    assert first.changed and first.regions == [(0, 0, 1920, 1080)]
+    assert not differ.update(make_desktop()).changed
+    assert differ.update(make_desktop(window=(10, 10, 300, 300))).changed
+    print("✅ FrameDiffer tracks the previous frame")
+
+
+def main():
+    test_identical_frames()
+    test_changed_region_is_located()
+    test_separate_regions()
+    test_perceptual_hash()
+    test_frame_differ()
+    print("\n🎉 All frame diff tests passed")
+
+
+if __name__ == "__main__":
+    main()
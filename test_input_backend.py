@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for the pluggable input backends
+(core/utils/operating_system/input_backend.py) and the ActionExecutor on top
+of them. Nothing here injects real input: the recording backend is used, and
+the xdotool and Windows backends get a fake command runner / user32.
+"""
+
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.operating_system.action_executor import ActionExecutor
+from core.utils.operating_system.input_backend import (
+    PLATFORM_ORDER,
+    RecordingInputBackend,
+    WindowsInputBackend,
+    XdotoolInputBackend,
+    create_backend,
+    get_input_backend,
+    select_backend,
+    set_input_backend,
+)
+
+
+class FakeXdotool(XdotoolInputBackend):
+    def __init__(self):
+        self.commands = []
+
+    def _run(self, *args):
+        self.commands.append(list(args))
+
+
+class FakeUser32:
+    # VkKeyScanW results on a US layout: virtual key, shift state in the high byte
+    LAYOUT = {"H": 0x148, "i": 0x49, ",": 0xBC, " ": 0x20, "!": 0x131}
+
+    def __init__(self):
+        self.calls = []
+
+    def VkKeyScanW(self, code):
+        return self.LAYOUT.get(chr(code), -1)
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name,) + args)
+
+
+def test_selection():
+    assert isinstance(select_backend("recording"), RecordingInputBackend)
+    try:
+        create_backend("carrier-pigeon")
+        raise AssertionError("unknown backend was created")
+    except ValueError:
+        pass
+    # The recording backend is only used when asked for
+    assert all("recording" not in order for order in PLATFORM_ORDER.values())
+    previous = get_input_backend()
+    recorder = RecordingInputBackend()
+    set_input_backend(recorder)
+    assert get_input_backend() is recorder
+    set_input_backend(previous)
+    print("✅ Backends are selected by name, and the process-wide one can be overridden")
+
+
+def test_executor_uses_one_backend():
+    backend = RecordingInputBackend()
+    executor = ActionExecutor(backend)
+    results = [executor.execute(action) for action in (
+        {"type": "key", "key": "win"},
+        {"type": "key_sequence", "keys": "ctrl+l"},
+        {"type": "type", "text": "https://example.com/docs\n"},
+        {"type": "click", "coordinate": {"x": 640, "y": 360}},
+    )]
+    assert all("recording" in r or r.startswith("Clicked") for r in results), results
+    assert backend.calls() == [("win",), ("ctrl", "l"), ("https://example.com/docs",), ("enter",),
+                               (640, 360, "left", 1)], backend.calls()
+    assert [name for _, name, _ in backend.events] == ["press", "hotkey", "paste", "press", "click"]
+    print("✅ ActionExecutor sends keys, pastes and clicks through the selected backend")
+
+
+def test_executor_without_backend():
+    previous = get_input_backend()
+    set_input_backend(None)
+    try:
+        result = ActionExecutor().execute({"type": "key", "key": "enter"})
+    finally:
+        set_input_backend(previous)
+    assert result.startswith("Action execution error") and "INPUT_BACKEND" in result, result
+    print("✅ Without an input backend actions fail with one clear error")
+
+
+def test_xdotool_commands():
+    backend = FakeXdotool()
+    backend.press("enter")
+    backend.hotkey("win", "r")
+    backend.write("ls -la", interval=0.01)
+    backend.click(10, 20, button="right")
+    backend.press("f5")
+    assert backend.commands == [
+        ["key", "--clearmodifiers", "Return"],
+        ["key", "--clearmodifiers", "super+r"],
+        ["type", "--delay", "10", "--", "ls -la"],
+        ["mousemove", "10", "20", "click", "--repeat", "1", "3"],
+        ["key", "--clearmodifiers", "F5"],
+    ], backend.commands
+    print("✅ xdotool backend maps key names to X keysyms")
+
+
+def test_windows_key_order():
+    backend = WindowsInputBackend.__new__(WindowsInputBackend)
+    backend._user32 = FakeUser32()
+    backend.hotkey("ctrl", "v")
+    assert backend._user32.calls == [("keybd_event", 0x11, 0, 0, 0), ("keybd_event", 0x56, 0, 0, 0),
+                                     ("keybd_event", 0x56, 0, 2, 0), ("keybd_event", 0x11, 0, 2, 0)]
+    try:
+        backend.press("hyper")
+        raise AssertionError("unknown key was pressed")
+    except ValueError:
+        pass
+    print("✅ Windows backend releases hotkeys in reverse and rejects unknown keys")
+
+
+def test_windows_write_keeps_case_and_punctuation():
+    backend = WindowsInputBackend.__new__(WindowsInputBackend)
+    backend._user32 = FakeUser32()
+    backend.write("Hi, !")
+    down = [args[1] for args in backend._user32.calls if args[3] == 0]
+    assert down == [0x10, 0x48, 0x49, 0xBC, 0x20, 0x10, 0x31], [hex(vk) for vk in down]
+    assert backend._user32.calls[:4] == [("keybd_event", 0x10, 0, 0, 0), ("keybd_event", 0x48, 0, 0, 0),
+                                         ("keybd_event", 0x48, 0, 2, 0), ("keybd_event", 0x10, 0, 2, 0)]
+
+    backend._user32.calls.clear()
+    try:
+        backend.write("Hi é")
+        raise AssertionError("unmappable character was skipped")
+    except ValueError:
+        pass
+    assert backend._user32.calls == [], "nothing is typed when a character cannot be"
+    print("✅ Windows backend types capitals and punctuation, and refuses unmappable text")
+
+
+def main():
+    test_selection()
+    test_executor_uses_one_backend()
+    test_executor_without_backend()
+    test_xdotool_commands()
+    test_windows_key_order()
+    test_windows_write_keeps_case_and_punctuation()
+    print("\n🎉 All input backend tests passed")
+
+
+if __name__ == "__main__":
+    main()
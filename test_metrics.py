@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process metrics registry (core/utils/metrics.py).
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.metrics import MetricsRegistry, observe_span, run_exporter, LLM_TOKENS, STAGE_SECONDS, STEPS
+from core.utils.timeline import SessionTimeline
+
+
+def test_counters_from_many_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_events_total", "Events")
+
+    def worker():
+        for _ in range(10000):
+            counter.inc(kind="a")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counter.value(kind="a") == 80000, counter.value(kind="a")
+    assert registry.counter("test_events_total") is counter
+    print("✅ Per-thread counter cells add up without locks")
+
+
+def test_histogram_and_exposition():
+    registry = MetricsRegistry()
+    hist = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(value, stage="parse")
+    gauge = registry.gauge("test_in_flight", "In flight")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    text = registry.render()
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="1"} 3' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="+Inf"} 4' in text
+    assert 'test_latency_seconds_count{stage="parse"} 4' in text
+    assert 'test_latency_seconds_sum{stage="parse"} 4.05' in text
+    assert 'test_in_flight 1' in text
+    print("✅ Histogram buckets rendered in Prometheus text format")
+
+
+def test_timeline_feeds_metrics():
+    steps_before = STEPS.value()
+    timeline = SessionTimeline("metrics", on_span=observe_span)
+    timeline.record("step", 0.0, 1.0, step=0)
+    timeline.record("llm_total", 0.0, 2.0, step=0, stage="action", tokens=40)
+    assert STEPS.value() == steps_before + 1
+    assert LLM_TOKENS.value(stage="action") >= 40
+    assert STAGE_SECONDS.snapshot()[(("stage", "llm_total"),)]["count"] >= 1
+    print("✅ Finished spans update stage, step and token metrics")
+
+
+def test_exporter_writes_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "automoy.prom")
+
+        async def run():
+            stop = asyncio.Event()
+            task = asyncio.create_task(run_exporter(stop, interval=0.05, path=path))
+            await asyncio.sleep(0.2)
+            stop.set()
+            await task
+
+        asyncio.run(run())
+        text = open(path, encoding="utf-8").read()
+    assert "automoy_metrics_snapshot_timestamp_seconds" in text
+    assert "# TYPE automoy_event_loop_lag_seconds histogram" in text
+    print("✅ Exporter writes snapshots")
+
+
+def main():
+    test_counters_from_many_threads()
+    test_histogram_and_exposition()
+    test_timeline_feeds_metrics()
+    test_exporter_writes_snapshot()
+    print("\n🎉 All metrics tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for batched OmniParser parsing (OmniParserInterface.parse_many and
+the tiled parser's batch path). Tiny local HTTP servers stand in for a patched
+and an unpatched OmniParser.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PIL import Image
+
+from core.utils.omniparser.omniparser_interface import OmniParserInterface
+from core.utils.omniparser.tiling import TiledParser
+
+
+def _result(index):
+    return {"parsed_content_list": [
+        {"type": "text", "content": f"frame {index}", "bbox_normalized": [0.1, 0.1, 0.3, 0.2]},
+    ]}
+
+
+class FakeOmniParserHandler(BaseHTTPRequestHandler):
+    """Serves /parse_batch/ unless ``batch`` is False (an unpatched server)."""
+
+    batch = True
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append((self.path, body))
+        if self.path == "/parse_batch/" and not self.batch:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.path == "/parse_batch/":
+            response = {"results": [_result(i) for i in range(len(body["images"]))]}
+        else:
+            response = _result(0)
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def _frames(directory, count, size=(64, 48)):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"frame{i}.png")
+        Image.new("RGB", size, (i * 20, 0, 0)).save(path)
+        paths.append(path)
+    return paths
+
+
+@contextmanager
+def fake_server():
+    """Serve FakeOmniParserHandler on a free port; yields its URL."""
+    server = HTTPServer(("127.0.0.1", 0), FakeOmniParserHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="module")
+def url():
+    with fake_server() as server_url:
+        yield server_url
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path)
+
+
+@pytest.fixture
+def frames(directory):
+    return _frames(directory, 5)
+
+
+def test_parse_many_batches(url, frames):
+    FakeOmniParserHandler.requests_seen.clear()
+    interface = OmniParserInterface(server_url=url)
+    results = interface.parse_many(frames, batch_size=3, captions=True)
+    paths = [path for path, _ in FakeOmniParserHandler.requests_seen]
+    assert paths == ["/parse_batch/", "/parse_batch/"], paths
+    assert [len(body["images"]) for _, body in FakeOmniParserHandler.requests_seen] == [3, 2]
+    assert [r["parsed_content_list"][0]["content"] for r in results] == \
+        ["frame 0", "frame 1", "frame 2", "frame 0", "frame 1"]
+    assert all(r["coords"] and r["captions"] for r in results)
+    print("✅ Five frames parsed in two batch requests")
+
+
+def test_parse_many_falls_back(url, frames):
+    FakeOmniParserHandler.requests_seen.clear()
+    FakeOmniParserHandler.batch = False
+    try:
+        interface = OmniParserInterface(server_url=url)
+        first = interface.parse_many(frames[:2], captions=True)
+        second = interface.parse_many(frames[2:4], captions=True)
+    finally:
+        FakeOmniParserHandler.batch = True
+    paths = [path for path, _ in FakeOmniParserHandler.requests_seen]
+    assert paths == ["/parse_batch/", "/parse/", "/parse/", "/parse/", "/parse/"], paths
+    assert len(first) == len(second) == 2 and all(first + second)
+    print("✅ Unpatched servers get one /parse/ per frame (batch endpoint probed once)")
+
+
+def test_tiles_sent_as_one_batch(url, directory):
+    FakeOmniParserHandler.requests_seen.clear()
+    frame = os.path.join(directory, "wide.png")
+    Image.new("RGB", (200, 100), (0, 0, 0)).save(frame)
+    parser = TiledParser(OmniParserInterface(server_url=url), tile_size=100, overlap=20)
+    result = parser.parse_screenshot(frame, overlay=False, captions=True)
+    assert [path for path, _ in FakeOmniParserHandler.requests_seen] == ["/parse_batch/"]
+    assert result["tiles"] == len(FakeOmniParserHandler.requests_seen[0][1]["images"]) > 1
+    print(f"✅ {result['tiles']} tiles parsed in one batch request")
+
+
+def main():
+    with fake_server() as url, tempfile.TemporaryDirectory() as tmp:
+        frames = _frames(tmp, 5)
+        test_parse_many_batches(url, frames)
+        test_parse_many_falls_back(url, frames)
+        test_tiles_sent_as_one_batch(url, tmp)
+    print("\n🎉 All batch parse tests passed")
+
+
+if __name__ == "__main__":
+    main()
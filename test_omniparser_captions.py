@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for detection-only parses with on-demand icon captions
+(core/utils/omniparser/captions.py and OmniParserInterface.caption_elements).
+A tiny local HTTP server stands in for a patched OmniParser.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PIL import Image
+
+from core.utils.omniparser.captions import elements_to_caption
+from core.utils.omniparser.omniparser_interface import OmniParserInterface
+
+ELEMENTS = [
+    {"type": "text", "content": "Recycle Bin", "bbox_normalized": [0.0, 0.1, 0.1, 0.15]},
+    {"type": "icon", "content": "Google Chrome", "bbox_normalized": [0.0, 0.2, 0.05, 0.25]},
+    {"type": "text", "content": "Search", "bbox_normalized": [0.1, 0.9, 0.2, 0.95]},
+    {"type": "icon", "content": "Settings gear", "bbox_normalized": [0.5, 0.9, 0.52, 0.95]},
+    {"type": "icon", "content": "Calculator", "bbox_normalized": [0.6, 0.9, 0.62, 0.95]},
+]
+
+
+class FakeOmniParserHandler(BaseHTTPRequestHandler):
+    """Detection-only parses leave icon content empty; /caption/ captions given boxes."""
+
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append((self.path, body))
+        if self.path == "/caption/":
+            captions = {tuple(e["bbox_normalized"]): e["content"] for e in ELEMENTS}
+            response = {"captions": [captions[tuple(box)] for box in body["bboxes"]]}
+        else:
+            captioned = body.get("captions", True)
+            response = {"captions": captioned, "parsed_content_list": [
+                dict(e, content=e["content"] if captioned or e["type"] == "text" else None) for e in ELEMENTS]}
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def fake_server():
+    """Serve FakeOmniParserHandler on a free port; yields its URL."""
+    server = HTTPServer(("127.0.0.1", 0), FakeOmniParserHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_screenshot(directory):
+    image_path = os.path.join(directory, "shot.png")
+    Image.new("RGB", (64, 48), (0, 0, 0)).save(image_path)
+    return image_path
+
+
+def detection_only_parse(url, image_path):
+    """A fresh detection-only parse (a new interface, so no cached captioned result is reused)."""
+    return OmniParserInterface(server_url=url).parse_screenshot(image_path, overlay=False, captions=False)
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    with fake_server() as url:
+        yield url
+
+
+@pytest.fixture
+def interface(server_url):
+    return OmniParserInterface(server_url=server_url)
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    return make_screenshot(str(tmp_path))
+
+
+@pytest.fixture
+def parsed(server_url, image_path):
+    return detection_only_parse(server_url, image_path)
+
+
+def test_detection_only_parse(interface, image_path):
+    result = interface.parse_screenshot(image_path, overlay=False, captions=False)
+    assert FakeOmniParserHandler.requests_seen[-1][1]["captions"] is False
+    assert result["captions"] is False
+    assert [e["content"] for e in result["parsed_content_list"]] == ["Recycle Bin", None, "Search", None, None]
+
+    seen = len(FakeOmniParserHandler.requests_seen)
+    captioned = interface.parse_screenshot(image_path, overlay=False, captions=True)
+    assert len(FakeOmniParserHandler.requests_seen) == seen + 1, "cached detection-only parse reused for a captioned one"
+    assert interface.parse_screenshot(image_path, overlay=False, captions=False) is captioned
+    print("✅ Detection-only parse skips icon captions and is not reused for captioned parses")
+
+
+def test_caption_policy(parsed):
+    elements = parsed["parsed_content_list"]
+    assert elements_to_caption(elements, "Action generation for: Click on the Search box") == []
+    assert elements_to_caption(elements, "Action generation for: Open Google Chrome") == [1, 3, 4]
+    print("✅ Icons are only captioned when the OCR text does not cover the task")
+
+
+def test_caption_on_demand(interface, image_path, parsed):
+    captions = interface.caption_elements(image_path, parsed, [1, 4, 1, 99])
+    path, body = FakeOmniParserHandler.requests_seen[-1]
+    assert path == "/caption/" and len(body["bboxes"]) == 2
+    assert captions == {1: "Google Chrome", 4: "Calculator"}
+    assert parsed["parsed_content_list"][1]["content"] == "Google Chrome"
+    assert parsed["coords"][4]["content"] == "Calculator"
+    assert parsed["parsed_content_list"][3]["content"] is None
+    print("✅ Only the requested elements are captioned, in place")
+
+
+def main():
+    with fake_server() as url, tempfile.TemporaryDirectory() as tmp:
+        image_path = make_screenshot(tmp)
+        test_detection_only_parse(OmniParserInterface(server_url=url), image_path)
+        test_caption_policy(detection_only_parse(url, image_path))
+        test_caption_on_demand(OmniParserInterface(server_url=url), image_path,
+                               detection_only_parse(url, image_path))
+    print("\n🎉 All caption tests passed")
+
+
+if __name__ == "__main__":
+    main()
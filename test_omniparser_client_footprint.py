@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Regression test for the OmniParser client's import cost
+(core/utils/omniparser/omniparser_interface.py).
+
+The models live in the server process, so importing the client must not pull
+in torch or other inference stacks. The import is measured in a fresh
+interpreter: modules loaded, wall time and resident memory added.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+MODULE = "core.utils.omniparser.omniparser_interface"
+
+# Inference stacks that belong in the server only
+FORBIDDEN = ("torch", "torchvision", "transformers", "ultralytics", "onnxruntime", "cv2", "easyocr")
+
+# Generous budgets: the torch import alone costs seconds and hundreds of MB
+MAX_IMPORT_SECONDS = 1.5
+MAX_RSS_MB = 80
+
+PROBE = r"""
+import json, sys, time
+
+def rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss / (1024 * 1024)
+        except ImportError:
+            return None
+
+before = rss_mb()
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+after = rss_mb()
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": None if before is None else after - before,
+    "modules": sorted(name for name in sys.modules if "." not in name),
+}}))
+"""
+
+
+def measure_import():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=MODULE)],
+        cwd=project_root, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def footprint():
+    return measure_import()
+
+
+def test_no_inference_stack(footprint):
+    loaded = [name for name in FORBIDDEN if name in footprint["modules"]]
+    assert not loaded, f"{MODULE} imports {loaded}"
+    print(f"✅ Client import loads none of: {', '.join(FORBIDDEN)}")
+
+
+def test_import_budget(footprint):
+    assert footprint["seconds"] < MAX_IMPORT_SECONDS, footprint["seconds"]
+    rss = footprint["rss_mb"]
+    if rss is not None:
+        assert rss < MAX_RSS_MB, f"import added {rss:.0f} MB"
+    rss_text = f"{rss:.1f} MB" if rss is not None else "RSS not measurable here"
+    print(f"✅ Client import: {footprint['seconds'] * 1000:.0f} ms, {rss_text}")
+
+
+def main():
+    footprint = measure_import()
+    test_no_inference_stack(footprint)
+    test_import_budget(footprint)
+    print("\n🎉 All OmniParser client footprint tests passed")
+
+
+if __name__ == "__main__":
+    main()
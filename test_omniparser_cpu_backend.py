@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the OmniParser CPU serving options
+(core/utils/omniparser/omniparser_interface.py) and the element agreement
+used by evaluations/benchmark_omniparser_cpu.py.
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "evaluations"))
+
+from config import config as config_module
+from core.utils.omniparser import omniparser_interface
+from core.utils.omniparser.omniparser_interface import _serving_options
+from benchmark_omniparser_cpu import match_elements
+
+
+@contextmanager
+def stock_weights(directory):
+    """Point DEFAULT_MODEL_PATH at a stock model.pt in ``directory``; yields the directory."""
+    weights_dir = pathlib.Path(directory)
+    (weights_dir / "model.pt").write_bytes(b"pt")
+    original = omniparser_interface.DEFAULT_MODEL_PATH
+    omniparser_interface.DEFAULT_MODEL_PATH = weights_dir / "model.pt"
+    try:
+        yield weights_dir
+    finally:
+        omniparser_interface.DEFAULT_MODEL_PATH = original
+
+
+@pytest.fixture
+def weights_dir(tmp_path):
+    with stock_weights(tmp_path) as directory:
+        yield directory
+
+
+def test_backend_selects_exported_model(weights_dir):
+    (weights_dir / "model.onnx").write_bytes(b"onnx")
+    device, weights, env = _serving_options("cpu", "onnx", None)
+    assert device == "cpu" and weights.name == "model.onnx", weights
+    assert env["OMNIPARSER_INT8"] == "0"
+
+    device, weights, env = _serving_options("cpu", "int8", None)
+    assert weights.name == "model.pt", "missing int8 export falls back to PyTorch"
+    assert "OMNIPARSER_INT8" not in env
+
+    (weights_dir / "model.int8.onnx").write_bytes(b"onnx")
+    device, weights, env = _serving_options("cpu", "int8", None)
+    assert weights.name == "model.int8.onnx" and env["OMNIPARSER_INT8"] == "1"
+
+    device, weights, env = _serving_options("cuda", "int8", None)
+    assert device == "cuda" and weights.name == "model.pt" and env == {}
+    print("✅ CPU backends pick the exported detector and fall back when it is missing")
+
+
+def test_threads_with_explicit_backend(weights_dir):
+    # weights_dir keeps the lookup away from the real OmniParser weights
+    original = config_module.Config
+
+    class ThreadedConfig(original):
+        def get(self, key, default=None):
+            return 2 if key == "OMNIPARSER_CPU_THREADS" else super().get(key, default)
+
+    config_module.Config = ThreadedConfig
+    try:
+        device, weights, env = _serving_options("cpu", "onnx", None)
+    finally:
+        config_module.Config = original
+    assert env["OMNIPARSER_THREADS"] == env["OMP_NUM_THREADS"] == "2", env
+    print("✅ OMNIPARSER_CPU_THREADS applies when device and backend are passed explicitly")
+
+
+def test_element_agreement():
+    reference = [((0, 0, .1, .1), "chrome"), ((.5, .5, .6, .6), "file")]
+    candidate = [((0, 0, .1, .11), "chrome"), ((.5, .5, .6, .6), "edit"), ((.8, .8, .9, .9), "x")]
+    score = match_elements(reference, candidate)
+    assert score["matched"] == 2 and score["recall"] == 1.0
+    assert abs(score["precision"] - 2 / 3) < 1e-9 and score["content"] == 0.5
+    assert match_elements([], [])["f1"] == 1.0
+    print("✅ Element agreement matches boxes by IoU and compares their text")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        with stock_weights(tmp) as weights_dir:
+            test_backend_selects_exported_model(weights_dir)
+            test_threads_with_explicit_backend(weights_dir)
+    test_element_agreement()
+    print("\n🎉 All OmniParser CPU backend tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the optional, lazily decoded OmniParser overlay.
+A tiny local HTTP server stands in for OmniParser.
+"""
+
+import base64
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PIL import Image
+
+from core.utils.omniparser import overlay as overlay_store
+from core.utils.omniparser.omniparser_interface import OmniParserInterface
+
+
+def _png_base64(color):
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+class FakeOmniParserHandler(BaseHTTPRequestHandler):
+    """Behaves like a patched server: the overlay is only sent when requested."""
+
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append(body)
+        response = {"parsed_content_list": [
+            {"type": "icon", "content": "OK", "bbox_normalized": [0.1, 0.1, 0.2, 0.2]},
+        ]}
+        if body.get("overlay", True):
+            response["som_image_base64"] = _png_base64((255, 0, 0))
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def fake_server():
+    """Serve FakeOmniParserHandler on a free port; yields its URL."""
+    server = HTTPServer(("127.0.0.1", 0), FakeOmniParserHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def overlay_workspace(directory):
+    """An empty static dir the overlay store writes to, and a screenshot to parse."""
+    static_dir = os.path.join(directory, "static")
+    os.makedirs(static_dir)
+    image_path = os.path.join(directory, "shot.png")
+    Image.new("RGB", (64, 48), (0, 0, 0)).save(image_path)
+    original = overlay_store.OVERLAY_DIR
+    overlay_store.OVERLAY_DIR = static_dir
+    try:
+        yield image_path, static_dir
+    finally:
+        overlay_store.OVERLAY_DIR = original
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    with fake_server() as url:
+        yield url
+
+
+@pytest.fixture
+def interface(server_url):
+    return OmniParserInterface(server_url=server_url)
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    with overlay_workspace(str(tmp_path)) as paths:
+        yield paths
+
+
+@pytest.fixture
+def image_path(workspace):
+    return workspace[0]
+
+
+@pytest.fixture
+def static_dir(workspace):
+    return workspace[1]
+
+
+def test_overlay_skipped_when_not_requested(interface, image_path, static_dir):
+    result = interface.parse_screenshot(image_path, overlay=False)
+    assert result and len(result["parsed_content_list"]) == 1
+    assert "overlay_path" not in result and "som_image_base64" not in result
+    assert FakeOmniParserHandler.requests_seen[-1]["overlay"] is False
+    assert not os.listdir(static_dir), os.listdir(static_dir)
+    print("✅ Headless parse skips the overlay entirely")
+
+
+def test_overlay_stored_undecoded(interface, image_path, static_dir):
+    result = interface.parse_screenshot(image_path, overlay=True)
+    b64_path, png_path = overlay_store.overlay_paths(static_dir)
+    assert result["overlay_path"] == str(png_path)
+    assert "som_image_base64" not in result
+    assert b64_path.exists() and not png_path.exists()
+    print("✅ Overlay written once as base64, not decoded on the parse path")
+
+
+def test_overlay_decoded_on_demand(interface, image_path, static_dir):
+    interface.parse_screenshot(image_path, overlay=True)
+    png_path = overlay_store.materialize_overlay(static_dir)
+    with Image.open(png_path) as image:
+        assert image.size == (64, 48) and image.getpixel((0, 0)) == (255, 0, 0)
+    mtime = png_path.stat().st_mtime_ns
+    assert overlay_store.materialize_overlay(static_dir) == png_path
+    assert png_path.stat().st_mtime_ns == mtime, "unchanged overlay was decoded again"
+    print("✅ Overlay decoded when first viewed and reused afterwards")
+
+
+def main():
+    with fake_server() as url, tempfile.TemporaryDirectory() as tmp:
+        with overlay_workspace(tmp) as (image_path, static_dir):
+            interface = OmniParserInterface(server_url=url)
+            test_overlay_skipped_when_not_requested(interface, image_path, static_dir)
+            test_overlay_stored_undecoded(interface, image_path, static_dir)
+            test_overlay_decoded_on_demand(interface, image_path, static_dir)
+    print("\n🎉 All overlay tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the OmniParser server pool balancer.
+Worker interfaces are replaced with in-process fakes, so no servers are needed.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.omniparser.omniparser_pool import OmniParserPool
+from core.utils.omniparser.omniparser_server_manager import OmniParserServerManager
+
+
+class FakeInterface:
+    """Pretends to be an OmniParserInterface; records which port served each parse."""
+
+    def __init__(self, port, healthy=True, delay=0.2):
+        self.port = port
+        self.server_url = f"http://localhost:{port}"
+        self.healthy = healthy
+        self.delay = delay
+        self.served = 0
+        self.active = 0
+        self.max_active = 0
+        self.launches = []
+        self.server_process = None
+        self.startup_metrics = {}
+        self._lock = threading.Lock()
+
+    def _check_server_ready(self):
+        return self.healthy
+
+    def parse_screenshot(self, image_path, overlay=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            self.served += 1
+        return {"parsed_content_list": [], "port": self.port}
+
+    def launch_server(self, **kwargs):
+        self.launches.append(kwargs)
+        self.healthy = True
+        return True
+
+    def stop_server(self):
+        pass
+
+
+def make_pool(size, unhealthy=()):
+    pool = OmniParserPool(size=size, base_port=9100)
+    for worker in pool.workers:
+        worker.interface = FakeInterface(worker.port, healthy=worker.port not in unhealthy)
+    pool.probe()
+    return pool
+
+
+def test_parallel_parses_spread_across_workers():
+    pool = make_pool(3)
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(pool.parse_screenshot, ["shot.png"] * 6))
+    elapsed = time.time() - start
+
+    served = [w.interface.served for w in pool.workers]
+    assert served == [2, 2, 2], served
+    assert all(w.interface.max_active <= 2 for w in pool.workers)
+    assert all(w.outstanding == 0 for w in pool.workers)
+    # Six 0.2s parses on three servers take ~0.4s, not the ~1.2s of a single server
+    assert elapsed < 0.9, elapsed
+    assert {r["port"] for r in results} == {9100, 9101, 9102}
+    print(f"✅ 6 parses spread over 3 workers in {elapsed:.2f}s: {served}")
+
+
+def test_unhealthy_worker_skipped():
+    pool = make_pool(3, unhealthy=(9101,))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(pool.parse_screenshot, ["shot.png"] * 4))
+    served = {w.port: w.interface.served for w in pool.workers}
+    assert served[9101] == 0, served
+    assert served[9100] + served[9102] == 4, served
+    print(f"✅ Unhealthy worker left out of rotation: {served}")
+
+
+def test_primary_server_gets_thread_share():
+    manager = OmniParserServerManager(pool_size=2, base_port=9100)
+    manager.pool.cpu_threads = 8
+    for worker in manager.pool.workers:
+        worker.interface = FakeInterface(worker.port, healthy=False)
+    manager._interface = manager.pool.workers[0].interface
+
+    manager.start_server(check_running=False)
+    manager.pool.start(wait=True)
+    assert [len(w.interface.launches) for w in manager.pool.workers] == [1, 1]
+    envs = [w.interface.launches[0]["extra_env"] for w in manager.pool.workers]
+    assert all(env["OMP_NUM_THREADS"] == "4" and env["OMNIPARSER_THREADS"] == "4" for env in envs), envs
+    assert [w.interface.launches[0]["port"] for w in manager.pool.workers] == [9100, 9101]
+    print("✅ The primary server and the other pool workers split the CPU threads")
+
+
+def main():
+    test_parallel_parses_spread_across_workers()
+    test_unhealthy_worker_skipped()
+    test_primary_server_gets_thread_share()
+    print("\n🎉 All OmniParser pool tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for tiled OmniParser parsing (core/utils/omniparser/tiling.py).
+A fake parser "detects" white rectangles in each tile, so no server is needed.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from core.utils.omniparser import overlay as overlay_store
+from core.utils.omniparser.tiling import TiledParser, iou, merge_tile_elements, plan_tiles
+
+# White "icons" on a 4K frame; the second straddles the vertical tile seam,
+# the third is wider than the overlap zone.
+ICONS = [
+    (100, 100, 180, 180),
+    (1850, 500, 1900, 560),
+    (1700, 1200, 2300, 1260),
+]
+
+
+class FakeRectangleParser:
+    """Returns one element per connected white rectangle in the image."""
+
+    def __init__(self):
+        self.calls = 0
+        self.overlays = []
+
+    def parse_screenshot(self, image_path, overlay=None):
+        self.calls += 1
+        self.overlays.append(overlay)
+        with Image.open(image_path) as image:
+            pixels = np.asarray(image.convert("L")) > 250
+        height, width = pixels.shape
+        elements = []
+        seen = np.zeros_like(pixels)
+        for y, x in zip(*np.nonzero(pixels)):
+            if seen[y, x]:
+                continue
+            # Rectangles only: extend right and down from the top-left corner
+            x2 = x
+            while x2 + 1 < width and pixels[y, x2 + 1]:
+                x2 += 1
+            y2 = y
+            while y2 + 1 < height and pixels[y2 + 1, x]:
+                y2 += 1
+            seen[y:y2 + 1, x:x2 + 1] = True
+            elements.append({
+                "type": "icon",
+                "content": f"icon@{x},{y}",
+                "bbox_normalized": [x / width, y / height, (x2 + 1) / width, (y2 + 1) / height],
+            })
+        return {"parsed_content_list": elements}
+
+
+def test_plan_tiles():
+    tiles = plan_tiles(3840, 2160, tile_size=1920, overlap=160)
+    assert len(tiles) == 6, tiles
+    assert all(r - l <= 1920 and b - t <= 1920 for l, t, r, b in tiles)
+    assert max(r for _, _, r, _ in tiles) == 3840 and max(b for _, _, _, b in tiles) == 2160
+    # Neighbouring tiles share at least the requested overlap
+    columns = sorted({(l, r) for l, _, r, _ in tiles})
+    assert all(a[1] - b[0] >= 160 for a, b in zip(columns, columns[1:])), columns
+    assert plan_tiles(1920, 1080) == [(0, 0, 1920, 1080)]
+    print(f"✅ 4K frame planned as {len(tiles)} overlapping tiles")
+
+
+def test_nms_removes_overlap_duplicates():
+    # The same icon seen fully by two overlapping tiles
+    tile_a, tile_b = (0, 0, 1000, 1000), (900, 0, 1900, 1000)
+    results = [
+        (tile_a, [{"content": "a", "bbox_normalized": [0.92, 0.1, 0.96, 0.14]}]),
+        (tile_b, [{"content": "a", "bbox_normalized": [0.02, 0.1, 0.06, 0.14]}]),
+    ]
+    merged = merge_tile_elements(results, (1900, 1000))
+    assert len(merged) == 1, merged
+    print("✅ Duplicate from the overlap zone suppressed")
+
+
+def save_frame(directory):
+    """A 4K frame with the ICONS drawn on it; returns its path."""
+    frame = Image.new("RGB", (3840, 2160), (20, 20, 20))
+    draw = ImageDraw.Draw(frame)
+    for box in ICONS:
+        draw.rectangle((box[0], box[1], box[2] - 1, box[3] - 1), fill=(255, 255, 255))
+    path = os.path.join(directory, "frame.png")
+    frame.save(path)
+    return path
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path)
+
+
+def test_tiled_parse_matches_icons():
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = FakeRectangleParser()
+        result = TiledParser(fake, tile_size=1920, overlap=160).parse_screenshot(save_frame(tmp), overlay=False)
+
+    assert fake.calls == 6, fake.calls
+    elements = result["parsed_content_list"]
+    assert len(elements) == len(ICONS), [e["bbox_normalized"] for e in elements]
+    for expected in ICONS:
+        best = max(iou(expected, tuple(v * s for v, s in zip(e["bbox_normalized"], (3840, 2160, 3840, 2160))))
+                   for e in elements)
+        assert best > 0.95, (expected, best)
+    assert "overlay_path" not in result
+    print(f"✅ {len(ICONS)} icons recovered from {fake.calls} tiles, including seam-crossing ones")
+
+
+def test_tiled_overlay_drawn_from_merged_boxes(directory):
+    original = overlay_store.OVERLAY_DIR
+    overlay_store.OVERLAY_DIR = os.path.join(directory, "static")
+    try:
+        fake = FakeRectangleParser()
+        result = TiledParser(fake, tile_size=1920, overlap=160).parse_screenshot(save_frame(directory),
+                                                                                 overlay=True)
+        png_path = overlay_store.materialize_overlay()
+    finally:
+        overlay_store.OVERLAY_DIR = original
+
+    assert fake.overlays == [False] * fake.calls, "tiles are parsed without server overlays"
+    assert result["overlay_path"] == str(png_path)
+    with Image.open(png_path) as image:
+        # Scaled to one tile: the 4K frame halves, and the first icon's box is outlined in red
+        assert image.size == (1920, 1080), image.size
+        assert image.getpixel((50, 70)) == (255, 0, 0), image.getpixel((50, 70))
+    print("✅ A tiled parse draws the merged boxes as the GUI overlay when one is requested")
+
+
+def main():
+    test_plan_tiles()
+    test_nms_removes_overlap_duplicates()
+    test_tiled_parse_matches_icons()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_tiled_overlay_drawn_from_merged_boxes(tmp)
+    print("\n🎉 All tiling tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy plugin registry (core/utils/plugins.py).
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.exceptions import PluginDisabledError
+from core.utils.plugins import PluginRegistry
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path)
+
+
+def test_lazy_module_imports_on_first_use(directory):
+    with open(os.path.join(directory, "fake_input_lib.py"), "w", encoding="utf-8") as f:
+        f.write("FAILSAFE = True\ndef press(key):\n    return f'pressed {key}'\n")
+    sys.path.insert(0, directory)
+    try:
+        plugins = PluginRegistry()
+        plugins.register("fake_input_lib", "fake_input_lib")
+        module = plugins.lazy("fake_input_lib")
+        assert "fake_input_lib" not in sys.modules
+        assert "not loaded" in repr(module)
+
+        module.FAILSAFE = False
+        assert "fake_input_lib" in sys.modules
+        assert sys.modules["fake_input_lib"].FAILSAFE is False
+        assert module.press("enter") == "pressed enter"
+        assert [entry["name"] for entry in plugins.load_report()] == ["fake_input_lib"]
+    finally:
+        sys.path.remove(directory)
+        sys.modules.pop("fake_input_lib", None)
+    print("✅ Lazy modules import on first attribute access and forward writes")
+
+
+def test_disabled_plugin():
+    plugins = PluginRegistry()
+    plugins.register("vmware", "core.utils.vmware.vmware_interface", "VMWareInterface",
+                     config_key="AUTOMOY_TEST_UNSET_KEY")
+    assert not plugins.enabled("vmware")
+    try:
+        plugins.get("vmware")
+        raise AssertionError("disabled plugin was loaded")
+    except PluginDisabledError as e:
+        assert e.config_key == "AUTOMOY_TEST_UNSET_KEY"
+    assert "pyVmomi" not in sys.modules
+    assert not plugins.load_report()
+    print("✅ Disabled plugins raise PluginDisabledError without importing")
+
+
+def test_os_interface_import_is_lazy():
+    code = ("import sys, core.utils.operating_system.os_interface; "
+            "print(','.join(m for m in ('pyautogui', 'keyboard', 'pyscreeze', 'pyperclip') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"⚠️ Skipped OSInterface import check: {result.stderr.strip().splitlines()[-1]}")
+        return
+    assert result.stdout.strip() == "", result.stdout
+    print("✅ Importing OSInterface loads no input library")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        test_lazy_module_imports_on_first_use(tmp)
+    test_disabled_plugin()
+    test_os_interface_import_is_lazy()
+    print("\n🎉 All plugin registry tests passed")
+
+
+if __name__ == "__main__":
+    main()
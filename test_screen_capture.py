@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Test script for the screen capture backends (core/utils/screen_capture.py).
+Frames come from the replay backend or from stub backends, so no display is
+required.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pytest
+from PIL import Image
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils import screen_capture
+from core.utils.screen_capture import (
+    CaptureBackend,
+    PILCaptureBackend,
+    ReplayCaptureBackend,
+    create_backend,
+    get_capture_backend,
+    select_backend,
+    set_capture_backend,
+)
+
+
+def solid(color, size=(64, 48)):
+    return Image.new("RGB", size, color)
+
+
+class StubBackend(CaptureBackend):
+    """Live backend stand-in: ``delay`` seconds per grab, or ``fail`` to raise."""
+
+    name = "stub"
+    is_available = True
+    delay = 0.0
+    fail = False
+
+    def __init__(self, reuse_buffer=False):
+        self.reuse_buffer = reuse_buffer
+        self.closed = False
+
+    @classmethod
+    def available(cls):
+        return cls.is_available
+
+    def monitors(self):
+        return [(0, 0, 64, 48), (0, 0, 64, 48)]
+
+    def grab(self, region=None, monitor=None):
+        if self.fail:
+            raise OSError("no display")
+        if self.delay:
+            time.sleep(self.delay)
+        return solid((0, 0, 0)).crop(self._resolve_region(region, monitor))
+
+    def close(self):
+        self.closed = True
+
+
+def stub(name, **attributes):
+    return type(f"Stub_{name}", (StubBackend,), dict(attributes, name=name))
+
+
+@contextmanager
+def live_backends(mss, pil):
+    """Stand the given stub classes in for the mss and pil backends."""
+    saved = (screen_capture.MSSCaptureBackend, screen_capture.PILCaptureBackend, dict(screen_capture.BACKENDS))
+    screen_capture.MSSCaptureBackend, screen_capture.PILCaptureBackend = mss, pil
+    screen_capture.BACKENDS.update({"mss": mss, "pil": pil})
+    try:
+        yield
+    finally:
+        screen_capture.MSSCaptureBackend, screen_capture.PILCaptureBackend = saved[:2]
+        screen_capture.BACKENDS.clear()
+        screen_capture.BACKENDS.update(saved[2])
+
+
+class FakeImageGrab:
+    """Records ImageGrab.grab calls; the primary screen is 800x600, all screens 1600x600."""
+
+    def __init__(self):
+        self.calls = []
+
+    def grab(self, bbox=None, all_screens=False):
+        self.calls.append((bbox, all_screens))
+        if bbox is not None:
+            return solid((0, 0, 0), (bbox[2] - bbox[0], bbox[3] - bbox[1]))
+        return solid((0, 0, 0), (1600, 600) if all_screens else (800, 600))
+
+
+@contextmanager
+def fake_image_grab():
+    original = screen_capture.ImageGrab
+    screen_capture.ImageGrab = FakeImageGrab()
+    try:
+        yield screen_capture.ImageGrab
+    finally:
+        screen_capture.ImageGrab = original
+
+
+@pytest.fixture
+def image_grab():
+    with fake_image_grab() as grab:
+        yield grab
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path)
+
+
+def test_replay_frames_and_looping():
+    frames = [solid((255, 0, 0)), solid((0, 255, 0))]
+    backend = ReplayCaptureBackend(frames)
+    assert backend.size == (64, 48) and backend.monitors()[1] == (0, 0, 64, 48)
+    colors = [backend.grab().getpixel((0, 0)) for _ in range(3)]
+    assert colors == [(255, 0, 0), (0, 255, 0), (255, 0, 0)], colors
+
+    # Callers may draw on a grabbed frame without changing the recording
+    backend.grab().paste((0, 0, 255), (0, 0, 64, 48))
+    assert frames[1].getpixel((0, 0)) == (0, 255, 0)
+
+    held = ReplayCaptureBackend(frames, loop=False)
+    assert [held.grab().getpixel((0, 0)) for _ in range(3)][-1] == (0, 255, 0)
+    print("✅ Replay serves frames in order, loops, and hands out copies")
+
+
+def test_replay_directory_and_synthetic(directory):
+    for name, color in (("b.png", (0, 255, 0)), ("a.png", (255, 0, 0)), ("notes.txt", None)):
+        path = os.path.join(directory, name)
+        if color:
+            solid(color, (32, 24)).save(path)
+        else:
+            open(path, "w").close()
+    backend = ReplayCaptureBackend(directory)
+    assert backend.size == (32, 24)
+    assert [backend.grab().getpixel((0, 0)) for _ in range(2)] == [(255, 0, 0), (0, 255, 0)]
+
+    synthetic = ReplayCaptureBackend(size=(320, 180))
+    first, second = synthetic.grab(), synthetic.grab()
+    assert first.size == (320, 180) and first.tobytes() != second.tobytes()
+    print("✅ Replay reads image files in name order and synthesises moving frames")
+
+
+def test_region_and_monitor_selection():
+    frame = solid((0, 0, 0), (200, 100))
+    frame.paste((255, 255, 255), (150, 50, 200, 100))
+    backend = ReplayCaptureBackend([frame])
+    crop = backend.grab(region=(150, 50, 200, 100))
+    assert crop.size == (50, 50) and crop.getpixel((0, 0)) == (255, 255, 255)
+
+    assert backend._resolve_region((1.0, 2.6, 30, 40), None) == (1, 2, 30, 40)
+    assert backend._resolve_region(None, 0) == (0, 0, 200, 100)
+    # An unknown monitor falls back to the primary one
+    assert backend._resolve_region(None, 7) == backend.monitors()[1]
+    print("✅ Regions are cropped and unknown monitors fall back to the primary one")
+
+
+def test_auto_selection_picks_fastest():
+    slow, fast = stub("mss", delay=0.01), stub("pil")
+    with live_backends(slow, fast):
+        backend = select_backend("auto", iterations=2)
+        assert isinstance(backend, fast) and not backend.closed
+
+    # A backend whose grabs fail is never chosen, whatever its speed
+    with live_backends(stub("mss", fail=True), stub("pil", delay=0.005)):
+        assert select_backend("auto").name == "pil"
+
+    with live_backends(stub("mss", fail=True), stub("pil", is_available=False)):
+        assert select_backend("auto") is None
+    print("✅ Auto selection benchmarks the live backends and keeps the fastest working one")
+
+
+def test_explicit_selection():
+    with live_backends(stub("mss"), stub("pil")):
+        backend = select_backend("mss", reuse_buffer=True)
+        assert backend.name == "mss" and backend.reuse_buffer
+
+    # An unavailable choice falls back to auto selection; replay is never auto-selected
+    with live_backends(stub("mss", is_available=False), stub("pil")):
+        assert select_backend("mss").name == "pil"
+    assert isinstance(select_backend("replay"), ReplayCaptureBackend)
+
+    try:
+        create_backend("carrier-pigeon")
+        raise AssertionError("unknown backend was created")
+    except ValueError:
+        pass
+    print("✅ A named backend is used when available; otherwise selection falls back to auto")
+
+
+def test_pil_size_is_cached(image_grab):
+    backend = PILCaptureBackend()
+    assert backend.monitors()[1] == (0, 0, 800, 600)
+    assert backend.monitors()[0] == (0, 0, 800, 600)
+    assert len(image_grab.calls) == 1, "monitors() grabbed the screen again"
+
+    backend._size = (640, 480)
+    assert backend.grab().size == (800, 600)
+    assert backend.monitors()[1] == (0, 0, 800, 600), "a primary grab refreshes the size"
+    backend.grab(monitor=0)
+    assert backend.monitors()[1] == (0, 0, 800, 600), "an all-screens grab is not the primary size"
+
+    image_grab.calls.clear()
+    assert backend.grab(region=(10, 20, 110, 70)).size == (100, 50)
+    assert image_grab.calls == [((10, 20, 110, 70), True)], image_grab.calls
+    print("✅ The PIL backend grabs once for its size and refreshes it on primary grabs")
+
+
+def test_process_wide_backend():
+    saved = (screen_capture._backend, screen_capture._backend_selected)
+    first, second = StubBackend(), StubBackend()
+    try:
+        set_capture_backend(first)
+        assert get_capture_backend() is first
+        set_capture_backend(second)
+        assert get_capture_backend() is second and first.closed and not second.closed
+    finally:
+        screen_capture._backend, screen_capture._backend_selected = saved
+    print("✅ Overriding the process-wide backend closes the one it replaces")
+
+
+def main():
+    test_replay_frames_and_looping()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_replay_directory_and_synthetic(tmp)
+    test_region_and_monitor_selection()
+    test_auto_selection_picks_fastest()
+    test_explicit_selection()
+    with fake_image_grab() as image_grab:
+        test_pil_size_is_cached(image_grab)
+    test_process_wide_backend()
+    print("\n🎉 All screen capture tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the screen settle detector (core/utils/screen_settle.py).
+Frames come from a scripted grab function, so no display is needed.
+"""
+
+import os
+import sys
+
+from PIL import Image, ImageDraw
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.screen_settle import ScreenSettleDetector
+
+
+def frame(text_width=0):
+    """160x90 thumbnail of a plain window; ``text_width`` pixels of "text" in its search box."""
+    image = Image.new("L", (160, 90), 230)
+    if text_width:
+        ImageDraw.Draw(image).rectangle((60, 44, 60 + text_width - 1, 45), fill=40)
+    return image
+
+
+class Frames:
+    """Grab function that plays back a script of frames, then repeats the last one."""
+
+    def __init__(self, *frames):
+        self.frames = list(frames)
+        self.grabs = 0
+
+    def __call__(self):
+        self.grabs += 1
+        return self.frames.pop(0) if len(self.frames) > 1 else self.frames[0]
+
+
+def detector(grab, **kwargs):
+    options = dict(stable_ms=50, timeout=1.0, sample_interval_ms=5, change_timeout=0.3)
+    options.update(kwargs)
+    return ScreenSettleDetector(grab_func=grab, **options)
+
+
+def test_stable_screen():
+    result = detector(Frames(frame())).wait()
+    assert result.settled and not result.changed, result
+    assert result.elapsed < 0.3, result
+    print("✅ A still screen settles after stable_ms")
+
+
+def test_small_change_then_settle():
+    # A word typed into a search box: a few pixels of a 160x90 thumbnail
+    grab = Frames(frame(), frame(), frame(4), frame(8), frame(8))
+    result = detector(grab).wait(expect_change=True)
+    assert result.settled and result.changed, result
+    # Settled well before change_timeout would have run out
+    assert result.elapsed < 0.3, result
+    print("✅ A typed-word-sized change is seen, and the wait ends once it settles")
+
+
+def test_expected_change_that_never_comes():
+    result = detector(Frames(frame())).wait(expect_change=True)
+    assert result.settled and not result.changed, result
+    assert result.elapsed >= 0.3, result
+    print("✅ An expected change is waited for up to change_timeout")
+
+
+def test_timeout():
+    flicker = Frames(*[frame(8 if i % 2 else 0) for i in range(1000)])
+    result = detector(flicker, timeout=0.2).wait()
+    assert not result.settled and result.changed, result
+    assert 0.2 <= result.elapsed < 0.4, result
+
+    # A per-call timeout cannot exceed the configured SETTLE_TIMEOUT
+    flicker = Frames(*[frame(8 if i % 2 else 0) for i in range(1000)])
+    result = detector(flicker, timeout=0.2).wait(timeout=2.0)
+    assert not result.settled and result.elapsed < 0.4, result
+    print("✅ A screen that keeps changing gives up at the timeout, capped by SETTLE_TIMEOUT")
+
+
+def test_failed_grab():
+    result = detector(lambda: None).wait()
+    assert not result.settled and result.frames == 0, result
+    print("✅ Without frames the wait ends at once, so callers can fall back to a sleep")
+
+
+def main():
+    test_stable_screen()
+    test_small_change_then_settle()
+    test_expected_change_that_never_comes()
+    test_timeout()
+    test_failed_grab()
+    print("\n🎉 All screen settle tests passed")
+
+
+if __name__ == "__main__":
+    main()
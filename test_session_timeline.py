@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-session latency timeline (core/utils/timeline.py).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.timeline import SessionTimeline, percentile
+
+
+def test_percentile():
+    values = [10, 20, 30, 40, 50]
+    assert percentile(values, 50) == 30
+    assert percentile(values, 90) == 46
+    assert percentile([7], 99) == 7 and percentile([], 50) == 0.0
+    print("✅ Percentiles interpolate between samples")
+
+
+async def _fake_session(timeline):
+    for step in range(3):
+        timeline.step = step
+        with timeline.span("capture"):
+            await asyncio.sleep(0.01)
+
+        async def parse_monitor(index):
+            with timeline.span("omniparser", monitor=index):
+                await asyncio.sleep(0.02)
+
+        # Concurrent spans (like per-monitor parses) land on separate tracks
+        await asyncio.gather(parse_monitor(1), parse_monitor(2))
+        with timeline.span("llm_total", stage="action") as span:
+            start = timeline.now()
+            await asyncio.sleep(0.005)
+            timeline.record("llm_ttft", start, timeline.now(), stage="action")
+            await asyncio.sleep(0.01)
+            span["tokens"] = 12
+
+
+def test_spans_and_trace_export():
+    timeline = SessionTimeline("test-session")
+    asyncio.run(_fake_session(timeline))
+
+    names = [s.name for s in timeline.spans]
+    assert names.count("capture") == 3 and names.count("omniparser") == 6 and names.count("llm_ttft") == 3
+    parses = [s for s in timeline.spans if s.name == "omniparser" and s.step == 0]
+    assert len({s.track for s in parses}) == 2, "concurrent spans share a track"
+
+    trace = timeline.to_chrome_trace()
+    json.dumps(trace)
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert len(complete) == len(timeline.spans)
+    llm = next(e for e in complete if e["name"] == "llm_total")
+    assert llm["dur"] >= 15000 and llm["args"]["tokens"] == 12 and llm["args"]["step"] == 1
+    print(f"✅ {len(complete)} spans exported as Chrome trace events")
+
+
+def test_summary_table():
+    timeline = SessionTimeline("summary")
+    for step, ms in enumerate([100, 200, 300, 400]):
+        timeline.record("llm_total", 0.0, ms / 1000.0, step=step)
+    with timeline.span("capture"):
+        time.sleep(0.001)
+
+    stats = timeline.summary()
+    assert list(stats) == ["capture", "llm_total"], list(stats)
+    assert stats["llm_total"]["count"] == 4
+    assert abs(stats["llm_total"]["p50_ms"] - 250) < 1e-6
+    assert abs(stats["llm_total"]["max_ms"] - 400) < 1e-6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path = timeline.export(tmp)
+        assert trace_path.exists()
+        table = open(os.path.join(tmp, "summary_summary.txt"), encoding="utf-8").read()
+    assert "llm_total" in table and "p99" in table
+    print("✅ Summary table with percentiles written")
+    print(timeline.summary_table())
+
+
+def test_span_records_errors():
+    timeline = SessionTimeline("errors")
+    try:
+        with timeline.span("json_parse"):
+            raise ValueError("bad json")
+    except ValueError:
+        pass
+    assert timeline.spans[0].attrs["error"] == "ValueError"
+    print("✅ Failed stages are still timed and marked")
+
+
+def main():
+    test_percentile()
+    test_spans_and_trace_export()
+    test_summary_table()
+    test_span_records_errors()
+    print("\n🎉 All timeline tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test script for the session trace recorder and replay harness
+(core/utils/session_trace.py).
+
+A small operator stand-in runs the same capture → parse → LLM → execute
+sequence as AutomoyOperator, so the test needs no desktop, OmniParser or LLM.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PIL import Image
+
+from core.utils.region.capture_region import CaptureRegion
+from core.utils.session_trace import SessionTrace, TraceRecorder, TraceReplayer, replay_session
+from core.utils.timeline import SessionTimeline
+
+
+class LiveOmniParser:
+    def parse_screenshot(self, image_path, overlay=None):
+        time.sleep(0.05)
+        return {"parsed_content_list": [{"type": "text", "content": os.path.basename(str(image_path))}],
+                "overlay_path": "/tmp/overlay.png"}
+
+
+class LiveLLM:
+    def construct_action_prompt(self, step):
+        return f"Next action for: {step}"
+
+    async def get_next_action(self, model, messages, objective, session_id, screenshot_path=None,
+                              thinking_callback=None):
+        await asyncio.sleep(0.05)
+        response = json.dumps({"type": "key", "key": "enter", "step": messages[-1]["content"]})
+        for token in response.split(" "):
+            if thinking_callback:
+                await thinking_callback(token + " ")
+        return response, "thinking", None
+
+
+class LiveExecutor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, action):
+        time.sleep(0.02)
+        self.executed.append(action)
+        return f"Pressed {action['key']}"
+
+
+class MiniOperator:
+    """Same attributes and call pattern the trace wiring relies on in AutomoyOperator."""
+
+    def __init__(self, objective, steps=3):
+        self.objective = objective
+        self.steps = [f"step {i}" for i in range(steps)]
+        self.omniparser = LiveOmniParser()
+        self.llm_interface = LiveLLM()
+        self.action_executor = LiveExecutor()
+        self.timeline = SessionTimeline("mini")
+        self.screenshot_region = None
+        self.monitor_frames = []
+        self.record_sessions = True
+        self.streamed = []
+        self.tmp = tempfile.mkdtemp()
+
+    async def _capture_screen(self):
+        await asyncio.sleep(0.02)
+        # Steps 0 and 1 see the same screen, so only two frames are stored
+        shade = 40 if self.timeline.step in (0, 1) else 200
+        self.screenshot_region = CaptureRegion(0, 0, 64, 48)
+        return Image.new("RGB", (64, 48), (shade, shade, shade))
+
+    async def _parse_screenshot(self, path):
+        with self.timeline.span("omniparser"):
+            return await asyncio.to_thread(self.omniparser.parse_screenshot, path)
+
+    async def _wait_for_screen_settle(self, context, fallback_delay, expect_change=False):
+        await asyncio.sleep(fallback_delay)
+
+    async def operate_loop(self):
+        self.timeline.reset("mini")
+        for index, step in enumerate(self.steps):
+            self.timeline.step = index
+            start = self.timeline.now()
+            image = await self._capture_screen()
+            path = os.path.join(self.tmp, f"shot{index}.png")
+            image.save(path)
+            parsed = await self._parse_screenshot(path)
+
+            async def stream(token):
+                self.streamed.append(token)
+
+            screen = parsed["parsed_content_list"][0]["content"] if parsed else ""
+            messages = [{"role": "user", "content": self.llm_interface.construct_action_prompt(step)},
+                        {"role": "user", "content": screen}]
+            raw, _, error = await self.llm_interface.get_next_action(
+                model="m", messages=messages, objective=self.objective, session_id="s",
+                thinking_callback=stream)
+            if error:
+                break
+            action = json.loads(raw)
+            await asyncio.to_thread(self.action_executor.execute, action)
+            await self._wait_for_screen_settle("after action", fallback_delay=0.1)
+            self.timeline.record("step", start, self.timeline.now(), step=index)
+
+
+def record(directory):
+    operator = MiniOperator("Open Chrome")
+    recorder = TraceRecorder(directory, "mini-session", operator.objective)
+
+    async def run():
+        started = time.perf_counter()
+        with recorder.attach(operator):
+            await operator.operate_loop()
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    assert isinstance(operator.omniparser, LiveOmniParser), "originals not restored"
+    return operator, elapsed
+
+
+@pytest.fixture(scope="module")
+def recording(tmp_path_factory):
+    """A session recorded once for the module: (trace directory, operator, live elapsed seconds)."""
+    directory = str(tmp_path_factory.mktemp("session") / "trace")
+    return (directory,) + record(directory)
+
+
+def test_record_trace(recording):
+    directory, operator, elapsed = recording
+    assert len(operator.action_executor.executed) == 3
+    frames = os.listdir(os.path.join(directory, "frames"))
+    assert len(frames) == 2, frames
+
+    trace = SessionTrace.load(directory)
+    assert trace.objective == "Open Chrome"
+    kinds = [e["kind"] for e in trace.events]
+    assert kinds.count("frame") == 3 and kinds.count("parse") == 3
+    assert kinds.count("llm") == 3 and kinds.count("action") == 3
+    assert "overlay_path" not in trace.of_kind("parse")[0]["result"]
+    llm = trace.of_kind("llm")[1]
+    assert llm["step"] == 1 and llm["tokens"] > 1 and llm["messages"][0]["content"] == "Next action for: step 1"
+    print(f"✅ Recorded 3 steps in {elapsed:.2f}s (2 distinct frames stored)")
+
+
+def test_replay_matches_recording(recording):
+    directory, _, live_elapsed = recording
+    operator = MiniOperator("Open Chrome")
+    executor = operator.action_executor
+
+    async def run():
+        started = time.perf_counter()
+        with TraceReplayer(SessionTrace.load(directory)).attach(operator) as replayer:
+            await operator.operate_loop()
+        return replayer, time.perf_counter() - started
+
+    replayer, elapsed = asyncio.run(run())
+    assert not replayer.mismatches, replayer.mismatches
+    assert replayer.remaining() == {"frame": 0, "parse": 0, "llm": 0, "action": 0}
+    assert executor.executed == [], "replay must not drive real input"
+    assert operator.streamed, "replayed responses are streamed to the callback"
+    assert operator.action_executor is executor and operator.record_sessions is True
+    assert elapsed < live_elapsed, (elapsed, live_elapsed)
+    print(f"✅ Replay reproduced the session in {elapsed:.3f}s (live: {live_elapsed:.2f}s)")
+
+
+def test_replay_detects_divergence(recording):
+    directory = recording[0]
+    operator = MiniOperator("Open Chrome", steps=4)
+    operator.steps[1] = "a different step"
+
+    result = asyncio.run(replay_session(directory, operator=operator))
+    assert [m["kind"] for m in result["mismatches"]] == ["prompt"], result["mismatches"]
+    assert result["mismatches"][0]["step"] == 1
+    assert result["exhausted"].get("llm") == 1, result["exhausted"]
+    print("✅ Replay flags prompt drift and stops when responses run out")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "trace")
+        recording = (directory,) + record(directory)
+        test_record_trace(recording)
+        test_replay_matches_recording(recording)
+        test_replay_detects_divergence(recording)
+    print("\n🎉 All session trace tests passed")
+
+
+if __name__ == "__main__":
+    main()
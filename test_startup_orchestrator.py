@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent startup orchestration (core/utils/startup.py).
+Sleeps stand in for the GUI health wait, the OmniParser cold start and the
+LLM interface; the webview window is resolved from another thread as main()
+does.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.exceptions import StartupError
+from core.utils.startup import StartupOrchestrator
+
+
+def _orchestrator(gui_fails=False):
+    startup = StartupOrchestrator()
+
+    def gui():
+        time.sleep(0.2)
+        if gui_fails:
+            raise RuntimeError("GUI server did not become healthy")
+        return "http://127.0.0.1:8001"
+
+    def omniparser():
+        time.sleep(0.6)
+        return "omniparser-interface"
+
+    async def operator(window):
+        return f"operator({window})"
+
+    startup.add("gui", gui)
+    startup.add_external("window", depends=("gui",))
+    startup.add("omniparser", omniparser, required=False)
+    # As in core/main.py: the LLM backend check runs alongside, outside the minimum set
+    startup.add("llm", lambda: (time.sleep(0.05), "llm-interface")[1], required=False)
+    startup.add("operator", operator, depends=("window",))
+    return startup
+
+
+def _main_thread(startup):
+    """What main() does: wait for the GUI server, then create and resolve the window."""
+    try:
+        startup.wait_sync("gui", timeout=5)
+    except StartupError as e:
+        startup.fail("window", e)
+        return
+    time.sleep(0.05)
+    startup.resolve("window", "webview-window")
+
+
+async def _minimum_set_before_stragglers():
+    startup = _orchestrator()
+    threading.Thread(target=_main_thread, args=(startup,), daemon=True).start()
+    started = time.perf_counter()
+    startup.start()
+    results = await startup.wait_minimum()
+    elapsed = time.perf_counter() - started
+
+    assert results == {"gui": "http://127.0.0.1:8001", "window": "webview-window",
+                       "operator": "operator(webview-window)"}, results
+    # Sequential startup would take at least 0.2 + 0.6 + 0.05 s
+    assert elapsed < 0.5, f"minimum set took {elapsed:.2f}s"
+    assert not startup.done("omniparser") and startup.result("omniparser") is None
+    assert startup.critical_path() == ["gui", "window", "operator"], startup.critical_path()
+    print(f"✅ Minimum set ready in {elapsed:.2f}s while OmniParser was still starting")
+
+    assert await startup.ready("llm", timeout=2) == "llm-interface"
+    assert await startup.ready("omniparser", timeout=2) == "omniparser-interface"
+    report = startup.report()
+    assert report["components"]["omniparser"]["status"] == "ready"
+    assert report["components"]["window"]["run_seconds"] < 0.2
+    assert "critical path: gui" in startup.format_report()
+    print(f"✅ {startup.format_report()}")
+
+
+async def _failure_propagates():
+    startup = _orchestrator(gui_fails=True)
+    threading.Thread(target=_main_thread, args=(startup,), daemon=True).start()
+    startup.start()
+    try:
+        await asyncio.wait_for(startup.wait_minimum(), timeout=5)
+        raise AssertionError("startup should have failed")
+    except StartupError as e:
+        assert e.component == "gui", e
+    try:
+        await startup.ready("operator", timeout=5)
+        raise AssertionError("operator should have failed with the GUI")
+    except StartupError as e:
+        assert "dependency 'window' failed" in str(e), e
+    assert startup.report()["components"]["operator"]["status"] == "failed"
+    print("✅ A failed component fails its dependents and the minimum set")
+
+
+async def _cancelled_component_reported():
+    startup = _orchestrator()
+    threading.Thread(target=_main_thread, args=(startup,), daemon=True).start()
+    startup.start()
+    # A shutdown can cancel a readiness future while the component is still starting
+    startup.components["omniparser"].future.cancel()
+    await startup.wait_minimum()
+    report = startup.report()
+    assert report["components"]["omniparser"]["status"] == "cancelled", report["components"]["omniparser"]
+    assert startup.result("omniparser", "none") == "none"
+    assert "omniparser (cancelled)" in startup.format_report(), startup.format_report()
+    print("✅ A cancelled component is reported as cancelled")
+
+
+def test_minimum_set_before_stragglers():
+    asyncio.run(_minimum_set_before_stragglers())
+
+
+def test_failure_propagates():
+    asyncio.run(_failure_propagates())
+
+
+def test_cancelled_component_reported():
+    asyncio.run(_cancelled_component_reported())
+
+
+def main():
+    test_minimum_set_before_stragglers()
+    test_failure_propagates()
+    test_cancelled_component_reported()
+    print("\n🎉 All startup orchestrator tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the structured logging helpers (core/utils/structured_logging.py).
+"""
+
+import io
+import logging
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.structured_logging import (
+    LazyJSON, Lazy, Sampler, StructuredFormatter, configure_logging, log_event, parse_levels,
+)
+
+
+class FakeConfig:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+def _capture(name):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(StructuredFormatter("%(levelname)s %(message)s"))
+    log = logging.getLogger(name)
+    log.handlers = [handler]
+    log.propagate = False
+    return log, stream
+
+
+def test_lazy_messages_not_built_when_disabled():
+    log, stream = _capture("core.test.lazy")
+    log.setLevel(logging.INFO)
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "expensive"
+
+    log.debug("value: %s", Lazy(expensive))
+    log.debug("items: %s", LazyJSON([{"never": "serialized"}], indent=2))
+    log_event(log, logging.DEBUG, "skipped", detail=Lazy(expensive))
+    assert not calls and stream.getvalue() == ""
+
+    log.setLevel(logging.DEBUG)
+    log.debug("value: %s", Lazy(expensive))
+    assert calls == [1] and "value: expensive" in stream.getvalue()
+    print("✅ Disabled log calls never build their messages")
+
+
+def test_structured_fields_rendered():
+    log, stream = _capture("core.test.fields")
+    log.setLevel(logging.INFO)
+    log_event(log, logging.INFO, "OmniParser response", status=200, elements=42)
+    assert stream.getvalue().strip() == "INFO OmniParser response status=200 elements=42", stream.getvalue()
+    print("✅ Structured fields rendered as key=value")
+
+
+def test_sampler_lets_one_in_n_through():
+    log, stream = _capture("core.test.sampler")
+    log.setLevel(logging.DEBUG)
+    sampler = Sampler(every=10)
+    for i in range(35):
+        sampler.log(log, logging.DEBUG, "token", "token %d", i)
+    lines = stream.getvalue().splitlines()
+    assert lines == ["DEBUG token 0", "DEBUG token 10", "DEBUG token 20", "DEBUG token 30"], lines
+    assert sampler.count("token") == 35
+    print(f"✅ Sampler emitted {len(lines)} of 35 events")
+
+
+def test_per_subsystem_levels():
+    assert parse_levels("core.lm=DEBUG, core.utils.omniparser=warning, bogus") == {
+        "core.lm": logging.DEBUG, "core.utils.omniparser": logging.WARNING}
+    levels = configure_logging(FakeConfig({
+        "LOG_LEVEL": "INFO",
+        "LOG_LEVELS": "core.lm=DEBUG, core.utils.omniparser=WARNING",
+    }))
+    assert levels["core"] == logging.INFO
+    assert logging.getLogger("core.lm.handlers.lmstudio_handler").isEnabledFor(logging.DEBUG)
+    assert not logging.getLogger("core.utils.omniparser.omniparser_interface").isEnabledFor(logging.INFO)
+    assert not logging.getLogger("core.operate").isEnabledFor(logging.DEBUG)
+    print("✅ Per-subsystem levels applied")
+
+
+def main():
+    test_lazy_messages_not_built_when_disabled()
+    test_structured_fields_rendered()
+    test_sampler_lets_one_in_n_through()
+    test_per_subsystem_levels()
+    print("\n🎉 All structured logging tests passed")
+
+
+if __name__ == "__main__":
+    main()
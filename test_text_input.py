@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the clipboard-paste typing strategy
+(core/utils/operating_system/text_input.py). A fake clipboard and recorded
+input functions stand in for pyperclip and pyautogui.
+"""
+
+import os
+import sys
+import time
+
+# Add project root to path
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.utils.metrics import TYPED_CHARACTERS
+from core.utils.operating_system.text_input import TextTyper, paste_hotkey
+
+
+class FakeClipboard:
+    def __init__(self, text="user clipboard", broken=False):
+        self.text = text
+        self.broken = broken
+
+    def copy(self, text):
+        if self.broken:
+            raise RuntimeError("could not find a copy/paste mechanism")
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+
+class Recorder:
+    """Input functions that record what they were asked to do, and what was pasted."""
+
+    def __init__(self, clipboard, key_delay=0.0):
+        self.clipboard = clipboard
+        self.key_delay = key_delay
+        self.events = []
+
+    def write(self, text, interval=0.0):
+        time.sleep(self.key_delay * len(text))
+        self.events.append(("keys", text))
+
+    def hotkey(self, *keys):
+        if keys == paste_hotkey():
+            self.events.append(("paste", self.clipboard.paste()))
+        else:
+            self.events.append(("hotkey", keys))
+
+    def press(self, key):
+        self.events.append(("press", key))
+
+    def typed(self):
+        return "".join(value if kind in ("keys", "paste") else {"enter": "\n", "tab": "\t"}[value]
+                       for kind, value in self.events)
+
+
+def _type(typer, text, recorder):
+    return typer.type(text, write=recorder.write, hotkey=recorder.hotkey, press=recorder.press)
+
+
+def test_plan():
+    typer = TextTyper(clipboard=FakeClipboard())
+    assert typer.plan("chrome") == [("keys", "chrome")]
+    assert typer.plan("https://example.com/search?q=automoy") == [("paste", "https://example.com/search?q=automoy")]
+    assert typer.plan("café") == [("paste", "café")]
+    assert typer.plan("Dear team,\nThe report is attached.\tok") == [
+        ("paste", "Dear team,"), ("press", "enter"), ("paste", "The report is attached."),
+        ("press", "tab"), ("keys", "ok")]
+    assert TextTyper(strategy="keys").plan("https://example.com") == [("keys", "https://example.com")]
+    assert TextTyper(strategy="paste", clipboard=FakeClipboard()).plan("ok") == [("paste", "ok")]
+    print("✅ Long and non-ASCII runs are pasted, short ones typed, newlines and tabs pressed")
+
+
+def test_paste_restores_clipboard():
+    clipboard = FakeClipboard()
+    recorder = Recorder(clipboard)
+    typer = TextTyper(restore_delay=0, clipboard=clipboard)
+    pasted = TYPED_CHARACTERS.value(method="paste")
+    text = "Quarterly numbers:\n1. Revenue up 12%\n2. Costs flat"
+    assert _type(typer, text, recorder) == "paste+press"
+    assert recorder.typed() == text, recorder.events
+    assert clipboard.text == "user clipboard"
+    assert TYPED_CHARACTERS.value(method="paste") - pasted == len(text) - 2
+    print("✅ Pasted text arrives intact and the user's clipboard is restored")
+
+
+def test_clipboard_unavailable_falls_back_to_keys():
+    clipboard = FakeClipboard(broken=True)
+    recorder = Recorder(clipboard)
+    typer = TextTyper(restore_delay=0, clipboard=clipboard)
+    assert _type(typer, "https://example.com", recorder) == "keys"
+    assert recorder.events == [("keys", "https://example.com")]
+    assert not typer.clipboard_ok and typer.plan("https://example.com") == [("keys", "https://example.com")]
+    print("✅ Without a clipboard every run is typed key by key")
+
+
+def test_paste_is_faster_for_long_text():
+    text = "The quick brown fox jumps over the lazy dog. " * 4
+    key_delay = 0.002  # per character, well below pyautogui's old 0.05 s interval
+    timings = {}
+    for strategy in ("keys", "auto"):
+        clipboard = FakeClipboard()
+        recorder = Recorder(clipboard, key_delay=key_delay)
+        started = time.perf_counter()
+        _type(TextTyper(strategy=strategy, restore_delay=0.01, clipboard=clipboard), text, recorder)
+        timings[strategy] = time.perf_counter() - started
+        assert recorder.typed() == text
+    assert timings["auto"] * 5 < timings["keys"], timings
+    print(f"✅ {len(text)} characters: {timings['keys'] * 1000:.0f} ms key by key, "
+          f"{timings['auto'] * 1000:.0f} ms pasted")
+
+
+def main():
+    test_plan()
+    test_paste_restores_clipboard()
+    test_clipboard_unavailable_falls_back_to_keys()
+    test_paste_is_faster_for_long_text()
+    print("\n🎉 All text input tests passed")
+
+
+if __name__ == "__main__":
+    main()